@@ -0,0 +1,178 @@
+# backend/bench_listener_isolation.py
+"""
+API latency under heavy beacon load: thread listeners vs process-isolated
+listeners (core.listeners.process).
+
+This process plays the teamserver: it owns the session registry, runs one
+HTTP(S) listener and serves a small stdlib API endpoint (GET /sessions,
+serializing the session table like the real route does). Load processes
+beacon as fast as they can (GET for a command, POST a --output-kb result),
+and a probe process times GET /sessions round trips while that runs.
+
+Each mode reports beacon throughput and probe latency percentiles; the
+"idle" row is the probe with no beacon load.
+
+Usage:
+  python -m TeamServer.bench_listener_isolation
+  python -m TeamServer.bench_listener_isolation --procs 8 --beacons 32 --output-kb 256 --duration 15
+  python -m TeamServer.bench_listener_isolation --https       # needs `cryptography` for the generated cert
+"""
+import argparse
+import base64
+import http.client
+import json
+import multiprocessing as mp
+import os
+import random
+import ssl
+import statistics
+import string
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _conn(scheme: str, port: int):
+    if scheme == "https":
+        return http.client.HTTPSConnection("127.0.0.1", port, timeout=30, context=ssl._create_unverified_context())
+    return http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+
+def _beacon_worker(scheme: str, port: int, n_threads: int, output_kb: int, stop_at: float, counter):
+    """Load process: n_threads implants beaconing back to back until stop_at."""
+    text = "".join(random.choices(string.ascii_letters + string.digits + " \n", k=output_kb * 1024))
+    body = json.dumps({"output": base64.b64encode(text.encode()).decode()}).encode()
+    done = [0] * n_threads
+
+    def implant(i):
+        sid = "-".join("".join(random.choices(string.ascii_lowercase + string.digits, k=5)) for _ in range(3))
+        hdr = {"X-Session-ID": sid, "Content-Type": "application/json"}
+        while time.time() < stop_at:
+            try:
+                c = _conn(scheme, port)
+                c.request("GET", "/", headers=hdr)
+                c.getresponse().read()
+                c.close()
+                c = _conn(scheme, port)
+                c.request("POST", "/", body=body, headers=hdr)
+                c.getresponse().read()
+                c.close()
+                done[i] += 1
+            except OSError:
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=implant, args=(i,), daemon=True) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with counter.get_lock():
+        counter.value += sum(done)
+
+
+def _probe_worker(api_port: int, interval: float, stop_at: float, out):
+    """Probe process: time GET /sessions round trips (ms)."""
+    samples = []
+    while time.time() < stop_at:
+        t0 = time.perf_counter()
+        c = http.client.HTTPConnection("127.0.0.1", api_port, timeout=30)
+        c.request("GET", "/sessions")
+        c.getresponse().read()
+        c.close()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        time.sleep(interval)
+    out.put(samples)
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        from core.session_handlers import session_manager
+
+        rows = [{"id": sid, "transport": s.transport, **(s.metadata or {})}
+                for sid, s in list(session_manager.sessions.items())]
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return
+
+
+def _pct(samples, p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+
+def _run(label: str, args, ctx, api_port: int, port: int = 0) -> None:
+    stop_at = time.time() + args.duration
+    counter = ctx.Value("q", 0)
+    out = ctx.Queue()
+    loaders = []
+    if port:
+        loaders = [ctx.Process(target=_beacon_worker, args=(args.scheme, port, args.beacons, args.output_kb, stop_at, counter))
+                   for _ in range(args.procs)]
+    probe = ctx.Process(target=_probe_worker, args=(api_port, args.interval / 1000.0, stop_at, out))
+    for p in loaders + [probe]:
+        p.start()
+    samples = out.get()
+    for p in loaders + [probe]:
+        p.join()
+
+    rate = counter.value / args.duration
+    print(f"    {label:<10}{rate:>12,.0f}{len(samples):>9}{statistics.median(samples):>10.2f}"
+          f"{_pct(samples, 95):>10.2f}{_pct(samples, 99):>10.2f}{max(samples):>10.2f}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modes", default="thread,process", help="comma list of thread/process")
+    ap.add_argument("--procs", type=int, default=4, help="beacon load processes")
+    ap.add_argument("--beacons", type=int, default=16, help="implant threads per load process")
+    ap.add_argument("--output-kb", type=int, default=64, help="size of each POSTed result")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    ap.add_argument("--interval", type=float, default=10.0, help="ms between API probes")
+    ap.add_argument("--port", type=int, default=18480, help="first listener port (one per mode)")
+    ap.add_argument("--https", dest="scheme", action="store_const", const="https", default="http")
+    args = ap.parse_args(argv)
+
+    # keep the benchmark off the operator's real session/history databases
+    os.environ.setdefault("SESSION_DB", "off")
+    os.environ.setdefault("HISTORY_DB", "off")
+    sys.path.insert(0, PROJECT_ROOT)
+    from core.listeners import base
+
+    base.load_listeners()
+    ctx = mp.get_context("spawn")
+
+    api = ThreadingHTTPServer(("127.0.0.1", 0), _ApiHandler)
+    api.daemon_threads = True
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    api_port = api.server_address[1]
+
+    print(f"[*] {args.scheme.upper()} beacons: {args.procs} procs x {args.beacons} implants, "
+          f"{args.output_kb} KB results, {args.duration:.0f}s per mode; API probe every {args.interval:.0f} ms")
+    print(f"    {'mode':<10}{'beacons/s':>12}{'probes':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    _run("idle", args, ctx, api_port)
+
+    for i, mode in enumerate(m.strip() for m in args.modes.split(",") if m.strip()):
+        inst = base.create_listener("127.0.0.1", args.port + i, args.scheme, to_console=False,
+                                    isolated=(mode == "process"))
+        try:
+            _run(mode, args, ctx, api_port, args.port + i)
+        finally:
+            inst.stop()
+            with base._reg_lock:
+                base.listeners.pop(inst.id, None)
+
+    api.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
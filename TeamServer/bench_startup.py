@@ -0,0 +1,88 @@
+# backend/bench_startup.py
+"""
+Teamserver startup benchmark / regression gate.
+
+Imports TeamServer.main in a fresh interpreter under ``python -X importtime``
+and fails (exit 1) when:
+  * the import takes longer than --budget seconds (best of --repeat runs), or
+  * a module that must stay lazy shows up on the startup path.
+
+Usage:
+  python -m TeamServer.bench_startup                 # budget 1.0s, 3 runs
+  python -m TeamServer.bench_startup --budget 0.6 --top 25
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Loaded on first use only (payload builds, file transfers). `cryptography` is
+# not listed: PyJWT and the operator store import it at startup regardless.
+LAZY_PREFIXES = (
+    "core.payload_generator",
+    "core.transfers",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(target: str):
+    """Return (wall_seconds, [(self_us, cumulative_us, depth, module), ...])."""
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {target}"]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"[!] importing {target} failed (exit {proc.returncode})")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    return wall, rows
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--target", default="TeamServer.main")
+    ap.add_argument("--budget", type=float, default=1.0, help="max seconds for the best run")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=15, help="show N slowest modules (self time)")
+    args = ap.parse_args(argv)
+
+    best = None
+    for _ in range(max(1, args.repeat)):
+        wall, rows = run_once(args.target)
+        if best is None or wall < best[0]:
+            best = (wall, rows)
+    wall, rows = best
+
+    total_us = sum(r[0] for r in rows)
+    print(f"[*] {args.target}: wall {wall * 1000:.0f} ms (interpreter + imports), "
+          f"imports {total_us / 1000:.0f} ms across {len(rows)} modules")
+    print(f"    {'self ms':>8} {'cum ms':>8}  module")
+    for self_us, cum_us, _depth, mod in sorted(rows, key=lambda r: r[0], reverse=True)[:args.top]:
+        print(f"    {self_us / 1000:8.1f} {cum_us / 1000:8.1f}  {mod}")
+
+    failed = False
+    eager = sorted({mod for *_, mod in rows if mod.startswith(LAZY_PREFIXES)})
+    if eager:
+        failed = True
+        print("[!] modules that should be lazy were imported at startup:")
+        for mod in eager:
+            print(f"    {mod}")
+    if wall > args.budget:
+        failed = True
+        print(f"[!] startup {wall:.3f}s exceeds budget {args.budget:.3f}s")
+    if not failed:
+        print(f"[+] within budget ({wall:.3f}s <= {args.budget:.3f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,405 @@
+# backend/bench_tracing.py
+"""
+Tracing overhead on the real command paths: CommandRouter.send()/receive()
+and the HTTP beacon handler, with tracing off, against the eager debug
+logging those paths did before core.tracing existed.
+
+Rows:
+  router       one CommandRouter.send() + receive() round trip (the beacon's
+               part is done by hand: command popped, tagged output pushed back)
+  beacon GET   C2HTTPRequestHandler.do_GET check-in that picks up a command
+  beacon POST  C2HTTPRequestHandler.do_POST carrying that command's output
+
+Each row is timed three ways:
+  off    current code, SENTINEL_TRACE unset
+  eager  the same code with the pre-tracing logger.debug calls (f-strings,
+         time.strftime() and qsize() built on every call, then dropped by the
+         logger because DEBUG is not enabled)
+  on     tracing enabled for router/http_listener, DEBUG still not enabled
+
+The handler is driven in process through a fake socket against a warm HTTP
+session, so the numbers are the Python cost of a request, not network time.
+Session persistence and command history are switched off for the run.
+
+Usage:
+  python -m TeamServer.bench_tracing
+  python -m TeamServer.bench_tracing --iterations 50000 --repeat 7
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import queue
+import sys
+import time
+
+os.environ["SESSION_DB"] = "off"
+os.environ["HISTORY_DB"] = "off"
+os.environ.pop("SENTINEL_TRACE", None)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from core import tracing  # noqa: E402
+from core.command_routing import http_command_router as router_mod  # noqa: E402
+from core.command_routing.http_command_router import CommandRouter  # noqa: E402
+from core.listeners import http as http_mod  # noqa: E402
+from core.listeners.base import listeners as listener_registry, socket_to_listener  # noqa: E402
+from core.session_handlers import session_manager  # noqa: E402
+from core.utils import defender, normalize_output  # noqa: E402
+
+SID = "bench-sid01-xxxxx"
+OP = "bench"
+LID = "bench-listener"
+FD = -4242
+CMD = "Get-ChildItem C:\\Users\\alice\\Documents | Select-Object Name,Length"
+OUTPUT = "\n".join(f"report_{i:04d}.docx    {1024 * i}" for i in range(8))
+
+
+# ---------------------------------------------------------------------------
+# Pre-tracing logging, reproduced on top of the current code paths
+# ---------------------------------------------------------------------------
+_rlog = router_mod.logger
+_hlog = http_mod.logger
+
+
+class _EagerRouter(CommandRouter):
+    """CommandRouter with the logger.debug calls it made before core.tracing."""
+
+    def __init__(self, session):
+        self.session = session
+        _rlog.debug(
+            "[%s] CommandRouter initialized for session %r",
+            time.strftime("%Y-%m-%d %H:%M:%S"), session.sid
+        )
+
+    def _ensure_queues(self, op_id):
+        before_cmd = len(self.session.merge_command_queue)
+        before_res = len(self.session.merge_response_queue)
+
+        self.session.merge_command_queue.setdefault(op_id, queue.Queue())
+        self.session.merge_response_queue.setdefault(op_id, queue.Queue())
+
+        _rlog.debug(
+            "[%s] Queues ensured for op_id=%r (cmd_queues: %d→%d, res_queues: %d→%d)",
+            time.strftime("%H:%M:%S"),
+            op_id,
+            before_cmd, len(self.session.merge_command_queue),
+            before_res, len(self.session.merge_response_queue)
+        )
+
+    def send(self, cmd, op_id="console", defender_bypass=False, transfer_use=False):
+        self.cmd = cmd
+        self._sent_at = None if transfer_use else time.time()
+
+        start_ts = time.time()
+        _rlog.debug(
+            "[%s] send() called: cmd=%r, op_id=%r, defender_bypass=%r",
+            time.strftime("%Y-%m-%d %H:%M:%S"), cmd, op_id, defender_bypass
+        )
+
+        self._ensure_queues(op_id)
+
+        _rlog.debug("[%s] Defender active=%r", time.strftime("%H:%M:%S"), defender.is_active)
+
+        os_type = self.session.metadata.get("os", "").lower()
+        if defender.is_active and not defender_bypass:
+            if os_type in ("windows", "linux"):
+                if not defender.inspect_command(os_type, cmd):
+                    self._record(op_id, "", "blocked")
+                    raise PermissionError("Command blocked by Session-Defender")
+
+        _rlog.debug(
+            "[%s] Defender check passed for op_id=%r (os_type=%r)",
+            time.strftime("%H:%M:%S"), op_id, os_type
+        )
+
+        b64_cmd = base64.b64encode(cmd.encode()).decode()
+        _rlog.debug(
+            "[%s] Encoded cmd to base64 for op_id=%r: %r",
+            time.strftime("%H:%M:%S"), op_id, b64_cmd
+        )
+
+        self.session.merge_command_queue[op_id].put(b64_cmd)
+
+        _rlog.debug(
+            "[%s] Enqueued command for op_id=%r; queue_size=%d",
+            time.strftime("%H:%M:%S"),
+            op_id,
+            self.session.merge_command_queue[op_id].qsize()
+        )
+
+        _rlog.debug(
+            "[%s] send() completed in %.4fs", time.strftime("%H:%M:%S"), time.time() - start_ts
+        )
+
+    def receive(self, op_id="console", block=True, timeout=None, transfer_use=False):
+        self._ensure_queues(op_id)
+        q = self.session.merge_response_queue[op_id]
+
+        _rlog.debug(
+            "[%s] receive() called: op_id=%r, block=%r, timeout=%s, queue_size=%d",
+            time.strftime("%H:%M:%S"),
+            op_id, block, str(timeout),
+            q.qsize()
+        )
+
+        out_b64 = q.get(timeout=timeout) if block else q.get_nowait()
+        decoded = base64.b64decode(out_b64).decode("utf-8", "ignore").strip()
+
+        _rlog.debug(
+            "[%s] Dequeued & decoded response for op_id=%r; remaining_queue=%d: %r",
+            time.strftime("%H:%M:%S"),
+            op_id,
+            self.session.merge_response_queue[op_id].qsize(),
+            decoded
+        )
+        decoded = normalize_output(decoded, self.cmd)
+        self._record(op_id, decoded)
+        return decoded
+
+
+class _EagerHandler(http_mod.C2HTTPRequestHandler):
+    """Handler whose profile lookup logs the way it did before core.tracing."""
+
+    def _select_profile(self, listener):
+        _hlog.debug(http_mod.brightblue + f"Searching listener {listener} for profiles" + http_mod.reset)
+        profs = getattr(listener, "profiles", {}) or {}
+        _hlog.debug(http_mod.brightblue + f"Found profiles {profs}" + http_mod.reset)
+        for hdr in self.RARE_HEADERS:
+            val = self.headers.get(hdr)
+            if val and val in profs:
+                _hlog.debug(http_mod.brightblue + f"Found profile header {hdr} with value {val} in profiles {profs}" + http_mod.reset)
+                profile = profs[val]
+                if profile:
+                    _hlog.debug(http_mod.brightyellow + f"Successfully grabbed profile class {profile}" + http_mod.reset)
+                    return profile
+        _hlog.debug(http_mod.brightred + "Returning none because no profile was found!" + http_mod.reset)
+        if self.command == "POST":
+            # do_POST logged the pick itself, right after this call
+            _hlog.debug(http_mod.brightyellow + f"Set profile to {None}" + http_mod.reset)
+        return None
+
+
+def _eager_checkin(sid, lid, scheme):
+    """beacon_checkin() with the check-in path's old eager logging."""
+    if sid in session_manager.dead_sessions:
+        return None
+    session = session_manager.sessions.get(sid)
+    if session is None:
+        return None
+
+    http_mod.BEACONS.inc(listener=lid, transport=scheme)
+    session_manager.touch_session(sid)
+
+    with http_mod._reg_lock:
+        listener = listener_registry.get(lid) if lid else None
+        if listener is not None and sid not in listener.sessions:
+            listener.sessions.append(sid)
+            session_manager.bind_listener(sid, lid)
+
+    try:
+        cmd_b64 = session.meta_command_queue.get_nowait()
+        session.last_cmd_type = "meta"
+        _hlog.debug(http_mod.brightblue + f"SET MODE TO METADATA COLLECTING METADATA FOR SID {sid}" + http_mod.reset)
+
+    except queue.Empty:
+        super_cmd_parts = []
+        picked_op = None
+        for op_id, q in list(session.merge_command_queue.items()):
+            try:
+                cmd_b64 = q.get_nowait()
+                super_cmd_parts.append(f"""
+					Write-Output "__OP__{op_id}__";
+					{base64.b64decode(cmd_b64).decode("utf-8", errors="ignore")}
+					Write-Output "__ENDOP__{op_id}__";
+				""")
+                session.last_cmd_type = "cmd"
+                picked_op = op_id
+            except queue.Empty:
+                continue
+
+        if picked_op:
+            combined = "\n".join(super_cmd_parts)
+            _hlog.debug(f"EXECUTING COMMAND: {combined}")
+            cmd_b64 = base64.b64encode(combined.encode("utf-8")).decode("utf-8")
+        else:
+            cmd_b64 = ""
+
+    return cmd_b64
+
+
+def _eager_output(sid, output, scheme):
+    """beacon_output() for a session in cmd mode, with the old eager logging."""
+    if sid in session_manager.dead_sessions:
+        return None
+    session = session_manager.sessions.get(sid)
+    if session is None:
+        return None
+
+    _hlog.debug(f"MODE {session.mode}")
+    assert session.last_cmd_type == "cmd", "bench session left cmd mode"
+    if output:
+        for m in http_mod._OP_BLOCK.finditer(output):
+            op = m.group("op")
+            out = m.group("out").strip()
+            session.merge_response_queue.setdefault(op, queue.Queue())
+            session.merge_response_queue[op].put(base64.b64encode(out.encode()).decode())
+    return "ok"
+
+
+# ---------------------------------------------------------------------------
+# In-process harness
+# ---------------------------------------------------------------------------
+class _FakeConn:
+    """Just enough socket for StreamRequestHandler: one canned request in, replies discarded."""
+
+    def __init__(self, raw: bytes):
+        self._raw = raw
+
+    def makefile(self, mode, *args, **kwargs):
+        return io.BytesIO(self._raw if "r" in mode else b"")
+
+    def sendall(self, data):
+        pass
+
+
+class _FakeSocket:
+    def fileno(self):
+        return FD
+
+
+class _FakeServer:
+    scheme = "http"
+    socket = _FakeSocket()
+
+
+class _FakeListener:
+    profiles = {}
+
+    def __init__(self):
+        self.sessions = []
+
+
+def _request(method: str, body: bytes = b"") -> bytes:
+    head = (f"{method} / HTTP/1.1\r\nHost: 127.0.0.1\r\nX-Session-ID: {SID}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    return head.encode() + body
+
+
+def _setup():
+    session = session_manager.Session(SID, "http", queue.Queue(),
+                                      metadata={"os": "Windows", "user": "CORP\\alice", "hostname": "WKSTN-1"})
+    session_manager.sessions[SID] = session
+    listener_registry[LID] = _FakeListener()
+    socket_to_listener[FD] = LID
+    return session
+
+
+def _agent_roundtrip(session):
+    """What the implant and the beacon handler do between send() and receive()."""
+    cmd_b64 = session.merge_command_queue[OP].get_nowait()
+    cmd = base64.b64decode(cmd_b64).decode()
+    out = f"{cmd}\n{OUTPUT}"
+    session.merge_response_queue[OP].put(base64.b64encode(out.encode()).decode())
+
+
+def _bench_router(session, router_cls, n: int) -> float:
+    router = router_cls(session)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        router.send(CMD, op_id=OP)
+        _agent_roundtrip(session)
+        router.receive(op_id=OP, timeout=1)
+    return time.perf_counter() - t0
+
+
+def _bench_get(session, handler_cls, n: int) -> float:
+    raw = _request("GET")
+    cmd_b64 = base64.b64encode(CMD.encode()).decode()
+    q = session.merge_command_queue.setdefault(OP, queue.Queue())
+    t = 0.0
+    for _ in range(n):
+        q.put(cmd_b64)
+        t0 = time.perf_counter()
+        handler_cls(_FakeConn(raw), ("127.0.0.1", 50000), _FakeServer())
+        t += time.perf_counter() - t0
+    assert q.empty(), "check-in did not pick up the queued command"
+    return t
+
+
+def _bench_post(session, handler_cls, n: int) -> float:
+    tagged = f"__OP__{OP}__\n{OUTPUT}\n__ENDOP__{OP}__"
+    raw = _request("POST", json.dumps({"output": base64.b64encode(tagged.encode()).decode()}).encode())
+    q = session.merge_response_queue.setdefault(OP, queue.Queue())
+    t = 0.0
+    for _ in range(n):
+        session.last_cmd_type = "cmd"
+        t0 = time.perf_counter()
+        handler_cls(_FakeConn(raw), ("127.0.0.1", 50000), _FakeServer())
+        t += time.perf_counter() - t0
+        q.get_nowait()  # raises if the output was not demuxed
+    return t
+
+
+def _run(fn, session, variants, n: int, repeat: int) -> dict:
+    """
+    Best-of-`repeat` microseconds per call for each (name, make_variant, traced)
+    entry. The variants take turns inside every repeat so machine drift hits
+    them alike.
+    """
+    best = {}
+    for rep in range(repeat + 1):
+        for name, make, traced in variants:
+            if traced:
+                tracing.enable(*traced)
+            else:
+                tracing.disable()
+            t = fn(session, make(), n if rep else max(1, n // 10))
+            if rep:  # the first pass is warm-up
+                best[name] = min(best.get(name, t), t)
+    tracing.disable()
+    return {name: t / n * 1e6 for name, t in best.items()}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iterations", type=int, default=20000, help="calls per run")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per measurement (best reported)")
+    args = ap.parse_args(argv)
+
+    session = _setup()
+    real_checkin, real_output = http_mod.beacon_checkin, http_mod.beacon_output
+
+    def eager_handler():
+        http_mod.beacon_checkin, http_mod.beacon_output = _eager_checkin, _eager_output
+        return _EagerHandler
+
+    def current_handler():
+        http_mod.beacon_checkin, http_mod.beacon_output = real_checkin, real_output
+        return http_mod.C2HTTPRequestHandler
+
+    rows = (
+        ("router", _bench_router, lambda: CommandRouter, lambda: _EagerRouter),
+        ("beacon GET", _bench_get, current_handler, eager_handler),
+        ("beacon POST", _bench_post, current_handler, eager_handler),
+    )
+
+    print(f"[*] {args.iterations} calls x {args.repeat} runs, microseconds per call (best run)")
+    print(f"    {'path':<14}{'off':>10}{'eager':>10}{'on':>10}{'eager-off':>12}")
+    for label, fn, current, eager in rows:
+        us = _run(fn, session, (
+            ("off", current, ()),
+            ("eager", eager, ()),
+            ("on", current, ("router", "http_listener")),
+        ), args.iterations, args.repeat)
+        print(f"    {label:<14}{us['off']:>10.2f}{us['eager']:>10.2f}{us['on']:>10.2f}"
+              f"{us['eager'] - us['off']:>+12.2f}")
+    current_handler()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
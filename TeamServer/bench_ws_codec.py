@@ -0,0 +1,102 @@
+# backend/bench_ws_codec.py
+"""
+Websocket wire-encoding benchmark: JSON text vs msgpack vs msgpack with
+columnar rows, over a sessions snapshot and a large fs.list reply.
+
+Times the teamserver side (ws_codec.encode) and the GUI side (json.loads,
+or gui/ws_codec.decode_binary including re-inflating columns) and prints
+frame sizes. msgpack rows are skipped when msgpack isn't installed.
+
+Usage:
+  python -m TeamServer.bench_ws_codec                      # 500 sessions, 20k entries
+  python -m TeamServer.bench_ws_codec --sessions 2000 --entries 50000 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from . import ws_codec
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "gui"))
+import ws_codec as gui_codec  # noqa: E402  (the GUI's receive side, no Qt needed)
+
+
+def _snapshot(n: int) -> dict:
+    rows = [{
+        "id": f"{i:08x}-3f2a-4c1d-9e8b-{i:012x}",
+        "hostname": f"WKSTN-{i:05d}",
+        "user": f"CORP\\user{i % 211}",
+        "os": "windows" if i % 4 else "linux",
+        "arch": "x64",
+        "transport": ("tcp", "tls", "http", "https")[i % 4],
+        "integrity": ("medium", "high", "system")[i % 3],
+        "last_checkin": 1760000000.0 + i,
+    } for i in range(n)]
+    return {"type": "snapshot", "sessions": rows}
+
+
+def _listing(n: int) -> dict:
+    rows = [{
+        "name": f"report_{i:06d}.docx" if i % 10 else f"folder_{i:06d}",
+        "is_dir": i % 10 == 0,
+        "size": None if i % 10 == 0 else 1024 * (i % 977),
+        "mtime": 1760000000000 + i * 1000,
+        "type": "File folder" if i % 10 == 0 else "Microsoft Word Document",
+        "owner": "CORP\\alice" if i % 3 else "BUILTIN\\Administrators",
+    } for i in range(n)]
+    return {"type": "fs.list", "req_id": "list", "path": "C:\\Users\\alice\\Documents",
+            "ok": True, "entries": rows}
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def _bench(label: str, payload: dict, repeat: int) -> None:
+    print(f"[*] {label}")
+    print(f"    {'codec':<20}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}")
+
+    txt = ws_codec.encode(payload, ws_codec.CODEC_JSON)
+    enc = _time(lambda: ws_codec.encode(payload, ws_codec.CODEC_JSON), repeat)
+    dec = _time(lambda: json.loads(txt), repeat)
+    print(f"    {'json (text)':<20}{len(txt.encode()):>12,}{enc:>12.2f}{dec:>12.2f}")
+
+    if ws_codec.msgpack is None or not gui_codec.available():
+        print("    (msgpack not installed - skipping binary codecs)")
+        return
+
+    plain = ws_codec.TAG_MSG + ws_codec.msgpack.packb(payload, use_bin_type=True)
+    enc = _time(lambda: ws_codec.TAG_MSG + ws_codec.msgpack.packb(payload, use_bin_type=True), repeat)
+    dec = _time(lambda: gui_codec.decode_binary(plain), repeat)
+    print(f"    {'msgpack (rows)':<20}{len(plain):>12,}{enc:>12.2f}{dec:>12.2f}")
+
+    frame = ws_codec.encode(payload, ws_codec.CODEC_MSGPACK)
+    enc = _time(lambda: ws_codec.encode(payload, ws_codec.CODEC_MSGPACK), repeat)
+    dec = _time(lambda: gui_codec.decode_binary(frame), repeat)
+    kind, back = gui_codec.decode_binary(frame)
+    assert kind == "text" and back == json.loads(txt), "columnar round trip mismatch"
+    print(f"    {'msgpack (columnar)':<20}{len(frame):>12,}{enc:>12.2f}{dec:>12.2f}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=500)
+    ap.add_argument("--entries", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=10, help="runs per measurement (median reported)")
+    args = ap.parse_args(argv)
+
+    _bench(f"sessions snapshot, {args.sessions} sessions", _snapshot(args.sessions), args.repeat)
+    _bench(f"fs.list, {args.entries} entries", _listing(args.entries), args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,4 +4,8 @@ SECRET_KEY = os.getenv("SECRET_KEY", "CHANGE_ME_SUPER_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 90
 
-DB_PATH = os.path.expanduser("~/.sentinelcommander/db/operators.db")
\ No newline at end of file
+DB_PATH = os.path.expanduser("~/.sentinelcommander/db/operators.db")
+
+# Teamserver-side fs.list cache shared by all operators (seconds / max directories kept)
+LISTING_CACHE_TTL = float(os.getenv("LISTING_CACHE_TTL", "5"))
+LISTING_CACHE_MAX = int(os.getenv("LISTING_CACHE_MAX", "512"))
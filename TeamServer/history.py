@@ -0,0 +1,54 @@
+# backend/history.py
+"""
+Command/output history search (see core.command_history).
+
+  GET /history?q=mimikatz&sid=...&op_id=...&since=...&until=...&before=...&limit=50
+      -> {"items": [...], "next": <id or null>, "fts": bool}
+         items are newest first; pass "next" back as ?before= for the next page.
+         "snippet" marks matches with \\x02 ... \\x03.
+  GET /history/{id}
+      -> one entry including the full output
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from .dependencies import get_current_user
+from core import command_history
+
+router = APIRouter()
+
+
+def _store():
+    store = command_history.get_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Command history is disabled")
+    return store
+
+
+@router.get("")
+async def search_history(
+    q: str = Query("", description="full-text query over commands and outputs"),
+    sid: Optional[str] = None,
+    op_id: Optional[str] = None,
+    since: Optional[float] = Query(None, description="unix time, inclusive"),
+    until: Optional[float] = Query(None, description="unix time, exclusive"),
+    before: Optional[int] = Query(None, description="page cursor: the previous page's 'next'"),
+    limit: int = Query(50, ge=1, le=command_history.MAX_PAGE),
+    _user: dict = Depends(get_current_user),
+):
+    store = _store()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: store.search(
+        q, sid=sid, op_id=op_id, since=since, until=until, before_id=before, limit=limit))
+
+
+@router.get("/{hid}")
+async def get_history_entry(hid: int, _user: dict = Depends(get_current_user)):
+    store = _store()
+    loop = asyncio.get_running_loop()
+    row = await loop.run_in_executor(None, store.get, hid)
+    if row is None:
+        raise HTTPException(status_code=404, detail="History entry not found")
+    return row
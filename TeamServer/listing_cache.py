@@ -0,0 +1,174 @@
+# backend/listing_cache.py
+"""
+Directory listing cache shared by every /ws/files connection.
+
+Listings are keyed by (session, normalized path, lazy_owner) and live for
+``config.LISTING_CACHE_TTL`` seconds. Concurrent requests for the same key
+share one remote call: the first caller starts the fetch, the others await
+the same task and each parses/pages the raw output for its own socket.
+Mutations made through the file browser (delete, new folder/file, upload)
+drop the affected listings explicitly so operators see their own changes
+immediately; anything done out of band shows up once the TTL lapses.
+
+The cache is per process. With several API workers (main.py --workers) each
+worker has its own, and a mutation only invalidates the cache of the worker
+that served it: a socket on another worker can be served the old listing
+until the TTL lapses (an fs.list with fresh=True always goes to the agent).
+
+Only touched from the event loop, so no locking.
+"""
+from __future__ import annotations
+
+import asyncio
+import ntpath
+import posixpath
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from . import config
+
+# (ok, real_path, entries); ok=False means the path does not exist
+Listing = Tuple[bool, str, List[Dict[str, Any]]]
+_Key = Tuple[str, str, bool]
+
+
+def normalize(path: str, os_type: str) -> str:
+    """Canonical cache key for a remote directory path."""
+    p = (path or "").strip()
+    if os_type == "windows":
+        p = p.replace("/", "\\")
+        if len(p) == 2 and p[1] == ":":
+            p += "\\"
+        p = ntpath.normpath(p) if p else p
+        if len(p) > 3 and p.endswith("\\"):
+            p = p.rstrip("\\")
+        return p.casefold()
+    return posixpath.normpath(p) if p else p
+
+
+def _parent(key: str, os_type: str) -> str:
+    return (ntpath if os_type == "windows" else posixpath).dirname(key)
+
+
+def _within(key: str, root: str, os_type: str) -> bool:
+    if key == root:
+        return True
+    sep = "\\" if os_type == "windows" else "/"
+    return key.startswith(root if root.endswith(sep) else root + sep)
+
+
+class ListingCache:
+    def __init__(self, ttl: float = config.LISTING_CACHE_TTL, max_entries: int = config.LISTING_CACHE_MAX):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[_Key, Tuple[float, Listing]]" = OrderedDict()
+        self._inflight: Dict[_Key, Tuple[asyncio.Future, int]] = {}
+        # bumped by every invalidation; a fetch that started before a bump is not stored
+        self._gen: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key: _Key) -> Optional[Listing]:
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        expires, listing = hit
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return listing
+
+    def peek(self, sid: str, path: str, os_type: str, lazy: bool = False) -> Optional[Listing]:
+        norm = normalize(path, os_type)
+        # a full listing (owners included) also answers a lazy request
+        return self._lookup((sid, norm, False)) or (self._lookup((sid, norm, True)) if lazy else None)
+
+    def cached(self, sid: str, path: str, os_type: str, lazy: bool = False) -> Optional[Listing]:
+        """peek() that counts towards the hit stats."""
+        listing = self.peek(sid, path, os_type, lazy)
+        if listing is not None:
+            self.hits += 1
+        return listing
+
+    async def fetch(self, sid: str, path: str, os_type: str,
+                    fetch: Callable[[], Awaitable[Any]], lazy: bool = False) -> Tuple[Any, int, str]:
+        """
+        Run ``fetch`` (the remote listing command), sharing one call between
+        concurrent callers for the same key. Returns ``(raw, token, source)``;
+        source is "remote" for the caller that started it and "shared" for the
+        ones that joined. Hand ``token`` back to store() once parsed.
+
+        The fetch runs as its own task, so a caller that gets cancelled (its
+        operator navigated away) does not throw the remote result away for
+        the others.
+        """
+        key = (sid, normalize(path, os_type), bool(lazy))
+        entry = self._inflight.get(key)
+        if entry is not None:
+            self.coalesced += 1
+            task, token = entry
+            return await asyncio.shield(task), token, "shared"
+
+        self.misses += 1
+        token = self._gen.get(sid, 0)
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = (task, token)
+        task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return await asyncio.shield(task), token, "remote"
+
+    def _fetch_done(self, key: _Key, task: asyncio.Future) -> None:
+        if self._inflight.get(key, (None,))[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    def store(self, sid: str, path: str, os_type: str, lazy: bool, listing: Listing, token: int) -> None:
+        # Missing paths are not cached (the operator may be about to create
+        # them), nor is anything fetched before an invalidation for the session.
+        if listing[0] and self._gen.get(sid, 0) == token:
+            self._store((sid, normalize(path, os_type), bool(lazy)), listing)
+
+    def _store(self, key: _Key, listing: Listing) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, listing)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def merge_owners(self, sid: str, path: str, os_type: str, owners: Dict[str, str]) -> None:
+        """Fold owners fetched for visible rows back into the cached lazy listing."""
+        listing = self._lookup((sid, normalize(path, os_type), True))
+        if listing is None or not owners:
+            return
+        for row in listing[2]:
+            o = owners.get(row.get("name"))
+            if o is not None:
+                row["owner"] = o
+
+    def invalidate(self, sid: str, target: str, os_type: str) -> int:
+        """
+        Drop listings affected by creating/removing/replacing ``target``: the
+        listing of its parent directory and every listing at or below it.
+        """
+        self._gen[sid] = self._gen.get(sid, 0) + 1
+        root = normalize(target, os_type)
+        parent = _parent(root, os_type)
+        doomed = [k for k in self._entries
+                  if k[0] == sid and (k[1] == parent or _within(k[1], root, os_type))]
+        for k in doomed:
+            del self._entries[k]
+        return len(doomed)
+
+    def invalidate_session(self, sid: str) -> None:
+        self._gen[sid] = self._gen.get(sid, 0) + 1
+        for k in [k for k in self._entries if k[0] == sid]:
+            del self._entries[k]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "inflight": len(self._inflight),
+                "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+listing_cache = ListingCache()
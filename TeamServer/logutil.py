@@ -1,9 +1,12 @@
 # backend/logutil.py
 from __future__ import annotations
 import json, logging, os, time, hashlib
-from logging.handlers import RotatingFileHandler
 from contextlib import contextmanager
 
+from core.logpipe import BatchRotatingFileHandler, attach, stats as pipeline_stats
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
 _STD_KEYS = {
     "name","msg","args","levelname","levelno","pathname","filename","module",
     "exc_info","exc_text","stack_info","lineno","funcName","created","msecs",
@@ -25,16 +28,23 @@ class JSONLFormatter(logging.Formatter):
             "name": record.name,
             "msg": record.getMessage(),
         }
-        # Include any non-standard fields that were passed via `extra=...`
+        # Include any non-standard fields that were passed via `extra=...`.
+        # One dumps() for the whole line; non-JSON values fall back to repr and
+        # fields are only re-walked if that single call fails (e.g. bad keys).
         for k, v in record.__dict__.items():
             if k in _STD_KEYS or k.startswith("_"):
                 continue
-            try:
-                json.dumps(v)  # probe JSON-serializability
-                base[k] = v
-            except Exception:
-                base[k] = repr(v)
-        return json.dumps(base, separators=(",", ":"), default=str)
+            base[k] = v
+        try:
+            return json.dumps(base, separators=(",", ":"), default=repr)
+        except (TypeError, ValueError):
+            for k, v in list(base.items()):
+                if not isinstance(v, _JSON_SCALARS):
+                    try:
+                        json.dumps(v, default=repr)
+                    except (TypeError, ValueError):
+                        base[k] = repr(v)
+            return json.dumps(base, separators=(",", ":"), default=repr)
 
 class RichFormatter(logging.Formatter):
     """Readable console formatter with short timestamp + level."""
@@ -63,9 +73,13 @@ def get_logger(name: str,
     Create a logger with:
       - JSONL rotating file logs (10MB x 5 by default)
       - human-console logs
+    Both handlers sit behind the shared async pipeline (core.logpipe), so a log
+    call only enqueues; formatting, rotation and disk writes happen on the
+    log-writer thread.
     Levels can be controlled via env:
       LOG_LEVEL_FILE, LOG_LEVEL_CONSOLE, LOG_LEVEL (fallback)
       LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+      LOG_QUEUE_SIZE, LOG_QUEUE_POLICY (drop|block), LOG_BATCH_SIZE
     """
     logger = logging.getLogger(name)
     if getattr(logger, "_logutil_configured", False):
@@ -78,18 +92,19 @@ def get_logger(name: str,
     ch = logging.StreamHandler()
     ch.setLevel(os.getenv("LOG_LEVEL_CONSOLE", "INFO"))
     ch.setFormatter(RichFormatter())
-    logger.addHandler(ch)
 
     # File (JSONL)
     log_dir = log_dir or os.getenv("LOG_DIR", "logs")
     _ensure_dir(log_dir)
     max_bytes = int(os.getenv("LOG_MAX_BYTES", "10485760"))   # 10MB
     backups   = int(os.getenv("LOG_BACKUP_COUNT", "5"))
-    fh = RotatingFileHandler(os.path.join(log_dir, f"{file_basename}.log"),
-                             maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    fh = BatchRotatingFileHandler(os.path.join(log_dir, f"{file_basename}.log"),
+                                  maxBytes=max_bytes, backupCount=backups, encoding="utf-8",
+                                  delay=True)
     fh.setLevel(os.getenv("LOG_LEVEL_FILE", "DEBUG"))
     fh.setFormatter(JSONLFormatter())
-    logger.addHandler(fh)
+
+    attach(logger, ch, fh)
 
     logger.propagate = False
     logger._logutil_configured = True  # type: ignore[attr-defined]
@@ -103,6 +118,10 @@ class ContextAdapter(logging.LoggerAdapter):
         kwargs["extra"] = extra
         return msg, kwargs
 
+def log_stats() -> dict:
+    """Queue depth / drop counters of the shared log pipeline."""
+    return pipeline_stats()
+
 def bind(logger: logging.Logger, **ctx) -> ContextAdapter:
     return ContextAdapter(logger, ctx)
 
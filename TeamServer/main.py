@@ -10,6 +10,13 @@ from fastapi.middleware.cors import CORSMiddleware
 
 
 from core.teamserver import auth_manager as auth
+from core.teamserver import state_service
+from core.session_handlers import session_manager
+from core import command_history
+
+# API worker behind a state service (main.py --workers N): swap the session/
+# listener registries for proxies before any router binds them
+state_service.install_remote()
 
 
 from .websocket_operators import router as operators_ws_router
@@ -20,6 +27,9 @@ from .payloads import router as payloads_router
 from .websocket_console import router as ws_router
 # from .websocket_sentinelshell import router as ss_router
 from .websocket_files import router as files_ws_router
+from .metrics import router as metrics_router
+from .profiling import router as profiling_router
+from .history import router as history_router
 # from .websocket_ldap import router as ldap_ws_router
 
 app = FastAPI(title="SentinelCommander Integrated API", version="1.0")
@@ -41,6 +51,13 @@ def _startup():
     if not ops:
         auth.add_operator("admin", "admin", "admin")
 
+    # warm restart: known HTTP(S) sessions, aliases and kill tombstones
+    # (the state service does this itself when the API runs as workers)
+    if not state_service.REMOTE:
+        session_manager.restore()
+    # open the history database now rather than on the first recorded command
+    command_history.get_store()
+
 # Routers
 app.include_router(operators_ws_router)
 app.include_router(listeners_ws_router)
@@ -49,6 +66,9 @@ app.include_router(sessions_ws_router)
 app.include_router(files_ws_router)
 app.include_router(payloads_router, prefix="/payloads", tags=["payloads"])
 app.include_router(ws_router, tags=["websocket"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(profiling_router, prefix="/debug", tags=["debug"])
+app.include_router(history_router, prefix="/history", tags=["history"])
 # app.include_router(gs_router, tags=["websocket"])
 # app.include_router(ldap_ws_router, tags=["websocket"])
 
@@ -0,0 +1,110 @@
+# backend/metrics.py
+"""
+Admin-only Prometheus scrape endpoint.
+
+Counters/histograms are updated inline by the listeners, routers, transfer
+manager and websocket routes (see core.metrics). The gauges below are read
+from state that already exists at scrape time: session/operator queue sizes,
+thread count and the log pipeline counters.
+"""
+import asyncio
+import threading
+from contextlib import suppress
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from .dependencies import get_current_admin
+from core import metrics
+from core import logpipe
+from core.session_handlers import session_manager
+from .listing_cache import listing_cache
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LOOP_LAG_INTERVAL = 0.5  # seconds between event-loop lag probes
+
+_lag_task: Optional[asyncio.Task] = None
+
+
+def _queue_rows():
+    per_session = []
+    per_operator = {}
+    for sid, sess in list(session_manager.sessions.items()):
+        for kind, attr in (("command", "merge_command_queue"), ("response", "merge_response_queue")):
+            for op_id, q in list((getattr(sess, attr, None) or {}).items()):
+                depth = q.qsize()
+                per_session.append(((sid, op_id, kind), depth))
+                per_operator[(op_id, kind)] = per_operator.get((op_id, kind), 0) + depth
+        meta = getattr(sess, "meta_command_queue", None)
+        if meta is not None:
+            per_session.append(((sid, "meta", "command"), meta.qsize()))
+    return per_session, [(k, v) for k, v in per_operator.items()]
+
+
+def _collect_queues():
+    per_session, per_operator = _queue_rows()
+    yield from metrics.gauge_lines("sentinel_session_queue_depth", "Pending items per session/operator queue",
+                                   ("sid", "operator", "queue"), per_session)
+    yield from metrics.gauge_lines("sentinel_operator_queue_depth", "Pending items per operator across all sessions",
+                                   ("operator", "queue"), per_operator)
+    yield from metrics.gauge_lines("sentinel_sessions", "Live sessions", (), [((), len(session_manager.sessions))])
+
+
+def _collect_runtime():
+    yield from metrics.gauge_lines("sentinel_threads", "Live Python threads", (), [((), threading.active_count())])
+    st = logpipe.stats()
+    yield from metrics.gauge_lines("sentinel_log_queue_depth", "Records waiting for the log writer", (), [((), st["queue_depth"])])
+    yield from metrics.counter_lines("sentinel_log_records_dropped_total", "Log records dropped because the log queue was full",
+                                     (), [((), st["dropped"])])
+    yield from metrics.counter_lines("sentinel_log_records_dropped_by_logger_total", "Dropped log records per logger",
+                                     ("logger",), [((name,), n) for name, n in st["dropped_by_logger"].items()])
+    yield from metrics.counter_lines("sentinel_log_records_written_total", "Log records written by the log writer",
+                                     (), [((), st["written"])])
+
+
+def _collect_listing_cache():
+    st = listing_cache.stats()
+    yield from metrics.gauge_lines("sentinel_fs_listing_cache_entries", "Directory listings held by the teamserver cache",
+                                   (), [((), st["entries"])])
+    yield from metrics.counter_lines("sentinel_fs_listing_requests_total", "fs.list requests by how they were answered",
+                                     ("source",), [(("cache",), st["hits"]), (("shared",), st["coalesced"]),
+                                                   (("remote",), st["misses"])])
+
+
+metrics.register_collector(_collect_queues)
+metrics.register_collector(_collect_runtime)
+metrics.register_collector(_collect_listing_cache)
+
+
+async def _probe_loop_lag():
+    """Sleep a fixed interval and record how late the loop woke us up."""
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        metrics.LOOP_LAG.set(max(0.0, loop.time() - t0 - LOOP_LAG_INTERVAL))
+
+
+@router.on_event("startup")
+async def _start_lag_probe():
+    global _lag_task
+    if _lag_task is None or _lag_task.done():
+        _lag_task = asyncio.create_task(_probe_loop_lag())
+
+
+@router.on_event("shutdown")
+async def _stop_lag_probe():
+    global _lag_task
+    if _lag_task:
+        _lag_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _lag_task
+        _lag_task = None
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def scrape(_admin: dict = Depends(get_current_admin)):
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,3 +1,6 @@
+import importlib
+from functools import lru_cache
+
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
@@ -12,27 +15,34 @@ reset = Style.RESET_ALL
 
 router = APIRouter()
 
-# ---- Import the same generators the CLI uses -------------------------------
-# Windows TCP
-from core.payload_generator.windows.tcp.ps1 import powershell_reverse_tcp as win_tcp_ps1
-from core.payload_generator.windows.tcp.exe import exe_reverse_tcp as win_tcp_exe
-
-# Windows TLS
-from core.payload_generator.windows.tls.ps1 import powershell_reverse_tls as win_tls_ps1
-from core.payload_generator.windows.tls.exe import exe_reverse_tls as win_tls_exe
-
-# Windows HTTP(S)
-from core.payload_generator.windows.http.ps1 import powershell_reverse_http as win_http_ps1
-from core.payload_generator.windows.http.exe import exe_reverse_http as win_http_exe
-from core.payload_generator.windows.https.ps1 import powershell_reverse_https as win_https_ps1
-from core.payload_generator.windows.https.exe import exe_reverse_https as win_https_exe
-from core.payload_generator.windows.https.sentinelplant import sentinelplant_reverse_https as win_https_sp
-from core.payload_generator.windows.python.exe import exe_reverse_python as win_python_exe
-from core.payload_generator.windows.python.exe import exe_reverse_python_tcp as win_python_tcp
+# ---- Generators (same modules the CLI uses) ---------------------------------
+# Imported on first use: the generator modules embed large source templates
+# (SentinelPlant, EXE stubs) that would otherwise load on every teamserver start.
+_GENERATORS = {
+    # Windows TCP / TLS
+    "win_tcp_ps1":   "core.payload_generator.windows.tcp.ps1.powershell_reverse_tcp",
+    "win_tcp_exe":   "core.payload_generator.windows.tcp.exe.exe_reverse_tcp",
+    "win_tls_ps1":   "core.payload_generator.windows.tls.ps1.powershell_reverse_tls",
+    "win_tls_exe":   "core.payload_generator.windows.tls.exe.exe_reverse_tls",
+    # Windows HTTP(S)
+    "win_http_ps1":  "core.payload_generator.windows.http.ps1.powershell_reverse_http",
+    "win_http_exe":  "core.payload_generator.windows.http.exe.exe_reverse_http",
+    "win_https_ps1": "core.payload_generator.windows.https.ps1.powershell_reverse_https",
+    "win_https_exe": "core.payload_generator.windows.https.exe.exe_reverse_https",
+    "win_https_sp":  "core.payload_generator.windows.https.sentinelplant.sentinelplant_reverse_https",
+    "win_python_exe": "core.payload_generator.windows.python.exe.exe_reverse_python",
+    "win_python_tcp": "core.payload_generator.windows.python.exe.exe_reverse_python_tcp",
+    # Linux
+    "lin_tcp":       "core.payload_generator.linux.tcp.bash_reverse_tcp",
+    "lin_http":      "core.payload_generator.linux.http.bash_reverse_http",
+}
+
+
+@lru_cache(maxsize=None)
+def _gen(name: str):
+    """Import (once) and return the generator module registered as ``name``."""
+    return importlib.import_module(_GENERATORS[name])
 
-# Linux
-from core.payload_generator.linux.tcp import bash_reverse_tcp as lin_tcp
-from core.payload_generator.linux.http import bash_reverse_http as lin_http
 
 def _as_text(payload) -> str:
     """
@@ -110,27 +120,27 @@ def build_windows(cfg: WindowsPayload) -> str:
     # TCP / TLS
     if t == "tcp":
         if f == "ps1":
-            return _as_text(win_tcp_ps1.generate_powershell_reverse_tcp(ip, port, cfg.obs, cfg.no_child))
+            return _as_text(_gen("win_tcp_ps1").generate_powershell_reverse_tcp(ip, port, cfg.obs, cfg.no_child))
         if f == "exe":
-            return _as_text(win_tcp_exe.generate_exe_reverse_tcp(ip, port, cfg.stager_ip, cfg.stager_port))
+            return _as_text(_gen("win_tcp_exe").generate_exe_reverse_tcp(ip, port, cfg.stager_ip, cfg.stager_port))
         if f == "python":
-            return _as_text(win_python_tcp.generate_exe_reverse_python_tcp(ip, port, cfg.beacon))
+            return _as_text(_gen("win_python_tcp").generate_exe_reverse_python_tcp(ip, port, cfg.beacon))
     if t == "tls":
         if f == "ps1":
-            return _as_text(win_tls_ps1.generate_powershell_reverse_tls(ip, port, cfg.obs, cfg.no_child))
+            return _as_text(_gen("win_tls_ps1").generate_powershell_reverse_tls(ip, port, cfg.obs, cfg.no_child))
         if f == "exe":
-            return _as_text(win_tls_exe.generate_exe_reverse_tls(ip, port, cfg.stager_ip, cfg.stager_port))
+            return _as_text(_gen("win_tls_exe").generate_exe_reverse_tls(ip, port, cfg.stager_ip, cfg.stager_port))
 
     # HTTP
     if t == "http":
         if f == "ps1":
-            return _as_text(win_http_ps1.generate_windows_powershell_http(
+            return _as_text(_gen("win_http_ps1").generate_windows_powershell_http(
                 ip, port, cfg.obs, cfg.beacon, cfg.headers or {},
                 cfg.useragent, accept=cfg.accept, byte_range=cfg.byte_range,
                 jitter=cfg.jitter, no_child=None, profile=cfg.profile
             ))
         if f == "exe":
-            return _as_text(win_http_exe.generate_exe_reverse_http(
+            return _as_text(_gen("win_http_exe").generate_exe_reverse_http(
                 ip, port, cfg.obs, cfg.beacon, cfg.headers or {},
                 cfg.useragent, cfg.stager_ip, cfg.stager_port,
                 accept=cfg.accept, byte_range=cfg.byte_range,
@@ -140,20 +150,20 @@ def build_windows(cfg: WindowsPayload) -> str:
     # HTTPS
     if t == "https":
         if f == "ps1":
-            return _as_text(win_https_ps1.generate_windows_powershell_https(
+            return _as_text(_gen("win_https_ps1").generate_windows_powershell_https(
                 ip, port, cfg.obs, cfg.beacon, cfg.headers or {},
                 cfg.useragent, accept=cfg.accept, byte_range=cfg.byte_range,
                 jitter=cfg.jitter, no_child=None, profile=cfg.profile
             ))
         if f == "exe":
-            return _as_text(win_https_exe.generate_exe_reverse_https(
+            return _as_text(_gen("win_https_exe").generate_exe_reverse_https(
                 ip, port, cfg.obs, cfg.beacon, cfg.headers or {},
                 cfg.useragent, cfg.stager_ip, cfg.stager_port,
                 accept=cfg.accept, byte_range=cfg.byte_range,
                 jitter=cfg.jitter, profile=cfg.profile
             ))
         if f == "sentinelplant":
-            return _as_text(win_https_sp.generate_sentinelplant_reverse_https(
+            return _as_text(_gen("win_https_sp").generate_sentinelplant_reverse_https(
                 ip, port, cfg.obs, cfg.beacon, cfg.headers or {},
                 cfg.useragent, cfg.stager_ip, cfg.stager_port,
                 accept=cfg.accept, byte_range=cfg.byte_range,
@@ -162,7 +172,7 @@ def build_windows(cfg: WindowsPayload) -> str:
 
     # Python (HTTP/HTTPS)
     if f == "python":
-        return _as_text(win_python_exe.generate_exe_reverse_python(ip, port, cfg.beacon))
+        return _as_text(_gen("win_python_exe").generate_exe_reverse_python(ip, port, cfg.beacon))
 
     raise HTTPException(status_code=400, detail="Unsupported format/transport combination")
 
@@ -170,9 +180,9 @@ def build_windows(cfg: WindowsPayload) -> str:
 
 def build_linux(cfg: LinuxPayload) -> str:
     if cfg.transport.lower() == "tcp":
-        return _as_text(lin_tcp.generate_bash_reverse_tcp(cfg.host, cfg.port, cfg.obs, cfg.use_ssl))
+        return _as_text(_gen("lin_tcp").generate_bash_reverse_tcp(cfg.host, cfg.port, cfg.obs, cfg.use_ssl))
     if cfg.transport.lower() == "http":
-        return _as_text(lin_http.generate_bash_reverse_http(cfg.host, cfg.port, cfg.obs, cfg.beacon))
+        return _as_text(_gen("lin_http").generate_bash_reverse_http(cfg.host, cfg.port, cfg.obs, cfg.beacon))
     raise HTTPException(status_code=400, detail="Linux transport must be tcp or http")
 
 
@@ -0,0 +1,68 @@
+# backend/profiling.py
+"""
+Admin-only sampling profiler endpoints (see core.profiler).
+
+  POST /debug/profile?seconds=10&interval_ms=10&idle=false
+       -> collapsed stacks as a downloadable .folded file
+  GET  /debug/threads?window=1
+       -> per-thread role / busy% / cpu% for a short window
+"""
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from .dependencies import get_current_admin
+from core import profiler
+
+router = APIRouter()
+
+
+@router.on_event("startup")
+async def _mark_loop_thread():
+    profiler.mark_event_loop_thread()
+
+
+async def run_profile(seconds: float, interval_ms: float, idle: bool) -> profiler.Profile:
+    """Run the sampler in the default executor so the loop itself gets sampled."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, profiler.run, seconds, interval_ms / 1000.0, idle)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+async def run_top_threads(window: float) -> dict:
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, profiler.top_threads, window)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=profiler.MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=1.0, le=1000.0),
+    idle: bool = Query(False, description="keep samples of threads blocked in wait/select/recv"),
+    _admin: dict = Depends(get_current_admin),
+):
+    prof = await run_profile(seconds, interval_ms, idle)
+    fname = time.strftime("teamserver-%Y%m%d-%H%M%S.folded")
+    return PlainTextResponse(
+        prof.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{fname}"',
+            "X-Profile-Samples": str(prof.samples),
+            "X-Profile-Seconds": f"{prof.wall:.3f}",
+        },
+    )
+
+
+@router.get("/threads")
+async def threads(
+    window: float = Query(1.0, gt=0, le=10.0),
+    _admin: dict = Depends(get_current_admin),
+):
+    return await run_top_threads(window)
@@ -6,6 +6,7 @@ from . import config
 from core.session_handlers import session_manager
 from core.command_execution import http_command_execution as http_exec
 from core.command_execution import tcp_command_execution as tcp_exec
+from core.metrics import WS_CLIENTS
 
 router = APIRouter()
 
@@ -28,6 +29,7 @@ async def session_ws(ws: WebSocket, sid: str):
     meta = getattr(sess, "metadata", {}) or {}
     await ws.send_text(f"** Connected to {meta.get('hostname','?')} as {meta.get('user','?')} ({meta.get('os','?')}/{meta.get('arch','?')}) **")
 
+    WS_CLIENTS.inc(route="/ws/sessions/{sid}")
     try:
         while True:
             cmd = (await ws.receive_text()).strip()
@@ -46,3 +48,5 @@ async def session_ws(ws: WebSocket, sid: str):
             await ws.send_text(f"[ERROR] {e}")
         finally:
             await ws.close()
+    finally:
+        WS_CLIENTS.dec(route="/ws/sessions/{sid}")
@@ -1,7 +1,7 @@
 # backend/websocket_files.py
 from __future__ import annotations
-import asyncio, json, os, ntpath, tempfile, time, shutil, uuid, hashlib, binascii, struct
-from typing import Any, Dict, Optional
+import asyncio, itertools, json, os, ntpath, tempfile, time, shutil, uuid, hashlib, binascii, struct
+from typing import Any, Dict, Iterator, Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import jwt
@@ -12,8 +12,10 @@ from . import config
 from core.session_handlers import session_manager
 from core.command_execution import http_command_execution as http_exec
 from core.command_execution import tcp_command_execution as tcp_exec
-from core.transfers.manager import TransferManager, TransferOpts
+from core.metrics import WS_CLIENTS
 from .schemas import FileInfo  # reuse your model
+from .listing_cache import listing_cache
+from . import ws_codec
 
 # ---------- logging ----------
 from .logutil import get_logger, bind, span, file_magic, sha256_path, safe_preview, redacts
@@ -29,17 +31,16 @@ router = APIRouter()
 
 # ----------------- shared helpers -----------------
 async def _ws_send(ws: WebSocket, payload: Dict[str, Any], log):
-	"""Send JSON and log payload type/size."""
+	"""Send (JSON or msgpack, per the socket's codec) and log payload type/size."""
 	try:
-		txt = json.dumps(payload, separators=(",", ":"), default=str)
-		await ws.send_text(txt)
+		nbytes = await ws_codec.send(ws, payload)
 		# LOG: outbound frame
 		log.debug("ws.send",
 				  extra={"payload_type": payload.get("type"),
 						 "req_id": payload.get("req_id"),
 						 "tid": payload.get("tid"),
 						 "status": payload.get("status"),
-						 "json_bytes": len(txt)})
+						 "frame_bytes": nbytes})
 	except WebSocketDisconnect:
 		raise
 	except Exception as e:
@@ -73,10 +74,145 @@ def _psq(s: str) -> str:
 def _shq(s: str) -> str:
 	return "'" + str(s).replace("'", "'\"'\"'") + "'"
 
+# Upper bound on names per fs.owners request (one Get-Acl each on Windows).
+OWNER_BATCH_MAX = 200
+RANGE_MAX_BYTES = 4 * 1024 * 1024  # largest fs.read_range reply (paged viewer)
+
+def _list_remote(sid: str, path: str, os_type: str, transport: str, lazy_owner: bool = False, log=None) -> str:
+	"""
+	Run the directory listing on the host and return its raw output: one
+	tab-separated row per entry, so it can be parsed and paged line by line
+	(see _split_listing). Blocking; called from an executor.
+	"""
+	# ---------- Windows ----------
+	if os_type == "windows":
+		# Get-Acl per entry dominates on big folders; lazy mode leaves owner blank.
+		owner = "''" if lazy_owner else "try { (Get-Acl -LiteralPath $_.FullName -ErrorAction Stop).Owner } catch { '' }"
+		ps = (
+			"$p = Get-Item -LiteralPath " + _psq(path) + " -ErrorAction SilentlyContinue; "
+			"if ($null -eq $p) { 'MISSING' } else { "
+			"\"PATH`t\" + $p.FullName; "
+			"Get-ChildItem -LiteralPath $p.FullName -Force -ErrorAction SilentlyContinue | ForEach-Object { "
+			"  $o = " + owner + "; "
+			"  $sz = if ($_.PSIsContainer) { '' } else { [string][int64]$_.Length }; "
+			"  $ty = if ($_.PSIsContainer) { 'File folder' } elseif ($_.Extension) { $_.Extension.TrimStart('.') + ' file' } else { 'File' }; "
+			"  \"{0}`t{1}`t{2}`t{3}`t{4}`t{5}\" -f $_.Name, [int]$_.PSIsContainer, $sz, "
+			"[int64]([DateTimeOffset]$_.LastWriteTimeUtc).ToUnixTimeMilliseconds(), $ty, $o "
+			"} }"
+		)
+		out = _run_remote(sid, ps, transport, log=log)
+		if log:
+			log.debug("fs.list.win.raw", extra={"sid": sid, "path": path, "raw_len": len(out or ""), "raw_preview": (out or "")[:256]})
+		return out or ""
+
+	# ---------- Linux / Posix ----------
+	cmd = (
+		'P=$1; FMT=$2; '
+		'[ -d "$P" ] || { echo MISSING; exit 0; }; '
+		'find "$P" -maxdepth 1 -mindepth 1 -printf "$FMT" 2>/dev/null || true'
+	)
+
+	# One quoted string for the command, then two quoted args: path and format
+	sh = "sh -c " + _shq(cmd) + " _ " + _shq(path) + " " + _shq(r"%f\t%y\t%s\t%T@\t%u\n")
+
+	out = _run_remote(sid, sh, transport, log=log, defender_bypass=True)
+	if log:
+		log.debug("fs.list.posix.raw", extra={"sid": sid, "path": path, "cmd": sh, "raw_len": len(out or "")})
+	return out or ""
+
+def _iter_lines(text: str) -> Iterator[str]:
+	"""Lines of ``text`` without building the whole list up front."""
+	pos, n = 0, len(text)
+	while pos < n:
+		end = text.find("\n", pos)
+		if end < 0:
+			end = n
+		line = text[pos:end].rstrip("\r")
+		pos = end + 1
+		if line:
+			yield line
+
+def _split_listing(out: str, os_type: str, path: str) -> tuple[bool, str, Iterator[str]]:
+	"""(exists, real_path, remaining row lines) for _list_remote() output."""
+	lines = _iter_lines(out or "")
+	first = next(lines, "")
+	if first.strip() == "MISSING":
+		return False, path, iter(())
+	if os_type == "windows":
+		if first.startswith("PATH\t"):
+			return True, first[5:], lines
+		return True, path, lines
+	return True, path, itertools.chain((first,), lines) if first else lines
+
+def _parse_row(line: str, os_type: str) -> Optional[Dict[str, Any]]:
+	"""One listing row -> the entry dict the GUI expects (None for junk lines)."""
+	parts = line.split("\t")
+	try:
+		if os_type == "windows":
+			if len(parts) < 6:
+				return None
+			name, isdir, sz, mt, type_label, owner = parts[:6]
+			is_dir = isdir == "1"
+			return {"name": name, "is_dir": is_dir, "size": None if is_dir else int(sz or 0),
+					"mtime": int(mt or 0), "type": type_label, "owner": owner}
+		name, typ, sz, mt, owner = (parts + ["", "", "", "", ""])[:5]
+		is_dir = typ.lower().startswith("d")
+		return {"name": name, "is_dir": is_dir, "size": None if is_dir else int(sz or 0),
+				"mtime": int(float(mt or 0) * 1000.0), "type": "File folder" if is_dir else "File",
+				"owner": owner or ""}
+	except ValueError:
+		return None
+
+def _owners_remote(sid: str, path: str, names: list, os_type: str, transport: str, log=None) -> Dict[str, str]:
+	"""Owner per entry name under ``path``. Blocking; called from an executor."""
+	if os_type == "windows":
+		ps = (
+			f"$d = {_psq(path)}; $o = @{{}}; "
+			f"foreach ($n in @({','.join(_psq(n) for n in names)})) {{ "
+			f"  try {{ $o[$n] = (Get-Acl -LiteralPath ([System.IO.Path]::Combine($d, $n)) -ErrorAction Stop).Owner }} catch {{ $o[$n] = '' }} "
+			f"}}; "
+			f"$o | ConvertTo-Json -Compress"
+		)
+		out = (_run_remote(sid, ps, transport, log=log) or "").strip()
+		try:
+			obj = json.loads(out) if out.startswith("{") else {}
+		except Exception:
+			obj = {}
+		return {str(k): str(v or "") for k, v in obj.items()} if isinstance(obj, dict) else {}
+
+	cmd = r'P=$1; shift; for n in "$@"; do printf "%s\t%s\n" "$n" "$(stat -c %U -- "$P/$n" 2>/dev/null)"; done'
+	sh = "sh -c " + _shq(cmd) + " _ " + _shq(path) + " " + " ".join(_shq(n) for n in names)
+	out = _run_remote(sid, sh, transport, log=log, defender_bypass=True)
+	owners = {}
+	for line in (out or "").splitlines():
+		name, _, owner = line.partition("\t")
+		if name in names:
+			owners[name] = owner.strip()
+	return owners
+
+# Upload flow control / resume
+UPLOAD_WINDOW_BYTES = 8 * 1024 * 1024   # unacknowledged bytes a client may have in flight
+UPLOAD_RESUME_TTL = 600.0               # seconds a dropped upload's bytes are kept for resume
+
+_partial_uploads: Dict[str, Dict[str, Any]] = {}
+
+def _stash_partial_upload(upload_id: str, tmp: str, key: Optional[tuple]):
+	_partial_uploads[upload_id] = {"tmp": tmp, "key": key, "ts": time.time()}
+
+def _take_partial_upload(upload_id: str) -> Optional[Dict[str, Any]]:
+	"""Pop a parked upload (dropping any that expired on the way)."""
+	now = time.time()
+	for uid, part in list(_partial_uploads.items()):
+		if now - part["ts"] > UPLOAD_RESUME_TTL:
+			_partial_uploads.pop(uid, None)
+			with suppress(OSError):
+				os.remove(part["tmp"])
+	return _partial_uploads.pop(upload_id, None)
+
 # ----------------- websocket route -----------------
 @router.websocket("/ws/files")
 async def files_ws(ws: WebSocket):
-	await ws.accept()
+	await ws_codec.accept(ws)
 	wsid = uuid.uuid4().hex[:8]
 	client = None
 	try:
@@ -100,7 +236,8 @@ async def files_ws(ws: WebSocket):
 		log.warning("ws.auth.invalid")
 		await ws.close(code=1008); return
 
-	# Per-connection state
+	# Per-connection state (transfer stack is imported on first connection, not at startup)
+	from core.transfers.manager import TransferManager, TransferOpts
 	tm = TransferManager()
 	active_download_task: Optional[asyncio.Task] = None
 	active_download_path: Optional[str] = None      # ← add
@@ -114,11 +251,41 @@ async def files_ws(ws: WebSocket):
 	active_upload_remote_archive: Optional[str] = None  # e.g. /tmp/core.zip or /tmp/core.tar.gz
 	active_upload_remote_dir: Optional[str] = None      # e.g. /tmp/core/
 	active_upload_is_folder: bool = False
+	# set when the client named its upload (credit window + resume support)
+	active_upload_id: Optional[str] = None
+	active_upload_key: Optional[tuple] = None
+
+	# Paged listing in progress (a new listing or fs.list.cancel stops it)
+	active_list_task: Optional[asyncio.Task] = None
+	active_list_req: Optional[str] = None
+
+	def _invalidate_listings(sid: str, *targets: Optional[str]):
+		"""Drop cached listings touched by a change we just made on the host."""
+		sess = session_manager.sessions.get(sid)
+		os_type = (getattr(sess,"metadata",{}) or {}).get("os","").lower() if sess else ""
+		for t in targets:
+			if t:
+				n = listing_cache.invalidate(sid, t, os_type)
+				log.debug("fs.list.cache.invalidate", extra={"sid": sid, "target": t, "dropped": n})
 
 	async def _do_list(req: Dict[str, Any]):
+		"""
+		Request:
+		{ "action": "fs.list", "sid": "...", "path": "...", "lazy_owner": false, "fresh": false,
+		  "page_size": 0, "req_id": "..." }
+		lazy_owner skips the per-entry Get-Acl on Windows (owners come later via fs.owners);
+		fresh bypasses the shared listing cache.
+
+		Without page_size the reply is one {"type":"fs.list", ...} message. With it,
+		rows are parsed from the command output line by line and sent as they fill:
+		{ "type": "fs.list.page", "req_id": "...", "path": "...", "cursor": <index of first entry>,
+		  "entries": [...], "done": false|true, "ok": true, "total": <only when done> }
+		A paged listing runs as a task and can be stopped with fs.list.cancel.
+		"""
 		sid = _resolve_sid(req.get("sid",""))
 		path = req.get("path","")
 		req_id = req.get("req_id")
+		page_size = max(0, int(req.get("page_size") or 0))
 		sess = session_manager.sessions.get(sid)
 		if not sess:
 			log.warning("fs.list.session_missing", extra={"sid": sid, "path": path, "req_id": req_id})
@@ -126,90 +293,151 @@ async def files_ws(ws: WebSocket):
 
 		os_type   = (getattr(sess,"metadata",{}) or {}).get("os","").lower()
 		transport = str(getattr(sess,"transport","")).lower()
-		log.debug("fs.list.begin", extra={"sid": sid, "path": path, "os": os_type, "transport": transport, "req_id": req_id})
+		# owners are free in the posix listing, only the Windows one pays for them
+		lazy = bool(req.get("lazy_owner")) and os_type == "windows"
+		log.debug("fs.list.begin", extra={"sid": sid, "path": path, "os": os_type, "transport": transport,
+										  "lazy_owner": lazy, "page_size": page_size, "req_id": req_id})
+
+		async def _reply(real_path: str, entries: list, ok: bool = True, cursor: int = 0, done: bool = True, **extra):
+			if page_size:
+				msg = {"type":"fs.list.page","req_id":req_id,"path":real_path,"cursor":cursor,
+					   "entries":entries,"done":done,"ok":ok}
+			else:
+				msg = {"type":"fs.list","req_id":req_id,"path":real_path,"entries":entries,"ok":ok}
+			msg.update(extra)
+			await _ws_send(ws, msg, log)
+
+		cached = None if req.get("fresh") else listing_cache.cached(sid, path, os_type, lazy)
+		if cached is not None:
+			_, real_path, rows = cached
+			log.info("fs.list.ok", extra={"sid": sid, "path": real_path, "count": len(rows), "source": "cache"})
+			if not page_size:
+				return await _reply(real_path, rows, lazy_owner=lazy, cached=True)
+			for cursor in range(0, len(rows), page_size):
+				done = cursor + page_size >= len(rows)
+				await _reply(real_path, rows[cursor:cursor + page_size], cursor=cursor, done=done,
+							 **({"total": len(rows), "lazy_owner": lazy, "cached": True} if done else {}))
+				await asyncio.sleep(0)
+			if not rows:
+				await _reply(real_path, [], total=0, lazy_owner=lazy, cached=True)
+			return
 
-		# ---------- Windows ----------
-		if os_type == "windows":
-			# Build rows with owner. We keep all fields you already used and add 'owner'.
-			ps = (
-				f"$p = Get-Item -LiteralPath {_psq(path)} -ErrorAction SilentlyContinue; "
-				f"if ($null -eq $p) {{ 'MISSING' }} else {{ "
-				f"$full = $p.FullName; "
-				f"$rows = @(Get-ChildItem -LiteralPath $full -Force -ErrorAction SilentlyContinue | "
-				f"  Select-Object "
-				f"    @{{n='name';e={{$_.Name}}}}, "
-				f"    @{{n='is_dir';e={{$_.PSIsContainer}}}}, "
-				f"    @{{n='size';e={{ if ($_.PSIsContainer) {{ $null }} else {{ [int64]$_.Length }} }}}}, "
-				f"    @{{n='mtime';e={{ [double]([DateTimeOffset]$_.LastWriteTimeUtc).ToUnixTimeMilliseconds() }}}}, "
-				f"    @{{n='type';e={{ if ($_.PSIsContainer) {{ 'File folder' }} elseif ($_.Extension) {{ ($_.Extension.TrimStart('.') + ' file') }} else {{ 'File' }} }}}}, "
-				f"    @{{n='owner';e={{ try {{ (Get-Acl -LiteralPath $_.FullName -ErrorAction Stop).Owner }} catch {{ '' }} }}}} "
-				f") ; "
-				f"@{{ path = $full; entries = $rows }} | ConvertTo-Json -Compress -Depth 4 }}"
-			)
+		loop = asyncio.get_running_loop()
+		async def _fetch():
+			return await loop.run_in_executor(None, _list_remote, sid, path, os_type, transport, lazy, log)
 
-			out = _run_remote(sid, ps, transport, log=log)
-			log.debug("fs.list.win.raw", extra={"sid": sid, "path": path, "raw_len": len(out or ""), "raw_preview": (out or "")[:256]})
+		try:
+			out, token, source = await listing_cache.fetch(sid, path, os_type, _fetch, lazy=lazy)
+		except Exception as e:
+			log.exception("fs.list.error", extra={"sid": sid, "path": path})
+			return await _ws_send(ws, {"type":"error","req_id":req_id,"error":f"List failed: {e!r}"}, log)
 
-			if (out or "").strip() == "MISSING":
-				log.info("fs.list.missing", extra={"sid": sid, "path": path})
-				return await _ws_send(ws, {"type":"fs.list","req_id":req_id,"path":path,"entries":[],"ok":False}, log)
+		ok, real_path, lines = _split_listing(out, os_type, path)
+		if not ok:
+			log.info("fs.list.missing", extra={"sid": sid, "path": path})
+			return await _reply(path, [], ok=False)
 
-			try:
-				obj = json.loads(out) if (out and out.strip().startswith("{")) else {}
-			except Exception:
-				log.exception("fs.list.parse_error", extra={"sid": sid, "path": path})
-				obj = {}
-
-			real_path = obj.get("path", path)
-			rows = obj.get("entries", [])
-			if isinstance(rows, dict):
-				rows = [rows]
-			elif rows is None:
-				rows = []
+		rows: list = []
+		try:
+			page: list = []
+			cursor = 0
+			for line in lines:
+				r = _parse_row(line, os_type)
+				if r is None:
+					continue
+				rows.append(r)
+				if page_size:
+					page.append(r)
+					if len(page) >= page_size:
+						await _reply(real_path, page, cursor=cursor, done=False)
+						cursor += len(page)
+						page = []
+						await asyncio.sleep(0)  # yield so fs.list.cancel / other sockets get a turn
+		except asyncio.CancelledError:
+			# operator moved on; finish the parse anyway so the next visitor hits the cache
+			rows.extend(r for r in (_parse_row(l, os_type) for l in lines) if r is not None)
+			listing_cache.store(sid, path, os_type, lazy, (True, real_path, rows), token)
+			log.info("fs.list.cancelled", extra={"sid": sid, "path": real_path, "sent": cursor, "req_id": req_id})
+			raise
+
+		listing_cache.store(sid, path, os_type, lazy, (True, real_path, rows), token)
+		log.info("fs.list.ok", extra={"sid": sid, "path": real_path, "count": len(rows), "source": source})
+		if page_size:
+			await _reply(real_path, page, cursor=cursor, done=True, total=len(rows), lazy_owner=lazy, cached=False)
+		else:
+			await _reply(real_path, rows, lazy_owner=lazy, cached=False)
 
-			# Normalize: ensure keys exist even if PS failed to get ACL.
-			for r in rows:
-				r.setdefault("owner", "")
+	async def _cancel_list():
+		nonlocal active_list_task, active_list_req
+		task, active_list_task, active_list_req = active_list_task, None, None
+		if task and not task.done():
+			task.cancel()
+			with suppress(asyncio.CancelledError):
+				await task
 
-			log.info("fs.list.ok", extra={"sid": sid, "path": real_path, "count": len(rows)})
-			return await _ws_send(ws, {"type":"fs.list","req_id":req_id,"path":real_path,"entries":rows,"ok":True}, log)
+	async def _do_owners(req: Dict[str, Any]):
+		"""
+		Owners for a handful of entries (the rows an operator can actually see).
+		Request:
+		{ "action": "fs.owners", "sid": "...", "path": "<dir>", "names": ["a", "b"], "req_id": "..." }
+		Response:
+		{ "type": "fs.owners", "req_id": "...", "path": "<dir>", "owners": {"a": "DOMAIN\\user", ...} }
+		"""
+		sid = _resolve_sid(req.get("sid",""))
+		path = req.get("path") or ""
+		req_id = req.get("req_id")
+		names = [str(n) for n in (req.get("names") or []) if n][:OWNER_BATCH_MAX]
+		sess = session_manager.sessions.get(sid)
+		if not sess or not path or not names:
+			return await _ws_send(ws, {"type":"fs.owners","req_id":req_id,"path":path,"owners":{}}, log)
 
-		else:
-			# ---------- Linux / Posix ----------
-			# Add %u (owner username) to the printed columns.
-			cmd = (
-				'P=$1; FMT=$2; '
-    			'[ -d "$P" ] || { echo MISSING; exit 0; }; '
-    			'find "$P" -maxdepth 1 -mindepth 1 -printf "$FMT" 2>/dev/null || true'
-			)
+		os_type   = (getattr(sess,"metadata",{}) or {}).get("os","").lower()
+		transport = str(getattr(sess,"transport","")).lower()
+		try:
+			owners = await asyncio.get_running_loop().run_in_executor(
+				None, _owners_remote, sid, path, names, os_type, transport, log)
+		except Exception:
+			log.exception("fs.owners.error", extra={"sid": sid, "path": path})
+			owners = {}
+		listing_cache.merge_owners(sid, path, os_type, owners)
+		log.debug("fs.owners.ok", extra={"sid": sid, "path": path, "asked": len(names), "got": len(owners)})
+		await _ws_send(ws, {"type":"fs.owners","req_id":req_id,"path":path,"owners":owners}, log)
 
-			# One quoted string for the command, then two quoted args: path and format
-			sh = "sh -c " + _shq(cmd) + " _ " + _shq(path) + " " + _shq(r"%f\t%y\t%s\t%T@\t%u\n")
-
-			out = _run_remote(sid, sh, transport, log=log, defender_bypass=True)
-
-			if "MISSING" in (out or ""):
-				log.info("fs.list.missing", extra={"sid": sid, "path": path})
-				return await _ws_send(ws, {"type":"fs.list","req_id":req_id,"path":path,"entries":[],"ok":False}, log)
-
-			entries = []
-			for line in (out or "").splitlines():
-				name, typ, sz, mt, owner = (line.split("\t") + ["","","","",""])[:5]
-				is_dir   = typ.lower().startswith("d")
-				size     = None if is_dir else int(sz or 0)
-				mtime_ms = int(float(mt or 0) * 1000.0)
-				type_label = "File folder" if is_dir else "File"
-				entries.append({
-					"name":   name,
-					"is_dir": is_dir,
-					"size":   size,
-					"mtime":  mtime_ms,
-					"type":   type_label,
-					"owner":  owner or ""
-				})
-
-			log.info("fs.list.ok", extra={"sid": sid, "path": path, "count": len(entries), "cmd": sh, "output": out})
-			await _ws_send(ws, {"type":"fs.list","req_id":req_id,"path":path,"entries":entries,"ok":True}, log)
+	async def _do_read_range(req: Dict[str, Any]):
+		"""
+		A byte range of a remote file, read in place (no transfer, no temp file).
+		Request:
+		{ "action": "fs.read_range", "sid": "...", "path": "...", "offset": 0, "length": 1048576,
+		  "stat": true, "req_id": "..." }
+		Response:
+		{ "type": "fs.range", "req_id": "...", "path": "...", "offset": 0, "total": <size or -1>,
+		  "ok": true, "error": "", "data": "<base64>" }
+		"stat" also probes the file size (one extra round trip), so clients ask once.
+		"""
+		sid = _resolve_sid(req.get("sid",""))
+		path = req.get("path") or ""
+		req_id = req.get("req_id")
+		offset = max(0, int(req.get("offset") or 0))
+		length = min(RANGE_MAX_BYTES, max(0, int(req.get("length") or 0)))
+		reply = {"type": "fs.range", "req_id": req_id, "path": path, "offset": offset,
+				 "total": -1, "ok": False, "error": "", "data": ""}
+		if sid not in session_manager.sessions or not path:
+			reply["error"] = "Session not found" if path else "No path"
+			return await _ws_send(ws, reply, log)
+		try:
+			total, data = await asyncio.get_running_loop().run_in_executor(
+				None, lambda: tm.read_range(sid, path, offset, length, with_size=bool(req.get("stat"))))
+		except (FileNotFoundError, IsADirectoryError) as e:
+			reply["error"] = f"{type(e).__name__}: {path}"
+			return await _ws_send(ws, reply, log)
+		except Exception as e:
+			log.exception("fs.read_range.error", extra={"sid": sid, "path": path, "offset": offset})
+			reply["error"] = str(e)
+			return await _ws_send(ws, reply, log)
+		log.debug("fs.read_range.ok", extra={"sid": sid, "path": path, "offset": offset,
+											 "asked": length, "got": len(data), "total": total})
+		reply.update(total=total, ok=True, data=binascii.b2a_base64(data, newline=False).decode("ascii"))
+		await _ws_send(ws, reply, log)
 
 	async def _do_delete(req: Dict[str, Any]):
 		"""
@@ -280,6 +508,7 @@ async def files_ws(ws: WebSocket):
 			log.debug("fs.delete.raw", extra={"preview": txt[:300]})
 
 			if txt.startswith("OK"):
+				_invalidate_listings(sid, target)
 				await _ws_send(ws, {"type":"deleted","req_id":req_id,"path":target,"ok":True}, log)
 				log.info("fs.delete.ok", extra={"sid": sid, "path": target})
 			elif "MISSING" in txt:
@@ -335,6 +564,8 @@ async def files_ws(ws: WebSocket):
 			txt = (out or "").strip()
 			ok = ("OK" in txt) or ("EXISTS" in txt and bool(req.get("ok_if_exists", True)))
 			err = "" if ok else (f"create_failed: {txt[:200]}" or "create_failed")
+			if ok:
+				_invalidate_listings(sid, full)
 			await _ws_send(ws, {"type":"fs.new.result","req_id":req_id,"kind":"folder","ok":ok,"error":err,"path":full,"name":(name or "")}, log)
 		except Exception as e:
 			log.exception("fs.new_folder.error")
@@ -380,6 +611,8 @@ async def files_ws(ws: WebSocket):
 			txt = (out or "").strip()
 			ok = ("OK" in txt) or ("EXISTS" in txt and bool(req.get("ok_if_exists", True)))
 			err = "" if ok else (f"create_failed: {txt[:200]}" or "create_failed")
+			if ok:
+				_invalidate_listings(sid, full)
 			await _ws_send(ws, {"type":"fs.new.result","req_id":req_id,"kind":"text","ok":ok,"error":err,"path":full,"name":(name or "")}, log)
 
 		except Exception as e:
@@ -393,6 +626,7 @@ async def files_ws(ws: WebSocket):
 			fs.download.begin { tid, name }
 			fs.download.meta  { tid, total_bytes }           (once known)
 			fs.download.end   { tid, status, error, bytes_sent, sha256 }
+		- Bytes go out in order as chunks complete (binary frames), not only after the transfer ends.
 		- Heavily logs progress and forensics (sizes, head/tail hex, sha256).
 		- Drains any remaining bytes after TM finalizes/renames the file to avoid truncation.
 		"""
@@ -451,7 +685,6 @@ async def files_ws(ws: WebSocket):
 			t0 = time.perf_counter()
 			hasher = hashlib.sha256()
 			last = 0                       # how many bytes we have sent to the GUI so far
-			part_path = None               # path to TM's part file (data.part)
 			announced_total = False
 			last_log_t = t0
 
@@ -506,6 +739,27 @@ async def files_ws(ws: WebSocket):
 				except Exception as e:
 					return False, {}, f"probe_exception:{e!r}"
 
+			async def _stream_from(path: str, start: int, end: Optional[int], src: str) -> int:
+				"""Send bytes [start, end) of path (end=None: to EOF); returns the new offset."""
+				nonlocal last_log_t
+				pos = start
+				with open(path, "rb") as f:
+					f.seek(start)
+					while end is None or pos < end:
+						# 1 MiB frames keep per-frame overhead down
+						chunk = f.read(1024 * 1024 if end is None else min(1024 * 1024, end - pos))
+						if not chunk:
+							break
+						await ws_codec.send_data(ws, chunk)
+						hasher.update(chunk)
+						pos += len(chunk)
+						now = time.perf_counter()
+						if now - last_log_t >= 1.0:
+							logger.debug("fs.download.stream tid=%s sent=%d bps=%d sid=%s src=%s",
+										 tid, pos, int(pos / max(1e-6, now - t0)), sid, src)
+							last_log_t = now
+				return pos
+
 			try:
 				while True:
 					st = tm.store.load(sid, tid)
@@ -516,31 +770,29 @@ async def files_ws(ws: WebSocket):
 						logger.debug("DL[%s] meta total_bytes=%s sid=%s", tid, st.total_bytes, sid)
 						announced_total = True
 
+					# Forward the part file's completed prefix while the transfer runs, so the GUI
+					# can start extracting folder archives before the last chunk lands. Chunks are
+					# written in order and bytes_done is persisted after the write, so [0, bytes_done)
+					# never contains preallocated holes.
+					if st.status == "running":
+						done_now = min(int(st.bytes_done or 0), int(st.total_bytes or 0))
+						part = st.tmp_local_path
+						if done_now > last and part and os.path.exists(part):
+							try:
+								last = await _stream_from(part, last, done_now, "part")
+							except OSError:
+								pass  # part file moved by finalize; picked up from the final file
+
 					# terminal states
 					if st.status in ("done", "error", "cancelled", "paused"):
 						# On success, stream the FINAL artifact once to avoid reading holes/zeros from a preallocated part file.
-						bytes_sent = 0
+						bytes_sent = last
 						final_src = st.local_path if (st.local_path and os.path.exists(st.local_path)) else ""
 						if st.status == "done" and final_src:
-							logger.debug("DL[%s] final stream start sid=%s file=%s", tid, sid, final_src)
+							# whatever the part-file streaming hasn't covered yet comes from the final artifact
+							logger.debug("DL[%s] final stream start sid=%s file=%s from=%d", tid, sid, final_src, last)
 							try:
-								with open(final_src, "rb") as f:
-									#chunk = f.read(256 * 1024)
-									# send bigger websocket frames to reduce per-frame overhead
-									chunk = f.read(1024 * 1024)  # 1 MiB frames
-									while chunk:
-										await ws.send_bytes(chunk)
-										hasher.update(chunk)
-										bytes_sent += len(chunk)
-										now = time.perf_counter()
-										if now - last_log_t >= 1.0:
-											elapsed = max(1e-6, now - t0)
-											bps = int(bytes_sent / elapsed)
-											logger.debug("fs.download.stream tid=%s sent=%d bps=%d sid=%s src=final",
-														 tid, bytes_sent, bps, sid)
-											last_log_t = now
-										#chunk = f.read(256 * 1024)
-										chunk = f.read(1024 * 1024)
+								bytes_sent = last = await _stream_from(final_src, last, None, "final")
 							except Exception as de:
 								logger.exception("DL[%s] final stream failed sid=%s err=%r", tid, sid, de)
 								# downgrade to error so GUI won’t try to extract
@@ -625,8 +877,10 @@ async def files_ws(ws: WebSocket):
 
 		active_download_task = asyncio.create_task(_pump())
 
-	async def _do_upload_begin(req: Dict[str, Any]):
+	async def _do_upload_begin(req: Dict[str, Any]) -> int:
+		"""Accept an upload; returns the byte offset the client should resume from."""
 		nonlocal active_upload_tmp, active_upload_expect, active_upload_sid, active_upload_remote_archive, active_upload_remote_dir, active_upload_is_folder
+		nonlocal active_upload_id, active_upload_key
 		if active_upload_tmp is not None:
 			log.warning("fs.upload.reject_busy", extra={"req_id": req.get("req_id")})
 			return await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":"Upload already in progress on this socket"}, log)
@@ -713,24 +967,44 @@ async def files_ws(ws: WebSocket):
 				log,
 			)
 
-		fd, tmp_path = tempfile.mkstemp(prefix="gc2_ul_ws_")
-		os.close(fd)
+		# Resume: a client that names its upload gets back whatever bytes an
+		# earlier (dropped) socket already stored for the same target.
+		upload_id = str(req.get("upload_id") or "") or None
+		resume_key = (sid, remote_path or "", (remote_dir or "") if is_folder else "", is_folder, size)
+		tmp_path, offset = None, 0
+		part = _take_partial_upload(upload_id) if upload_id else None
+		if part:
+			if part["key"] == resume_key and os.path.exists(part["tmp"]):
+				tmp_path = part["tmp"]
+				offset = min(os.path.getsize(tmp_path), size)
+			else:
+				with suppress(OSError):
+					os.remove(part["tmp"])
+		if tmp_path is None:
+			fd, tmp_path = tempfile.mkstemp(prefix="gc2_ul_ws_")
+			os.close(fd)
 		active_upload_tmp = tmp_path
 		active_upload_expect = size
 		active_upload_sid = sid
 		active_upload_is_folder = is_folder
 		active_upload_remote_archive = remote_path or None
 		active_upload_remote_dir = (remote_dir or None) if is_folder else None
+		active_upload_id = upload_id
+		active_upload_key = resume_key
 
 		log.info("fs.upload.accept",
 				 extra={"sid": sid, "folder": is_folder, "target": target_descriptor, "expect_bytes": size,
-						"tmp_file": tmp_path})
+						"tmp_file": tmp_path, "upload_id": upload_id, "offset": offset})
 		log.debug("fs.upload.accept.details",
 				  extra={"remote_path": remote_path, "remote_dir": remote_dir})
-		await _ws_send(ws, {"type":"fs.upload.accept","req_id":req.get("req_id"), "explicit_finish": False}, log)
+		# window: bytes the client may have in flight beyond the last fs.upload.credit "acked"
+		await _ws_send(ws, {"type":"fs.upload.accept","req_id":req.get("req_id"), "explicit_finish": False,
+							"upload_id": upload_id, "offset": offset, "window": UPLOAD_WINDOW_BYTES}, log)
+		return offset
 
 	async def _do_upload_finish():
 		nonlocal active_upload_tmp, active_upload_expect, active_upload_sid, active_upload_remote_archive, active_upload_remote_dir, active_upload_is_folder
+		nonlocal active_upload_id, active_upload_key
 		# Always upload the file/archive first; extraction is handled here after success.
 		tid = tm.start_upload(active_upload_sid, active_upload_tmp, (active_upload_remote_archive or ""),
 							  folder=False, opts=TransferOpts(quiet=True))
@@ -825,6 +1099,9 @@ async def files_ws(ws: WebSocket):
 					log.exception("fs.upload.extract.error", extra={"err": repr(ex)})
 					final_status, final_error = "error", f"extract_exception:{ex!r}"
 
+				if final_status == "done":
+					_invalidate_listings(active_upload_sid, active_upload_remote_archive,
+										 active_upload_remote_dir if active_upload_is_folder else None)
 				await _ws_send(ws, {"type":"fs.upload.result","tid":tid,"status":final_status,"error":final_error}, log)
 				log.info("fs.upload.result.sent", extra={"tid": tid, "status": final_status, "error": final_error})
 				break
@@ -841,6 +1118,8 @@ async def files_ws(ws: WebSocket):
 		active_upload_remote_archive = None
 		active_upload_remote_dir = None
 		active_upload_is_folder = False
+		active_upload_id = None
+		active_upload_key = None
 
 	async def _preflight_can_write(sid: str, target_file: str) -> tuple[bool, str]:
 		"""Return (ok, detail). Verifies we can create/overwrite at target_file."""
@@ -1002,11 +1281,13 @@ async def files_ws(ws: WebSocket):
 		await _ws_send(ws, {"type":"fs.quickpaths","paths":obj, "req_id":req_id}, log)
 
 	# ---------- main loop ----------
+	WS_CLIENTS.inc(route="/ws/files")
 	try:
 		recv_written = 0
 		# throttle state for upload progress frames
 		progress_last_t = 0.0
 		progress_last_reported = 0
+		credit_acked = 0  # recv_written as of the last fs.upload.credit
 		while True:
 			msg = await ws.receive()
 			if msg["type"] == "websocket.receive":
@@ -1031,25 +1312,43 @@ async def files_ws(ws: WebSocket):
 					})
 
 					if act in ("fs.list","list"):
-						await _do_list(req)
+						if req.get("page_size"):
+							# navigating elsewhere supersedes whatever is still streaming
+							await _cancel_list()
+							active_list_req = req.get("req_id")
+							active_list_task = asyncio.create_task(_do_list(req))
+						else:
+							await _do_list(req)
+
+					elif act in ("fs.list.cancel",):
+						if not req.get("req_id") or req.get("req_id") == active_list_req:
+							await _cancel_list()
 
 					elif act in ("fs.delete", "delete"):
 						await _do_delete(req)
 
+					elif act in ("fs.owners",):
+						await _do_owners(req)
+
 					elif act in ("fs.new_folder","new.folder"):
 						await _do_new_folder(req)
 
 					elif act in ("fs.new_text","new.text"):
 						await _do_new_text(req)
 
+					elif act in ("fs.read_range",):
+						await _do_read_range(req)
+
 					elif act in ("fs.download","download"):
 						await _do_download(req)
 
 					elif act in ("fs.upload.begin","upload.begin"):
-						recv_written = 0
 						progress_last_t = 0.0
-						progress_last_reported = 0
-						await _do_upload_begin(req)
+						recv_written = await _do_upload_begin(req) or 0
+						progress_last_reported = credit_acked = recv_written
+						if active_upload_tmp is not None and active_upload_expect and recv_written >= active_upload_expect:
+							# everything already arrived before the reconnect
+							await _do_upload_finish()
 
 					elif act in ("fs.upload.finish","upload.finish"):
 						if active_upload_tmp is None:
@@ -1113,6 +1412,13 @@ async def files_ws(ws: WebSocket):
 						progress_last_t = now_t
 						progress_last_reported = recv_written
 
+					# Flow control: re-open the client's window every quarter window written
+					if active_upload_id and (recv_written - credit_acked >= UPLOAD_WINDOW_BYTES // 4
+											 or recv_written == active_upload_expect):
+						await _ws_send(ws, {"type":"fs.upload.credit","upload_id":active_upload_id,
+											"acked":recv_written,"window":UPLOAD_WINDOW_BYTES}, log)
+						credit_acked = recv_written
+
 					if active_upload_expect and recv_written >= active_upload_expect:
 						log.info("fs.upload.bytes_complete", extra={"written": recv_written, "expect": active_upload_expect})
 						try:
@@ -1136,8 +1442,19 @@ async def files_ws(ws: WebSocket):
 	except WebSocketDisconnect:
 		log.info("ws.disconnect.ws")
 	finally:
+		WS_CLIENTS.dec(route="/ws/files")
+		if active_list_task:
+			active_list_task.cancel()
 		if active_download_task:
 			active_download_task.cancel()
 			with suppress(asyncio.CancelledError):
 				await active_download_task
+		if active_upload_tmp:
+			if active_upload_id:
+				# keep the partial bytes around so a reconnecting client can resume
+				_stash_partial_upload(active_upload_id, active_upload_tmp, active_upload_key)
+				log.info("fs.upload.parked", extra={"upload_id": active_upload_id, "written": recv_written})
+			else:
+				with suppress(OSError):
+					os.remove(active_upload_tmp)
 		log.info("ws.cleanup")
@@ -13,6 +13,8 @@ from . import config
 from .logutil import get_logger, bind, redacts
 from .listeners import _serialize_listener, ALLOWED_TYPES, _stop_instance_async
 from core.listeners.base import listeners as CORE_REG, _reg_lock
+from core.metrics import WS_CLIENTS
+from . import ws_codec
 
 router = APIRouter()
 logger = get_logger("backend.websocket_listeners", file_basename="listeners_ws")
@@ -57,14 +59,13 @@ def _conflict_by_port(port: int) -> Tuple[bool, str, str, str]:
 
 async def _ws_send(ws: WebSocket, payload: Dict[str, Any], log):
 	try:
-		txt = json.dumps(payload, separators=(",", ":"), default=str)
-		await ws.send_text(txt)
+		nbytes = await ws_codec.send(ws, payload)
 		log.debug(
 			"ws.send",
 			extra={
 				"payload_type": payload.get("type"),
 				"req_id": payload.get("req_id"),
-				"json_bytes": len(txt),
+				"frame_bytes": nbytes,
 			},
 		)
 	except WebSocketDisconnect:
@@ -75,10 +76,10 @@ async def _ws_send(ws: WebSocket, payload: Dict[str, Any], log):
 
 async def _broadcast(payload: Dict[str, Any]):
 	dead: list[WebSocket] = []
-	txt = json.dumps(payload, separators=(",", ":"), default=str)
+	frames = ws_codec.FrameCache(payload)
 	for ws in list(_CLIENTS):
 		try:
-			await ws.send_text(txt)
+			await ws_codec.send_frame(ws, frames.for_ws(ws))
 		except Exception:
 			dead.append(ws)
 	for d in dead:
@@ -118,7 +119,7 @@ _install_change_hook()
 
 @router.websocket("/ws/listeners")
 async def listeners_ws(ws: WebSocket):
-	await ws.accept()
+	await ws_codec.accept(ws)
 	wsid = id(ws) & 0xFFFF_FFFF
 	client = None
 	try:
@@ -143,6 +144,7 @@ async def listeners_ws(ws: WebSocket):
 		return
 
 	_CLIENTS.add(ws)
+	WS_CLIENTS.inc(route="/ws/listeners")
 
 	# Initial snapshot so pre-created (CLI/REST) listeners appear immediately
 	await _ws_send(ws, {"type": "listeners.snapshot", "rows": _snapshot_rows()}, log)
@@ -321,4 +323,5 @@ async def listeners_ws(ws: WebSocket):
 		log.info("ws.disconnect")
 	finally:
 		_CLIENTS.discard(ws)
+		WS_CLIENTS.dec(route="/ws/listeners")
 		log.info("ws.cleanup")
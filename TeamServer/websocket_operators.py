@@ -8,6 +8,8 @@ from contextlib import suppress
 from . import config
 from .dependencies import create_access_token
 from core.teamserver import auth_manager as auth
+from core.metrics import WS_CLIENTS
+from . import ws_codec
 
 router = APIRouter()
 
@@ -50,7 +52,7 @@ def _get_operator_by_username(username: str) -> Optional[dict]:
 
 async def _ws_send(ws: WebSocket, payload: Dict[str, Any]):
     try:
-        await ws.send_text(json.dumps(payload, separators=(",", ":"), default=str))
+        await ws_codec.send(ws, payload)
     except WebSocketDisconnect:
         raise
     except Exception:
@@ -179,7 +181,7 @@ async def _cmd_login(ws, req):
 
 @router.websocket("/ws/operators")
 async def operators_ws(ws: WebSocket):
-    await ws.accept()
+    await ws_codec.accept(ws)
 
     # Connection auth state (None until verified)
     claims: Optional[dict] = None
@@ -241,11 +243,13 @@ async def operators_ws(ws: WebSocket):
             await fn(ws, req)
 
     writer_task = asyncio.create_task(writer())
+    WS_CLIENTS.inc(route="/ws/operators")
     try:
         await reader()
     except WebSocketDisconnect:
         pass
     finally:
+        WS_CLIENTS.dec(route="/ws/operators")
         writer_task.cancel()
         with suppress(asyncio.CancelledError):
             await writer_task
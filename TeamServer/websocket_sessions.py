@@ -11,6 +11,10 @@ from . import config
 from core.session_handlers import session_manager
 from core.command_execution import http_command_execution as http_exec
 from core.command_execution import tcp_command_execution as tcp_exec
+from core.metrics import WS_CLIENTS
+from core import profiler
+from core import command_history
+from . import ws_codec
 
 router = APIRouter()
 
@@ -47,7 +51,7 @@ def _resolve_sid(sid: str) -> Optional[str]:
 async def _ws_send(ws: WebSocket, payload: Dict[str, Any]):
 	# Safe send (ignore if client already closed)
 	try:
-		await ws.send_text(json.dumps(payload, separators=(",", ":"), default=str))
+		await ws_codec.send(ws, payload)
 	except WebSocketDisconnect:
 		raise
 	except Exception:
@@ -146,20 +150,71 @@ async def _cmd_exec(ws: WebSocket, req: Dict[str, Any]):
 	except Exception as e:
 		await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":str(e)})
 
+async def _cmd_profile(ws: WebSocket, req: Dict[str, Any]):
+	# Admin-only; the sampler blocks, so it runs in the executor
+	loop = asyncio.get_running_loop()
+	try:
+		seconds = float(req.get("seconds") or 10.0)
+		interval = float(req.get("interval_ms") or 10.0) / 1000.0
+		prof = await loop.run_in_executor(None, profiler.run, seconds, interval, bool(req.get("idle")))
+	except Exception as e:
+		return await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":str(e)})
+	await _ws_send(ws, {
+		"type": "profile",
+		"req_id": req.get("req_id"),
+		"format": "collapsed",
+		"summary": prof.summary(),
+		"threads": prof.threads(),
+		"data": prof.collapsed(),
+	})
+
+async def _cmd_threads(ws: WebSocket, req: Dict[str, Any]):
+	loop = asyncio.get_running_loop()
+	try:
+		out = await loop.run_in_executor(None, profiler.top_threads, float(req.get("window") or 1.0))
+	except Exception as e:
+		return await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":str(e)})
+	await _ws_send(ws, {"type": "threads", "req_id": req.get("req_id"), **out})
+
+async def _cmd_history(ws: WebSocket, req: Dict[str, Any]):
+	store = command_history.get_store()
+	if store is None:
+		return await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":"Command history is disabled"})
+	loop = asyncio.get_running_loop()
+	try:
+		if req.get("id") is not None:
+			row = await loop.run_in_executor(None, store.get, int(req["id"]))
+			if row is None:
+				return await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":"History entry not found"})
+			return await _ws_send(ws, {"type": "history.entry", "req_id": req.get("req_id"), "entry": row})
+		page = await loop.run_in_executor(None, lambda: store.search(
+			req.get("q") or "",
+			sid=_resolve_sid(req["sid"]) if req.get("sid") else None,
+			op_id=req.get("op_id") or None,
+			since=req.get("since"),
+			until=req.get("until"),
+			before_id=req.get("before"),
+			limit=int(req.get("limit") or 50),
+		))
+	except Exception as e:
+		return await _ws_send(ws, {"type":"error","req_id":req.get("req_id"),"error":str(e)})
+	await _ws_send(ws, {"type": "history", "req_id": req.get("req_id"), "q": req.get("q") or "", **page})
+
 # ---------- the websocket route ---------------------------------------------
 
 @router.websocket("/ws/sessions")
 async def sessions_ws(ws: WebSocket):
-	await ws.accept()
+	await ws_codec.accept(ws)
 
 	# auth
 	token = ws.query_params.get("token")
 	if not token:
 		await ws.close(code=1008); return
 	try:
-		jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
+		claims = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
 	except jwt.InvalidTokenError:
 		await ws.close(code=1008); return
+	is_admin = str(claims.get("role", "")).lower() == "admin"
 
 	# writer: push snapshots when changed
 	last_hash = None
@@ -185,8 +240,13 @@ async def sessions_ws(ws: WebSocket):
 			"get":    _cmd_get,
 			"kill":   _cmd_kill,
 			"exec":   _cmd_exec,
+			"history": _cmd_history,
 			"ping":   lambda w, r: _ws_send(w, {"type":"pong","req_id":r.get("req_id")}),
 		}
+		# diagnostics: admin only
+		forbidden = lambda w, r: _ws_send(w, {"type":"error","req_id":r.get("req_id"),"error":"Not enough permissions"})
+		actions["profile"] = _cmd_profile if is_admin else forbidden
+		actions["threads"] = _cmd_threads if is_admin else forbidden
 		while True:
 			raw = await ws.receive_text()
 			try:
@@ -201,11 +261,13 @@ async def sessions_ws(ws: WebSocket):
 
 	# run both concurrently
 	writer_task = asyncio.create_task(writer())
+	WS_CLIENTS.inc(route="/ws/sessions")
 	try:
 		await reader()
 	except WebSocketDisconnect:
 		pass
 	finally:
+		WS_CLIENTS.dec(route="/ws/sessions")
 		writer_task.cancel()
 		# Swallow the cancellation so Uvicorn doesn't log it as an error.
 		with suppress(asyncio.CancelledError):
@@ -0,0 +1,120 @@
+# backend/ws_codec.py
+"""
+Wire encoding for the GUI websocket routes.
+
+JSON text is the default. A client that offers the ``sentinel.msgpack.v1``
+subprotocol (and a teamserver with ``msgpack`` installed) gets binary
+frames instead:
+
+  * the first frame after accept is the JSON text ``{"type":"ws.codec","codec":"msgpack"}``
+    so clients that cannot read the negotiated subprotocol still know;
+  * every message is a binary frame ``b"\\x01" + msgpack(payload)``;
+  * raw data (file download chunks) is a binary frame ``b"\\x02" + bytes``.
+
+Inside msgpack payloads, top-level lists of same-shaped dicts (session
+snapshots, fs.list rows, listener rows) travel columnar:
+``{"__cols__": [k1, k2, ...], "__rows__": [[v1, v2, ...], ...]}``, so the key
+names are sent once per message instead of once per row. Client -> server
+traffic stays JSON text.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional, Union
+
+try:  # optional: without it every socket speaks JSON
+    import msgpack
+except Exception:  # pragma: no cover - depends on the install
+    msgpack = None
+
+from fastapi import WebSocket
+
+SUBPROTOCOL_MSGPACK = "sentinel.msgpack.v1"
+CODEC_JSON = "json"
+CODEC_MSGPACK = "msgpack"
+
+TAG_MSG = b"\x01"
+TAG_DATA = b"\x02"
+
+COLUMNAR_MIN_ROWS = 8  # below this the key overhead isn't worth it
+
+Frame = Union[str, bytes]
+
+
+def _json_default(o):
+    return str(o)
+
+
+def columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of ``payload`` with uniform lists of dicts packed as columns."""
+    out = None
+    for k, v in payload.items():
+        if not isinstance(v, list) or len(v) < COLUMNAR_MIN_ROWS or not isinstance(v[0], dict):
+            continue
+        cols = list(v[0])
+        keys = set(cols)
+        if not all(isinstance(r, dict) and len(r) == len(cols) and keys.issuperset(r) for r in v):
+            continue
+        if out is None:
+            out = dict(payload)
+        out[k] = {"__cols__": cols, "__rows__": [[r[c] for c in cols] for r in v]}
+    return payload if out is None else out
+
+
+def encode(payload: Dict[str, Any], codec: str = CODEC_JSON) -> Frame:
+    if codec == CODEC_MSGPACK:
+        return TAG_MSG + msgpack.packb(columnar(payload), use_bin_type=True, default=_json_default)
+    return json.dumps(payload, separators=(",", ":"), default=_json_default)
+
+
+def codec_of(ws: WebSocket) -> str:
+    return getattr(ws.state, "ws_codec", CODEC_JSON)
+
+
+async def accept(ws: WebSocket) -> str:
+    """ws.accept() with subprotocol negotiation; returns the codec in use."""
+    offered = ws.scope.get("subprotocols") or []
+    if msgpack is not None and SUBPROTOCOL_MSGPACK in offered:
+        await ws.accept(subprotocol=SUBPROTOCOL_MSGPACK)
+        ws.state.ws_codec = CODEC_MSGPACK
+        await ws.send_text(json.dumps({"type": "ws.codec", "codec": CODEC_MSGPACK}))
+        return CODEC_MSGPACK
+    await ws.accept()
+    ws.state.ws_codec = CODEC_JSON
+    return CODEC_JSON
+
+
+async def send_frame(ws: WebSocket, frame: Frame) -> None:
+    if isinstance(frame, bytes):
+        await ws.send_bytes(frame)
+    else:
+        await ws.send_text(frame)
+
+
+async def send(ws: WebSocket, payload: Dict[str, Any]) -> int:
+    """Encode for this socket's codec and send; returns the frame size."""
+    frame = encode(payload, codec_of(ws))
+    await send_frame(ws, frame)
+    return len(frame)
+
+
+async def send_data(ws: WebSocket, chunk: bytes) -> None:
+    """Raw bytes (download chunks); tagged when the socket speaks msgpack."""
+    if codec_of(ws) == CODEC_MSGPACK:
+        chunk = TAG_DATA + chunk
+    await ws.send_bytes(chunk)
+
+
+class FrameCache:
+    """Encode a broadcast payload once per codec rather than once per client."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self._frames: Dict[str, Frame] = {}
+
+    def for_ws(self, ws: WebSocket) -> Frame:
+        codec = codec_of(ws)
+        frame: Optional[Frame] = self._frames.get(codec)
+        if frame is None:
+            frame = self._frames[codec] = encode(self.payload, codec)
+        return frame
@@ -1,6 +1,7 @@
 import os
 import sys
 import queue
+import time
 import base64
 import logging
 
@@ -8,6 +9,7 @@ from core import utils
 from core.utils import defender
 from core.command_routing.http_command_router import CommandRouter
 from core.session_handlers import session_manager, sessions
+from core.metrics import CMD_RTT
 
 from colorama import init, Fore, Style
 brightgreen = "\001" + Style.BRIGHT + Fore.GREEN + "\002"
@@ -35,6 +37,7 @@ def run_command_http(sid, cmd, output=True, defender_bypass=False, op_id=None, t
 	router.flush_response(op_id)
 
 	# send the command (may raise PermissionError)
+	t0 = time.perf_counter()
 	try:
 		router.send(cmd, op_id=op_id, defender_bypass=defender_bypass, transfer_use=transfer_use)
 	except PermissionError as e:
@@ -50,6 +53,7 @@ def run_command_http(sid, cmd, output=True, defender_bypass=False, op_id=None, t
 			return None
 
 	if not output:
+		router.record_sent(op_id)
 		return None
 
 	if transfer_use:
@@ -60,7 +64,9 @@ def run_command_http(sid, cmd, output=True, defender_bypass=False, op_id=None, t
 
 	# block until response or timeout=None
 	try:
-		return router.receive(op_id=op_id, block=True, timeout=timeout, transfer_use=transfer_use)
+		out = router.receive(op_id=op_id, block=True, timeout=timeout, transfer_use=transfer_use)
+		CMD_RTT.observe(time.perf_counter() - t0, transport=str(getattr(session, "transport", "http")).lower())
+		return out
 
 	except queue.Empty:
 		logging.debug("No response available for sid=%r, op_id=%r", sid, op_id)
@@ -1,8 +1,10 @@
+import time
 import queue
 import logging
 
 from core.command_routing.tcp_command_router import TcpCommandRouter
 from core.session_handlers import session_manager
+from core.metrics import CMD_RTT
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +31,9 @@ def run_command_tcp(sid: str,
 	router.flush_response(op_id)
 
 	# Atomically sendreceive
+	t0 = time.perf_counter()
 	try:
-		return router.execute(
+		out = router.execute(
 			cmd,
 			op_id=op_id,
 			timeout=timeout,
@@ -39,6 +42,8 @@ def run_command_tcp(sid: str,
 			defender_bypass=defender_bypass,
 			transfer_use=transfer_use
 		)
+		CMD_RTT.observe(time.perf_counter() - t0, transport=str(getattr(session, "transport", "tcp")).lower())
+		return out
 
 	except queue.Empty as e:
 		logger.debug("TCP execute timeout for sid=%r, op_id=%r", sid, op_id)
@@ -0,0 +1,327 @@
+# core/command_history.py
+"""
+Searchable command/output history.
+
+CommandRouter and TcpCommandRouter call record() once per completed command
+(transfer traffic is not recorded); HTTP commands sent without waiting for
+output are recorded at dispatch with status "sent" and an empty output.
+record() only builds a tuple and puts it on a bounded queue; a single writer
+thread drains the queue in batches and inserts each batch into SQLite with
+one commit, so the command path never touches the database. Outputs (and commands) are indexed with FTS5 when the
+sqlite3 build has it, otherwise search falls back to LIKE.
+
+search() is called from the teamserver API / websocket (in the executor) on
+its own read connection; WAL mode lets it run while the writer commits.
+
+Environment:
+  HISTORY_DB           database path, or "off" to disable recording
+                       (default ~/.sentinelcommander/db/history.db)
+  HISTORY_QUEUE_SIZE   max queued records, newest are dropped when full (default 10000)
+  HISTORY_BATCH_SIZE   max records per commit (default 256)
+  HISTORY_MAX_OUTPUT   outputs are stored/indexed up to this many bytes (default 1 MiB)
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.expanduser("~/.sentinelcommander/db/history.db")
+
+MAX_PAGE = 200
+SNIPPET_OPEN = "\x02"    # snippet() match markers; the GUI turns them into highlights
+SNIPPET_CLOSE = "\x03"
+
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+	id         INTEGER PRIMARY KEY,
+	sid        TEXT NOT NULL,
+	op_id      TEXT,
+	transport  TEXT,
+	cmd        TEXT,
+	output     TEXT,
+	status     TEXT,
+	sent_at    REAL,
+	done_at    REAL,
+	latency_ms REAL,
+	bytes_out  INTEGER,
+	bytes_in   INTEGER
+);
+CREATE INDEX IF NOT EXISTS history_sid ON history (sid, id);
+CREATE INDEX IF NOT EXISTS history_op ON history (op_id, id);
+"""
+
+# external-content index: the text lives once, in history
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+	cmd, output, content='history', content_rowid='id'
+);
+"""
+
+_COLS = ("sid", "op_id", "transport", "cmd", "output", "status",
+		 "sent_at", "done_at", "latency_ms", "bytes_out", "bytes_in")
+
+_INSERT = f"INSERT INTO history ({', '.join(_COLS)}) VALUES ({', '.join('?' * len(_COLS))})"
+
+_TOKEN_RE = re.compile(r'"[^"]*"|\S+')
+
+
+def _fts_query(text: str) -> str:
+	"""
+	Operator input -> safe FTS5 query: every word becomes a quoted term (so
+	"-", ":" or "OR" are searched for, not parsed), terms are ANDed; a trailing
+	"*" keeps prefix matching and "quoted phrases" stay phrases.
+	"""
+	terms = []
+	for tok in _TOKEN_RE.findall(text or ""):
+		prefix = tok.endswith("*") and len(tok) > 1
+		body = tok[:-1] if prefix else tok
+		if body.startswith('"') and body.endswith('"') and len(body) >= 2:
+			body = body[1:-1]
+		body = body.replace('"', '""').strip()
+		if body:
+			terms.append(f'"{body}"' + ("*" if prefix else ""))
+	return " ".join(terms)
+
+
+class HistoryStore:
+	"""Bounded queue plus one writer thread feeding the history database."""
+
+	def __init__(self, path: str = DB_PATH, maxsize: int = 10000, batch_size: int = 256,
+				 max_output: int = 1024 * 1024):
+		self.path = path
+		self.batch_size = max(1, int(batch_size))
+		self.max_output = max(1024, int(max_output))
+		self._q: "queue.Queue" = queue.Queue(maxsize=max(1, int(maxsize)))
+		self._lock = threading.Lock()
+		self._thread: Optional[threading.Thread] = None
+		self._local = threading.local()
+		self.enqueued = 0
+		self.dropped = 0
+		self.written = 0
+		self.batches = 0
+
+		if path != ":memory:":
+			os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		conn = self._connect()
+		conn.executescript(_SCHEMA)
+		try:
+			conn.executescript(_FTS_SCHEMA)
+			self.fts = True
+		except sqlite3.OperationalError:
+			logger.info("sqlite3 has no FTS5, history search falls back to LIKE")
+			self.fts = False
+		conn.commit()
+		self._wconn = conn
+
+	def _connect(self) -> sqlite3.Connection:
+		conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+		conn.execute("PRAGMA journal_mode=WAL;")
+		conn.execute("PRAGMA synchronous=NORMAL;")
+		return conn
+
+	def _reader(self) -> sqlite3.Connection:
+		conn = getattr(self._local, "conn", None)
+		if conn is None:
+			conn = self._connect()
+			conn.row_factory = sqlite3.Row
+			self._local.conn = conn
+		return conn
+
+	# ---------- producer side ----------
+	def record(self, sid: str, op_id: str, transport: str, cmd: str, output: str, *,
+			   sent_at: float, done_at: Optional[float] = None, status: str = "ok") -> None:
+		"""Queue one finished command; never blocks (drops and counts when full)."""
+		self._ensure_started()
+		done_at = time.time() if done_at is None else done_at
+		out = output or ""
+		bytes_in = len(out.encode("utf-8", "ignore"))
+		if bytes_in > self.max_output:
+			out = out.encode("utf-8", "ignore")[:self.max_output].decode("utf-8", "ignore")
+		try:
+			self._q.put_nowait((
+				str(sid), str(op_id or "console"), str(transport or ""), cmd or "", out, status,
+				sent_at, done_at, round((done_at - sent_at) * 1000.0, 3),
+				len((cmd or "").encode("utf-8", "ignore")), bytes_in,
+			))
+			self.enqueued += 1
+		except queue.Full:
+			with self._lock:
+				self.dropped += 1
+
+	# ---------- writer side ----------
+	def _ensure_started(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		with self._lock:
+			if self._thread is None or not self._thread.is_alive():
+				self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+				self._thread.start()
+
+	def _run(self) -> None:
+		q = self._q
+		while True:
+			item = q.get()
+			batch = [item]
+			while len(batch) < self.batch_size:
+				try:
+					batch.append(q.get_nowait())
+				except queue.Empty:
+					break
+			rows = [r for r in batch if r is not _STOP]
+			if rows:
+				self._write(rows)
+			if len(rows) != len(batch):
+				return
+
+	def _write(self, rows: List[tuple]) -> None:
+		conn = self._wconn
+		try:
+			with conn:
+				if self.fts:
+					for row in rows:
+						cur = conn.execute(_INSERT, row)
+						conn.execute("INSERT INTO history_fts (rowid, cmd, output) VALUES (?, ?, ?)",
+									 (cur.lastrowid, row[3], row[4]))
+				else:
+					conn.executemany(_INSERT, rows)
+		except sqlite3.Error as e:
+			logger.warning("history: dropped batch of %d records: %s", len(rows), e)
+			with self._lock:
+				self.dropped += len(rows)
+			return
+		self.written += len(rows)
+		self.batches += 1
+
+	def stop(self, timeout: float = 2.0) -> None:
+		"""Drain queued records and stop the writer (called at interpreter exit)."""
+		t = self._thread
+		if not t or not t.is_alive():
+			return
+		try:
+			self._q.put(_STOP, timeout=timeout)
+		except queue.Full:
+			return
+		t.join(timeout)
+
+	# ---------- search ----------
+	def search(self, text: str = "", *, sid: Optional[str] = None, op_id: Optional[str] = None,
+			   since: Optional[float] = None, until: Optional[float] = None,
+			   before_id: Optional[int] = None, limit: int = 50) -> Dict[str, Any]:
+		"""
+		Newest-first page of history rows matching ``text`` (FTS over command and
+		output; empty = everything) and the optional filters. Pass the returned
+		``next`` as ``before_id`` to get the following page; it is None on the last.
+		"""
+		limit = max(1, min(int(limit or 50), MAX_PAGE))
+		where, args = [], []
+		query = _fts_query(text) if self.fts else (text or "").strip()
+		use_fts = bool(query) and self.fts
+
+		if use_fts:
+			sql = (
+				"SELECT h.id, h.sid, h.op_id, h.transport, h.cmd, h.status, h.sent_at, h.done_at,"
+				" h.latency_ms, h.bytes_out, h.bytes_in,"
+				f" snippet(history_fts, 1, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', 16) AS snippet"
+				" FROM history_fts JOIN history h ON h.id = history_fts.rowid"
+			)
+			where.append("history_fts MATCH ?")
+			args.append(query)
+		else:
+			sql = (
+				"SELECT h.id, h.sid, h.op_id, h.transport, h.cmd, h.status, h.sent_at, h.done_at,"
+				" h.latency_ms, h.bytes_out, h.bytes_in, substr(h.output, 1, 200) AS snippet"
+				" FROM history h"
+			)
+			if query:
+				like = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+				where.append("(h.output LIKE ? ESCAPE '\\' OR h.cmd LIKE ? ESCAPE '\\')")
+				args += [like, like]
+
+		if sid:
+			where.append("h.sid = ?"); args.append(sid)
+		if op_id:
+			where.append("h.op_id = ?"); args.append(op_id)
+		if since is not None:
+			where.append("h.sent_at >= ?"); args.append(float(since))
+		if until is not None:
+			where.append("h.sent_at < ?"); args.append(float(until))
+		if before_id is not None:
+			where.append("h.id < ?"); args.append(int(before_id))
+		if where:
+			sql += " WHERE " + " AND ".join(where)
+		sql += " ORDER BY h.id DESC LIMIT ?"
+		args.append(limit + 1)
+
+		rows = [dict(r) for r in self._reader().execute(sql, args).fetchall()]
+		more = len(rows) > limit
+		rows = rows[:limit]
+		return {"items": rows, "next": rows[-1]["id"] if more else None, "fts": self.fts}
+
+	def get(self, hid: int) -> Optional[Dict[str, Any]]:
+		"""One full row, output included."""
+		r = self._reader().execute("SELECT * FROM history WHERE id = ?", (int(hid),)).fetchone()
+		return dict(r) if r else None
+
+	def stats(self) -> Dict[str, object]:
+		with self._lock:
+			return {
+				"path": self.path,
+				"fts": self.fts,
+				"queue_depth": self._q.qsize(),
+				"enqueued": self.enqueued,
+				"dropped": self.dropped,
+				"written": self.written,
+				"batches": self.batches,
+			}
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+_disabled = False
+
+
+def get_store() -> Optional[HistoryStore]:
+	"""Return the process-wide history store (created from the environment once), or None when disabled."""
+	global _store, _disabled
+	if _store is None and not _disabled:
+		with _store_lock:
+			if _store is None and not _disabled:
+				path = os.getenv("HISTORY_DB", DB_PATH)
+				if path.strip().lower() in ("off", "none", "0", ""):
+					_disabled = True
+					return None
+				try:
+					_store = HistoryStore(
+						os.path.expanduser(path),
+						maxsize=int(os.getenv("HISTORY_QUEUE_SIZE", "10000")),
+						batch_size=int(os.getenv("HISTORY_BATCH_SIZE", "256")),
+						max_output=int(os.getenv("HISTORY_MAX_OUTPUT", str(1024 * 1024))),
+					)
+				except (sqlite3.Error, OSError) as e:
+					logger.warning("command history disabled, cannot open %s: %s", path, e)
+					_disabled = True
+					return None
+				atexit.register(_store.stop)
+	return _store
+
+
+def record(sid: str, op_id: str, transport: str, cmd: str, output: str, *,
+		   sent_at: float, status: str = "ok") -> None:
+	"""Fire-and-forget entry point for the command routers."""
+	store = get_store()
+	if store is not None:
+		try:
+			store.record(sid, op_id, transport, cmd, output, sent_at=sent_at, status=status)
+		except Exception:
+			pass
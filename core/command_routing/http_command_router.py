@@ -3,8 +3,11 @@ import queue
 import time
 import logging
 from core.utils import defender, normalize_output
+from core import tracing
+from core import command_history
 
 logger = logging.getLogger(__name__)
+_trace = tracing.get_tracer("router", logger)
 
 from colorama import init, Fore, Style
 brightgreen = "\001" + Style.BRIGHT + Fore.GREEN + "\002"
@@ -19,30 +22,16 @@ class CommandRouter:
 	"""
 	def __init__(self, session):
 		self.session = session
-		logger.debug(
-			"[%s] CommandRouter initialized for session %r",
-			time.strftime("%Y-%m-%d %H:%M:%S"), session.sid
-		)
+		if _trace.on:
+			_trace.log("CommandRouter initialized for session %r", session.sid)
 
 	def _ensure_queues(self, op_id: str):
 		"""
 		Make sure both command and response queues exist for this operator.
 		"""
-
-		before_cmd = len(self.session.merge_command_queue)
-		before_res = len(self.session.merge_response_queue)
-
 		self.session.merge_command_queue.setdefault(op_id, queue.Queue())
 		self.session.merge_response_queue.setdefault(op_id, queue.Queue())
 
-		logger.debug(
-			"[%s] Queues ensured for op_id=%r (cmd_queues: %d→%d, res_queues: %d→%d)",
-			time.strftime("%H:%M:%S"),
-			op_id,
-			before_cmd, len(self.session.merge_command_queue),
-			before_res, len(self.session.merge_response_queue)
-		)
-
 	def send(self, cmd: str, op_id: str = "console", defender_bypass: bool = False, transfer_use: bool = False):
 		"""
 		Apply Session-Defender, base64-encode cmd, then enqueue it.
@@ -50,56 +39,40 @@ class CommandRouter:
 		"""
 
 		self.cmd = cmd
+		# transfer chunks are not operator commands: keep them out of the history
+		self._sent_at = None if transfer_use else time.time()
 
-		start_ts = time.time()
-		logger.debug(
-			"[%s] send() called: cmd=%r, op_id=%r, defender_bypass=%r",
-			time.strftime("%Y-%m-%d %H:%M:%S"), cmd, op_id, defender_bypass
-		)
+		with _trace.span("cmd.send", sid=self.session.sid, op_id=op_id, transport="http", cmd_len=len(cmd)):
+			if _trace.on:
+				_trace.log("send() called: cmd=%r, op_id=%r, defender_bypass=%r, defender_active=%r",
+						   cmd, op_id, defender_bypass, defender.is_active)
 
-		self._ensure_queues(op_id)
+			self._ensure_queues(op_id)
+
+			# Session-Defender check
+			os_type = self.session.metadata.get("os", "").lower()
+			if defender.is_active and not defender_bypass:
+				if os_type in ("windows", "linux"):
+					allowed = defender.inspect_command(os_type, cmd)
+					if not allowed:
+						logger.debug("Command blocked by Session-Defender")
+						self._record(op_id, "", "blocked")
+						raise PermissionError("Command blocked by Session-Defender")
+
+			# Base64 encode & enqueue
+			b64_cmd = base64.b64encode(cmd.encode()).decode()
 
-		# Session-Defender check
-		logger.debug("[%s] Defender active=%r", time.strftime("%H:%M:%S"), defender.is_active)
-
-		os_type = self.session.metadata.get("os", "").lower()
-		if defender.is_active and not defender_bypass:
-			if os_type in ("windows", "linux"):
-				allowed = defender.inspect_command(os_type, cmd)
-				if not allowed:
-					logger.debug("Command blocked by Session-Defender")
-					raise PermissionError("Command blocked by Session-Defender")
-
-		logger.debug(
-			"[%s] Defender check passed for op_id=%r (os_type=%r)",
-			time.strftime("%H:%M:%S"), op_id, os_type
-		)
-
-		# Base64 encode & enqueue
-		b64_cmd = base64.b64encode(cmd.encode()).decode()
-		logger.debug(
-			"[%s] Encoded cmd to base64 for op_id=%r: %r",
-			time.strftime("%H:%M:%S"), op_id, b64_cmd
-		)
-
-		try:
-			self.session.merge_command_queue[op_id].put(b64_cmd)
-
-		except Exception as e:
-			logger.warning(brightred + f"Hit exception while sending in HTTP/HTTPS: {e}" + reset)
-			if transfer_use:
-				raise ConnectionError("Hit ConnectionError while sending over HTTP/HTTPS") from e
-
-		logger.debug(
-			"[%s] Enqueued command for op_id=%r; queue_size=%d",
-			time.strftime("%H:%M:%S"),
-			op_id,
-			self.session.merge_command_queue[op_id].qsize()
-		)
-
-		logger.debug(
-			"[%s] send() completed in %.4fs", time.strftime("%H:%M:%S"), time.time() - start_ts
-		)
+			try:
+				self.session.merge_command_queue[op_id].put(b64_cmd)
+
+			except Exception as e:
+				logger.warning(brightred + f"Hit exception while sending in HTTP/HTTPS: {e}" + reset)
+				if transfer_use:
+					raise ConnectionError("Hit ConnectionError while sending over HTTP/HTTPS") from e
+
+			if _trace.on:
+				_trace.log("Enqueued command for op_id=%r (os_type=%r); queue_size=%d",
+						   op_id, os_type, self.session.merge_command_queue[op_id].qsize())
 
 	def receive(self, op_id: str = "console", block: bool = True, timeout: float = None, transfer_use: bool = False) -> str:
 		"""
@@ -109,67 +82,71 @@ class CommandRouter:
 		self._ensure_queues(op_id)
 		q = self.session.merge_response_queue[op_id]
 
-		logger.debug(
-			"[%s] receive() called: op_id=%r, block=%r, timeout=%s, queue_size=%d",
-			time.strftime("%H:%M:%S"),
-			op_id, block, str(timeout),
-			q.qsize()
-		)
-
-		if block:
-			out_b64 = q.get(timeout=timeout)
-			
-		else:
-			out_b64 = q.get_nowait()
-
-		try:
-			decoded = base64.b64decode(out_b64).decode("utf-8", "ignore").strip()
-		except Exception as e:
-			logger.warning(
-				"[%s] Failed to decode response for op_id=%r: %s",
-				time.strftime("%H:%M:%S"), op_id, e
-			)
-			if transfer_use:
-				raise ConnectionError("Hit ConnectionError while reading over HTTP/HTTPS") from e
-
-			return ""
-
-		#logger.debug(f"Decoding base64 output: {out_b64}")
-
-		logger.debug(
-			"[%s] Dequeued & decoded response for op_id=%r; remaining_queue=%d: %r",
-			time.strftime("%H:%M:%S"),
-			op_id,
-			self.session.merge_response_queue[op_id].qsize(),
-			decoded
-		)
-		decoded = normalize_output(decoded, self.cmd)
+		if _trace.on:
+			_trace.log("receive() called: op_id=%r, block=%r, timeout=%s, queue_size=%d",
+					   op_id, block, timeout, q.qsize())
+
+		with _trace.span("cmd.response", sid=self.session.sid, op_id=op_id, transport="http", block=block) as sp:
+			try:
+				if block:
+					out_b64 = q.get(timeout=timeout)
+
+				else:
+					out_b64 = q.get_nowait()
+			except queue.Empty:
+				if block:
+					self._record(op_id, "", "timeout")
+				raise
+
+			try:
+				decoded = base64.b64decode(out_b64).decode("utf-8", "ignore").strip()
+			except Exception as e:
+				logger.warning("Failed to decode response for op_id=%r: %s", op_id, e)
+				if transfer_use:
+					raise ConnectionError("Hit ConnectionError while reading over HTTP/HTTPS") from e
+
+				return ""
+
+			sp.set(out_len=len(decoded))
+
+		if _trace.on:
+			_trace.log("Dequeued & decoded response for op_id=%r; remaining_queue=%d: %r",
+					   op_id, q.qsize(), decoded)
+
+		with _trace.span("cmd.normalize", sid=self.session.sid, op_id=op_id, raw_len=len(decoded)):
+			decoded = normalize_output(decoded, self.cmd)
+		self._record(op_id, decoded)
 		return decoded
 
+	def record_sent(self, op_id: str = "console"):
+		"""
+		Record a fire-and-forget command (output=False) at dispatch: no
+		receive() will follow to record it, so it goes in with no output.
+		"""
+		self._record(op_id, "", "sent")
+
+	def _record(self, op_id: str, output: str, status: str = "ok"):
+		sent_at = getattr(self, "_sent_at", None)
+		if sent_at is None:
+			return
+		self._sent_at = None
+		command_history.record(self.session.sid, op_id, getattr(self.session, "transport", "http"),
+							   self.cmd, output, sent_at=sent_at, status=status)
+
 	def flush_response(self, op_id: str = "console"):
 		"""
 		Drop any pending responses for this op_id.
 		"""
 		self._ensure_queues(op_id)
 		q = self.session.merge_response_queue[op_id]
-
-		logger.debug(
-			"[%s] flush_response() called for op_id=%r; starting_queue=%d",
-			time.strftime("%H:%M:%S"),
-			op_id,
-			q.qsize()
-		)
 		count = 0
 
 		while not q.empty():
 			q.get_nowait()
 			count += 1
 
-		logger.debug(
-			"[%s] flush_response() cleared %d items for op_id=%r; final_queue=%d",
-			time.strftime("%H:%M:%S"),
-			count, op_id, q.qsize()
-		)
+		if count and _trace.on:
+			_trace.log("flush_response() cleared %d items for op_id=%r", count, op_id)
 
 	def flush_commands(self, op_id: str = "console"):
 		"""
@@ -177,21 +154,11 @@ class CommandRouter:
 		"""
 		self._ensure_queues(op_id)
 		q = self.session.merge_command_queue[op_id]
-
-		logger.debug(
-			"[%s] flush_commands() called for op_id=%r; starting_queue=%d",
-			time.strftime("%H:%M:%S"),
-			op_id,
-			q.qsize()
-		)
 		count = 0
 
 		while not q.empty():
 			q.get_nowait()
 			count += 1
 
-		logger.debug(
-			"[%s] flush_commands() cleared %d items for op_id=%r; final_queue=%d",
-			time.strftime("%H:%M:%S"),
-			count, op_id, q.qsize()
-		)
+		if count and _trace.on:
+			_trace.log("flush_commands() cleared %d items for op_id=%r", count, op_id)
@@ -10,8 +10,11 @@ import logging
 
 from core.utils import defender
 from core import utils
+from core import tracing
+from core import command_history
 
 logger = logging.getLogger(__name__)
+_trace = tracing.get_tracer("tcp_router", logger)
 
 from colorama import init, Fore, Style
 brightgreen = "\001" + Style.BRIGHT + Fore.GREEN + "\002"
@@ -32,8 +35,8 @@ class TcpCommandRouter:
 		self.recv_lock = session.recv_lock
 		self.exec_lock = session.exec_lock
 		self._transfer_use = False
-		logger.debug("[%s] TcpCommandRouter initialized for session %r",
-					 time.strftime("%Y-%m-%d %H:%M:%S"), session.sid)
+		if _trace.on:
+			_trace.log("TcpCommandRouter initialized for session %r", session.sid)
 
 	def execute(self,
 				cmd: str,
@@ -48,22 +51,24 @@ class TcpCommandRouter:
 		Ensures two operators never interleave on the same socket.
 		"""
 		result = ""
-		logger.debug(
-			"[%s] execute() called: cmd=%r, op_id=%r, timeout=%s, portscan=%r, retries=%d, bypass=%r",
-			time.strftime("%Y-%m-%d %H:%M:%S"),
-			cmd, op_id, timeout, portscan_active, retries, defender_bypass
-		)
+		if _trace.on:
+			_trace.log("execute() called: cmd=%r, op_id=%r, timeout=%s, portscan=%r, retries=%d, bypass=%r",
+					   cmd, op_id, timeout, portscan_active, retries, defender_bypass)
 
 		with self.session.exec_lock:
-			start_ts = time.time()
+			start_ts = time.perf_counter()
+			sent_at = time.time()
+			status = "ok"
 			# flush any stray data before we start
 			self._drain_socket()
 
 			# send wrapped command
 			try:
-				self.send(cmd, op_id=op_id, defender_bypass=defender_bypass, transfer_use=transfer_use)
+				with _trace.span("cmd.send", sid=self.session.sid, op_id=op_id, transport="tcp", cmd_len=len(cmd)):
+					self.send(cmd, op_id=op_id, defender_bypass=defender_bypass, transfer_use=transfer_use)
 			except Exception as e:
-				logger.warning("[%s] execute.send() error: %s", time.strftime("%H:%M:%S"), e)
+				logger.warning("execute.send() error: %s", e)
+				status = "blocked" if isinstance(e, PermissionError) else "error"
 				if transfer_use:
 					raise ConnectionError(f"send failed: {e}") from e
 				
@@ -79,14 +84,18 @@ class TcpCommandRouter:
 					transfer_use=transfer_use,
 				)
 			except Exception as e:
-				logger.warning("[%s] execute.receive() error: %s", time.strftime("%H:%M:%S"), e)
+				logger.warning("execute.receive() error: %s", e)
 				if transfer_use:
 					raise ConnectionError(f"receive failed: {e}") from e
-				
+				if status == "ok":
+					status = "error"
+
+			if not transfer_use:
+				command_history.record(self.session.sid, op_id, self.session.transport, cmd, result,
+									   sent_at=sent_at, status=status)
 
-			elapsed = time.time() - start_ts
-			logger.debug("[%s] execute() completed in %.4fs, result=%r",
-						 time.strftime("%Y-%m-%d %H:%M:%S"), elapsed, result)
+			if _trace.on:
+				_trace.log("execute() completed in %.4fs, result=%r", time.perf_counter() - start_ts, result)
 			return result
 
 
@@ -96,7 +105,6 @@ class TcpCommandRouter:
 		Normal 'no data' conditions (EWOULDBLOCK/SSLWantRead) are NOT errors.
 		We cap time/bytes so we never spin.
 		"""
-		logger.debug("[%s] Draining stray bytes before send", time.strftime("%H:%M:%S"))
 		drained = 0
 		deadline = time.time() + 0.05  # ~50ms budget
 		try:
@@ -125,7 +133,8 @@ class TcpCommandRouter:
 			# restore blocking/timeout for real work
 			self.sock.setblocking(True)
 			self.sock.settimeout(self.session.metadata.get("tcp_timeout", 0.5))
-		logger.debug("[%s] Drain complete (%d bytes)", time.strftime("%H:%M:%S"), drained)
+		if drained and _trace.on:
+			_trace.log("Drained %d stray bytes before send", drained)
 
 	def _sh_quote(s: str) -> str:
 		# Single-quote for POSIX shells: ' -> '"'"'
@@ -142,17 +151,16 @@ class TcpCommandRouter:
 		start = f"__OP__{op_id}__"
 		end   = f"__ENDOP__{op_id}__"
 
-		logger.debug("[%s] send() called: cmd=%r, op_id=%r, defender_bypass=%r",
-					 time.strftime("%Y-%m-%d %H:%M:%S"), cmd, op_id, defender_bypass)
+		if _trace.on:
+			_trace.log("send() called: cmd=%r, op_id=%r, defender_bypass=%r", cmd, op_id, defender_bypass)
 
 		# Defender check
 		os_type = self.session.metadata.get("os", "").lower()
 		if defender.is_active and not defender_bypass and os_type in ("windows", "linux"):
 			if not defender.inspect_command(os_type, cmd):
-				logger.debug("[%s] Command blocked by Session-Defender", time.strftime("%H:%M:%S"))
+				logger.debug("Command blocked by Session-Defender")
 				#print(brightred + f"Command blocked by Session-Defender" + reset)
 				raise PermissionError("Command blocked by Session-Defender")
-		logger.debug("[%s] Defender check passed", time.strftime("%H:%M:%S"))
 
 		# Choose shell wrapping
 		if os_type == "windows":
@@ -161,17 +169,16 @@ class TcpCommandRouter:
 		else:
 			wrapped = f"echo {start}; {cmd}; echo {end}"
 
-		logger.debug("[%s] Wrapped command for op_id=%r: %r",
-					 time.strftime("%H:%M:%S"), op_id, wrapped)
+		if _trace.on:
+			_trace.log("Wrapped command for op_id=%r: %r", op_id, wrapped)
 
 		
 		self._drain_socket()
 
 		# Send command
-		with self.send_lock:
+		with self.send_lock, _trace.span("cmd.deliver", sid=self.session.sid, op_id=op_id, transport="tcp", cmd_len=len(wrapped)):
 			try:
 				self.sock.sendall(wrapped.encode() + b"\n")
-				logger.debug("[%s] Sent wrapped command to socket", time.strftime("%H:%M:%S"))
 
 			except (ConnectionResetError, BrokenPipeError, OSError) as e:
 				logger.warning(brightred + f"Connect error ocurred on session {self.session.sid}" + reset)
@@ -180,7 +187,7 @@ class TcpCommandRouter:
 					
 
 			except Exception as e:
-				logger.warning("[%s] Failed to send command: %s", time.strftime("%H:%M:%S"), e)
+				logger.warning("Failed to send command: %s", e)
 				raise
 			
 
@@ -198,8 +205,10 @@ class TcpCommandRouter:
 		start = f"__OP__{op_id}__".encode()
 		end   = f"__ENDOP__{op_id}__".encode()
 
-		logger.debug("[%s] receive() called: op_id=%r, timeout=%s, portscan_active=%r, retries=%d",
-					 time.strftime("%H:%M:%S"), op_id, timeout, portscan_active, retries)
+		if _trace.on:
+			_trace.log("receive() called: op_id=%r, timeout=%s, portscan_active=%r, retries=%d",
+					   op_id, timeout, portscan_active, retries)
+		t_resp = time.perf_counter()
 
 		# Reader thread to collect bytes
 		chunks = []
@@ -245,12 +254,12 @@ class TcpCommandRouter:
 			self.sock.settimeout(timeout)
 
 		"""try:
-			reader = threading.Thread(target=_reader, daemon=True)
+			reader = threading.Thread(target=_reader, name=f"tcp-reader-{self.session.sid}", daemon=True)
 			reader.start()
 			reader.join(timeout if timeout is not None else None)"""
 
 		try:
-			reader = threading.Thread(target=_reader, daemon=True)
+			reader = threading.Thread(target=_reader, name=f"tcp-reader-{self.session.sid}", daemon=True)
 			reader.start()
 
 			# Actively wait until we *see* both tokens or we hit the deadline.
@@ -281,8 +290,10 @@ class TcpCommandRouter:
 			self.sock.settimeout(old_to)
 
 		resp_bytes = b"".join(chunks)
-		logger.debug("[%s] Raw response bytes (%d): %r",
-					 time.strftime("%H:%M:%S"), len(resp_bytes), resp_bytes)
+		if _trace.on:
+			_trace.event("cmd.response", sid=self.session.sid, op_id=op_id, transport="tcp",
+						 dur_ms=round((time.perf_counter() - t_resp) * 1000.0, 3), raw_len=len(resp_bytes))
+			_trace.log("Raw response bytes (%d): %r", len(resp_bytes), resp_bytes)
 
 		# Demux other ops
 		pattern = re.compile(rb"__OP__(?P<op>[^_]+)__\s*(?P<out>.*?)\s*__ENDOP__(?P=op)__", re.DOTALL)
@@ -295,8 +306,8 @@ class TcpCommandRouter:
 			op_que_obj = self.session.merge_response_queue.setdefault(o, queue.Queue())
 			q = self.session.merge_response_queue[o]
 			q.put(base64.b64encode(out.encode()).decode())
-			logger.debug("[%s] Demuxed output for other op %r into queue (size=%d)",
-						 time.strftime("%H:%M:%S"), o, q.qsize())
+			if _trace.on:
+				_trace.log("Demuxed output for other op %r into queue (size=%d)", o, q.qsize())
 
 		# Extract our own output
 		match = re.search(rf"{re.escape(start.decode())}\s*(.*?)\s*{re.escape(end.decode())}",
@@ -308,16 +319,18 @@ class TcpCommandRouter:
 			try:
 				my_out = self.session.merge_response_queue[op_id].get_nowait()
 			except queue.Empty:
-				logger.debug("[%s] No queued output for op_id=%r", time.strftime("%H:%M:%S"), op_id)
+				if _trace.on:
+					_trace.log("No queued output for op_id=%r", op_id)
 				my_out = ""
 
-		logger.debug("[%s] Raw extracted output for op_id=%r: %r",
-					 time.strftime("%H:%M:%S"), op_id, my_out)
+		if _trace.on:
+			_trace.log("Raw extracted output for op_id=%r: %r", op_id, my_out)
 
 		# Normalize
-		clean = utils.normalize_output(my_out.strip(), cmd)
-		logger.debug("[%s] Normalized output for op_id=%r: %r",
-					 time.strftime("%H:%M:%S"), op_id, clean)
+		with _trace.span("cmd.normalize", sid=self.session.sid, op_id=op_id, raw_len=len(my_out)):
+			clean = utils.normalize_output(my_out.strip(), cmd)
+		if _trace.on:
+			_trace.log("Normalized output for op_id=%r: %r", op_id, clean)
 		return clean
 
 	def flush_response(self, op_id: str = "console"):
@@ -326,13 +339,13 @@ class TcpCommandRouter:
 		while not q.empty():
 			q.get_nowait(); count += 1
 
-		logger.debug("[%s] flush_response cleared %d for op_id=%r",
-					 time.strftime("%H:%M:%S"), count, op_id)
+		if count and _trace.on:
+			_trace.log("flush_response cleared %d for op_id=%r", count, op_id)
 
 	def flush_commands(self, op_id: str = "console"):
 		q = self.session.merge_command_queue.setdefault(op_id, queue.Queue())
 		count = 0
 		while not q.empty():
 			q.get_nowait(); count += 1
-		logger.debug("[%s] flush_commands cleared %d for op_id=%r",
-					 time.strftime("%H:%M:%S"), count, op_id)
\ No newline at end of file
+		if count and _trace.on:
+			_trace.log("flush_commands cleared %d for op_id=%r", count, op_id)
\ No newline at end of file
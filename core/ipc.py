@@ -0,0 +1,197 @@
+# core/ipc.py
+"""
+Small request/response RPC over a local Unix socket.
+
+Frame: 4-byte big-endian body length, 1 codec byte, body. The body is
+msgpack when the sender has it installed (codec 1) and JSON otherwise
+(codec 0); the receiver decodes by the tag, so mixed installs interoperate.
+
+  request   {"op": str, "args": {...}}
+  reply     {"ok": true, "result": ...}
+          | {"ok": false, "exc": "ConnectionError", "msg": "..."}
+
+RpcServer serves each connection on its own thread, one request at a time
+(a connection is a call slot, like a DB connection). RpcClient keeps a pool
+of connections so concurrent callers never share a socket; a call that is
+blocked on a slow op (e.g. a 60 s HTTP beacon round trip) just holds one.
+"""
+from __future__ import annotations
+
+import os
+import json
+import queue
+import socket
+import struct
+import logging
+import builtins
+import threading
+import socketserver
+from typing import Any, Callable, Dict
+
+try:  # optional: JSON is used when it's missing
+	import msgpack
+except Exception:
+	msgpack = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+MAX_FRAME = 64 * 1024 * 1024
+
+_HDR = struct.Struct(">IB")
+
+# exception types re-raised as themselves on the client side
+_PASS_THROUGH = {
+	"ConnectionError", "PermissionError", "KeyError", "ValueError", "TimeoutError",
+	"FileNotFoundError", "IsADirectoryError", "LookupError", "RuntimeError",
+}
+
+
+class RemoteError(RuntimeError):
+	"""Server-side exception of a type that isn't re-raised as-is."""
+
+
+def encode(obj: Any) -> bytes:
+	if msgpack is not None:
+		body = msgpack.packb(obj, use_bin_type=True, default=str)
+		codec = CODEC_MSGPACK
+	else:
+		body = json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+		codec = CODEC_JSON
+	return _HDR.pack(len(body), codec) + body
+
+
+def _decode(codec: int, body: bytes) -> Any:
+	if codec == CODEC_MSGPACK:
+		if msgpack is None:
+			raise ValueError("peer sent msgpack but msgpack is not installed")
+		return msgpack.unpackb(body, raw=False, strict_map_key=False)
+	return json.loads(body.decode("utf-8"))
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+	buf = bytearray()
+	while len(buf) < n:
+		chunk = sock.recv(n - len(buf))
+		if not chunk:
+			raise ConnectionError("ipc peer closed the connection")
+		buf += chunk
+	return bytes(buf)
+
+
+def send_msg(sock: socket.socket, obj: Any) -> None:
+	sock.sendall(encode(obj))
+
+
+def recv_msg(sock: socket.socket) -> Any:
+	n, codec = _HDR.unpack(_recv_exact(sock, _HDR.size))
+	if n > MAX_FRAME:
+		raise ConnectionError(f"ipc frame too large ({n} bytes)")
+	return _decode(codec, _recv_exact(sock, n))
+
+
+# ---------- server ----------
+class _Handler(socketserver.BaseRequestHandler):
+	def handle(self):
+		ops: Dict[str, Callable[..., Any]] = self.server.ops
+		sock = self.request
+		while True:
+			try:
+				req = recv_msg(sock)
+			except (ConnectionError, OSError):
+				return
+			except ValueError as e:
+				logger.warning("ipc: undecodable request: %s", e)
+				return
+			op = (req or {}).get("op")
+			fn = ops.get(op)
+			try:
+				if fn is None:
+					raise LookupError(f"unknown ipc op {op!r}")
+				reply = {"ok": True, "result": fn(**(req.get("args") or {}))}
+			except Exception as e:
+				reply = {"ok": False, "exc": type(e).__name__, "msg": str(e)}
+			try:
+				send_msg(sock, reply)
+			except OSError:
+				return
+
+
+class RpcServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	daemon_threads = True
+	allow_reuse_address = True
+
+	def __init__(self, path: str, ops: Dict[str, Callable[..., Any]]):
+		self.ops = dict(ops)
+		self.path = path
+		try:
+			os.unlink(path)
+		except FileNotFoundError:
+			pass
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		old = os.umask(0o177)  # socket is 0600: only this user may drive sessions
+		try:
+			super().__init__(path, _Handler)
+		finally:
+			os.umask(old)
+
+	def serve_in_thread(self, name: str = "ipc-server") -> threading.Thread:
+		t = threading.Thread(target=self.serve_forever, name=name, daemon=True)
+		t.start()
+		return t
+
+	def server_close(self):
+		super().server_close()
+		try:
+			os.unlink(self.path)
+		except OSError:
+			pass
+
+
+# ---------- client ----------
+class RpcClient:
+	def __init__(self, path: str, *, connect_timeout: float = 5.0, max_idle: int = 16):
+		self.path = path
+		self.connect_timeout = connect_timeout
+		self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue(maxsize=max(1, max_idle))
+
+	def _connect(self) -> socket.socket:
+		s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		s.settimeout(self.connect_timeout)
+		try:
+			s.connect(self.path)
+		except OSError as e:
+			s.close()
+			raise ConnectionError(f"state service unreachable at {self.path}: {e}") from e
+		s.settimeout(None)
+		return s
+
+	def call(self, op: str, **args) -> Any:
+		try:
+			sock = self._idle.get_nowait()
+		except queue.Empty:
+			sock = self._connect()
+		try:
+			send_msg(sock, {"op": op, "args": args})
+			reply = recv_msg(sock)
+		except (OSError, ValueError) as e:
+			sock.close()
+			raise ConnectionError(f"ipc call {op!r} failed: {e}") from e
+		try:
+			self._idle.put_nowait(sock)
+		except queue.Full:
+			sock.close()
+
+		if reply.get("ok"):
+			return reply.get("result")
+		name, msg = reply.get("exc") or "RemoteError", reply.get("msg") or ""
+		exc = getattr(builtins, name, None) if name in _PASS_THROUGH else None
+		raise (exc or RemoteError)(msg if exc else f"{name}: {msg}")
+
+	def close(self) -> None:
+		while True:
+			try:
+				self._idle.get_nowait().close()
+			except queue.Empty:
+				return
@@ -1,3 +1,4 @@
+import os
 import threading
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
@@ -52,15 +53,25 @@ listeners: Dict[str, Listener] = {}
 socket_to_listener: Dict[int, str] = {}
 
 def create_listener(ip: str, port: int, transport: str, to_console: bool=True, op_id: str=None, profiles: Optional[dict] = None, certfile: str = None,
-	keyfile: str = None) -> Listener:
+	keyfile: str = None, isolated: Optional[bool] = None) -> Listener:
 	"""
 	Instantiate, start, and register a new Listener subclass
 	for the given transport name. Returns the running instance.
+
+	isolated=True runs an HTTP/HTTPS listener in its own supervised process
+	(core.listeners.process); None follows LISTENER_ISOLATION ("thread" or "process").
 	"""
 	cls = LISTENER_CLASSES.get(transport)
 	if not cls:
 		raise ValueError(f"No listener registered for transport {transport!r}")
 
+	if isolated is None:
+		isolated = os.getenv("LISTENER_ISOLATION", "thread").strip().lower() == "process"
+	if isolated:
+		from core.listeners import process
+		if transport in process.TRANSPORTS:
+			cls = process.ProcessListener
+
 	# Assign a random 8-char ID
 	lid = uuid.uuid4().hex[:8]
 
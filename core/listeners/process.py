@@ -0,0 +1,314 @@
+# core/listeners/process.py
+"""
+Process-isolated HTTP/HTTPS listeners.
+
+By default a listener is a thread in the teamserver, so TLS handshakes,
+request parsing and the JSON/base64 decoding of every beacon compete for the
+GIL with the API. With LISTENER_ISOLATION=process (or
+create_listener(..., isolated=True)) the HTTP server runs in a child
+
+	python -m core.listeners.process --id LID --transport https ...
+
+which does all of that per-request work and makes one IPC call per beacon
+back to the teamserver (core.ipc over a Unix socket):
+
+	checkin(sid, lid, scheme)    -> http.beacon_checkin   register/touch, pop the next command
+	output(sid, output, scheme)  -> http.beacon_output    metadata collection, demux results
+
+Sessions, their command queues and the routers therefore stay where they
+were; only the wire work moves. Malleable profiles attached to the listener
+are pushed to the child over its control socket.
+
+ProcessListener supervises the child: when it dies it is restarted with
+exponential backoff and its profiles are pushed again. Sessions survive a
+restart because they never lived in the child. TCP/TLS listeners always run
+as threads: their sessions are the accepted sockets, which the command
+router reads and writes directly.
+
+Environment:
+	LISTENER_ISOLATION              "thread" (default) or "process"
+	LISTENER_RESTART_MAX_BACKOFF    seconds between restarts at most (default 30)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import atexit
+import time
+import signal
+import logging
+import argparse
+import threading
+import subprocess
+from typing import Optional
+
+from core import ipc
+from core.listeners.base import Listener, _reg_lock
+
+from colorama import Fore, Style
+brightgreen = "\001" + Style.BRIGHT + Fore.GREEN + "\002"
+brightred = "\001" + Style.BRIGHT + Fore.RED + "\002"
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("http", "https")
+
+RUN_DIR = os.path.expanduser("~/.sentinelcommander/run")
+STARTUP_TIMEOUT = 15.0
+MAX_BACKOFF = float(os.getenv("LISTENER_RESTART_MAX_BACKOFF", "30"))
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_bus_lock = threading.Lock()
+_bus: Optional[ipc.RpcServer] = None
+
+
+# ---------------------------------------------------------------------------
+# Teamserver side
+# ---------------------------------------------------------------------------
+def _ensure_bus() -> str:
+	"""Start (once per process) the socket every isolated listener reports beacons to."""
+	global _bus
+	with _bus_lock:
+		if _bus is None:
+			from core.listeners import http
+
+			ops = {
+				"checkin": lambda sid, lid, scheme: http.beacon_checkin(sid, lid, scheme),
+				"output": lambda sid, output, scheme: http.beacon_output(sid, output, scheme),
+			}
+			_bus = ipc.RpcServer(os.path.join(RUN_DIR, f"listeners-{os.getpid()}.sock"), ops)
+			_bus.serve_in_thread(name="listener-bus")
+			atexit.register(_bus.server_close)
+		return _bus.path
+
+
+class _ProfileDict(dict):
+	"""listener.profiles for an isolated listener: writes are forwarded to the child."""
+
+	def __init__(self, owner: "ProcessListener", *args):
+		super().__init__(*args)
+		self._owner = owner
+
+	def __setitem__(self, name, profile):
+		super().__setitem__(name, profile)
+		self._owner._push_profile(name, profile)
+
+	def __delitem__(self, name):
+		super().__delitem__(name)
+		self._owner._push_profile(name, None)
+
+
+class ProcessListener(Listener):
+	"""Teamserver-side handle for an HTTP/HTTPS listener running in a supervised child process."""
+
+	def __init__(self, *args, **kwargs):
+		self._control: Optional[ipc.RpcClient] = None
+		self._proc: Optional[subprocess.Popen] = None
+		self._argv: list = []
+		self.restarts = 0
+		super().__init__(*args, **kwargs)
+
+	# the profile loaders do `listener.profiles[name] = profile`
+	@property
+	def profiles(self):
+		return self._profiles
+
+	@profiles.setter
+	def profiles(self, p):
+		self._profiles = _ProfileDict(self, p or {})
+		for name, prof in self._profiles.items():
+			self._push_profile(name, prof)
+
+	def _push_profile(self, name, profile):
+		if self._control is None or self._proc is None:
+			return  # not started yet; _spawn pushes everything
+		blocks = getattr(profile, "blocks", None) if profile is not None else None
+		if profile is not None and blocks is None:
+			logger.warning("listener %s: profile %r has no blocks; not forwarded", self.id, name)
+			return
+		try:
+			self._control.call("set_profile", name=name, blocks=blocks)
+		except ConnectionError as e:
+			# the child is restarting; the supervisor pushes all profiles once it's back
+			logger.warning("listener %s: could not push profile %r: %s", self.id, name, e)
+
+	def start(self, ip, port, certfile: str = None, keyfile: str = None):
+		from core import utils
+
+		self.is_ssl = (self.transport == "https")
+		self._control_path = control = os.path.join(RUN_DIR, f"listener-{self.id}.sock")
+		self._argv = [
+			sys.executable, "-m", "core.listeners.process",
+			"--id", self.id, "--transport", self.transport, "--ip", ip, "--port", str(port),
+			"--bus", _ensure_bus(), "--control", control, "--parent", str(os.getpid()),
+		]
+		if certfile and keyfile:
+			self._argv += ["--certfile", certfile, "--keyfile", keyfile]
+		self._control = ipc.RpcClient(control, connect_timeout=1.0)
+		self._spawn()
+
+		with _reg_lock:
+			registry = utils.https_listener_sockets if self.is_ssl else utils.http_listener_sockets
+			registry[f"{self.transport}-{ip}:{port}"] = self  # utils.shutdown() calls .shutdown()
+
+		self._thread = threading.Thread(target=self.run_loop, args=(self._stop_event,), name=f"listener-{self.id}", daemon=True)
+		self._thread.start()
+
+	def _spawn(self):
+		"""Start the child and wait until it is serving; raises if it can't bind/come up."""
+		self._control.close()  # pooled connections to a previous child are dead
+		proc = subprocess.Popen(self._argv, cwd=_ROOT)
+		self._proc = proc
+		deadline = time.monotonic() + STARTUP_TIMEOUT
+		while True:
+			if proc.poll() is not None:
+				raise RuntimeError(f"{self.transport.upper()} listener process exited during startup (code {proc.returncode})")
+			try:
+				self._control.call("ping")
+				break
+			except ConnectionError:
+				if time.monotonic() > deadline:
+					self._terminate()
+					raise RuntimeError(f"{self.transport.upper()} listener process did not start within {STARTUP_TIMEOUT:.0f}s")
+				time.sleep(0.05)
+		for name, prof in list(self._profiles.items()):
+			self._push_profile(name, prof)
+
+	def run_loop(self, stop_evt):
+		"""Supervisor: restart the child whenever it exits on its own."""
+		backoff = 1.0
+		while not stop_evt.is_set():
+			started = time.monotonic()
+			code = self._proc.wait()
+			if stop_evt.is_set():
+				break
+			if time.monotonic() - started > 60.0:
+				backoff = 1.0  # it ran fine for a while; this is a fresh failure
+			logger.warning("listener %s process exited (code %s); restarting in %.0fs", self.id, code, backoff)
+			print(brightred + f"[!] {self.transport.upper()} listener {self.ip}:{self.port} exited (code {code}), restarting")
+			if stop_evt.wait(backoff):
+				break
+			backoff = min(backoff * 2, MAX_BACKOFF)
+			try:
+				self._spawn()
+			except Exception as e:
+				logger.error("listener %s restart failed: %s", self.id, e)
+				continue
+			self.restarts += 1
+			if stop_evt.is_set():
+				self._terminate()  # stop() raced with the restart
+				break
+			print(brightgreen + f"[+] {self.transport.upper()} listener {self.ip}:{self.port} restarted (pid {self._proc.pid})")
+
+	def _terminate(self):
+		proc = self._proc
+		if proc is None or proc.poll() is not None:
+			return
+		proc.terminate()
+		try:
+			proc.wait(5)
+		except subprocess.TimeoutExpired:
+			proc.kill()
+			proc.wait()
+
+	def stop(self, timeout=None):
+		self._stop_event.set()
+		self._terminate()
+		if self._thread and self._thread is not threading.current_thread():
+			self._thread.join(timeout if timeout is not None else 10)
+		self._terminate()
+		if self._control is not None:
+			self._control.close()
+			try:
+				os.unlink(self._control_path)  # left behind if the child was killed
+			except OSError:
+				pass
+
+	shutdown = stop
+
+	def is_alive(self):
+		return bool(self._proc is not None and self._proc.poll() is None)
+
+	@property
+	def pid(self) -> Optional[int]:
+		return self._proc.pid if self._proc is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Child side
+# ---------------------------------------------------------------------------
+def main(argv=None) -> int:
+	ap = argparse.ArgumentParser(description="Isolated HTTP/HTTPS listener (started and supervised by the teamserver)")
+	ap.add_argument("--id", required=True)
+	ap.add_argument("--transport", required=True, choices=TRANSPORTS)
+	ap.add_argument("--ip", required=True)
+	ap.add_argument("--port", required=True, type=int)
+	ap.add_argument("--bus", required=True, help="teamserver socket beacons are reported to")
+	ap.add_argument("--control", required=True, help="socket this process serves set_profile/ping on")
+	ap.add_argument("--parent", type=int, default=0, help="teamserver pid; exit when it goes away")
+	ap.add_argument("--certfile")
+	ap.add_argument("--keyfile")
+	args = ap.parse_args(argv)
+
+	from core.listeners import base, http
+	from core.malleable_c2.malleable_c2 import MalleableProfile
+
+	parent = args.parent or os.getppid()
+	bus = ipc.RpcClient(args.bus, max_idle=64)
+
+	# route the session side of every request to the teamserver
+	def beacon_checkin(sid, lid, scheme):
+		return bus.call("checkin", sid=sid, lid=lid, scheme=scheme)
+
+	def beacon_output(sid, output, scheme):
+		return bus.call("output", sid=sid, output=output, scheme=scheme)
+
+	http.beacon_checkin = beacon_checkin
+	http.beacon_output = beacon_output
+
+	inst = http.HttpListener(ip=args.ip, port=args.port, transport=args.transport, to_console=False, listener_id=args.id)
+	with base._reg_lock:
+		base.listeners[args.id] = inst
+	if args.transport == "https":
+		inst.start(args.ip, args.port, certfile=args.certfile, keyfile=args.keyfile)
+	else:
+		inst.start(args.ip, args.port)
+	if not inst.is_alive():
+		return 1  # start() already said why (e.g. cert/key not found)
+
+	def set_profile(name, blocks=None):
+		profs = dict(inst.profiles)
+		if blocks is None:
+			profs.pop(name, None)
+		else:
+			profs[name] = MalleableProfile(name, blocks)
+		inst.profiles = profs  # swapped whole, so a request never sees a half-updated dict
+		return True
+
+	control = ipc.RpcServer(args.control, {
+		"set_profile": set_profile,
+		"ping": lambda: {"pid": os.getpid(), "alive": inst.is_alive()},
+	})
+	control.serve_in_thread(name="listener-control")
+
+	stop = threading.Event()
+	for sig in (signal.SIGINT, signal.SIGTERM):
+		signal.signal(sig, lambda *_: stop.set())
+
+	code = 0
+	while not stop.wait(1.0):
+		if os.getppid() != parent:
+			break  # teamserver is gone; don't linger holding the port
+		if not inst.is_alive():
+			code = 1  # server thread died: exit so the supervisor restarts us
+			break
+
+	control.shutdown()
+	control.server_close()
+	inst.stop(5)
+	return code
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -8,16 +8,12 @@ import datetime
 import threading
 import time
 
-from cryptography import x509
-from cryptography.x509.oid import NameOID
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import rsa
-
 from colorama import Style, Fore
 
 from core.listeners.base import Listener, register_listener, socket_to_listener, _reg_lock
 from core import utils
 from core.session_handlers import session_manager
+from core.metrics import BEACONS
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +24,12 @@ brightred    = "\001" + Style.BRIGHT + Fore.RED    + "\002"
 
 def _generate_tls_context(listen_ip: str) -> ssl.SSLContext:
     """Create a self-signed TLS context for the given IP."""
+    # cryptography is only needed once a TLS/HTTPS listener starts; keep it off the startup path
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import serialization, hashes
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
     key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
 
     name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, u"SentinelCommander")])
@@ -196,7 +198,7 @@ class TcpListener(Listener):
 
         print(brightyellow + f"[+] {'TLS' if self.is_ssl else 'TCP'} listener started on {ip}:{port}")
 
-        self._thread = threading.Thread(target=self.run_loop, args=(self._stop_event, ctx), daemon=True)
+        self._thread = threading.Thread(target=self.run_loop, args=(self._stop_event, ctx), name=f"listener-{self.id}", daemon=True)
         self._thread.start()
 
     def stop(self, timeout: float = None):
@@ -241,11 +243,12 @@ class TcpListener(Listener):
             sid = utils.gen_session_id()
             session_manager.register_tcp_session(sid, client, self.is_ssl)
             self.sessions.append(sid)
+            BEACONS.inc(listener=self.id, transport="tls" if self.is_ssl else "tcp")
 
             print(brightgreen + f"[+] New {'TLS' if self.is_ssl else 'TCP'} agent: {sid}")
             
             # Use the new handler instead of _collect_tcp_metadata
-            threading.Thread(target=_handle_tcp_session_v2, args=(sid,), daemon=True).start()
+            threading.Thread(target=_handle_tcp_session_v2, args=(sid,), name=f"session-{sid}", daemon=True).start()
 
 # import logging
 # logger = logging.getLogger(__name__)
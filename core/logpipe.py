@@ -0,0 +1,214 @@
+# core/logpipe.py
+"""
+Centralized asynchronous logging backend.
+
+Loggers get a lightweight PipelineHandler instead of file/console handlers.
+The handler only snapshots the record and puts it on one bounded queue; a
+single writer thread drains the queue in batches, formats the records and
+hands them to the real handlers (one flush per handler per batch).  Request
+handlers and the asyncio loop therefore never wait on disk I/O or rotation.
+
+Environment:
+  LOG_QUEUE_SIZE     max queued records (default 10000)
+  LOG_QUEUE_POLICY   "drop" (default) or "block" when the queue is full
+  LOG_BATCH_SIZE     max records written per batch (default 512)
+"""
+from __future__ import annotations
+
+import os
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional, Tuple
+
+_STOP = object()
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+	"""RotatingFileHandler that can write a batch of records with a single flush."""
+
+	def emit_batch(self, records: List[logging.LogRecord]) -> None:
+		self.acquire()
+		try:
+			if self.stream is None:
+				self.stream = self._open()
+			for record in records:
+				try:
+					if self.shouldRollover(record):
+						self.stream.flush()
+						self.doRollover()
+					self.stream.write(self.format(record) + self.terminator)
+				except Exception:
+					self.handleError(record)
+			self.stream.flush()
+		finally:
+			self.release()
+
+
+class LogPipeline:
+	"""Bounded queue plus one writer thread shared by every pipelined logger."""
+
+	def __init__(self, maxsize: int = 10000, policy: str = "drop", batch_size: int = 512):
+		self.maxsize = max(1, int(maxsize))
+		self.policy = "block" if str(policy).lower() == "block" else "drop"
+		self.batch_size = max(1, int(batch_size))
+		self._q: "queue.Queue" = queue.Queue(maxsize=self.maxsize)
+		self._lock = threading.Lock()
+		self._thread: Optional[threading.Thread] = None
+		self.enqueued = 0
+		self.dropped = 0
+		self.written = 0
+		self.batches = 0
+		self.dropped_by_logger: Dict[str, int] = {}
+
+	# ---------- producer side ----------
+	def submit(self, handlers: Tuple[logging.Handler, ...], record: logging.LogRecord) -> None:
+		self._ensure_started()
+		try:
+			if self.policy == "block":
+				self._q.put((handlers, record))
+			elif record.levelno >= logging.ERROR:
+				# errors get a short grace period before being counted as dropped
+				self._q.put((handlers, record), timeout=0.05)
+			else:
+				self._q.put_nowait((handlers, record))
+			self.enqueued += 1
+		except queue.Full:
+			with self._lock:
+				self.dropped += 1
+				self.dropped_by_logger[record.name] = self.dropped_by_logger.get(record.name, 0) + 1
+
+	# ---------- writer side ----------
+	def _ensure_started(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		with self._lock:
+			if self._thread is None or not self._thread.is_alive():
+				self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+				self._thread.start()
+
+	def _run(self) -> None:
+		q = self._q
+		while True:
+			item = q.get()
+			batch = [item]
+			while len(batch) < self.batch_size:
+				try:
+					batch.append(q.get_nowait())
+				except queue.Empty:
+					break
+			stop = self._write(batch)
+			if stop:
+				return
+
+	def _write(self, batch) -> bool:
+		stop = False
+		grouped: Dict[logging.Handler, List[logging.LogRecord]] = {}
+		for item in batch:
+			if item is _STOP:
+				stop = True
+				continue
+			handlers, record = item
+			for h in handlers:
+				if record.levelno >= h.level:
+					grouped.setdefault(h, []).append(record)
+		for h, records in grouped.items():
+			try:
+				if hasattr(h, "emit_batch"):
+					h.emit_batch(records)
+				else:
+					for r in records:
+						h.handle(r)
+			except Exception:
+				pass
+		self.written += sum(len(r) for r in grouped.values())
+		self.batches += 1
+		return stop
+
+	def stop(self, timeout: float = 2.0) -> None:
+		"""Drain pending records and stop the writer (called at interpreter exit)."""
+		t = self._thread
+		if not t or not t.is_alive():
+			return
+		try:
+			self._q.put(_STOP, timeout=timeout)
+		except queue.Full:
+			return
+		t.join(timeout)
+
+	def stats(self) -> Dict[str, object]:
+		with self._lock:
+			return {
+				"queue_depth": self._q.qsize(),
+				"queue_max": self.maxsize,
+				"policy": self.policy,
+				"enqueued": self.enqueued,
+				"dropped": self.dropped,
+				"dropped_by_logger": dict(self.dropped_by_logger),
+				"written": self.written,
+				"batches": self.batches,
+			}
+
+
+class PipelineHandler(logging.Handler):
+	"""
+	Front-end handler: snapshots the record and enqueues it for the writer.
+	The message is rendered here (cheap %-format) so mutable args are captured
+	at log time; everything else (JSON, rotation, disk) happens off-thread.
+	"""
+
+	def __init__(self, pipeline: LogPipeline, targets: List[logging.Handler]):
+		super().__init__(level=min((h.level for h in targets), default=logging.NOTSET))
+		self.pipeline = pipeline
+		self.targets = tuple(targets)
+
+	def emit(self, record: logging.LogRecord) -> None:
+		try:
+			record.msg = record.getMessage()
+			record.args = None
+			if record.exc_info and not record.exc_text:
+				record.exc_text = logging.Formatter().formatException(record.exc_info)
+			record.exc_info = None
+			self.pipeline.submit(self.targets, record)
+		except Exception:
+			self.handleError(record)
+
+	def close(self) -> None:
+		for h in self.targets:
+			try:
+				h.close()
+			except Exception:
+				pass
+		super().close()
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> LogPipeline:
+	"""Return the process-wide pipeline, creating it from the environment once."""
+	global _pipeline
+	if _pipeline is None:
+		with _pipeline_lock:
+			if _pipeline is None:
+				_pipeline = LogPipeline(
+					maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+					policy=os.getenv("LOG_QUEUE_POLICY", "drop"),
+					batch_size=int(os.getenv("LOG_BATCH_SIZE", "512")),
+				)
+				atexit.register(_pipeline.stop)
+	return _pipeline
+
+
+def attach(logger: logging.Logger, *targets: logging.Handler) -> PipelineHandler:
+	"""Install ``targets`` on ``logger`` behind a single pipelined front-end."""
+	h = PipelineHandler(get_pipeline(), list(targets))
+	logger.addHandler(h)
+	return h
+
+
+def stats() -> Dict[str, object]:
+	return get_pipeline().stats()
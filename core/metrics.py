@@ -0,0 +1,212 @@
+# core/metrics.py
+"""
+Minimal in-process metrics (Prometheus text exposition format).
+
+Instruments are updated inline on the existing code paths (a lock + a dict
+update per call); nothing here polls. Values that already live elsewhere
+(queue sizes, thread count, log drops) are read by collectors at scrape time.
+
+	BEACONS = metrics.counter("sentinel_beacons_total", "Beacon check-ins", ("listener", "transport"))
+	BEACONS.inc(listener=lid, transport="http")
+"""
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_LabelKey = Tuple[str, ...]
+
+_registry_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+# Seconds; covers sub-ms TCP round-trips up to slow HTTP beacons.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _esc(v: object) -> str:
+	return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+	parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+	if extra:
+		parts.append(extra)
+	return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+	if v == math.inf:
+		return "+Inf"
+	if float(v).is_integer():
+		return str(int(v))
+	return repr(float(v))
+
+
+class _Metric:
+	kind = "untyped"
+
+	def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+		self.name = name
+		self.doc = doc
+		self.labels = tuple(labels)
+		self._lock = threading.Lock()
+
+	def _key(self, kw: Dict[str, object]) -> _LabelKey:
+		return tuple(str(kw.get(n, "")) for n in self.labels)
+
+	def header(self) -> List[str]:
+		return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+	def render(self) -> List[str]:
+		raise NotImplementedError
+
+
+class Counter(_Metric):
+	kind = "counter"
+
+	def __init__(self, name, doc, labels=()):
+		super().__init__(name, doc, labels)
+		self._values: Dict[_LabelKey, float] = {}
+
+	def inc(self, amount: float = 1.0, **labels) -> None:
+		k = self._key(labels)
+		with self._lock:
+			self._values[k] = self._values.get(k, 0.0) + amount
+
+	def render(self) -> List[str]:
+		with self._lock:
+			items = list(self._values.items())
+		return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+	kind = "gauge"
+
+	def __init__(self, name, doc, labels=()):
+		super().__init__(name, doc, labels)
+		self._values: Dict[_LabelKey, float] = {}
+
+	def set(self, value: float, **labels) -> None:
+		k = self._key(labels)
+		with self._lock:
+			self._values[k] = float(value)
+
+	def inc(self, amount: float = 1.0, **labels) -> None:
+		k = self._key(labels)
+		with self._lock:
+			self._values[k] = self._values.get(k, 0.0) + amount
+
+	def dec(self, amount: float = 1.0, **labels) -> None:
+		self.inc(-amount, **labels)
+
+	def render(self) -> List[str]:
+		with self._lock:
+			items = list(self._values.items())
+		return self.header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+	kind = "histogram"
+
+	def __init__(self, name, doc, labels=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+		super().__init__(name, doc, labels)
+		self.buckets = tuple(sorted(buckets)) + (math.inf,)
+		# per label key: [bucket counts..., sum, count]
+		self._values: Dict[_LabelKey, List[float]] = {}
+
+	def observe(self, value: float, **labels) -> None:
+		k = self._key(labels)
+		with self._lock:
+			row = self._values.get(k)
+			if row is None:
+				row = self._values[k] = [0.0] * (len(self.buckets) + 2)
+			for i, b in enumerate(self.buckets):
+				if value <= b:
+					row[i] += 1
+					break
+			row[-2] += value
+			row[-1] += 1
+
+	def render(self) -> List[str]:
+		with self._lock:
+			items = [(k, list(v)) for k, v in self._values.items()]
+		out = self.header()
+		for k, row in items:
+			acc = 0.0
+			for i, b in enumerate(self.buckets):
+				acc += row[i]
+				le = 'le="%s"' % _fmt_value(b)
+				out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, le)} {_fmt_value(acc)}")
+			out.append(f"{self.name}_sum{_fmt_labels(self.labels, k)} {_fmt_value(row[-2])}")
+			out.append(f"{self.name}_count{_fmt_labels(self.labels, k)} {_fmt_value(row[-1])}")
+		return out
+
+
+def _get_or_create(cls, name: str, doc: str, labels: Sequence[str], **kw):
+	with _registry_lock:
+		m = _metrics.get(name)
+		if m is None:
+			m = _metrics[name] = cls(name, doc, labels, **kw)
+		return m
+
+
+def counter(name: str, doc: str, labels: Sequence[str] = ()) -> Counter:
+	return _get_or_create(Counter, name, doc, labels)
+
+
+def gauge(name: str, doc: str, labels: Sequence[str] = ()) -> Gauge:
+	return _get_or_create(Gauge, name, doc, labels)
+
+
+def histogram(name: str, doc: str, labels: Sequence[str] = (), buckets: Optional[Sequence[float]] = None) -> Histogram:
+	return _get_or_create(Histogram, name, doc, labels, buckets=buckets or DEFAULT_BUCKETS)
+
+
+def register_collector(fn: Callable[[], Iterable[str]]) -> None:
+	"""Add a scrape-time collector yielding exposition lines (HELP/TYPE included)."""
+	with _registry_lock:
+		if fn not in _collectors:
+			_collectors.append(fn)
+
+
+def _family_lines(kind: str, name: str, doc: str, labels: Sequence[str], rows: Iterable[Tuple[Sequence[object], float]]) -> List[str]:
+	out = [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"]
+	for values, v in rows:
+		out.append(f"{name}{_fmt_labels(labels, [str(x) for x in values])} {_fmt_value(v)}")
+	return out
+
+
+def gauge_lines(name: str, doc: str, labels: Sequence[str], rows: Iterable[Tuple[Sequence[object], float]]) -> List[str]:
+	"""Helper for collectors: render a one-off gauge from (label_values, value) rows."""
+	return _family_lines("gauge", name, doc, labels, rows)
+
+
+def counter_lines(name: str, doc: str, labels: Sequence[str], rows: Iterable[Tuple[Sequence[object], float]]) -> List[str]:
+	"""Same as gauge_lines() for monotonically increasing values kept elsewhere."""
+	return _family_lines("counter", name, doc, labels, rows)
+
+
+def render() -> str:
+	with _registry_lock:
+		metrics = list(_metrics.values())
+		collectors = list(_collectors)
+	lines: List[str] = []
+	for m in metrics:
+		lines.extend(m.render())
+	for fn in collectors:
+		try:
+			lines.extend(fn())
+		except Exception:
+			continue
+	return "\n".join(lines) + "\n"
+
+
+# ---------- shared instruments used across core ----------
+BEACONS = counter("sentinel_beacons_total", "Beacon check-ins received, per listener", ("listener", "transport"))
+CMD_RTT = histogram("sentinel_command_rtt_seconds", "Command round-trip latency (send to normalized output)", ("transport",))
+TRANSFER_BYTES = counter("sentinel_transfer_bytes_total", "Bytes moved by the transfer manager", ("direction",))
+TRANSFERS_ACTIVE = gauge("sentinel_transfers_active", "Transfer worker threads currently running", ("direction",))
+WS_CLIENTS = gauge("sentinel_ws_clients", "Connected websocket clients", ("route",))
+LOOP_LAG = gauge("sentinel_event_loop_lag_seconds", "Last measured asyncio event-loop scheduling lag")
@@ -0,0 +1,238 @@
+# core/profiler.py
+"""
+On-demand sampling profiler for the running teamserver.
+
+A single sampler thread walks ``sys._current_frames()`` at a fixed interval and
+aggregates every other thread's Python stack, so listener threads, transfer
+workers, TCP session reactors and the uvicorn event loop are all covered
+without instrumenting them. Output is collapsed-stack text (one
+``role;frame;frame count`` line per unique stack) that flamegraph.pl,
+speedscope and inferno read directly.
+
+Threads are labelled by role from their names (see thread_role()); the
+listener/transfer/session threads are named at creation for that purpose.
+
+	prof = profiler.run(seconds=10)
+	open("teamserver.folded", "w").write(prof.collapsed())
+	profiler.top_threads(window=1.0)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+MAX_SECONDS = 120.0
+MIN_INTERVAL = 0.001
+MAX_DEPTH = 128
+
+_busy = threading.Lock()
+_loop_thread_id: Optional[int] = None
+
+# Top-of-stack frames that mean "blocked, not working" (basename, function).
+_IDLE_FRAMES = {
+	("threading.py", "wait"),
+	("threading.py", "_wait_for_tstate_lock"),
+	("queue.py", "get"),
+	("selectors.py", "select"),
+	("socket.py", "accept"),
+	("socket.py", "readinto"),
+	("socketserver.py", "serve_forever"),
+	("ssl.py", "recv"),
+	("ssl.py", "read"),
+	("ssl.py", "accept"),
+	("time.py", "sleep"),
+}
+
+
+class ProfilerBusy(RuntimeError):
+	"""Raised when a profile is requested while another one is running."""
+
+
+def mark_event_loop_thread(ident: Optional[int] = None) -> None:
+	"""Remember which thread runs the asyncio loop so it is labelled 'event-loop'."""
+	global _loop_thread_id
+	_loop_thread_id = ident if ident is not None else threading.get_ident()
+
+
+def thread_role(t: Optional[threading.Thread], ident: int) -> str:
+	"""Map a thread to a short role label used as the root of each stack."""
+	if ident == _loop_thread_id:
+		return "event-loop"
+	if t is None:
+		return f"thread-{ident}"
+	name = t.name or ""
+	# named at creation: listener-<id>, transfer-<tid>, session-<sid>, tcp-reader-<sid>, log-writer
+	for prefix in ("listener-", "transfer-", "session-", "tcp-reader-"):
+		if name.startswith(prefix):
+			return name
+	if name == "MainThread":
+		return "main"
+	if "process_request_thread" in name:
+		return "http-request"
+	if name.startswith("AnyIO worker thread") or name.startswith("ThreadPoolExecutor"):
+		return "worker-pool"
+	return name or f"thread-{ident}"
+
+
+def _frame_label(code) -> str:
+	return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+	code = frame.f_code
+	return (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+
+
+def _cpu_clock(ident: int) -> Optional[int]:
+	# Linux/BSD only; None elsewhere (top_threads then reports samples only).
+	try:
+		return time.pthread_getcpuclockid(ident)
+	except (AttributeError, OSError, ValueError):
+		return None
+
+
+def _cpu_time(clk: Optional[int]) -> Optional[float]:
+	if clk is None:
+		return None
+	try:
+		return time.clock_gettime(clk)
+	except OSError:
+		return None
+
+
+def _threads_by_ident() -> Dict[int, threading.Thread]:
+	return {t.ident: t for t in threading.enumerate() if t.ident is not None}
+
+
+class Profile:
+	"""Result of one sampling run."""
+
+	def __init__(self, seconds: float, interval: float, include_idle: bool):
+		self.seconds = seconds
+		self.interval = interval
+		self.include_idle = include_idle
+		self.stacks: Counter = Counter()
+		self.samples = 0               # sampler ticks
+		self.thread_samples: Counter = Counter()   # role -> samples (incl. idle)
+		self.thread_busy: Counter = Counter()      # role -> non-idle samples
+		self.cpu: Dict[str, float] = {}            # role -> cpu seconds during run
+		self.wall = 0.0
+
+	def collapsed(self) -> str:
+		"""Brendan Gregg collapsed-stack format, heaviest stacks first."""
+		return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+	def threads(self) -> List[Dict[str, object]]:
+		rows = []
+		for role, n in self.thread_samples.most_common():
+			busy = self.thread_busy.get(role, 0)
+			cpu = self.cpu.get(role)
+			rows.append({
+				"role": role,
+				"samples": n,
+				"busy_pct": round(100.0 * busy / n, 1) if n else 0.0,
+				"cpu_s": round(cpu, 4) if cpu is not None else None,
+				"cpu_pct": round(100.0 * cpu / self.wall, 1) if cpu is not None and self.wall else None,
+			})
+		rows.sort(key=lambda r: (r["cpu_s"] or 0.0, r["busy_pct"]), reverse=True)
+		return rows
+
+	def summary(self) -> Dict[str, object]:
+		return {
+			"seconds": round(self.wall, 3),
+			"interval_ms": round(self.interval * 1000.0, 3),
+			"samples": self.samples,
+			"stacks": len(self.stacks),
+			"include_idle": self.include_idle,
+		}
+
+
+def run(seconds: float = 10.0, interval: float = 0.01, include_idle: bool = False) -> Profile:
+	"""
+	Sample all threads for ``seconds`` (blocking the caller, so run it off the
+	event loop). Only one profile may run at a time; raises ProfilerBusy.
+	"""
+	seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+	interval = max(MIN_INTERVAL, float(interval))
+	if not _busy.acquire(blocking=False):
+		raise ProfilerBusy("a profile is already running")
+	try:
+		prof = Profile(seconds, interval, include_idle)
+		me = threading.get_ident()
+		clocks: Dict[int, Tuple[str, Optional[int], Optional[float]]] = {}
+		names = _threads_by_ident()
+
+		t0 = time.perf_counter()
+		deadline = t0 + seconds
+		next_tick = t0
+		while True:
+			now = time.perf_counter()
+			if now >= deadline:
+				break
+			frames = sys._current_frames()
+			if len(frames) != len(names):
+				names = _threads_by_ident()
+			prof.samples += 1
+			for ident, frame in frames.items():
+				if ident == me:
+					continue
+				role = thread_role(names.get(ident), ident)
+				if ident not in clocks:
+					clk = _cpu_clock(ident)
+					clocks[ident] = (role, clk, _cpu_time(clk))
+				prof.thread_samples[role] += 1
+				idle = _is_idle(frame)
+				if not idle:
+					prof.thread_busy[role] += 1
+				elif not include_idle:
+					continue
+				parts = []
+				f = frame
+				while f is not None and len(parts) < MAX_DEPTH:
+					parts.append(_frame_label(f.f_code))
+					f = f.f_back
+				parts.append(role)
+				parts.reverse()
+				prof.stacks[";".join(parts)] += 1
+			del frames
+			next_tick += interval
+			delay = next_tick - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			else:
+				next_tick = time.perf_counter()   # fell behind; don't burst
+		prof.wall = time.perf_counter() - t0
+
+		for ident, (role, clk, start) in clocks.items():
+			end = _cpu_time(clk)
+			if start is not None and end is not None:
+				prof.cpu[role] = prof.cpu.get(role, 0.0) + max(0.0, end - start)
+		return prof
+	finally:
+		_busy.release()
+
+
+def top_threads(window: float = 1.0, interval: float = 0.02) -> Dict[str, object]:
+	"""Short sampling window summarised per thread role (busiest first)."""
+	prof = run(seconds=window, interval=interval, include_idle=True)
+	return {**prof.summary(), "threads": prof.threads()}
+
+
+if __name__ == "__main__":
+	# Sampler self-check: python -m core.profiler
+	def _spin(stop):
+		while not stop.is_set():
+			sum(i * i for i in range(1000))
+
+	stop = threading.Event()
+	threading.Thread(target=_spin, args=(stop,), name="transfer-demo", daemon=True).start()
+	p = run(seconds=1.0, interval=0.005)
+	stop.set()
+	print(p.summary())
+	for row in p.threads():
+		print(row)
+	print(p.collapsed()[:600])
@@ -4,10 +4,13 @@ import fnmatch
 import uuid
 import threading
 import signal
+import time
 from typing import Dict
 
+from core.session_handlers import session_store
+
 class Session:
-    def __init__(self, sid, transport, handler):
+    def __init__(self, sid, transport, handler, metadata=None):
         self.sid = sid
         self.transport = transport
         self.handler = handler
@@ -28,7 +31,15 @@ class Session:
         self.os_metadata_commands = []
         self.metadata_fields = []
 
-        self.queue_metadata_commands()
+        if metadata and metadata.get("os") and metadata.get("user"):
+            # warm restart: identity already collected before the teamserver went down
+            self.detect_os(metadata["os"])
+            self.metadata.update(metadata)
+            self.metadata_stage = len(self.metadata_fields)
+            self.mode = "cmd"
+            self.collection = 1
+        else:
+            self.queue_metadata_commands()
     
     def queue_metadata_commands(self):
         cmd = "uname -a"
@@ -47,6 +58,104 @@ class Session:
             self.os_metadata_commands = [("hostname", "hostname"), ("user", "whoami"), ("arch", "(Get-WmiObject Win32_OperatingSystem | Select-Object -ExpandProperty OSArchitecture)") ]
             
 
+class DormantSession:
+    """
+    A session restored from the store that has not been looked up yet: what
+    listings need (identity, transport, metadata, last beacon) without the
+    queues and locks of a live Session.
+    """
+    dormant = True
+
+    def __init__(self, row):
+        self.sid = row["sid"]
+        self.transport = row["transport"]
+        self.metadata = row["metadata"]
+        self.listener = row.get("listener")
+        self.created_at = row.get("created_at")
+        self.last_seen = row.get("last_seen")
+
+
+class SessionRegistry(dict):
+    """
+    sid -> Session. Restored sessions are held as DormantSession rows and
+    become a real Session on first lookup (sessions[sid] / sessions.get(sid),
+    e.g. the beacon's check-in); membership, len() and iteration include them
+    as they are, so the fleet can be listed without waking anything.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._dormant: Dict[str, DormantSession] = {}
+        self._wake_lock = threading.Lock()
+
+    def add_dormant(self, row):
+        if not dict.__contains__(self, row["sid"]):
+            self._dormant[row["sid"]] = DormantSession(row)
+
+    def _wake(self, sid):
+        with self._wake_lock:
+            live = dict.get(self, sid)
+            if live is not None:
+                return live
+            d = self._dormant.get(sid)
+            if d is None:
+                return None
+            live = Session(sid, d.transport, queue.Queue(), metadata=d.metadata)
+            # published before the dormant row goes, so `sid in sessions` never blinks
+            dict.__setitem__(self, sid, live)
+            self._dormant.pop(sid, None)
+            return live
+
+    def __missing__(self, sid):
+        live = self._wake(sid)
+        if live is None:
+            raise KeyError(sid)
+        return live
+
+    def get(self, sid, default=None):
+        live = dict.get(self, sid)
+        if live is None and sid in self._dormant:
+            live = self._wake(sid)
+        return default if live is None else live
+
+    def __setitem__(self, sid, session):
+        dict.__setitem__(self, sid, session)
+        self._dormant.pop(sid, None)
+
+    def __delitem__(self, sid):
+        if dict.__contains__(self, sid):
+            dict.__delitem__(self, sid)
+        else:
+            del self._dormant[sid]
+
+    def pop(self, sid, *default):
+        if dict.__contains__(self, sid):
+            return dict.pop(self, sid)
+        if sid in self._dormant:
+            return self._dormant.pop(sid)
+        if default:
+            return default[0]
+        raise KeyError(sid)
+
+    def __contains__(self, sid):
+        return dict.__contains__(self, sid) or sid in self._dormant
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._dormant)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return list(dict.keys(self)) + list(self._dormant)
+
+    def values(self):
+        return list(dict.values(self)) + list(self._dormant.values())
+
+    def items(self):
+        return list(dict.items(self)) + list(self._dormant.items())
+
+
 class TimeoutException(Exception):
     test = "anyvalue"
 
@@ -55,7 +164,7 @@ def _timout_handler(signum, frame):
 
 signal.signal(signal.SIGALRM, _timout_handler)
 
-sessions = {}
+sessions = SessionRegistry()
 alias_map = {}
 dead_sessions = set()
 
@@ -74,15 +183,24 @@ def kill_http_session(sid, os_type, becon_interval=False):
 
     dead_sessions.add(sid)
 
+    store = session_store.get_store()
     for alias, real in list(alias_map.items()):
         if real == sid:
             del alias_map[alias]
+            if store:
+                store.drop_alias(alias)
     
     sess = sessions.pop(sid, None)
+    if store:
+        store.tombstone(sid)
+        store.forget_session(sid)
     return True
 
 def set_alias(alias, sid):
     alias_map[alias] = sid
+    store = session_store.get_store()
+    if store:
+        store.put_alias(alias, sid)
 
 def resolve_sid(raw: str) -> str|None:
     """Given a raw input (SID or alias), return the canonical SID, or None."""
@@ -125,11 +243,19 @@ def resolve_sid(raw: str) -> str|None:
     # no match
     return None
 
+def _persist_new(sid, transport):
+    store = session_store.get_store()
+    if store:
+        now = time.time()
+        store.put_session(sid, transport=transport, created_at=now, last_seen=now)
+
 def register_http_session(sid):
     sessions[sid] = Session(sid, 'http', queue.Queue())
+    _persist_new(sid, 'http')
 
 def register_https_session(sid):
     sessions[sid] = Session(sid, 'https', queue.Queue())
+    _persist_new(sid, 'https')
 
 def register_tcp_session(sid, client_socket, is_ssl):
     if is_ssl:
@@ -155,3 +281,75 @@ def is_tcp_session(sid):
 
     else:
         return False
+
+def save_metadata(session):
+    """Persist a session's collected metadata (called once collection finishes)."""
+    if session.transport not in ('http', 'https'):
+        return
+    store = session_store.get_store()
+    if store:
+        store.put_session(session.sid, metadata=dict(session.metadata), last_seen=time.time())
+
+def bind_listener(sid, lid):
+    store = session_store.get_store()
+    if store and sid in sessions and sessions[sid].transport in ('http', 'https'):
+        store.put_session(sid, listener=lid)
+
+def touch_session(sid):
+    """Record a beacon; coalesced by the store, so calling it on every check-in is cheap."""
+    store = session_store.get_store()
+    if store:
+        store.touch(sid)
+
+_restored = False
+
+def restore():
+    """
+    Warm restart: load tombstones, aliases and HTTP/HTTPS sessions from the
+    session store. Sessions are registered dormant (see SessionRegistry) and
+    only built when first looked up; one whose identity was already collected
+    comes back in "cmd" mode, so a returning beacon is served straight away
+    instead of repeating the uname/metadata round trip. TCP/TLS sessions are
+    not restored (their sockets died with the old process). Returns the number
+    restored.
+    """
+    global _restored
+    if _restored:
+        return 0
+    _restored = True
+
+    store = session_store.get_store()
+    if not store:
+        return 0
+
+    rows, aliases, tombstones = store.load(session_store.retention_days(),
+                                           session_store.tombstone_retention_days())
+    dead_sessions.update(tombstones)
+
+    from core.listeners.base import _reg_lock, listeners as listener_registry
+
+    n = 0
+    for row in rows:
+        sid = row["sid"]
+        if row["transport"] not in ('http', 'https'):
+            store.forget_session(sid)
+            continue
+        if sid in dead_sessions or sid in sessions:
+            continue
+        sessions.add_dormant(row)
+        n += 1
+
+        lid = row.get("listener")
+        if lid:
+            with _reg_lock:
+                lst = listener_registry.get(lid)
+                if lst is not None and isinstance(getattr(lst, "sessions", None), list) and sid not in lst.sessions:
+                    lst.sessions.append(sid)
+
+    for alias, sid in aliases.items():
+        if sid in sessions:
+            alias_map.setdefault(alias, sid)
+        else:
+            store.drop_alias(alias)
+
+    return n
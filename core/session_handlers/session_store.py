@@ -0,0 +1,322 @@
+# core/session_handlers/session_store.py
+"""
+Persistent session registry (SQLite, write-behind).
+
+session_manager keeps its in-memory dicts as the source of truth; every
+change that must survive a teamserver restart (session metadata, listener
+binding, last beacon, aliases, kill tombstones) is also handed to this store.
+Callers only update a pending map under a lock; one writer thread coalesces
+repeated updates of the same row and commits them in a single transaction
+every SESSION_FLUSH_INTERVAL seconds (sooner once SESSION_BATCH_MAX rows are
+pending), so beacon handlers never wait on disk.
+
+Environment:
+  SESSION_DB               database path, or "off" to disable persistence
+                           (default ~/.sentinelcommander/db/sessions.db)
+  SESSION_FLUSH_INTERVAL   seconds between write-behind commits (default 0.5)
+  SESSION_BATCH_MAX        pending rows that trigger an early commit (default 512)
+  SESSION_RETENTION_DAYS   sessions silent for longer are not restored (default 30)
+  SESSION_TOMBSTONE_RETENTION_DAYS
+                           kill tombstones older than this are purged; 0 keeps
+                           them forever, so a killed implant always gets 410
+                           (default 0)
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.expanduser("~/.sentinelcommander/db/sessions.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+	sid         TEXT PRIMARY KEY,
+	transport   TEXT,
+	metadata    TEXT,
+	listener    TEXT,
+	created_at  REAL,
+	last_seen   REAL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+	alias       TEXT PRIMARY KEY,
+	sid         TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tombstones (
+	sid         TEXT PRIMARY KEY,
+	killed_at   REAL NOT NULL
+);
+"""
+
+# NULL columns in an upsert keep what is already stored
+_UPSERT_SESSION = """
+INSERT INTO sessions (sid, transport, metadata, listener, created_at, last_seen)
+VALUES (:sid, :transport, :metadata, :listener, :created_at, :last_seen)
+ON CONFLICT(sid) DO UPDATE SET
+	transport  = COALESCE(excluded.transport, sessions.transport),
+	metadata   = COALESCE(excluded.metadata, sessions.metadata),
+	listener   = COALESCE(excluded.listener, sessions.listener),
+	created_at = COALESCE(sessions.created_at, excluded.created_at),
+	last_seen  = COALESCE(excluded.last_seen, sessions.last_seen)
+"""
+
+_SESSION_COLS = ("transport", "metadata", "listener", "created_at", "last_seen")
+
+_DELETE = object()
+
+
+class SessionStore:
+	"""Write-behind SQLite store for the session registry."""
+
+	def __init__(self, path: str = DB_PATH, flush_interval: float = 0.5, batch_max: int = 512):
+		self.path = path
+		self.flush_interval = max(0.05, float(flush_interval))
+		self.batch_max = max(1, int(batch_max))
+		# (table, key) -> row dict for upserts, or _DELETE
+		self._pending: Dict[Tuple[str, str], Any] = {}
+		self._cv = threading.Condition()
+		self._io_lock = threading.Lock()
+		self._stopped = False
+		self._thread: Optional[threading.Thread] = None
+		self.written = 0
+		self.batches = 0
+		self.errors = 0
+
+		if path != ":memory:":
+			os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+		self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+		self._conn.execute("PRAGMA journal_mode=WAL;")
+		self._conn.execute("PRAGMA synchronous=NORMAL;")
+		self._conn.executescript(_SCHEMA)
+		self._conn.commit()
+
+	# ---------- producer side ----------
+	def _put(self, table: str, key: str, row: Any) -> None:
+		with self._cv:
+			if self._stopped:
+				return
+			k = (table, key)
+			cur = self._pending.get(k)
+			if row is _DELETE or cur is None or cur is _DELETE:
+				self._pending[k] = row
+			else:
+				cur.update(row)
+			n = len(self._pending)
+			if n == 1 or n >= self.batch_max:
+				self._cv.notify()
+		self._ensure_started()
+
+	def put_session(self, sid: str, *, transport: Optional[str] = None, metadata: Optional[dict] = None,
+					listener: Optional[str] = None, created_at: Optional[float] = None,
+					last_seen: Optional[float] = None) -> None:
+		"""Upsert a session row; only the fields given are changed."""
+		row = {}
+		if transport is not None:
+			row["transport"] = transport
+		if metadata is not None:
+			row["metadata"] = json.dumps(metadata, separators=(",", ":"))
+		if listener is not None:
+			row["listener"] = listener
+		if created_at is not None:
+			row["created_at"] = created_at
+		if last_seen is not None:
+			row["last_seen"] = last_seen
+		if row:
+			self._put("sessions", sid, row)
+
+	def touch(self, sid: str) -> None:
+		self._put("sessions", sid, {"last_seen": time.time()})
+
+	def forget_session(self, sid: str) -> None:
+		self._put("sessions", sid, _DELETE)
+
+	def put_alias(self, alias: str, sid: str) -> None:
+		self._put("aliases", alias, {"sid": sid})
+
+	def drop_alias(self, alias: str) -> None:
+		self._put("aliases", alias, _DELETE)
+
+	def tombstone(self, sid: str) -> None:
+		self._put("tombstones", sid, {"killed_at": time.time()})
+
+	# ---------- writer side ----------
+	def _ensure_started(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		with self._cv:
+			if self._stopped:
+				return
+			if self._thread is None or not self._thread.is_alive():
+				self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+				self._thread.start()
+
+	def _run(self) -> None:
+		while True:
+			with self._cv:
+				while not self._stopped and not self._pending:
+					self._cv.wait()
+				# first pending row opens the window; later updates ride along
+				deadline = time.monotonic() + self.flush_interval
+				while not self._stopped and len(self._pending) < self.batch_max:
+					left = deadline - time.monotonic()
+					if left <= 0:
+						break
+					self._cv.wait(left)
+				stopped = self._stopped
+			self.flush()
+			if stopped:
+				return
+
+	def flush(self) -> int:
+		"""Commit everything pending now; returns the number of rows written."""
+		with self._io_lock:
+			with self._cv:
+				batch, self._pending = self._pending, {}
+			if not batch:
+				return 0
+			upserts: List[dict] = []
+			deletes: List[Tuple[str]] = []
+			aliases: List[Tuple[str, str]] = []
+			unaliases: List[Tuple[str]] = []
+			tombs: List[Tuple[str, float]] = []
+			for (table, key), row in batch.items():
+				if table == "sessions":
+					if row is _DELETE:
+						deletes.append((key,))
+					else:
+						upserts.append(dict({c: row.get(c) for c in _SESSION_COLS}, sid=key))
+				elif table == "aliases":
+					if row is _DELETE:
+						unaliases.append((key,))
+					else:
+						aliases.append((key, row["sid"]))
+				elif table == "tombstones":
+					tombs.append((key, row["killed_at"]))
+			try:
+				with self._conn:
+					if upserts:
+						self._conn.executemany(_UPSERT_SESSION, upserts)
+					if deletes:
+						self._conn.executemany("DELETE FROM sessions WHERE sid = ?", deletes)
+					if aliases:
+						self._conn.executemany("INSERT OR REPLACE INTO aliases (alias, sid) VALUES (?, ?)", aliases)
+					if unaliases:
+						self._conn.executemany("DELETE FROM aliases WHERE alias = ?", unaliases)
+					if tombs:
+						self._conn.executemany("INSERT OR REPLACE INTO tombstones (sid, killed_at) VALUES (?, ?)", tombs)
+			except sqlite3.Error as e:
+				self.errors += 1
+				logger.warning("session store: dropped batch of %d rows: %s", len(batch), e)
+				return 0
+			self.written += len(batch)
+			self.batches += 1
+			return len(batch)
+
+	def close(self, timeout: float = 2.0) -> None:
+		"""Flush pending rows and stop the writer (called at interpreter exit)."""
+		with self._cv:
+			self._stopped = True
+			self._cv.notify()
+		t = self._thread
+		if t is not None and t.is_alive():
+			t.join(timeout)
+		self.flush()
+
+	# ---------- startup ----------
+	def load(self, retention_days: float = 30.0, tombstone_retention_days: float = 0.0):
+		"""
+		Return (sessions, aliases, tombstones) as stored: a list of session dicts
+		(metadata decoded), {alias: sid} and a set of killed sids. Sessions not
+		seen for ``retention_days`` are purged instead of returned. Tombstones
+		are kept unless ``tombstone_retention_days`` is set: an implant killed
+		long ago must still be refused.
+		"""
+		self.flush()
+		now = time.time()
+		with self._io_lock:
+			with self._conn:
+				# a killed session is never restored; drop any row a late touch left behind
+				self._conn.execute("DELETE FROM sessions WHERE sid IN (SELECT sid FROM tombstones)")
+				if retention_days and retention_days > 0:
+					cutoff = now - retention_days * 86400.0
+					self._conn.execute(
+						"DELETE FROM sessions WHERE COALESCE(last_seen, created_at, 0) < ?", (cutoff,))
+				if tombstone_retention_days and tombstone_retention_days > 0:
+					cutoff = now - tombstone_retention_days * 86400.0
+					self._conn.execute("DELETE FROM tombstones WHERE killed_at < ?", (cutoff,))
+				self._conn.execute("DELETE FROM aliases WHERE sid NOT IN (SELECT sid FROM sessions)")
+			rows = self._conn.execute(
+				"SELECT sid, transport, metadata, listener, created_at, last_seen FROM sessions").fetchall()
+			alias_rows = self._conn.execute("SELECT alias, sid FROM aliases").fetchall()
+			tomb_rows = self._conn.execute("SELECT sid FROM tombstones").fetchall()
+
+		sessions = []
+		for sid, transport, meta, listener, created_at, last_seen in rows:
+			try:
+				metadata = json.loads(meta) if meta else {}
+			except ValueError:
+				metadata = {}
+			sessions.append({
+				"sid": sid,
+				"transport": transport,
+				"metadata": metadata if isinstance(metadata, dict) else {},
+				"listener": listener,
+				"created_at": created_at,
+				"last_seen": last_seen,
+			})
+		return sessions, dict(alias_rows), {r[0] for r in tomb_rows}
+
+	def stats(self) -> Dict[str, object]:
+		with self._cv:
+			pending = len(self._pending)
+		return {
+			"path": self.path,
+			"pending": pending,
+			"written": self.written,
+			"batches": self.batches,
+			"errors": self.errors,
+		}
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+_disabled = False
+
+
+def get_store() -> Optional[SessionStore]:
+	"""Return the process-wide store (created from the environment once), or None when disabled."""
+	global _store, _disabled
+	if _store is None and not _disabled:
+		with _store_lock:
+			if _store is None and not _disabled:
+				path = os.getenv("SESSION_DB", DB_PATH)
+				if path.strip().lower() in ("off", "none", "0", ""):
+					_disabled = True
+					return None
+				try:
+					_store = SessionStore(
+						os.path.expanduser(path),
+						flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "0.5")),
+						batch_max=int(os.getenv("SESSION_BATCH_MAX", "512")),
+					)
+				except (sqlite3.Error, OSError) as e:
+					logger.warning("session store disabled, cannot open %s: %s", path, e)
+					_disabled = True
+					return None
+				atexit.register(_store.close)
+	return _store
+
+
+def retention_days() -> float:
+	return float(os.getenv("SESSION_RETENTION_DAYS", "30"))
+
+
+def tombstone_retention_days() -> float:
+	return float(os.getenv("SESSION_TOMBSTONE_RETENTION_DAYS", "0"))
@@ -66,6 +66,21 @@ def reload_cache():
                 "created_at":    r["created_at"],
             }
 
+def _sync_cache():
+    """
+    Reload the cache if the DB changed under us: another process (an API
+    worker, see state_service) or another thread's connection committed.
+    PRAGMA data_version is a cheap per-connection change counter.
+    """
+    conn = _get_conn()
+    try:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+    except sqlite3.Error:
+        return
+    if getattr(_thread_local, "data_version", version) != version:
+        reload_cache()
+    _thread_local.data_version = version
+
 def _connect():
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     conn = _get_conn()
@@ -119,6 +134,7 @@ def add_operator(username, password, role="operator"):
         reload_cache()
 
 def query_operatordb(action, username=""):
+    _sync_cache()
     try:
         if action == "username":
             if not username:
@@ -171,6 +187,7 @@ def startup_useradd():
 
 
 def verify_credentials(username, password):
+    _sync_cache()
     with cache_lock:
         entry = operators_cache.get(username.lower())
 
@@ -180,6 +197,7 @@ def verify_credentials(username, password):
     return None
 
 def list_operators():
+    _sync_cache()
     # read-only: return snapshot from cache
     with cache_lock:
         return [
@@ -193,6 +211,7 @@ def list_operators():
         ]
 
 def verify_username(username):
+    _sync_cache()
     try:
         uname = username.lower().strip()
         with cache_lock:
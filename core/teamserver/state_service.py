@@ -0,0 +1,399 @@
+# core/teamserver/state_service.py
+"""
+Teamserver state service: one process owns sessions, listeners and command
+routing; uvicorn API workers reach them over a Unix socket (core.ipc).
+
+Single-process mode (the default) does not use any of this. With
+``main.py --workers N`` the launcher starts
+
+	python -m core.teamserver.state_service --socket PATH
+
+which restores the session registry, runs every listener and beacon handler
+and serves the ops below. Each API worker finds SENTINEL_STATE_SOCKET in its
+environment and, before the routers are imported, calls install_remote():
+that swaps the process-wide registries the routers already use for thin
+proxies, so the route code stays the same:
+
+  session_manager.sessions      -> RemoteSessions (short-TTL mirror of sid -> transport/metadata)
+  session_manager.kill_http_session / resolve_sid
+  http_exec.run_command_http     -> executed in the state process
+  tcp_exec.run_command_tcp
+  core.listeners.base.listeners  -> RemoteListeners
+  core.listeners.base.create_listener
+
+Commands are therefore queued, routed and demuxed by exactly one process no
+matter which worker took the websocket. Operator accounts and command
+history are SQLite databases that every process opens directly (WAL).
+
+Environment:
+  SENTINEL_STATE_SOCKET     socket path (set by main.py for its workers)
+  SENTINEL_STATE_CACHE_TTL  seconds a worker trusts its session mirror (default 0.5)
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Optional
+
+from core import ipc
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = os.path.expanduser("~/.sentinelcommander/run/state.sock")
+ENV_SOCKET = "SENTINEL_STATE_SOCKET"
+
+REMOTE = False   # True inside an API worker after install_remote()
+_client: Optional[ipc.RpcClient] = None
+
+
+# ---------------------------------------------------------------------------
+# State-process side
+# ---------------------------------------------------------------------------
+def _listener_row(lid: str, inst) -> Dict[str, Any]:
+	t = getattr(inst, "thread", None)  # same test as TeamServer.listeners._serialize_listener
+	return {
+		"id": lid,
+		"transport": getattr(inst, "transport", ""),
+		"ip": getattr(inst, "ip", ""),
+		"port": getattr(inst, "port", 0),
+		"name": getattr(inst, "name", "") or "",
+		"profiles": getattr(inst, "profiles", None) or None,
+		"alive": bool(t is not None and getattr(t, "is_alive", lambda: False)()),
+	}
+
+
+def _ops() -> Dict[str, Any]:
+	from core.session_handlers import session_manager
+	from core.command_execution import http_command_execution as http_exec
+	from core.command_execution import tcp_command_execution as tcp_exec
+	from core.listeners import base
+
+	def sessions():
+		return {sid: [s.transport, dict(s.metadata or {})] for sid, s in list(session_manager.sessions.items())}
+
+	def resolve_sid(raw):
+		return session_manager.resolve_sid(raw)
+
+	def kill_http_session(sid, os_type):
+		return bool(session_manager.kill_http_session(sid, os_type))
+
+	def close_session(sid):
+		sess = session_manager.sessions.get(sid)
+		if sess is None:
+			return False
+		try:
+			handler = getattr(sess, "handler", None)
+			if handler and hasattr(handler, "close"):
+				handler.close()
+		finally:
+			session_manager.sessions.pop(sid, None)
+		return True
+
+	def run_http(sid, cmd, kwargs):
+		return http_exec.run_command_http(sid, cmd, **kwargs)
+
+	def run_tcp(sid, cmd, kwargs):
+		return tcp_exec.run_command_tcp(sid, cmd, **kwargs)
+
+	def listeners():
+		with base._reg_lock:
+			return [_listener_row(lid, inst) for lid, inst in base.listeners.items()]
+
+	def create_listener(ip, port, transport, kwargs):
+		with base._reg_lock:
+			before = set(base.listeners)
+		try:
+			inst = base.create_listener(ip, port, transport, **kwargs)
+		except TypeError:
+			inst = base.create_listener(ip, port, transport, profiles=kwargs.get("profiles"))
+		except Exception:
+			with base._reg_lock:
+				for lid in set(base.listeners) - before:
+					base.listeners.pop(lid, None)
+			raise
+		return _listener_row(inst.id, inst)
+
+	def set_listener_name(lid, name):
+		with base._reg_lock:
+			inst = base.listeners.get(lid)
+		if inst is None:
+			raise KeyError(lid)
+		inst.name = name
+		return True
+
+	def stop_listener(lid):
+		with base._reg_lock:
+			inst = base.listeners.pop(lid, None)
+		if inst is None:
+			return False
+		for attr in ("stop", "shutdown", "close"):
+			fn = getattr(inst, attr, None)
+			if callable(fn):
+				fn()
+				break
+		return True
+
+	def ping():
+		return {"pid": os.getpid(), "sessions": len(session_manager.sessions), "listeners": len(base.listeners)}
+
+	return {
+		"sessions": sessions,
+		"resolve_sid": resolve_sid,
+		"kill_http_session": kill_http_session,
+		"close_session": close_session,
+		"run_http": run_http,
+		"run_tcp": run_tcp,
+		"listeners": listeners,
+		"create_listener": create_listener,
+		"set_listener_name": set_listener_name,
+		"stop_listener": stop_listener,
+		"ping": ping,
+	}
+
+
+def serve(path: str = SOCKET_PATH) -> ipc.RpcServer:
+	"""Load the listener classes, restore the session registry and start serving (returns at once)."""
+	from core.listeners.base import load_listeners
+	from core.session_handlers import session_manager
+	from core import command_history
+
+	load_listeners()
+	n = session_manager.restore()
+	command_history.get_store()
+	server = ipc.RpcServer(path, _ops())
+	server.serve_in_thread(name="state-service")
+	logger.info("state service on %s (pid %d, %d sessions restored)", path, os.getpid(), n)
+	return server
+
+
+def main(argv=None) -> int:
+	ap = argparse.ArgumentParser(description="SentinelCommander state service (sessions, listeners, command routing)")
+	ap.add_argument("--socket", default=os.getenv(ENV_SOCKET, SOCKET_PATH))
+	args = ap.parse_args(argv)
+
+	server = serve(args.socket)
+	stop = threading.Event()
+	for sig in (signal.SIGINT, signal.SIGTERM):
+		signal.signal(sig, lambda *_: stop.set())
+	print(f"[*] State service listening on {args.socket}", flush=True)
+	while not stop.wait(1.0):
+		pass
+	server.shutdown()
+	server.server_close()
+	return 0
+
+
+# ---------------------------------------------------------------------------
+# API-worker side
+# ---------------------------------------------------------------------------
+class _RemoteHandle:
+	"""Stands in for a TCP session's socket: close() closes it in the state process."""
+
+	def __init__(self, sid: str):
+		self.sid = sid
+
+	def close(self):
+		_client.call("close_session", sid=self.sid)
+
+
+class SessionProxy:
+	"""What route code needs from a Session: identity, transport and metadata."""
+
+	remote = True
+
+	def __init__(self, sid: str, transport: str, metadata: dict):
+		self.sid = sid
+		self.transport = transport
+		self.metadata = metadata
+		self.handler = _RemoteHandle(sid)
+
+
+class RemoteSessions(MutableMapping):
+	"""Read-through mirror of the state process's session table."""
+
+	def __init__(self, client: ipc.RpcClient, ttl: float = 0.5):
+		self._client = client
+		self.ttl = ttl
+		self._lock = threading.Lock()
+		self._by_sid: Dict[str, SessionProxy] = {}
+		self._at = 0.0
+
+	def _refresh(self, force: bool = False) -> Dict[str, SessionProxy]:
+		now = time.monotonic()
+		if not force and now - self._at < self.ttl:
+			return self._by_sid
+		with self._lock:
+			if not force and time.monotonic() - self._at < self.ttl:
+				return self._by_sid
+			rows = self._client.call("sessions")
+			old = self._by_sid
+			fresh = {}
+			for sid, (transport, metadata) in rows.items():
+				p = old.get(sid)
+				if p is None or p.transport != transport:
+					p = SessionProxy(sid, transport, metadata)
+				else:
+					p.metadata = metadata  # keep identity for callers holding the proxy
+				fresh[sid] = p
+			self._by_sid = fresh
+			self._at = time.monotonic()
+			return fresh
+
+	def __getitem__(self, sid):
+		table = self._refresh()
+		if sid not in table and time.monotonic() - self._at > 0.05:
+			table = self._refresh(force=True)  # registered since the last refresh?
+		return table[sid]
+
+	def __contains__(self, sid):
+		try:
+			self[sid]
+			return True
+		except KeyError:
+			return False
+
+	def __iter__(self):
+		return iter(list(self._refresh()))
+
+	def __len__(self):
+		return len(self._refresh())
+
+	def __setitem__(self, sid, value):
+		raise TypeError("sessions are registered by the state service, not by API workers")
+
+	def __delitem__(self, sid):
+		# the state process already dropped it (kill/close); just forget it here
+		with self._lock:
+			del self._by_sid[sid]
+
+	def invalidate(self):
+		self._at = 0.0
+
+
+class ListenerProxy:
+	def __init__(self, row: Dict[str, Any]):
+		self.id = row["id"]
+		self.transport = row.get("transport", "")
+		self.ip = row.get("ip", "")
+		self.port = row.get("port", 0)
+		self.profiles = row.get("profiles")
+		self.sessions = []
+		self._name = row.get("name", "")
+		self._alive = bool(row.get("alive"))
+
+	@property
+	def name(self):
+		return self._name
+
+	@name.setter
+	def name(self, value):
+		_client.call("set_listener_name", lid=self.id, name=value)
+		self._name = value
+
+	@property
+	def thread(self):
+		return self  # _serialize_listener only asks thread.is_alive()
+
+	def is_alive(self):
+		return self._alive
+
+	def stop(self, timeout: float = None):
+		_client.call("stop_listener", lid=self.id)
+
+
+class RemoteListeners(MutableMapping):
+	"""Listener registry as seen from an API worker (always fetched fresh; it's small)."""
+
+	def __init__(self, client: ipc.RpcClient):
+		self._client = client
+
+	def _rows(self) -> Dict[str, ListenerProxy]:
+		return {r["id"]: ListenerProxy(r) for r in self._client.call("listeners")}
+
+	def __getitem__(self, lid):
+		return self._rows()[lid]
+
+	def __iter__(self):
+		return iter(list(self._rows()))
+
+	def __len__(self):
+		return len(self._rows())
+
+	def items(self):
+		return list(self._rows().items())
+
+	def values(self):
+		return list(self._rows().values())
+
+	def __setitem__(self, lid, value):
+		raise TypeError("listeners are created by the state service")
+
+	def __delitem__(self, lid):
+		pass  # stop() already removed it in the state process
+
+	def pop(self, lid, *default):
+		return default[0] if default else None
+
+
+def install_remote(path: Optional[str] = None) -> bool:
+	"""
+	Point this process's session/listener registries and command execution at
+	the state service. Must run before the routers are imported (some bind the
+	listener registry at import). No-op without a socket path.
+	"""
+	global REMOTE, _client
+	path = path or os.getenv(ENV_SOCKET)
+	if not path or REMOTE:
+		return REMOTE
+
+	from core.session_handlers import session_manager
+	from core.command_execution import http_command_execution as http_exec
+	from core.command_execution import tcp_command_execution as tcp_exec
+	from core.listeners import base
+
+	_client = ipc.RpcClient(path)
+	_client.call("ping")  # fail fast if the state service isn't up
+	ttl = float(os.getenv("SENTINEL_STATE_CACHE_TTL", "0.5"))
+	remote_sessions = RemoteSessions(_client, ttl=ttl)
+
+	def run_command_http(sid, cmd, **kwargs):
+		return _client.call("run_http", sid=sid, cmd=cmd, kwargs=kwargs)
+
+	def run_command_tcp(sid, cmd, **kwargs):
+		return _client.call("run_tcp", sid=sid, cmd=cmd, kwargs=kwargs)
+
+	def kill_http_session(sid, os_type, becon_interval=False):
+		ok = _client.call("kill_http_session", sid=sid, os_type=os_type)
+		remote_sessions.invalidate()
+		return ok
+
+	def resolve_sid(raw):
+		return _client.call("resolve_sid", raw=raw)
+
+	def create_listener(ip, port, transport, to_console=True, op_id=None, profiles=None, certfile=None, keyfile=None):
+		kwargs = {"to_console": to_console, "op_id": op_id, "profiles": profiles}
+		if certfile or keyfile:
+			kwargs.update(certfile=certfile, keyfile=keyfile)
+		return ListenerProxy(_client.call("create_listener", ip=ip, port=port, transport=transport, kwargs=kwargs))
+
+	session_manager.sessions = remote_sessions
+	session_manager.kill_http_session = kill_http_session
+	session_manager.resolve_sid = resolve_sid
+	http_exec.run_command_http = run_command_http
+	tcp_exec.run_command_tcp = run_command_tcp
+	base.listeners = RemoteListeners(_client)
+	base.create_listener = create_listener
+
+	REMOTE = True
+	logger.info("API worker %d using state service at %s", os.getpid(), path)
+	return True
+
+
+if __name__ == "__main__":
+	sys.exit(main())
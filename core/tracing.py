@@ -0,0 +1,229 @@
+# core/tracing.py
+"""
+Zero-cost structured tracing for the command/beacon hot paths.
+
+Each subsystem gets a Tracer with a plain boolean ``on`` switch, so a disabled
+call site costs one attribute lookup:
+
+	_trace = tracing.get_tracer("router", logger)
+
+	if _trace.on:
+		_trace.log("enqueued op_id=%r queue=%d", op_id, q.qsize())
+
+	with _trace.span("cmd.send", sid=sid, op_id=op_id):
+		...
+
+Switches are read from the environment at import time and can be flipped at
+runtime with enable()/disable():
+  SENTINEL_TRACE         comma list of subsystems, or "all" / "*"
+  SENTINEL_TRACE_EXPORT  "jsonl" to also write events via TeamServer.logutil
+                         (logs/trace.log, one JSON object per event)
+
+Known subsystems: router, tcp_router, http_listener, transfers.
+"""
+from __future__ import annotations
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+SUBSYSTEMS = ("router", "tcp_router", "http_listener", "transfers")
+
+_lock = threading.RLock()
+_tracers: Dict[str, "Tracer"] = {}
+_enabled: set[str] = set()
+_all = False
+_export_logger: Optional[logging.Logger] = None
+_export_on = False
+
+
+class lazy:
+	"""
+	Defer an expensive log argument until the record is actually formatted.
+	Example: _trace.log("queue=%s", lazy(q.qsize))
+	"""
+	__slots__ = ("_fn", "_args")
+
+	def __init__(self, fn: Callable[..., Any], *args):
+		self._fn = fn
+		self._args = args
+
+	def __str__(self) -> str:
+		return str(self._fn(*self._args))
+
+	def __repr__(self) -> str:
+		return repr(self._fn(*self._args))
+
+
+class _NullSpan:
+	"""Shared no-op context manager returned while a tracer is off."""
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+	def set(self, **fields):
+		pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+	__slots__ = ("_tracer", "_event", "_fields", "_t0")
+
+	def __init__(self, tracer: "Tracer", event: str, fields: Dict[str, Any]):
+		self._tracer = tracer
+		self._event = event
+		self._fields = fields
+		self._t0 = 0.0
+
+	def __enter__(self):
+		self._t0 = time.perf_counter()
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		fields = self._fields
+		fields["dur_ms"] = round((time.perf_counter() - self._t0) * 1000.0, 3)
+		if exc_type is not None:
+			fields["error"] = exc_type.__name__
+		self._tracer.event(self._event, **fields)
+		return False
+
+	def set(self, **fields):
+		"""Attach fields discovered inside the span (e.g. byte counts)."""
+		self._fields.update(fields)
+
+
+class Tracer:
+	"""Per-subsystem tracer. Check ``on`` before building expensive arguments."""
+	__slots__ = ("name", "on", "_logger")
+
+	def __init__(self, name: str, logger: Optional[logging.Logger] = None):
+		self.name = name
+		self.on = False
+		self._logger = logger or logging.getLogger(f"core.tracing.{name}")
+
+	def log(self, msg: str, *args) -> None:
+		"""Debug line on the owning logger; formatting is left to logging."""
+		if self.on:
+			self._logger.debug(msg, *args)
+
+	def event(self, event: str, **fields) -> None:
+		"""Structured point event; exported as JSONL when export is enabled."""
+		if not self.on:
+			return
+		if _export_on and _export_logger is not None:
+			_export_logger.info(event, extra={"subsystem": self.name, **fields})
+		if self._logger.isEnabledFor(logging.DEBUG):
+			self._logger.debug("%s %s", event, " ".join(f"{k}={v!r}" for k, v in fields.items()))
+
+	def span(self, event: str, **fields):
+		"""Time a block and emit ``event`` with ``dur_ms`` on exit."""
+		if not self.on:
+			return _NULL_SPAN
+		return _Span(self, event, fields)
+
+
+def _parse_env() -> None:
+	global _all
+	raw = (os.getenv("SENTINEL_TRACE") or "").strip().lower()
+	if not raw:
+		return
+	names = {p.strip() for p in raw.split(",") if p.strip()}
+	if names & {"all", "*", "1", "true"}:
+		_all = True
+	_enabled.update(names)
+
+
+def get_tracer(name: str, logger: Optional[logging.Logger] = None) -> Tracer:
+	"""Return the shared Tracer for ``name`` (created on first use)."""
+	with _lock:
+		tr = _tracers.get(name)
+		if tr is None:
+			tr = Tracer(name, logger)
+			tr.on = _all or name in _enabled
+			_tracers[name] = tr
+		elif logger is not None and tr._logger.name.startswith("core.tracing."):
+			tr._logger = logger
+		return tr
+
+
+def enable(*names: str) -> None:
+	"""Turn tracing on for the given subsystems (no names = all)."""
+	global _all
+	with _lock:
+		if not names:
+			_all = True
+		_enabled.update(names)
+		for n, tr in _tracers.items():
+			tr.on = _all or n in _enabled
+
+
+def disable(*names: str) -> None:
+	"""Turn tracing off for the given subsystems (no names = all)."""
+	global _all
+	with _lock:
+		if not names:
+			_all = False
+			_enabled.clear()
+		else:
+			_all = False
+			_enabled.difference_update(names)
+		for n, tr in _tracers.items():
+			tr.on = _all or n in _enabled
+
+
+def enabled() -> Dict[str, bool]:
+	with _lock:
+		return {n: tr.on for n, tr in _tracers.items()}
+
+
+def set_export(on: bool = True, log_dir: Optional[str] = None) -> None:
+	"""
+	Route trace events to the TeamServer JSONL log (logs/trace.log).
+	Imported lazily so core stays usable without the TeamServer package.
+	"""
+	global _export_logger, _export_on
+	with _lock:
+		if on and _export_logger is None:
+			from TeamServer.logutil import get_logger
+			_export_logger = get_logger("core.tracing.export", file_basename="trace", log_dir=log_dir)
+		_export_on = bool(on)
+
+
+_parse_env()
+if (os.getenv("SENTINEL_TRACE_EXPORT") or "").strip().lower() == "jsonl":
+	try:
+		set_export(True)
+	except Exception:
+		logging.getLogger(__name__).exception("Failed to enable JSONL trace export")
+
+
+if __name__ == "__main__":
+	# Quick overhead check: python -m core.tracing
+	# (python -m TeamServer.bench_tracing times the router and beacon paths)
+	import timeit
+
+	tr = get_tracer("bench")
+	n = 1_000_000
+
+	def _guarded():
+		if tr.on:
+			tr.log("x=%r q=%d", "payload", 1)
+
+	def _spanned():
+		with tr.span("cmd.send", sid="s", op_id="o"):
+			pass
+
+	def _baseline():
+		pass
+
+	for label, fn in (("baseline", _baseline), ("guarded log", _guarded), ("span", _spanned)):
+		t = timeit.timeit(fn, number=n)
+		print(f"{label:<12} off: {t / n * 1e9:7.1f} ns/call")
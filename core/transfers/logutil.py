@@ -1,6 +1,8 @@
 # core/transfers/logutil.py
 import logging, os
 
+from core.logpipe import BatchRotatingFileHandler, attach
+
 _LOGGER_NAME = "core.transfers"  # package logger all children inherit from
 _initialized = False
 
@@ -20,15 +22,17 @@ def setup_once():
                               os.path.join(os.getcwd(), "transfers.log"))
     os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
 
-    fh = logging.FileHandler(log_path, encoding="utf-8")
+    # maxBytes=0 -> never rotates (same behaviour as the old FileHandler), but
+    # writes go through the shared async log pipeline instead of the caller.
+    fh = BatchRotatingFileHandler(log_path, maxBytes=0, encoding="utf-8", delay=True)
     fh.setLevel(logging.DEBUG)
-    fh._is_transfers_log = True
     fh.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
 
     logger.setLevel(logging.DEBUG)
-    logger.addHandler(fh)
+    ph = attach(logger, fh)
+    ph._is_transfers_log = True
     logger.propagate = False   # stop at package boundary (prevents double logging via root)
-    logger.debug(f"transfers logger initialized at {log_path}")
+    logger.debug("transfers logger initialized at %s", log_path)
     _initialized = True
 
 def get_logger(name: str | None = None) -> logging.Logger:
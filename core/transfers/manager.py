@@ -3,6 +3,9 @@ setup_once()
 logger = get_logger("manager")  # name will be 'core.transfers.manager'
 MB = 1024 * 1024
 
+from core import tracing
+_trace = tracing.get_tracer("transfers", logger)
+
 import os, threading, time, uuid, traceback, ntpath, zipfile, tarfile, re, tempfile, shutil
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, Literal, Iterable
@@ -13,6 +16,7 @@ from .chunker import human_bytes, chunk_count, ensure_prealloc
 from .protocols.shell import ShellProtocol, _linux_shq, _ps_quote
 from core.session_handlers import session_manager
 from core.utils import echo
+from core.metrics import TRANSFER_BYTES, TRANSFERS_ACTIVE
 
 from colorama import init, Fore, Style
 brightgreen = "\001" + Style.BRIGHT + Fore.GREEN + "\002"
@@ -79,7 +83,7 @@ class TransferManager:
 			options={"compress":opts.compress, "encrypt":opts.encrypt}
 		)
 		#print(st)
-		logger.debug("TransferState: %r", st)
+		_trace.log("TransferState: %r", st)
 		return st
 
 	def _progress_line(self, st: TransferState) -> str:
@@ -216,7 +220,7 @@ class TransferManager:
 		self.store.save(st)
 		stop = threading.Event()
 		self._stop_flags[st.tid] = stop
-		t = threading.Thread(target=self._run_download, args=(proto, st, opts, stop, timeout), daemon=True)
+		t = threading.Thread(target=self._run_download, args=(proto, st, opts, stop, timeout), name=f"transfer-{st.tid}", daemon=True)
 		t.start()
 		self._threads[st.tid] = t
 		self._emit(opts, f"[*] Transfer started (download) TID={st.tid} → {st.local_path}")
@@ -288,7 +292,7 @@ class TransferManager:
 		self.store.save(st)
 		stop = threading.Event()
 		self._stop_flags[st.tid] = stop
-		t = threading.Thread(target=self._run_upload, args=(proto, st, opts, stop, timeout), daemon=True)
+		t = threading.Thread(target=self._run_upload, args=(proto, st, opts, stop, timeout), name=f"transfer-{st.tid}", daemon=True)
 		t.start()
 		self._threads[st.tid] = t
 
@@ -302,6 +306,7 @@ class TransferManager:
 			f"remote={st.remote_path!r} local={st.local_path!r} chunk={st.chunk_size} "
 			f"total_bytes={st.total_bytes} next_index={st.next_index} bytes_done={st.bytes_done}"
 		)
+		TRANSFERS_ACTIVE.inc(direction="download")
 		try:
 			if st.status != "running":
 				st.status = "running"
@@ -371,9 +376,12 @@ class TransferManager:
 			last = time.time()
 			while not stop.is_set():
 				pre_idx = st.next_index
-				logger.debug(f"DL[{st.tid}] loop: requesting chunk idx={pre_idx}/{st.total_chunks} (bytes_done={st.bytes_done})")
+				pre_bytes = st.bytes_done or 0
+				if _trace.on:
+					_trace.log("DL[%s] loop: requesting chunk idx=%d/%d (bytes_done=%d)", st.tid, pre_idx, st.total_chunks, st.bytes_done)
 				try:
-					idx = proto.next_download_chunk(st)
+					with _trace.span("transfer.chunk", tid=st.tid, sid=st.sid, direction="download", idx=pre_idx):
+						idx = proto.next_download_chunk(st)
 				except (ConnectionError, ConnectionResetError, BrokenPipeError, OSError) as neterr:
 					try:
 						want_bytes = pre_idx * st.chunk_size
@@ -397,15 +405,19 @@ class TransferManager:
 					return
 
 				if idx is None:
-					logger.debug(f"DL[{st.tid}] loop: proto returned None at idx={pre_idx} (total_chunks={st.total_chunks})")
+					_trace.log("DL[%s] loop: proto returned None at idx=%d (total_chunks=%d)", st.tid, pre_idx, st.total_chunks)
 					break
 
-				logger.debug(f"DL[{st.tid}] chunk_ok: wrote idx={idx} -> next_index={st.next_index} bytes_done={st.bytes_done}")
+				TRANSFER_BYTES.inc(max(0, (st.bytes_done or 0) - pre_bytes), direction="download")
+
+				if _trace.on:
+					_trace.log("DL[%s] chunk_ok: wrote idx=%d -> next_index=%d bytes_done=%d", st.tid, idx, st.next_index, st.bytes_done)
 
 				if time.time() - last >= 0.5:
 					self.store.save(st)
 					last = time.time()
-					logger.debug(f"DL[{st.tid}] progress saved: next_index={st.next_index} bytes_done={st.bytes_done}")
+					if _trace.on:
+						_trace.log("DL[%s] progress saved: next_index=%d bytes_done=%d", st.tid, st.next_index, st.bytes_done)
 
 			if stop.is_set():
 				st.status = "paused"
@@ -534,6 +546,9 @@ class TransferManager:
 			logger.debug(f"DL[{st.tid}] ERROR: {e}", exc_info=True)
 			self._emit(opts, f"[!] Transfer error {st.tid}: {e}", color=brightred, override_quiet=True)
 
+		finally:
+			TRANSFERS_ACTIVE.dec(direction="download")
+
 	def _run_upload(self, proto: ShellProtocol, st: TransferState, opts: TransferOpts, stop: threading.Event, timeout: float = None):
 		logger.debug(
 			f"UL[{st.tid}] start: status={st.status} dir={st.direction} "
@@ -541,6 +556,7 @@ class TransferManager:
 			f"total_bytes={st.total_bytes} next_index={st.next_index} bytes_done={st.bytes_done} "
 			f"is_folder={st.is_folder}"
 		)
+		TRANSFERS_ACTIVE.inc(direction="upload")
 		try:
 			if st.status != "running":
 				st.status = "running"
@@ -597,9 +613,12 @@ class TransferManager:
 			last = time.time()
 			while not stop.is_set():
 				pre_idx = st.next_index
-				logger.debug(f"UL[{st.tid}] loop: sending chunk idx={pre_idx}/{st.total_chunks} (bytes_done={st.bytes_done})")
+				pre_bytes = st.bytes_done or 0
+				if _trace.on:
+					_trace.log("UL[%s] loop: sending chunk idx=%d/%d (bytes_done=%d)", st.tid, pre_idx, st.total_chunks, st.bytes_done)
 				try:
-					idx = proto.next_upload_chunk(st)
+					with _trace.span("transfer.chunk", tid=st.tid, sid=st.sid, direction="upload", idx=pre_idx):
+						idx = proto.next_upload_chunk(st)
 				except (ConnectionResetError, BrokenPipeError, OSError, ConnectionError) as neterr:
 					# Roll remote back to last whole chunk
 					safe_bytes = pre_idx * st.chunk_size
@@ -637,15 +656,19 @@ class TransferManager:
 					return
 
 				if idx is None:
-					logger.debug(f"UL[{st.tid}] loop: proto returned None at idx={pre_idx} (total_chunks={st.total_chunks})")
+					_trace.log("UL[%s] loop: proto returned None at idx=%d (total_chunks=%d)", st.tid, pre_idx, st.total_chunks)
 					break
 
-				logger.debug(f"UL[{st.tid}] chunk_ok: sent idx={idx} -> next_index={st.next_index} bytes_done={st.bytes_done}")
+				TRANSFER_BYTES.inc(max(0, (st.bytes_done or 0) - pre_bytes), direction="upload")
+
+				if _trace.on:
+					_trace.log("UL[%s] chunk_ok: sent idx=%d -> next_index=%d bytes_done=%d", st.tid, idx, st.next_index, st.bytes_done)
 
 				if time.time() - last >= 0.5:
 					self.store.save(st)
 					last = time.time()
-					logger.debug(f"UL[{st.tid}] progress saved: next_index={st.next_index} bytes_done={st.bytes_done}")
+					if _trace.on:
+						_trace.log("UL[%s] progress saved: next_index=%d bytes_done=%d", st.tid, st.next_index, st.bytes_done)
 
 			if stop.is_set():
 				st.status = "paused"
@@ -743,6 +766,29 @@ class TransferManager:
 			self._emit(opts, f"[!] Transfer error {st.tid}: {e}",
 					   color=brightred, override_quiet=True, world_wide=True)
 
+		finally:
+			TRANSFERS_ACTIVE.dec(direction="upload")
+
+	def read_range(self, sid: str, remote_path: str, offset: int, length: int, *, with_size: bool = False, timeout: float = None) -> tuple:
+		"""
+		Synchronously read ``length`` bytes at ``offset`` of a remote file, without a
+		TID, temp file or state on disk. Returns (total_bytes or -1, data); the size
+		probe costs a round trip and only runs when ``with_size`` is set.
+		"""
+		length = max(0, int(length))
+		st = self._mk_state("download", sid, remote_path, "", False, TransferOpts(chunk_size=max(1, length)))
+		proto = self._protocol(None, timeout=timeout)
+		total = proto._remote_size(st) if with_size else -1
+		if total == -2:
+			raise IsADirectoryError(remote_path)
+		if with_size and total < 0:
+			raise FileNotFoundError(remote_path)
+		if length == 0 or (total >= 0 and offset >= total):
+			return total, b""
+		data = proto.read_range(st, int(offset), length)
+		TRANSFER_BYTES.inc(len(data), direction="download")
+		return total, data
+
 	# control plane
 	def resume(self, sid: str, tid: str, opts: Optional[TransferOpts]=None, timeout: float = None) -> bool:
 		opts = opts or TransferOpts()
@@ -759,7 +805,7 @@ class TransferManager:
 		self._stop_flags[tid] = stop
 		proto = self._protocol(opts.to_op, timeout=timeout)
 		runner = self._run_download if st.direction == "download" else self._run_upload
-		t = threading.Thread(target=runner, args=(proto, st, opts, stop), daemon=True)
+		t = threading.Thread(target=runner, args=(proto, st, opts, stop), name=f"transfer-{tid}", daemon=True)
 		t.start()
 		self._threads[tid] = t
 		self._emit(opts, f"[*] Resuming TID={tid} at chunk {st.next_index}")
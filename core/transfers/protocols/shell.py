@@ -2,6 +2,9 @@ from core.transfers.logutil import setup_once, get_logger
 setup_once()
 logger = get_logger("manager")  # name will be 'core.transfers.manager'
 
+from core import tracing
+_trace = tracing.get_tracer("transfers", logger)
+
 import base64, os, time, re, ntpath, textwrap
 from typing import Optional
 from .base import TransferProtocol
@@ -22,17 +25,21 @@ reset = Style.RESET_ALL
 BANNER = "=" * 72
 SUBBAR = "-" * 72
 
+# All of these are no-ops unless the "transfers" tracer is on (SENTINEL_TRACE).
 def _banner(title: str):
 	# Leading newline to visually separate blocks in single log file.
-	logger.debug("\n%s\n%s\n%s", BANNER, f"[TRANSFERS] {title}", BANNER)
+	if _trace.on:
+		_trace.log("\n%s\n[TRANSFERS] %s\n%s", BANNER, title, BANNER)
 
 def _sub(title: str):
-	logger.debug("%s\n[%s]", SUBBAR, title)
+	if _trace.on:
+		_trace.log("%s\n[%s]", SUBBAR, title)
 
 def _kv(**pairs):
 	# Compact key=value line; values repr-ed; None shown explicitly
-	items = ", ".join(f"{k}={repr(v)}" for k, v in pairs.items())
-	logger.debug("  %s", items)
+	if _trace.on:
+		if _trace.on:
+			_trace.log("  %s", ", ".join(f"{k}={repr(v)}" for k, v in pairs.items()))
 
 def _preview(s: str, n: int = 160) -> str:
 	if s is None:
@@ -83,15 +90,15 @@ class ShellProtocol(TransferProtocol):
 		"""
 		Route command to the correct execution path and return stdout as string (normalized).
 		"""
-		_sub("RUN_CMD begin")
-		_kv(sid=sid, transport=transport, op_id=op_id)
-		logger.debug("  cmd.preview=%s", _preview(cmd))
-		t0 = time.time()
-
 		tr = transport.lower()
-
 		_eff_timeout = self.timeout if (self.timeout is not None) else 5.0
-		logger.debug("  _run_cmd.timeout=%.3fs transport=%s", _eff_timeout, tr)
+		if _trace.on:
+			_sub("RUN_CMD begin")
+			_kv(sid=sid, transport=transport, op_id=op_id)
+			_trace.log("  cmd.preview=%s", _preview(cmd))
+			_trace.log("  _run_cmd.timeout=%.3fs transport=%s", _eff_timeout, tr)
+		t0 = time.perf_counter()
+
 		try:
 			out = (
 				http_exec.run_command_http(sid, cmd, op_id=op_id, transfer_use=True, timeout=_eff_timeout) if tr in ("http","https")
@@ -100,17 +107,21 @@ class ShellProtocol(TransferProtocol):
 			)
 		except Exception as e:
 			# Normalize into a connection error for the transfer manager.
-			logger.debug("  _run_cmd.exception=%r (elapsed=%.4fs)", e, time.time() - t0)
+			_trace.log("  _run_cmd.exception=%r (elapsed=%.4fs)", e, time.perf_counter() - t0)
 			raise ConnectionError(str(e))
 
 		out = (out or "")
 		# Some older paths may return operator-formatted error lines instead of raising.
 		if out.lstrip().startswith("[!]") or "Error:" in out:
-			logger.debug("  _run_cmd.operator_error_line=%s", _preview(out))
+			if _trace.on:
+				_trace.log("  _run_cmd.operator_error_line=%s", _preview(out))
 			raise ConnectionError(out.strip())
 
-		elapsed = time.time() - t0
-		logger.debug("  _run_cmd.ok elapsed=%.4fs out.len=%d out.preview=%s", elapsed, len(out), _preview(out))
+		if _trace.on:
+			elapsed = time.perf_counter() - t0
+			_trace.event("transfer.cmd", sid=sid, transport=tr, op_id=op_id, dur_ms=round(elapsed * 1000.0, 3),
+						 cmd_len=len(cmd), out_len=len(out))
+			_trace.log("  _run_cmd.ok elapsed=%.4fs out.len=%d out.preview=%s", elapsed, len(out), _preview(out))
 		
 		return out
 
@@ -130,7 +141,8 @@ class ShellProtocol(TransferProtocol):
 				"else echo -1; fi\""
 			)
 			try:
-				logger.debug("  linux.stat.cmd=%s", _preview(sh))
+				if _trace.on:
+					_trace.log("  linux.stat.cmd=%s", _preview(sh))
 				out = (self._run_cmd(st.sid, sh, st.transport, self.op_id, defender_bypass=True) or "").strip()
 
 			except Exception as e:
@@ -138,14 +150,14 @@ class ShellProtocol(TransferProtocol):
 				raise ConnectionError("Connection Error in remote size in upload function _remote_size") from e
 
 			if out == "":
-				logger.debug("  linux.stat.result=EMPTY -> -1")
+				_trace.log("  linux.stat.result=EMPTY -> -1")
 				#logger.warning(brightred + "agent unreachable while Get-Item (empty output)" + reset)
 				# Treat as missing instead of throwing; caller will decide how to proceed.
 				return -1
 
 			try:
 				val = int(out)
-				logger.debug("  linux.stat.result=%s", val)
+				_trace.log("  linux.stat.result=%s", val)
 				return val
 
 			except Exception:
@@ -170,34 +182,35 @@ class ShellProtocol(TransferProtocol):
 			)
 
 			try:
-				logger.debug("  win.size.cmd=%s", ps)
+				_trace.log("  win.size.cmd=%s", ps)
 				out = (self._run_cmd(st.sid, ps, st.transport, self.op_id) or "").strip()
 
 			except Exception as e:
 				logger.warning(brightred + f"Connection Error in remote size grabber: {e}" + reset)
 				raise ConnectionError("Connection Error in remote size in upload function _remote_size") from e
 
-			logger.debug(f"GOT OUTPUT SIZE: {out}")
+			if _trace.on:
+				_trace.log(f"GOT OUTPUT SIZE: {out}")
 
 			if out == "":
 				"""logger.warning(brightred + "agent unreachable while Get-Item" + reset)
 				raise ConnectionError("agent unreachable while Get-Item")"""
 				# Non-terminating PS noise can yield empty stdout; treat as "missing".
-				logger.debug("  win.size.result=EMPTY -> coerced to -1")
+				_trace.log("  win.size.result=EMPTY -> coerced to -1")
 				out = "-1"
 
 			if out.upper() == "DIR":
 				# Directory sentinel (lets caller decide next step).
-				logger.debug("  win.size.result=DIR -> -2 sentinel")
+				_trace.log("  win.size.result=DIR -> -2 sentinel")
 				return -2
 
 			if out == "-1":
-				logger.debug("  win.size.result=-1 (missing/denied)")
+				_trace.log("  win.size.result=-1 (missing/denied)")
 				return -1
 
 			try:
 				val = int(out)
-				logger.debug("  win.size.result=%s", val)
+				_trace.log("  win.size.result=%s", val)
 				return val
 
 			except Exception:
@@ -220,7 +233,8 @@ class ShellProtocol(TransferProtocol):
 
 		_sub("LINUX READ CHUNK")
 		_kv(index=index, chunk_size=st.chunk_size, offset=index*st.chunk_size)
-		logger.debug("  cmd.preview=%s", _preview(cmd))
+		if _trace.on:
+			_trace.log("  cmd.preview=%s", _preview(cmd))
 
 		try:
 			out = self._run_cmd(st.sid, cmd, st.transport, self.op_id)
@@ -233,7 +247,8 @@ class ShellProtocol(TransferProtocol):
 			logger.warning(brightred + "No output from agent for linux chunk read!" + reset)
 			raise ConnectionError("no output from agent for linux chunk read")
 		dec = _b64_to_bytes(out)
-		logger.debug("  read.ok b64.len=%d decoded.len=%d", len(out.strip()), len(dec))
+		if _trace.on:
+			_trace.log("  read.ok b64.len=%d decoded.len=%d", len(out.strip()), len(dec))
 		return dec
 
 	def _windows_read_chunk(self, st: TransferState, index: int) -> bytes:
@@ -261,7 +276,43 @@ class ShellProtocol(TransferProtocol):
 		if not out.strip():
 			raise ConnectionError("no output from agent for windows chunk read")
 		dec = _b64_to_bytes(out)
-		logger.debug("  read.ok b64.len=%d decoded.len=%d", len(out.strip()), len(dec))
+		if _trace.on:
+			_trace.log("  read.ok b64.len=%d decoded.len=%d", len(out.strip()), len(dec))
+		return dec
+
+	def read_range(self, st: TransferState, offset: int, length: int) -> bytes:
+		"""
+		Read up to ``length`` bytes at an absolute byte offset (no chunk alignment).
+		Returns fewer bytes at EOF and b"" past it; used by the paged file viewer.
+		"""
+		_sub("READ RANGE")
+		_kv(sid=st.sid, os_type=st.os_type, offset=offset, length=length)
+		if st.os_type == "linux":
+			# skip/count in bytes so any offset works without reading from the start
+			cmd = (
+				f"dd if={_linux_shq(st.remote_path)} bs=65536 skip={offset} count={length} "
+				"iflag=skip_bytes,count_bytes,fullblock status=none | base64 -w 0"
+			)
+		else:
+			cmd = (
+				f"$fs=[System.IO.File]::Open({_ps_quote(st.remote_path)},'Open','Read','ReadWrite');"
+				f"$fs.Seek({offset},'Begin') > $null;"
+				f"$buf=New-Object byte[] {length};"
+				"$read=0;"
+				f"while($read -lt {length}){{$n=$fs.Read($buf,$read,{length}-$read); if($n -le 0){{break}}; $read+=$n}};"
+				"$fs.Close();"
+				"[Convert]::ToBase64String($buf,0,$read)"
+			)
+		try:
+			out = self._run_cmd(st.sid, cmd, st.transport, self.op_id)
+
+		except Exception as e:
+			logger.warning(brightred + f"Connection Error in _run_cmd: {e}" + reset)
+			raise ConnectionError("Connection Error in _run_cmd") from e
+
+		dec = _b64_to_bytes(out)[:length]
+		if _trace.on:
+			_trace.log("  read_range.ok b64.len=%d decoded.len=%d", len(out.strip()), len(dec))
 		return dec
 
 	def _linux_write_chunk(self, st: TransferState, offset: int, chunk_b64: str) -> None:
@@ -392,7 +443,8 @@ class ShellProtocol(TransferProtocol):
 			)
 			try:
 				out = self._run_cmd(st.sid, zip_cmd, st.transport, self.op_id)
-				logger.debug("  zip.create.output=%s", _preview(out))
+				if _trace.on:
+					_trace.log("  zip.create.output=%s", _preview(out))
 
 			except Exception as e:
 				logger.warning(brightred + f"Connection Error in _run_cmd: {e}" + reset)
@@ -402,7 +454,8 @@ class ShellProtocol(TransferProtocol):
 			size_ps = (
 				f"if (Test-Path {_ps_quote(remote_zip)}) {{ (Get-Item {_ps_quote(remote_zip)}).Length }} else {{ 0 }}"
 			)
-			logger.debug("  zip.poll.size.cmd=%s", _preview(size_ps))
+			if _trace.on:
+				_trace.log("  zip.poll.size.cmd=%s", _preview(size_ps))
 			for _ in range(30):
 				try:
 					sz = (self._run_cmd(st.sid, size_ps, st.transport, self.op_id) or "").strip()
@@ -412,7 +465,7 @@ class ShellProtocol(TransferProtocol):
 					raise ConnectionError("Connection Error in _run_cmd") from e
 
 				try:
-					logger.debug("    zip.poll.size.val=%r", sz)
+					_trace.log("    zip.poll.size.val=%r", sz)
 					if int(sz) > 22:  # larger than empty ZIP EOCD
 						break
 				except Exception:
@@ -423,7 +476,8 @@ class ShellProtocol(TransferProtocol):
 			st.remote_path         = remote_zip
 			# Save fingerprint + mark prepared
 			mtime_ps = f"(Get-Item {_ps_quote(remote_zip)}).LastWriteTimeUtc.Ticks"
-			logger.debug("  zip.mtime.cmd=%s", _preview(mtime_ps))
+			if _trace.on:
+				_trace.log("  zip.mtime.cmd=%s", _preview(mtime_ps))
 			try:
 				mtime = _parse_int(self._run_cmd(st.sid, mtime_ps, st.transport, self.op_id))
 				length = _parse_int(self._run_cmd(st.sid, size_ps,   st.transport, self.op_id))
@@ -445,7 +499,8 @@ class ShellProtocol(TransferProtocol):
 			try:
 				self._run_cmd(st.sid, f"rm -f {_linux_shq(remote_tar)}", st.transport, self.op_id)
 				tar_cmd = f"tar czf {_linux_shq(remote_tar)} -C {_linux_shq(st.remote_path)} ."
-				logger.debug("  tar.create.cmd=%s", _preview(tar_cmd))
+				if _trace.on:
+					_trace.log("  tar.create.cmd=%s", _preview(tar_cmd))
 				self._run_cmd(st.sid, tar_cmd, st.transport, self.op_id)
 
 			except Exception as e:
@@ -458,8 +513,10 @@ class ShellProtocol(TransferProtocol):
 			# Save fingerprint + mark prepared
 			size_sh = f"bash -lc 'stat -c %s {_linux_shq(remote_tar)}'"
 			mtime_sh = f"bash -lc 'stat -c %Y {_linux_shq(remote_tar)}'"
-			logger.debug("  tar.size.cmd=%s", _preview(size_sh))
-			logger.debug("  tar.mtime.cmd=%s", _preview(mtime_sh))
+			if _trace.on:
+				_trace.log("  tar.size.cmd=%s", _preview(size_sh))
+			if _trace.on:
+				_trace.log("  tar.mtime.cmd=%s", _preview(mtime_sh))
 			try:
 				length = _parse_int(self._run_cmd(st.sid, size_sh,  st.transport, self.op_id))
 				mtime  = _parse_int(self._run_cmd(st.sid, mtime_sh, st.transport, self.op_id))
@@ -498,7 +555,7 @@ class ShellProtocol(TransferProtocol):
 		_sub("NEXT DOWNLOAD CHUNK")
 		idx = st.next_index
 		if idx >= st.total_chunks:
-			logger.debug("  finished: idx=%d total_chunks=%d", idx, st.total_chunks)
+			_trace.log("  finished: idx=%d total_chunks=%d", idx, st.total_chunks)
 			return None
 		offset = index_to_offset(idx, st.chunk_size)
 		_kv(idx=idx, offset=offset, chunk_size=st.chunk_size, bytes_done=st.bytes_done, total_bytes=st.total_bytes)
@@ -521,7 +578,8 @@ class ShellProtocol(TransferProtocol):
 
 		# Non-final chunk must be exactly chunk_size bytes
 		if idx < st.total_chunks - 1 and len(data) != st.chunk_size:
-			logger.debug("  short_read mid-stream: got=%d expected=%d", len(data), st.chunk_size)
+			if _trace.on:
+				_trace.log("  short_read mid-stream: got=%d expected=%d", len(data), st.chunk_size)
 			raise ConnectionError(f"short read ({len(data)} bytes) at chunk {idx}")
 
 		"""# If we are NOT on the last chunk, we must receive a full chunk.
@@ -539,7 +597,8 @@ class ShellProtocol(TransferProtocol):
 			if len(data) > expected_last:
 				data = data[:expected_last]
 		
-		logger.debug("  write_at: path=%s offset=%d write_len=%d (is_last=%r)", st.tmp_local_path, offset, len(data), is_last)
+		if _trace.on:
+			_trace.log("  write_at: path=%s offset=%d write_len=%d (is_last=%r)", st.tmp_local_path, offset, len(data), is_last)
 		ensure_prealloc(st.tmp_local_path, st.total_bytes)
 		write_at(st.tmp_local_path, offset, data)
 		st.bytes_done += len(data)
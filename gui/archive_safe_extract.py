@@ -0,0 +1,340 @@
+# gui/archive_safe_extract.py
+"""
+Safe local extraction of downloaded folder archives (GUI side).
+
+safe_extract_zip / safe_extract_tar unpack with traversal checks, links
+skipped, and an optional redundant top-level folder stripped.
+
+StreamingExtractor unpacks a folder download while its bytes are still
+arriving. The UI thread feed()s websocket chunks; a worker thread tees them
+into the archive file and
+  * tar.gz: runs tarfile in stream mode ("r|gz"), so each file lands in the
+    destination as soon as its last byte has arrived;
+  * zip: spools until the end-of-central-directory record shows the central
+    directory is complete (zip needs it to locate members), then extracts
+    right away instead of waiting for the end-of-download handshake.
+"""
+from __future__ import annotations
+
+import os
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from collections import deque
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QObject, QThread, QCoreApplication, pyqtSignal, pyqtSlot
+
+COPY_CHUNK = 1024 * 1024
+ZIP_TAIL_BYTES = 22 + 65535 + 20 + 56   # EOCD + max comment + zip64 locator/record
+
+OnFile = Optional[Callable[[str], None]]
+
+
+# ---------- Safe extraction ----------
+def ensure_inside(root: str, path: str) -> None:
+	ab_root = os.path.abspath(root)
+	ab_path = os.path.abspath(path)
+	if not (ab_path == ab_root or ab_path.startswith(ab_root + os.sep)):
+		raise RuntimeError(f"Unsafe path in archive: {path}")
+
+
+def _target(dest_dir: str, name: str, strip_root: str) -> Optional[str]:
+	parts = [p for p in (name or "").replace("\\", "/").split("/") if p]
+	# Strip common top-level folder if it equals the chosen folder name
+	if parts and strip_root and parts[0].lower() == strip_root:
+		parts = parts[1:]
+	if not parts:
+		return None  # the root itself
+	target = os.path.join(dest_dir, *parts)
+	ensure_inside(dest_dir, target)
+	return target
+
+
+def _copy(src, target: str) -> None:
+	os.makedirs(os.path.dirname(target), exist_ok=True)
+	with src, open(target, "wb") as dst:
+		while True:
+			chunk = src.read(COPY_CHUNK)
+			if not chunk:
+				break
+			dst.write(chunk)
+
+
+def safe_extract_zip(zf: zipfile.ZipFile, dest_dir: str, *, strip_root: str | None = None, on_file: OnFile = None) -> int:
+	"""
+	Normalize backslashes to forward slashes, prevent traversal, create dirs,
+	and (optionally) strip a redundant top-level folder that matches strip_root.
+	Returns the number of files written.
+	"""
+	os.makedirs(dest_dir, exist_ok=True)
+	sr = (strip_root or "").strip().lower()
+	n = 0
+	for info in zf.infolist():
+		raw = info.filename or ""
+		target = _target(dest_dir, raw, sr)
+		if target is None:
+			continue
+		if raw.endswith("/") or raw.endswith("\\"):
+			os.makedirs(target, exist_ok=True)
+			continue
+		_copy(zf.open(info, "r"), target)
+		n += 1
+		if on_file:
+			on_file(target)
+	return n
+
+
+def safe_extract_tar(tf: tarfile.TarFile, dest_dir: str, *, strip_root: str | None = None, on_file: OnFile = None) -> int:
+	"""Same rules as safe_extract_zip; links are skipped. Works on stream-mode ("r|gz") archives."""
+	os.makedirs(dest_dir, exist_ok=True)
+	sr = (strip_root or "").strip().lower()
+	n = 0
+	for member in tf:  # iterating (not getmembers()) keeps stream mode single-pass
+		# Skip links for safety
+		if member.issym() or member.islnk():
+			continue
+		target = _target(dest_dir, member.name, sr)
+		if target is None:
+			continue
+		if member.isdir():
+			os.makedirs(target, exist_ok=True)
+			continue
+		src = tf.extractfile(member)
+		if src is None:
+			continue
+		_copy(src, target)
+		n += 1
+		if on_file:
+			on_file(target)
+	return n
+
+
+# ---------- Streaming ----------
+class _Aborted(Exception):
+	pass
+
+
+class ChunkPipe:
+	"""
+	Bytes handed over from the UI thread to the extract worker. read() blocks
+	until data, close() (clean EOF) or abort(); every byte read is also written
+	to ``tee`` (the archive file kept on disk).
+	"""
+
+	def __init__(self):
+		self._chunks: deque = deque()
+		self._cv = threading.Condition()
+		self._closed = False
+		self._aborted = False
+		self._buf = b""
+		self.tee = None
+		self.consumed = 0
+
+	# UI thread
+	def write(self, data: bytes) -> None:
+		with self._cv:
+			self._chunks.append(bytes(data))
+			self._cv.notify()
+
+	def close(self) -> None:
+		with self._cv:
+			self._closed = True
+			self._cv.notify()
+
+	def abort(self) -> None:
+		with self._cv:
+			self._aborted = True
+			self._cv.notify()
+
+	# worker thread
+	def next_chunk(self) -> bytes:
+		"""The next chunk as it arrived (b"" at EOF)."""
+		with self._cv:
+			while not self._chunks and not self._closed and not self._aborted:
+				self._cv.wait()
+			if self._aborted:
+				raise _Aborted()
+			if not self._chunks:
+				return b""
+			chunk = self._chunks.popleft()
+		if self.tee is not None:
+			self.tee.write(chunk)
+		self.consumed += len(chunk)
+		return chunk
+
+	def peek(self, n: int) -> bytes:
+		"""Up to n bytes without consuming them (fewer only at EOF)."""
+		while len(self._buf) < n:
+			chunk = self.next_chunk()
+			if not chunk:
+				break
+			self._buf += chunk
+		return self._buf[:n]
+
+	def take_buffered(self) -> bytes:
+		out, self._buf = self._buf, b""
+		return out
+
+	def read(self, n: int = -1) -> bytes:
+		while n < 0 or len(self._buf) < n:
+			chunk = self.next_chunk()
+			if not chunk:
+				break
+			self._buf += chunk
+		if n < 0:
+			out, self._buf = self._buf, b""
+		else:
+			out, self._buf = self._buf[:n], self._buf[n:]
+		return out
+
+	def drain(self) -> None:
+		"""Consume (and tee) whatever is left up to EOF."""
+		self._buf = b""
+		while self.next_chunk():
+			pass
+
+
+def _zip_cd_complete(tail: bytes, received: int) -> bool:
+	"""True once the EOCD closes the stream and its central directory lies inside it."""
+	i = tail.rfind(b"PK\x05\x06")
+	if i < 0 or i + 22 > len(tail):
+		return False
+	cd_size, cd_offset, comment_len = struct.unpack_from("<IIH", tail, i + 12)
+	eocd_off = received - len(tail) + i
+	if eocd_off + 22 + comment_len != received:
+		return False
+	if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+		return tail.rfind(b"PK\x06\x07", 0, i) >= 0  # zip64: its locator sits right before
+	return cd_offset + cd_size <= eocd_off
+
+
+class _ExtractWorker(QObject):
+	file_ready = pyqtSignal(str)
+	done = pyqtSignal(bool, str, object)  # ok, error, info
+
+	def __init__(self, pipe: ChunkPipe, archive_path: str, dest_dir: str, strip_root: str):
+		super().__init__()
+		self.pipe = pipe
+		self.archive_path = archive_path
+		self.dest_dir = dest_dir
+		self.strip_root = strip_root
+		self.kind = ""
+		self.files = 0
+
+	def _on_file(self, path: str):
+		self.files += 1
+		self.file_ready.emit(path)
+
+	@pyqtSlot()
+	def run(self):
+		ok, err = True, ""
+		try:
+			with open(self.archive_path, "wb") as arch:
+				self.pipe.tee = arch
+				head = self.pipe.peek(4)
+				if head.startswith(b"\x1f\x8b"):
+					self.kind = "tar.gz"
+					with tarfile.open(fileobj=self.pipe, mode="r|gz") as tf:
+						safe_extract_tar(tf, self.dest_dir, strip_root=self.strip_root, on_file=self._on_file)
+					self.pipe.drain()
+				elif head.startswith(b"PK\x03\x04"):
+					self.kind = "zip"
+					self._run_zip(arch)
+				else:
+					self.pipe.drain()
+					if self.pipe.consumed:
+						raise ValueError(f"Unknown archive magic: {head.hex()}")
+		except _Aborted:
+			ok, err = False, "aborted"
+		except Exception as e:
+			ok, err = False, f"{type(e).__name__}: {e}"
+			try:
+				self.pipe.drain()  # keep the archive complete on disk for the post-mortem
+			except _Aborted:
+				pass
+			except Exception:
+				pass
+		finally:
+			self.pipe.tee = None
+		self.done.emit(ok, err, {"kind": self.kind, "files": self.files, "bytes": self.pipe.consumed})
+
+	def _run_zip(self, arch):
+		tail = self.pipe.take_buffered()
+		extracted = False
+		while True:
+			if not extracted and _zip_cd_complete(tail[-ZIP_TAIL_BYTES:], self.pipe.consumed):
+				arch.flush()
+				with zipfile.ZipFile(self.archive_path, "r", allowZip64=True) as zf:
+					safe_extract_zip(zf, self.dest_dir, strip_root=self.strip_root, on_file=self._on_file)
+				extracted = True
+			chunk = self.pipe.next_chunk()
+			if not chunk:
+				break
+			tail = (tail + chunk)[-ZIP_TAIL_BYTES:]
+		if not extracted:
+			raise zipfile.BadZipFile("EOCD not found (likely truncated)")
+
+
+_running: set = set()
+_quit_hooked = False
+
+
+def _abort_all():
+	for ex in list(_running):
+		ex.abort()
+		ex._thread.wait(2000)
+
+
+class StreamingExtractor(QObject):
+	"""
+	Extract a folder archive while it downloads. feed() every received chunk,
+	finish() on a clean end of download, abort() otherwise; ``done`` fires once
+	with (ok, error, info) where info has kind/files/bytes/archive/first_file_s.
+	"""
+	file_ready = pyqtSignal(str)
+	done = pyqtSignal(bool, str, object)
+
+	def __init__(self, archive_path: str, dest_dir: str, *, strip_root: str = "", parent=None):
+		super().__init__(parent)
+		self.archive_path = archive_path
+		self.dest_dir = dest_dir
+		self.t_start = time.perf_counter()
+		self.first_file_s: float | None = None
+		self._pipe = ChunkPipe()
+		self._thread = QThread()
+		self._worker = _ExtractWorker(self._pipe, archive_path, dest_dir, (strip_root or "").strip().lower())
+		self._worker.moveToThread(self._thread)
+		self._thread.started.connect(self._worker.run)
+		self._worker.file_ready.connect(self._on_file)
+		self._worker.done.connect(self._on_done)
+		global _quit_hooked
+		app = QCoreApplication.instance()
+		if app is not None and not _quit_hooked:
+			app.aboutToQuit.connect(_abort_all)
+			_quit_hooked = True
+		_running.add(self)
+		self._thread.start()
+
+	def feed(self, data: bytes):
+		self._pipe.write(data)
+
+	def finish(self):
+		self._pipe.close()
+
+	def abort(self):
+		self._pipe.abort()
+
+	def _on_file(self, path: str):
+		if self.first_file_s is None:
+			self.first_file_s = time.perf_counter() - self.t_start
+		self.file_ready.emit(path)
+
+	def _on_done(self, ok: bool, err: str, info: dict):
+		self._thread.quit()
+		self._thread.wait()
+		_running.discard(self)
+		info = dict(info, archive=self.archive_path, first_file_s=self.first_file_s)
+		self.done.emit(ok, err, info)
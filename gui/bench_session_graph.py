@@ -0,0 +1,130 @@
+# gui/bench_session_graph.py
+"""
+Synthetic-snapshot benchmark for SessionGraph.
+
+Feeds the graph the same kind of snapshots the /ws/sessions writer pushes
+(full list every tick, a few agents changing) and reports per-update and
+per-frame times, then replays wheel-zoom and drag-pan steps over the whole
+graph (the 60 fps budget is ~16.7 ms per frame). Runs offscreen, no
+teamserver needed:
+
+	cd gui && QT_QPA_PLATFORM=offscreen python bench_session_graph.py --agents 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+import session_graph
+from session_graph import SessionGraph
+
+
+class _NoAPI:
+	base_url = "http://127.0.0.1:9"
+	token = ""
+
+
+def _session(i: int, proto: str = None) -> dict:
+	return {
+		"id": f"sid{i:05d}",
+		"hostname": f"HOST{i:05d}",
+		"user": f"HOST{i:05d}\\user{i % 37}",
+		"os": "windows" if i % 3 else "linux",
+		"transport": proto or ("tcp", "tls", "http", "https")[i % 4],
+	}
+
+
+def _pct(vals, p):
+	vals = sorted(vals)
+	return vals[min(len(vals) - 1, int(len(vals) * p))]
+
+
+def _report(label, samples_ms):
+	print(f"  {label:<28} avg {statistics.mean(samples_ms):7.2f} ms   p95 {_pct(samples_ms, 0.95):7.2f} ms   max {max(samples_ms):7.2f} ms")
+
+
+def main(argv=None):
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--agents", type=int, default=500)
+	ap.add_argument("--ticks", type=int, default=60, help="snapshot updates to replay")
+	ap.add_argument("--churn", type=int, default=5, help="agents changed per tick")
+	ap.add_argument("--nav-frames", type=int, default=60, help="zoom and pan frames to replay (each)")
+	args = ap.parse_args(argv)
+
+	session_graph.PERSIST_PATH = os.path.join(tempfile.mkdtemp(), "positions.json")
+	SessionGraph._try_start_ws = lambda self: None   # offline: snapshots are injected below
+
+	app = QApplication.instance() or QApplication(sys.argv)
+	g = SessionGraph(_NoAPI())
+	g.resize(1600, 1000)
+	g.show()
+	app.processEvents()
+
+	sessions = [_session(i) for i in range(args.agents)]
+
+	t0 = time.perf_counter()
+	g._on_ws_snapshot(list(sessions))
+	app.processEvents()
+	print(f"[*] {args.agents} agents, initial snapshot: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+	rng = random.Random(1)
+	update_ms, frame_ms = [], []
+	next_id = args.agents
+	for _ in range(args.ticks):
+		# a few agents flip transport, one leaves, one joins
+		for _ in range(args.churn):
+			i = rng.randrange(len(sessions))
+			sessions[i] = dict(sessions[i], transport=rng.choice(("tcp", "tls", "http", "https")))
+		sessions.pop(rng.randrange(len(sessions)))
+		sessions.append(_session(next_id)); next_id += 1
+
+		t = time.perf_counter()
+		g._on_ws_snapshot(list(sessions))
+		app.processEvents()   # includes the coalesced filter pass
+		update_ms.append((time.perf_counter() - t) * 1000)
+
+		t = time.perf_counter()
+		g.view.viewport().repaint()
+		frame_ms.append((time.perf_counter() - t) * 1000)
+
+	_report("snapshot apply", update_ms)
+	_report("full repaint", frame_ms)
+
+	# navigation: start from "fit all" (every item on screen, the worst case)
+	view = g.view
+	view.fit_all(g._content_rect())
+	app.processEvents()
+	zoom_ms, pan_ms = [], []
+	for k in range(args.nav_frames):
+		view._touch_interaction()
+		view._apply_zoom(1.08 if (k // 15) % 2 == 0 else 1 / 1.08)
+		t = time.perf_counter()
+		view.viewport().repaint()
+		zoom_ms.append((time.perf_counter() - t) * 1000)
+	for k in range(args.nav_frames):
+		view._pan(dx=24 if (k // 20) % 2 == 0 else -24, dy=12)
+		t = time.perf_counter()
+		view.viewport().repaint()
+		pan_ms.append((time.perf_counter() - t) * 1000)
+	view._end_interaction()
+	t = time.perf_counter()
+	view.viewport().repaint()
+	settle = (time.perf_counter() - t) * 1000
+
+	_report("zoom frame", zoom_ms)
+	_report("pan frame", pan_ms)
+	print(f"  {'settle (full quality)':<28} {settle:7.2f} ms")
+	worst = _pct(zoom_ms + pan_ms, 0.95)
+	print(f"[*] navigation p95 {worst:.2f} ms -> {'OK' if worst <= 1000 / 60 else 'below'} 60 fps")
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,124 @@
+# gui/bench_startup.py
+"""
+GUI cold-start benchmark / regression gate.
+
+Starts a fresh interpreter that does what main.py does after a successful
+login (QApplication + theme, import main_window, build MainWindow, show it)
+and reports the time from process start until the dashboard's event loop
+is running. Fails (exit 1) when the best run is over --budget, or when a
+module that must stay lazy (imported on first use of its tab) was loaded.
+Runs offscreen, no teamserver needed (the sessions socket just fails to
+connect):
+
+	cd gui && python bench_startup.py                 # budget 2.0s, 3 runs
+	cd gui && python bench_startup.py --budget 1.2 --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Imported when their tab/pane is first opened, never at startup.
+LAZY_MODULES = (
+	"file_browser",
+	"sentinel_text_editor",
+	"paged_viewer",
+	"archive_safe_extract",
+	"ldap_browser",
+	"payloads_tab",
+	"listeners_tab",
+	"operators_tab",
+	"history_tab",
+	"session_console",
+	"sentinelshell_console",
+)
+
+
+class _NoAPI:
+	base_url = "http://127.0.0.1:9"
+	token = ""
+
+
+def _child() -> int:
+	t_start = time.perf_counter()
+	from PyQt5.QtCore import QTimer
+	from PyQt5.QtWidgets import QApplication
+	from theme_center import ThemeManager
+
+	app = QApplication(sys.argv)
+	ThemeManager.instance().install(app)
+	t_app = time.perf_counter()
+
+	from main_window import MainWindow
+	t_import = time.perf_counter()
+	mw = MainWindow(_NoAPI())
+	t_built = time.perf_counter()
+	mw.show()
+
+	def _ready():
+		# first turn of the event loop after show(): the dashboard takes input from here on
+		t_ready = time.perf_counter()
+		print(json.dumps({
+			"app_ms": (t_app - t_start) * 1000,
+			"import_ms": (t_import - t_app) * 1000,
+			"build_ms": (t_built - t_import) * 1000,
+			"show_ms": (t_ready - t_built) * 1000,
+			"lazy_loaded": [m for m in LAZY_MODULES if m in sys.modules],
+		}), flush=True)
+		app.quit()
+
+	QTimer.singleShot(0, _ready)
+	app.exec_()
+	return 0
+
+
+def run_once():
+	"""Return (wall_seconds from spawn to interactive, child breakdown dict)."""
+	env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+	t0 = time.perf_counter()
+	proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child"], cwd=HERE, env=env,
+							stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+	line = proc.stdout.readline()
+	wall = time.perf_counter() - t0
+	_, err = proc.communicate()
+	try:
+		return wall, json.loads(line)
+	except ValueError:
+		sys.stderr.write(err[-4000:])
+		raise SystemExit(f"[!] startup run failed (exit {proc.returncode})")
+
+
+def main(argv=None) -> int:
+	ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	ap.add_argument("--budget", type=float, default=2.0, help="max seconds, process start -> interactive dashboard")
+	ap.add_argument("--repeat", type=int, default=3)
+	ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+	args = ap.parse_args(argv)
+	if args.child:
+		return _child()
+
+	runs = [run_once() for _ in range(max(1, args.repeat))]
+	for i, (wall, b) in enumerate(runs, 1):
+		print(f"  run {i}: {wall:6.3f} s   (QApplication {b['app_ms']:6.1f} ms, import {b['import_ms']:6.1f} ms, "
+			  f"build {b['build_ms']:6.1f} ms, first frame {b['show_ms']:6.1f} ms)")
+	best, info = min(runs, key=lambda r: r[0])
+	print(f"[*] cold start {best:.3f} s (best of {len(runs)}), budget {args.budget:.3f} s")
+
+	failed = False
+	if best > args.budget:
+		print(f"[!] over budget by {best - args.budget:.3f} s")
+		failed = True
+	if info["lazy_loaded"]:
+		print(f"[!] loaded at startup but should be lazy: {', '.join(info['lazy_loaded'])}")
+		failed = True
+	if not failed:
+		print("[+] OK")
+	return 1 if failed else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -3,30 +3,28 @@ from PyQt5.QtCore import Qt, QSettings, QByteArray, QTimer, QPoint, QRect, QEven
 
 from PyQt5.QtWidgets import (
 	QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTabWidget, QSplitter, QMessageBox, QApplication, QSizePolicy,
-	QMenu, QAction, QTabBar
+	QMenu, QAction, QTabBar, QInputDialog, QFileDialog
 )
 
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QPainter, QPen, QBrush
 
+import sys
+
+# Only what the first frame shows is imported up front; every other tab's
+# module (file browser + editor, LDAP, payloads, consoles, admin tabs) is
+# imported when that tab is first opened. See bench_startup.py.
 from session_graph import SessionGraph
 from sessions_tab import SessionsTab
-from listeners_tab import ListenersTab
-from payloads_tab import PayloadsTab
-from operators_tab import OperatorsTab
-from file_browser import FileBrowser
-from ldap_browser import LdapBrowser
-from session_console import SessionConsole
-from sentinelshell_console import SentinelshellConsole
-
-from theme_center import ThemeManager, ThemePanel
 
 try:
 	# same import pattern you used elsewhere
 	from .websocket_client import SessionsWSClient
-	from .file_browser import FileBrowser
 except Exception:
 	from websocket_client import SessionsWSClient
-	from file_browser import FileBrowser
+
+# Tabs that maximize the bottom pane, as (module, class); checked through
+# sys.modules so asking doesn't import them.
+_HEAVY_TABS = (("payloads_tab", "PayloadsTab"), ("file_browser", "FileBrowser"), ("ldap_browser", "LdapBrowser"))
 
 # ----------- Helpers ------------
 def _strip_host_prefix(username: str, hostname: str) -> str:
@@ -58,8 +56,10 @@ class Dashboard(QWidget):
 		self.btn_listeners = QPushButton("Listeners")
 		self.btn_payloads = QPushButton("Payloads")
 		self.btn_operators = QPushButton("Operators")
+		self.btn_history = QPushButton("History")
+		self.btn_profiler = QPushButton("Profiler")
 
-		for b in (self.btn_sessions, self.btn_listeners, self.btn_payloads, self.btn_operators):
+		for b in (self.btn_sessions, self.btn_listeners, self.btn_payloads, self.btn_operators, self.btn_history, self.btn_profiler):
 			b.setCursor(Qt.PointingHandCursor)
 			b.setMinimumHeight(34)
 			b.setStyleSheet(
@@ -80,7 +80,9 @@ class Dashboard(QWidget):
 		buttons.addWidget(self.btn_listeners)
 		buttons.addWidget(self.btn_payloads)
 		buttons.addWidget(self.btn_operators)
+		buttons.addWidget(self.btn_history)
 		buttons.addStretch()
+		buttons.addWidget(self.btn_profiler)
 
 		# ---------- Graph (top) ----------
 		self.graph = SessionGraph(self.api)
@@ -196,12 +198,21 @@ class Dashboard(QWidget):
 		self.btn_listeners.clicked.connect(self._open_listeners_tab)
 		self.btn_payloads.clicked.connect(self._open_payloads_tab)
 		self.btn_operators.clicked.connect(self._open_operators_tab)
+		self.btn_history.clicked.connect(self._open_history_tab)
+
+		# Teamserver profiler (admin): capture collapsed stacks / top threads
+		prof_menu = QMenu(self)
+		prof_menu.setStyleSheet(self._menu_stylesheet_dark())
+		prof_menu.addAction("Capture profile…", self._profile_teamserver)
+		prof_menu.addAction("Top threads", self._show_top_threads)
+		self.btn_profiler.setMenu(prof_menu)
 
 		# Lazy-singletons for the admin tabs
 		self._tab_sessions = None
 		self._tab_listeners = None
 		self._tab_payloads = None
 		self._tab_operators = None
+		self._tab_history = None
 
 		# watch geometry changes to keep overlay visibility correct
 		self.installEventFilter(self)
@@ -224,7 +235,11 @@ class Dashboard(QWidget):
 
 	def _is_heavy_tab(self, w):
 		# Treat both Payloads and Files as “heavy” (maximize bottom pane)
-		return isinstance(w, (PayloadsTab, FileBrowser, LdapBrowser))
+		for mod, name in _HEAVY_TABS:
+			m = sys.modules.get(mod)
+			if m is not None and isinstance(w, getattr(m, name)):
+				return True
+		return False
 
 	def _on_host_tab_changed(self, idx: int):
 		host = self._host_tabwidget()
@@ -750,6 +765,7 @@ class Dashboard(QWidget):
 			arch = cached.get("arch") or arch
 
 		if kind == "console":
+			from session_console import SessionConsole
 			# Build title just like _open_console_tab, but force a unique copy
 			title = f"{_strip_host_prefix(user, host)}@{host}" if user else host
 			title = self._unique_tab_title(title)
@@ -760,6 +776,7 @@ class Dashboard(QWidget):
 			self._set_tab_meta(w2, "console", sid, host, user, arch)
 
 		elif kind == "sentinelshell":
+			from sentinelshell_console import SentinelshellConsole
 			base = (f"SS — {_strip_host_prefix(user, host)}@{host}" if user else f"SS — {host}")
 			title = self._unique_tab_title(base)
 			w2 = SentinelshellConsole(self.api, sid, host)
@@ -858,13 +875,69 @@ class Dashboard(QWidget):
 		self._ensure_tab("_tab_sessions", _make, "Sessions")
 
 	def _open_listeners_tab(self):
-		self._ensure_tab("_tab_listeners", lambda: ListenersTab(self.api), "Listeners")
+		def _make():
+			from listeners_tab import ListenersTab
+			return ListenersTab(self.api)
+		self._ensure_tab("_tab_listeners", _make, "Listeners")
 
 	def _open_payloads_tab(self):
-		self._ensure_tab("_tab_payloads", lambda: PayloadsTab(self.api), "Payloads")
+		def _make():
+			from payloads_tab import PayloadsTab
+			return PayloadsTab(self.api)
+		self._ensure_tab("_tab_payloads", _make, "Payloads")
 
 	def _open_operators_tab(self):
-		self._ensure_tab("_tab_operators", lambda: OperatorsTab(self.api), "Operators")
+		def _make():
+			from operators_tab import OperatorsTab
+			return OperatorsTab(self.api)
+		self._ensure_tab("_tab_operators", _make, "Operators")
+
+	def _open_history_tab(self):
+		def _make():
+			from history_tab import HistoryTab
+			return HistoryTab(self.api, self.sessions_ws)
+		self._ensure_tab("_tab_history", _make, "History")
+
+	# ---------- Teamserver profiler ----------
+	def _profile_teamserver(self):
+		secs, ok = QInputDialog.getInt(self, "Profile teamserver", "Sample all teamserver threads for (seconds):", 10, 1, 120)
+		if not ok:
+			return
+		self.btn_profiler.setEnabled(False)
+		self.btn_profiler.setText(f"Profiling {secs}s…")
+
+		def _done(msg: dict):
+			self.btn_profiler.setEnabled(True)
+			self.btn_profiler.setText("Profiler")
+			if str(msg.get("type", "")).lower() != "profile":
+				QMessageBox.warning(self, "Profiler", str(msg.get("error") or "Profile failed"))
+				return
+			s = msg.get("summary") or {}
+			path, _ = QFileDialog.getSaveFileName(
+				self, f"Save profile ({s.get('samples', 0)} samples)", "teamserver.folded",
+				"Collapsed stacks (*.folded *.txt);;All files (*)",
+			)
+			if path:
+				with open(path, "w", encoding="utf-8") as f:
+					f.write(msg.get("data") or "")
+
+		self.sessions_ws.profile(seconds=secs, cb=_done)
+
+	def _show_top_threads(self):
+		def _done(msg: dict):
+			if str(msg.get("type", "")).lower() != "threads":
+				QMessageBox.warning(self, "Top threads", str(msg.get("error") or "Request failed"))
+				return
+			lines = [f"{'ROLE':<40} {'CPU%':>6} {'BUSY%':>6}"]
+			for r in msg.get("threads") or []:
+				cpu = "-" if r.get("cpu_pct") is None else f"{r['cpu_pct']:.1f}"
+				lines.append(f"{str(r.get('role', ''))[:40]:<40} {cpu:>6} {r.get('busy_pct', 0):>6.1f}")
+			box = QMessageBox(self)
+			box.setWindowTitle("Top threads")
+			box.setText("<pre>" + "\n".join(lines).replace("&", "&amp;").replace("<", "&lt;") + "</pre>")
+			box.exec_()
+
+		self.sessions_ws.threads(window=1.0, cb=_done)
 
 	# ---------- Graph actions wiring ----------
 	"""def _focus_graph(self):
@@ -934,6 +1007,7 @@ class Dashboard(QWidget):
 				self.tabs.setCurrentIndex(i)
 				return
 
+		from session_console import SessionConsole
 		w = SessionConsole(self.api, sid, hostname)
 		idx = self.tabs.addTab(w, title)
 		self.tabs.setTabIcon(idx, QApplication.windowIcon())
@@ -982,6 +1056,7 @@ class Dashboard(QWidget):
 
 		start_path = "C:\\" if os_type == "windows" else "/"
 
+		from file_browser import FileBrowser
 		w = FileBrowser(
 			self.api, sid,
 			start_path=start_path,
@@ -1011,6 +1086,7 @@ class Dashboard(QWidget):
 
 
 		# Create and insert at index 0
+		from ldap_browser import LdapBrowser
 		w = LdapBrowser(self.api, sid, hostname)
 		idx = self.tabs.insertTab(0, w, title)
 		self.tabs.setTabIcon(idx, QApplication.windowIcon())
@@ -1055,6 +1131,7 @@ class Dashboard(QWidget):
 				self.tabs.setCurrentIndex(i)
 				return
 
+		from sentinelshell_console import SentinelshellConsole
 		w = SentinelshellConsole(self.api, sid, hostname)
 		idx = self.tabs.addTab(w, title)
 		self.tabs.setTabIcon(idx, QApplication.windowIcon())
@@ -1134,6 +1211,9 @@ class Dashboard(QWidget):
 		elif w is self._tab_operators:
 			self._tab_operators = None
 
+		elif w is self._tab_history:
+			self._tab_history = None
+
 		# drop tab meta if present
 		try:
 			if w in self._tab_meta:
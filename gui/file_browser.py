@@ -8,7 +8,7 @@ from __future__ import annotations
 # lists a suggested filename, dependencies, and what it provides.          #
 # Suggested split (filenames/classes):                                     #
 #   • gui/file_browser_logging.py         => logger 'log' (setup)          #
-#   • gui/file_items.py                   => NameItem, SizeItem            #
+#   • gui/file_items.py                   => FileRow, FileListModel/Filter #
 #   • gui/busy_overlay.py                 => BusyOverlay                   #
 #   • gui/file_browser_init.py            => FileBrowser.__init__ (UI)     #
 #   • gui/file_browser_theme.py           => _apply_theme()                #
@@ -29,20 +29,25 @@ from __future__ import annotations
 import logging, logging.handlers, traceback
 import random, os, time, posixpath, ntpath, re, mimetypes
 import datetime, zipfile, tarfile, tempfile, shutil, hashlib, binascii
+from functools import lru_cache
 
 from PyQt5.QtWidgets import (
-	QWidget, QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, QLabel,
+	QWidget, QTableView, QPushButton, QLineEdit, QLabel,
 	QHBoxLayout, QVBoxLayout, QFileDialog, QMessageBox, QHeaderView, QToolButton,
 	QApplication, QStyle, QFrame, QProgressBar, QShortcut, QMenu, QAbstractItemView,
 	QSplitter, QTreeWidget, QTreeWidgetItem, QTabBar, QStackedWidget, QSizePolicy,
 	QTabWidget
 )
 
-from PyQt5.QtCore import Qt, QTimer, QSortFilterProxyModel, QEvent, QObject, QSize
+from PyQt5.QtCore import (
+	Qt, QTimer, QSortFilterProxyModel, QEvent, QObject, QSize, QAbstractTableModel, QModelIndex
+)
 from PyQt5.QtGui import QKeySequence, QIcon
 
 from files_ws_client import FilesWSClient
-from sentinel_text_editor import SentinelEditorWindow
+from paged_viewer import PAGED_THRESHOLD
+from archive_safe_extract import StreamingExtractor, ensure_inside, safe_extract_tar, safe_extract_zip
+from theme_center import use_sheet
 
 ############################################################################
 # SECTION [LOGGING]: Logger initialization                                 #
@@ -94,33 +99,396 @@ def _basename_for_label(p: str) -> str:
 	if "\\" in p and ("/" not in p): return p.split("\\")[-1]
 	return p.split("/")[-1]
 
+# ---- "Type" column labels (Explorer-like) ----
+_SPECIAL_TYPES = {
+	"desktop.ini": "Configuration settings",
+	"thumbs.db": "Data base file",
+}
+# common extension → friendly label map
+_EXT_TYPES = {
+	# documents
+	"pdf":"PDF file", "txt":"Text Document", "rtf":"Rich Text Format",
+	"md":"Markdown file", "csv":"CSV file", "tsv":"TSV file",
+	"json":"JSON file", "yaml":"YAML file", "yml":"YAML file", "xml":"XML file",
+	# office
+	"doc":"Microsoft Word 97-2003", "docx":"Microsoft Word Document",
+	"dotx":"Word Template", "xls":"Microsoft Excel 97-2003", "xlsx":"Microsoft Excel Worksheet",
+	"xlsm":"Excel Macro-Enabled Worksheet", "xltx":"Excel Template",
+	"ppt":"PowerPoint 97-2003", "pptx":"PowerPoint Presentation", "ppsx":"PowerPoint Show",
+	# images
+	"jpg":"JPEG image", "jpeg":"JPEG image", "png":"PNG image", "gif":"GIF image",
+	"bmp":"Bitmap image", "tif":"TIFF image", "tiff":"TIFF image", "webp":"WEBP image",
+	"svg":"SVG image", "ico":"Icon",
+	# audio
+	"mp3":"MP3 audio", "wav":"WAVE audio", "flac":"FLAC audio", "aac":"AAC audio",
+	"m4a":"MPEG-4 audio", "ogg":"OGG audio", "opus":"OPUS audio", "mid":"MIDI sequence",
+	# video
+	"mp4":"MPEG-4 video", "mkv":"Matroska video", "mov":"QuickTime movie", "avi":"AVI video",
+	"wmv":"Windows Media video", "webm":"WebM video", "mpg":"MPEG video", "mpeg":"MPEG video",
+	# archives
+	"zip":"ZIP archive", "7z":"7-Zip archive", "rar":"RAR archive",
+	"tar":"TAR archive", "gz":"GZIP archive", "tgz":"GZipped TAR archive",
+	"bz2":"BZip2 archive", "xz":"XZ archive", "iso":"Disc image",
+	# executables / scripts
+	"exe":"Application", "msi":"Windows Installer Package",
+	"bat":"Windows Batch File", "cmd":"Windows Command Script", "ps1":"PowerShell Script",
+	"sh":"Shell script", "bash":"Shell script", "reg":"Registration Entries",
+	"py":"Python file", "js":"JavaScript file", "ts":"TypeScript file",
+	"java":"Java source file", "c":"C source file", "cpp":"C++ source file",
+	"h":"C/C++ header", "hpp":"C++ header", "go":"Go source file",
+	"rs":"Rust source file", "rb":"Ruby file", "php":"PHP file", "sql":"SQL file",
+	# system
+	"dll":"Application extension", "sys":"System file", "drv":"Device driver",
+	"lnk":"Shortcut", "ini":"Configuration settings", "log":"Log file",
+}
+
+@lru_cache(maxsize=4096)
+def _type_for_ext(ext: str) -> str:
+	"""Type label for an extension; cached so big listings hit mimetypes once per ext."""
+	if ext in _EXT_TYPES: return _EXT_TYPES[ext]
+	# fallback to mimetypes for unknowns
+	kind, _ = mimetypes.guess_type("x." + ext) if ext else (None, None)
+	if kind:
+		main = kind.split("/", 1)[0]
+		return {
+			"image":"Image file", "audio":"Audio file", "video":"Video file",
+			"text":"Text file", "application":"Application file",
+		}.get(main, "File")
+	return "File"
+
+# ---- listing normalization (pure; also runs on the websocket decode thread) ----
+def _coerce_is_dir(r: dict) -> bool:
+	v = r.get("is_dir", r.get("dir", r.get("directory", r.get("isDirectory"))))
+	if isinstance(v, bool): return v
+	if isinstance(v, (int, float)): return bool(int(v))
+	if isinstance(v, str):
+		s = v.strip().lower()
+		if s in {"1","true","yes","y","dir","folder","directory","d"}: return True
+		if s in {"0","false","no","n","file","f"}: return False
+	# MIME-style hints
+	mime = str(r.get("mime") or r.get("mimetype") or r.get("content_type") or "").lower()
+	if mime in {"inode/directory","application/x-directory"}: return True
+	# Type labels some back-ends use
+	t = str(r.get("type") or "").strip().lower()
+	if t in {"dir","folder","directory"}: return True
+	if t in {"file"}: return False
+	return False
+
+def _coerce_owner(r: dict) -> str:
+	o = str(r.get("owner") or r.get("user") or r.get("username") or "").strip()
+	if "\\" in o:
+		o = o.split("\\")[-1].strip()
+	return o
+
+def _coerce_mtime_ms(r: dict) -> int:
+	for k in ("mtime_ms","mtime","modified","last_modified","updated","timestamp","time","date"):
+		if k in r and r[k] is not None:
+			v = r[k]
+			# numeric (seconds or ms)
+			if isinstance(v, (int, float)):
+				return int(v if v > 1e12 else v * 1000)
+			# numeric string
+			if isinstance(v, str) and v.strip().isdigit():
+				n = int(v.strip())
+				return int(n if n > 1e12 else n * 1000)
+			# ISO 8601 string
+			if isinstance(v, str):
+				s = v.strip().replace("Z", "+00:00")
+				try:
+					dt = datetime.datetime.fromisoformat(s)
+					return int(dt.timestamp() * 1000)
+				except Exception:
+					pass
+	return 0
+
+def _coerce_size_int(r: dict) -> int:
+	for k in ("size","length","bytes","byte_size","st_size"):
+		if k in r and r[k] is not None:
+			try: return int(float(r[k]))
+			except Exception: return 0
+	return 0
+
+def _guess_type(name: str, is_dir: bool) -> str:
+	"""Robust "Type" detector (Explorer-like)."""
+	if is_dir:
+		return "File folder"
+	nm = (name or "").lower().rstrip(".")
+	# explicit names that Windows treats specially
+	if nm in _SPECIAL_TYPES: return _SPECIAL_TYPES[nm]
+	# find last extension piece; the label only depends on it, so it's memoized
+	return _type_for_ext(nm.rsplit(".", 1)[-1] if "." in nm else "")
+
+def listing_map(entries: list[dict]) -> dict[str, tuple[bool, int, int, str, int, str]]:
+	"""
+	name -> (is_dir, raw_size, mtime_ms, type_label, item_count_for_dir, owner)
+	"""
+	m: dict[str, tuple[bool, int, int, str, int, str]] = {}
+	for r in entries or []:
+		name = str(r.get("name") or _basename_for_label(str(r.get("path") or "")) or "")
+		is_dir = _coerce_is_dir(r)
+		sz = _coerce_size_int(r)
+		mt = _coerce_mtime_ms(r)
+		tl = "File folder" if is_dir else (_guess_type(name, False) or "File")
+		# optional item counts
+		items = 0
+		for k in ("items", "child_count", "children", "count"):
+			try:
+				v = r.get(k)
+				if isinstance(v, (int, float)) and int(v) > 0:
+					items = int(v); break
+			except Exception:
+				pass
+		m[name] = (is_dir, sz, mt, tl, items, _coerce_owner(r))
+	return m
+
+class MappedEntries(list):
+	"""fs.list entries plus their listing_map(), built before they reach the UI thread."""
+	__slots__ = ("mapped",)
+
+	def __init__(self, entries: list, mapped: dict):
+		super().__init__(entries)
+		self.mapped = mapped
+
+def _premap_listing(msg: dict) -> None:
+	"""FilesWSClient shaper for fs.list / fs.list.page (decode thread)."""
+	entries = msg.get("entries")
+	if isinstance(entries, list):
+		msg["entries"] = MappedEntries(entries, listing_map(entries))
+
+LISTING_SHAPERS = {"fs.list": _premap_listing, "fs.list.page": _premap_listing}
+
 ############################################################################
-# SECTION [ITEM MODELS]: Table item classes                                #
+# SECTION [ITEM MODELS]: Listing model (virtualized)                       #
 # Suggested file: gui/file_items.py                                        #
-# Depends on: PyQt5.QtWidgets (QTableWidgetItem), PyQt5.QtCore.Qt          #
-# Provides: NameItem (dir-first sorting), SizeItem (numeric sort)          #
+# Depends on: PyQt5.QtCore (QAbstractTableModel, QSortFilterProxyModel)    #
+# Provides: FileRow, FileListModel (lazy data, typed sort), FileListFilter #
 ############################################################################
 
 
-class NameItem(QTableWidgetItem):
-	def __init__(self, text: str, is_dir: bool, icon: QIcon = None):
-		super().__init__(text); self.is_dir = bool(is_dir)
-		if icon: self.setIcon(icon)
-	def __lt__(self, other):
-		if isinstance(other, NameItem):
-			if self.is_dir != other.is_dir:
-				return self.is_dir and not other.is_dir
-			return self.text().lower() < other.text().lower()
-		return super().__lt__(other)
+MAIN_COLUMNS = ["Name", "Date modified", "Type", "Owner", "Size"]
+_OWNER_COL = MAIN_COLUMNS.index("Owner")
+# Windows listings arrive without owners (Get-Acl per entry is slow); the rows
+# on screen are filled in shortly after the listing or a scroll settles.
+OWNER_FETCH_DEBOUNCE_MS = 150
+# fs.list arrives in pages of this many entries; the first one is shown immediately
+LIST_PAGE_SIZE = 500
+
+
+class FileRow:
+	"""
+	One listing row. Real folder rows keep raw values only and are formatted on
+	first paint (see FileListModel.data); pseudo rows (drives / quick access)
+	pass their cells + sort keys explicitly.
+	"""
+	__slots__ = ("name", "is_dir", "size", "mtime_ms", "type_label", "owner", "items",
+				 "target", "icon", "cells", "keys", "right_cols")
+
+	def __init__(self, name: str, is_dir: bool, *, size: int = 0, mtime_ms: int = 0,
+				 type_label: str = "", owner: str = "", items: int = 0,
+				 target: str | None = None, icon: QIcon | None = None,
+				 cells: list | None = None, keys: list | None = None, right_cols: tuple = (4,)):
+		self.name = name; self.is_dir = bool(is_dir)
+		self.size = int(size or 0); self.mtime_ms = int(mtime_ms or 0)
+		self.type_label = type_label; self.owner = owner or ""; self.items = int(items or 0)
+		self.target = target; self.icon = icon
+		self.cells = cells; self.keys = keys; self.right_cols = right_cols
+
+	def size_key(self) -> int:
+		"""Sort value of the Size column, without formatting anything."""
+		if not self.is_dir:
+			return self.size
+		return self.items if self.items > 0 else self.size
+
+	def size_cell(self, fmt_bytes) -> tuple[str, int]:
+		"""Size column (files → bytes; folders → items/bytes/blank) as (display, sort value)."""
+		if not self.is_dir:
+			return fmt_bytes(self.size), self.size
+		if self.items > 0:
+			return (f"{self.items} item" if self.items == 1 else f"{self.items} items"), self.items
+		if self.size > 0:
+			return fmt_bytes(self.size), self.size
+		return "", 0
+
+
+class FileListModel(QAbstractTableModel):
+	"""
+	Table model for the file listing. Nothing is created per cell: data() formats
+	on demand and caches the strings on the row, sort() orders the rows by raw
+	values (ints for size/date, dir-first names) with a single list.sort.
+	"""
+	def __init__(self, fmt_dt, fmt_bytes, parent=None):
+		super().__init__(parent)
+		self._fmt_dt = fmt_dt
+		self._fmt_bytes = fmt_bytes
+		self._headers: list[str] = list(MAIN_COLUMNS)
+		self._rows: list[FileRow] = []
+		self._sort_col = 0
+		self._sort_order = Qt.AscendingOrder
+
+	# ----- Qt model API -----
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self._rows)
+
+	def columnCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self._headers)
+
+	def headerData(self, section, orientation, role=Qt.DisplayRole):
+		if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self._headers):
+			return self._headers[section]
+		return None
+
+	def data(self, index, role=Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		row = self._rows[index.row()]
+		c = index.column()
+		if role == Qt.DisplayRole:
+			if row.cells is None:
+				self._format(row)
+			return row.cells[c] if c < len(row.cells) else ""
+		if role == Qt.DecorationRole:
+			return row.icon if c == 0 else None
+		if role == Qt.TextAlignmentRole:
+			return (Qt.AlignRight | Qt.AlignVCenter) if c in row.right_cols else None
+		if role == Qt.UserRole:
+			return row.target if c == 0 else None
+		return None
+
+	def _format(self, row: FileRow):
+		size_disp, size_key = row.size_cell(self._fmt_bytes)
+		row.cells = [row.name, self._fmt_dt(row.mtime_ms), row.type_label, row.owner, size_disp]
+		row.keys = [row.name.lower(), row.mtime_ms, row.type_label.lower(), row.owner.lower(), size_key]
+
+	# raw sort values for real listing rows, by MAIN_COLUMNS position; nothing is formatted
+	_RAW_KEYS = (
+		lambda r: r.name.lower(),
+		lambda r: r.mtime_ms,
+		lambda r: r.type_label.lower(),
+		lambda r: r.owner.lower(),
+		FileRow.size_key,
+	)
+
+	def _sort_key(self, c: int):
+		raw = self._RAW_KEYS[c] if c < len(self._RAW_KEYS) else None
+
+		def key(row: FileRow):
+			if row.keys is not None:
+				k = row.keys[c] if c < len(row.keys) else ""
+			elif row.cells is not None:
+				# pseudo row that only passed display cells
+				row.keys = [str(x).lower() for x in row.cells]
+				k = row.keys[c] if c < len(row.keys) else ""
+			else:
+				k = raw(row) if raw is not None else ""
+			# Name column lists folders first (like Explorer)
+			return (not row.is_dir, k) if c == 0 else k
+		return key
+
+	def sort(self, column, order=Qt.AscendingOrder):
+		self._sort_col, self._sort_order = column, order
+		if column < 0 or column >= len(self._headers) or not self._rows:
+			return
+		self.layoutAboutToBeChanged.emit()
+		before = list(self._rows)
+		self._rows.sort(key=self._sort_key(column), reverse=(order == Qt.DescendingOrder))
+		# move persistent indexes (selection, current) along with their rows
+		frm = self.persistentIndexList()
+		if frm:
+			pos = {id(r): i for i, r in enumerate(self._rows)}
+			to = [self.index(pos[id(before[i.row()])], i.column()) for i in frm]
+			self.changePersistentIndexList(frm, to)
+		self.layoutChanged.emit()
+
+	def resort(self):
+		self.sort(self._sort_col, self._sort_order)
+
+	# ----- mutations -----
+	def set_columns(self, headers: list[str]) -> bool:
+		"""Switch column set (drops rows); returns True if anything changed."""
+		if headers == self._headers:
+			return False
+		self.beginResetModel()
+		self._headers = list(headers)
+		self._rows = []
+		self.endResetModel()
+		return True
+
+	def set_rows(self, rows: list[FileRow]):
+		self.beginResetModel()
+		self._rows = list(rows)
+		if 0 <= self._sort_col < len(self._headers):
+			self._rows.sort(key=self._sort_key(self._sort_col), reverse=(self._sort_order == Qt.DescendingOrder))
+		self.endResetModel()
+
+	def apply_diff(self, removed: set[str], changed: dict[str, FileRow], added: list[FileRow]):
+		"""Patch a live listing in place: only touched rows are signalled."""
+		if removed:
+			# remove bottom-up in contiguous runs
+			idxs = sorted((i for i, r in enumerate(self._rows) if r.name in removed), reverse=True)
+			run_end = run_start = idxs[0] if idxs else None
+			for i in (idxs[1:] + [None]) if idxs else ():
+				if i is not None and i == run_start - 1:
+					run_start = i; continue
+				self.beginRemoveRows(QModelIndex(), run_start, run_end)
+				del self._rows[run_start:run_end + 1]
+				self.endRemoveRows()
+				if i is not None:
+					run_end = run_start = i
+		if changed:
+			last_col = len(self._headers) - 1
+			for i, r in enumerate(self._rows):
+				nr = changed.get(r.name)
+				if nr is not None:
+					self._rows[i] = nr
+					self.dataChanged.emit(self.index(i, 0), self.index(i, last_col))
+		if added:
+			first = len(self._rows)
+			self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+			self._rows.extend(added)
+			self.endInsertRows()
+		if changed or added:
+			self.resort()
+
+	def set_owners(self, owners: dict[str, str]) -> int:
+		"""Fill in owners fetched after the listing (lazy-owner mode); returns rows touched."""
+		touched = 0
+		for i, r in enumerate(self._rows):
+			o = owners.get(r.name)
+			if o is not None and o != r.owner:
+				r.owner = o
+				r.cells = r.keys = None
+				self.dataChanged.emit(self.index(i, _OWNER_COL), self.index(i, _OWNER_COL))
+				touched += 1
+		if touched and self._sort_col == _OWNER_COL:
+			self.resort()
+		return touched
+
+	def row_at(self, source_row: int) -> FileRow | None:
+		if 0 <= source_row < len(self._rows):
+			return self._rows[source_row]
+		return None
+
+
+class FileListFilter(QSortFilterProxyModel):
+	"""Name filter only; sorting is delegated to FileListModel.sort (raw-value keys)."""
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self._needle = ""
+
+	def set_needle(self, text: str):
+		text = (text or "").lower()
+		if text != self._needle:
+			self._needle = text
+			self.invalidateFilter()
 
+	def filterAcceptsRow(self, source_row, source_parent):
+		if not self._needle:
+			return True
+		row = self.sourceModel().row_at(source_row)
+		return row is not None and self._needle in row.name.lower()
 
-class SizeItem(QTableWidgetItem):
-	def __init__(self, size_display: str, raw_size: int | None):
-		super().__init__(size_display); self.raw_size = int(raw_size or 0)
-		self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-	def __lt__(self, other):
-		if isinstance(other, SizeItem): return self.raw_size < other.raw_size
-		return super().__lt__(other)
+	def sort(self, column, order=Qt.AscendingOrder):
+		self.sourceModel().sort(column, order)
 
 ############################################################################
 # SECTION [WIDGET]: BusyOverlay translucent progress overlay               #
@@ -316,16 +684,22 @@ class FileBrowser(QWidget):
 
 
 		# ---------- Table ----------
-		self.table = QTableWidget(0, 4)
+		# model/view: rows are plain FileRow objects, cells are formatted on paint
+		self.model = FileListModel(self._fmt_dt, self._fmt_bytes, self)
+		self.proxy = FileListFilter(self)
+		self.proxy.setSourceModel(self.model)
+		self.table = QTableView()
+		self.table.setModel(self.proxy)
 		self._ensure_main_columns()
 		self.table.setAlternatingRowColors(False)
 		self.table.setSortingEnabled(True)	
-		self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-		self.table.setSelectionBehavior(QTableWidget.SelectRows)
+		self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+		self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+		self.table.setWordWrap(False)
 		self.table.verticalHeader().setVisible(False)
-		self.table.cellDoubleClicked.connect(self._cell_dbl)
+		self.table.doubleClicked.connect(lambda ix: self._cell_dbl(ix.row(), ix.column()))
 		# Also allow Enter/Space to open the selected row (safer than relying only on double-click)
-		self.table.itemActivated.connect(lambda _: self._open_selection())
+		self.table.activated.connect(lambda _: self._open_selection())
 
 		# Background (nothing-selected) context menu
 		self.table.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -383,8 +757,8 @@ class FileBrowser(QWidget):
 		self.btn_refresh.setText("Refresh")
 
 		self.btn_download.setEnabled(False)
-		self.table.itemSelectionChanged.connect(
-			lambda: self.btn_download.setEnabled(bool(self.table.selectionModel().selectedRows()))
+		self.table.selectionModel().selectionChanged.connect(
+			lambda *_: self.btn_download.setEnabled(bool(self.table.selectionModel().selectedRows()))
 		)
 
 		bottom = QHBoxLayout()
@@ -423,7 +797,7 @@ class FileBrowser(QWidget):
 		self.btn_download.clicked.connect(self.download)
 		act_file.triggered.connect(self._upload_pick_files_only)
 		act_folder.triggered.connect(self._upload_pick_folder_only)
-		self.btn_refresh.clicked.connect(lambda: self._kick_live(immediate=True))
+		self.btn_refresh.clicked.connect(self._manual_refresh)
 		self.search.textChanged.connect(self._apply_search_filter)
 		self.search.returnPressed.connect(self._on_search_return)  # allow absolute path -> navigate
 
@@ -431,7 +805,7 @@ class FileBrowser(QWidget):
 		self._update_search_placeholder()
 
 		# ---------- WS client ----------
-		self.fws = FilesWSClient(self.api.base_url, self.api.token, self)
+		self.fws = FilesWSClient(self.api.base_url, self.api.token, self, shapers=LISTING_SHAPERS)
 		self.fws.drives.connect(self._on_drives)
 		self.fws.quickpaths.connect(self._on_quickpaths)
 
@@ -445,6 +819,7 @@ class FileBrowser(QWidget):
 		# connect ALL signals BEFORE opening
 		self.fws.connected.connect(self._on_files_ws_connected)
 		self.fws.listed.connect(self._on_list)
+		self.fws.list_page.connect(self._on_list_page)
 		self.fws.dl_begin.connect(self._on_dl_begin)
 		self.fws.dl_chunk.connect(self._on_dl_chunk)
 		self.fws.dl_end.connect(self._on_dl_end)
@@ -454,7 +829,7 @@ class FileBrowser(QWidget):
 		self.fws.created.connect(self._on_created)
 
 		# --- Selection-aware action row state & Delete shortcut ---
-		self.table.itemSelectionChanged.connect(self._update_action_row_state)
+		self.table.selectionModel().selectionChanged.connect(self._update_action_row_state)
 
 		# Hide Upload whenever there is a selection
 		self._update_action_row_state()  # set initial state
@@ -480,6 +855,10 @@ class FileBrowser(QWidget):
 		self._dl_expect_sha: str | None = None
 		self._dl_srv_head: str | None = None
 		self._dl_srv_tail: str | None = None
+		# Folder download being extracted as it arrives (None otherwise)
+		self._dl_stream: StreamingExtractor | None = None
+		self._dl_stream_files = 0
+		self._dl_stream_status_t = 0.0
 
 		# Live update timer
 		self._busy = False
@@ -487,6 +866,23 @@ class FileBrowser(QWidget):
 		self._auto_timer.setSingleShot(True)
 		self._auto_timer.timeout.connect(self._auto_tick)
 
+		# Lazy owners: name -> owner for the current folder, and names already asked for
+		self._owner_cache: dict[str, str] = {}
+		self._owner_asked: set[str] = set()
+		self._want_fresh = False
+		# Paged listing: entries buffered for an in-place refresh, and whether
+		# pages are being appended straight into a freshly opened folder
+		self._page_buf = MappedEntries([], {})
+		self._page_live = False
+		self._owners_timer = QTimer(self)
+		self._owners_timer.setSingleShot(True)
+		self._owners_timer.setInterval(OWNER_FETCH_DEBOUNCE_MS)
+		self._owners_timer.timeout.connect(self._request_visible_owners)
+		self.table.verticalScrollBar().valueChanged.connect(lambda _: self._owners_timer.start())
+		self.proxy.layoutChanged.connect(self._owners_timer.start)
+		self.proxy.modelReset.connect(self._owners_timer.start)
+		self.fws.owners_ready.connect(self._on_owners)
+
 		# NEW: busy guard to recover if first request was dropped
 		self._busy_guard = QTimer(self)
 		self._busy_guard.setSingleShot(True)
@@ -551,9 +947,8 @@ class FileBrowser(QWidget):
 
 	# ---- Ensure the main 4 columns (Explorer-like) are active ----
 	# Keep the main (Explorer-like) columns consistent whenever we show a real folder.
-	def _ensure_main_columns(self):
-		self.table.setColumnCount(5)
-		self.table.setHorizontalHeaderLabels(["Name", "Date modified", "Type", "Owner", "Size"])
+	def _ensure_main_columns(self) -> bool:
+		changed = self.model.set_columns(MAIN_COLUMNS)
 		hdr = self.table.horizontalHeader()
 		hdr.setStretchLastSection(False)
 		hdr.setSectionResizeMode(0, QHeaderView.Interactive)
@@ -562,61 +957,26 @@ class FileBrowser(QWidget):
 				hdr.resizeSection(0, 420)
 		except Exception:
 			pass
-		# auto-size Date modified, Type, Owner, Size
-		for i in (1, 2, 3, 4):
-			hdr.setSectionResizeMode(i, QHeaderView.ResizeToContents)
+		# Date modified, Type, Owner, Size: fixed widths. ResizeToContents would
+		# measure every row, which defeats the lazy model on huge folders.
+		for i, w in ((1, 140), (2, 180), (3, 120), (4, 90)):
+			hdr.setSectionResizeMode(i, QHeaderView.Interactive)
+			if hdr.sectionSize(i) < w:
+				hdr.resizeSection(i, w)
+		return changed
 
 	# ----- coercers for back-end variability -----
 	def _coerce_is_dir(self, r: dict) -> bool:
-		v = r.get("is_dir", r.get("dir", r.get("directory", r.get("isDirectory"))))
-		if isinstance(v, bool): return v
-		if isinstance(v, (int, float)): return bool(int(v))
-		if isinstance(v, str):
-			s = v.strip().lower()
-			if s in {"1","true","yes","y","dir","folder","directory","d"}: return True
-			if s in {"0","false","no","n","file","f"}: return False
-		# MIME-style hints
-		mime = str(r.get("mime") or r.get("mimetype") or r.get("content_type") or "").lower()
-		if mime in {"inode/directory","application/x-directory"}: return True
-		# Type labels some back-ends use
-		t = str(r.get("type") or "").strip().lower()
-		if t in {"dir","folder","directory"}: return True
-		if t in {"file"}: return False
-		return False
+		return _coerce_is_dir(r)
 
 	def _coerce_owner(self, r: dict) -> str:
-		o = str(r.get("owner") or r.get("user") or r.get("username") or "").strip()
-		if "\\" in o:
-			o = o.split("\\")[-1].strip()
-		return o
+		return _coerce_owner(r)
 
 	def _coerce_mtime_ms(self, r: dict) -> int:
-		for k in ("mtime_ms","mtime","modified","last_modified","updated","timestamp","time","date"):
-			if k in r and r[k] is not None:
-				v = r[k]
-				# numeric (seconds or ms)
-				if isinstance(v, (int, float)):
-					return int(v if v > 1e12 else v * 1000)
-				# numeric string
-				if isinstance(v, str) and v.strip().isdigit():
-					n = int(v.strip())
-					return int(n if n > 1e12 else n * 1000)
-				# ISO 8601 string
-				if isinstance(v, str):
-					s = v.strip().replace("Z", "+00:00")
-					try:
-						dt = datetime.datetime.fromisoformat(s)
-						return int(dt.timestamp() * 1000)
-					except Exception:
-						pass
-		return 0
+		return _coerce_mtime_ms(r)
 
 	def _coerce_size_int(self, r: dict) -> int:
-		for k in ("size","length","bytes","byte_size","st_size"):
-			if k in r and r[k] is not None:
-				try: return int(float(r[k]))
-				except Exception: return 0
-		return 0
+		return _coerce_size_int(r)
 
 
 	# ----- Editor integration -----
@@ -630,7 +990,13 @@ class FileBrowser(QWidget):
 		self.status.setText("Opening in editor…")
 		self.fws.start_download(self.sid, remote_path)
 
+	def _open_remote_paged(self, remote_path: str, display_name: str):
+		"""Big text files (logs) open read-only in the editor window and are fetched by page."""
+		self._get_or_make_editor().open_paged(title=display_name, remote_path=remote_path)
+		self.status.setText(f"Viewing {display_name} (read-only, paged)")
+
 	def _get_or_make_editor(self) -> SentinelEditorWindow:
+		from sentinel_text_editor import SentinelEditorWindow  # only once a file is opened for editing
 		return SentinelEditorWindow.get_or_create(self)
 
 	def _save_text_back_to_remote(self, remote_path: str, text: str, done_cb):
@@ -718,87 +1084,8 @@ class FileBrowser(QWidget):
 
 	# ---------- Styling ----------
 	def _apply_theme(self):
-		self.setStyleSheet("""
-			QWidget { background:#0e1420; color:#e8e8e8; font-size:13px; }
-			QLabel { background:transparent; }
-			QLabel#StatusLabel { color:#8a93a3; }
-			/* Compact tabs */
-			QTabBar { margin-bottom: -2px; }
-			QTabBar::tab { background:#131a26; border:1px solid #273245; padding:4px 8px; margin-right:6px;
-						   border-top-left-radius:8px; border-top-right-radius:8px; min-height: 22px; }
-			QTabBar::tab:selected { background:#192235; }
-			/* Crumbs host shouldn’t reserve vertical space */
-			#CrumbsHost { background:transparent; padding:0; margin:0; min-height: 0; }
-			QToolButton[crumb="true"] { background:#131a26; border:1px solid #273245; border-radius:8px; padding:4px 8px; }
-			QToolButton[crumb="true"]:hover { background:#172134; }
-			QLineEdit { background:#0b111a; color:#e8e8e8; border:1px solid #273245; border-radius:8px; padding:6px 10px; }
-			QToolButton, QPushButton {
-				background:#131a26; color:#e8e8e8; border:1px solid #273245; border-radius:8px; padding:6px 12px;
-			}
-
-			/* ===== Windows 11-style TopNavBar ===== */
-			#TopNavBar {
-				background:#111722;
-				border:1px solid #1d2635;
-				border-radius:10px;
-			}
-			#TopNavBar QToolButton[toolbar="true"] {
-				min-width:36px; min-height:36px; border-radius:10px; padding:0;
-			}
-			#TopNavBar QToolButton[toolbar="true"]:hover { background:#172134; }
-			#TopNavBar QToolButton[toolbar="true"]:pressed { background:#101826; }
-			#TopNavBar QLineEdit {
-				background:#0b111a; color:#e8e8e8; border:1px solid #273245; border-radius:8px; padding:6px 10px;
-				min-width:240px;
-			}
-			/* Breadcrumbs more “to a tee”: flat text-like with chevrons */
-			#CrumbsHost { background:transparent; padding:0; margin:0; min-height:0; }
-			QToolButton[crumb="true"] {
-				background:transparent; border:0; border-radius:6px; padding:2px 6px; color:#e8e8e8;
-			}
-			QToolButton[crumb="true"]:hover { background:#1a2234; }
-			QLabel#CrumbSep { color:#8a93a3; padding:0 4px; }
-			/* ===== end TopNavBar ===== */
-
-			/* (Sidebar mini-toolbar CSS left as-is if present elsewhere) */
-
-			QToolButton:hover, QPushButton:hover { background:#172134; }
-			QToolButton:pressed, QPushButton:pressed { background:#101826; }
-			
-			#Sidebar {
-				background:#111722;
-				border:1px solid #1d2635;
-				border-radius:10px;
-				selection-background-color:#1b2740;   /* fallback for some styles */
-				selection-color:#e8e8e8;
-				show-decoration-selected: 0;          /* prevent blue chip on the left */
-				outline: 0;                            /* no dotted focus outline */
-			}
-			QTreeWidget#Sidebar::item { height:26px; padding:2px 10px; }
-			QTreeWidget#Sidebar::item:hover { background:#172134; }
-			QTreeWidget#Sidebar::item:selected,
-			QTreeWidget#Sidebar::item:selected:active,
-			QTreeWidget#Sidebar::item:selected:!active {
-				background:#1b2740; color:#e8e8e8; border:0;
-			}
-			QTreeWidget#Sidebar::branch:selected,
-			QTreeWidget#Sidebar::branch:selected:active,
-			QTreeWidget#Sidebar::branch:selected:!active { background: transparent; }
-
-			QTableWidget {
-				background:#0b111a; border:1px solid #1d2635; border-radius:10px; gridline-color:#1b2434;
-			}
-			QHeaderView::section {
-				background:#111722; color:#e8e8e8; padding:6px 8px; border:0px; border-right:1px solid #1b2434;
-			}
-			QTableWidget::item:selected { background:#193156; }
-			QProgressBar { background:#0b111a; border:1px solid #273245; border-radius:6px; }
-
-			/* Hide any splitter grabber “dots” so it doesn’t look draggable here */
-			QSplitter::handle { image: none; }
-			QToolBar::handle { image: none; }
-			QLabel#CrumbSep { color:#8a93a3; padding:0 6px; }
-		""")
+		# rules live in theme_center ("files" sheet), compiled once into the app stylesheet
+		use_sheet(self, "files")
 		# tighter table rows
 		self.table.verticalHeader().setDefaultSectionSize(28)
 
@@ -1050,16 +1337,12 @@ class FileBrowser(QWidget):
 	def _is_heavy_widget(self, w: QWidget | None) -> bool:
 		"""
 		Treat PayloadsTab and FileBrowser as 'heavy'.
-		Avoid hard import cycles; fall back to name check.
+		Checked by class name: avoids import cycles and doesn't pull in
+		payloads_tab before the operator opens it.
 		"""
 		if w is None:
 			return False
-		try:
-			from payloads_tab import PayloadsTab  # type: ignore
-			return isinstance(w, (PayloadsTab, FileBrowser))
-		except Exception:
-			clsname = getattr(w.__class__, "__name__", "")
-			return clsname in ("PayloadsTab", "FileBrowser")
+		return getattr(w.__class__, "__name__", "") in ("PayloadsTab", "FileBrowser")
 
 	def _leaving_to_heavy(self) -> bool:
 		"""
@@ -1443,114 +1726,37 @@ class FileBrowser(QWidget):
 
 	# ---- Robust "Type" detector (Explorer-like) ----
 	def _guess_type(self, name: str, is_dir: bool) -> str:
-		if is_dir:
-			return "File folder"
-		nm = (name or "").lower().rstrip(".")
-		# explicit names that Windows treats specially
-		specials = {
-			"desktop.ini": "Configuration settings",
-			"thumbs.db": "Data base file",
-		}
-		if nm in specials: return specials[nm]
-		# common extension → friendly label map
-		EXT = {
-			# documents
-			"pdf":"PDF file", "txt":"Text Document", "rtf":"Rich Text Format",
-			"md":"Markdown file", "csv":"CSV file", "tsv":"TSV file",
-			"json":"JSON file", "yaml":"YAML file", "yml":"YAML file", "xml":"XML file",
-			# office
-			"doc":"Microsoft Word 97-2003", "docx":"Microsoft Word Document",
-			"dotx":"Word Template", "xls":"Microsoft Excel 97-2003", "xlsx":"Microsoft Excel Worksheet",
-			"xlsm":"Excel Macro-Enabled Worksheet", "xltx":"Excel Template",
-			"ppt":"PowerPoint 97-2003", "pptx":"PowerPoint Presentation", "ppsx":"PowerPoint Show",
-			# images
-			"jpg":"JPEG image", "jpeg":"JPEG image", "png":"PNG image", "gif":"GIF image",
-			"bmp":"Bitmap image", "tif":"TIFF image", "tiff":"TIFF image", "webp":"WEBP image",
-			"svg":"SVG image", "ico":"Icon",
-			# audio
-			"mp3":"MP3 audio", "wav":"WAVE audio", "flac":"FLAC audio", "aac":"AAC audio",
-			"m4a":"MPEG-4 audio", "ogg":"OGG audio", "opus":"OPUS audio", "mid":"MIDI sequence",
-			# video
-			"mp4":"MPEG-4 video", "mkv":"Matroska video", "mov":"QuickTime movie", "avi":"AVI video",
-			"wmv":"Windows Media video", "webm":"WebM video", "mpg":"MPEG video", "mpeg":"MPEG video",
-			# archives
-			"zip":"ZIP archive", "7z":"7-Zip archive", "rar":"RAR archive",
-			"tar":"TAR archive", "gz":"GZIP archive", "tgz":"GZipped TAR archive",
-			"bz2":"BZip2 archive", "xz":"XZ archive", "iso":"Disc image",
-			# executables / scripts
-			"exe":"Application", "msi":"Windows Installer Package",
-			"bat":"Windows Batch File", "cmd":"Windows Command Script", "ps1":"PowerShell Script",
-			"sh":"Shell script", "bash":"Shell script", "reg":"Registration Entries",
-			"py":"Python file", "js":"JavaScript file", "ts":"TypeScript file",
-			"java":"Java source file", "c":"C source file", "cpp":"C++ source file",
-			"h":"C/C++ header", "hpp":"C++ header", "go":"Go source file",
-			"rs":"Rust source file", "rb":"Ruby file", "php":"PHP file", "sql":"SQL file",
-			# system
-			"dll":"Application extension", "sys":"System file", "drv":"Device driver",
-			"lnk":"Shortcut", "ini":"Configuration settings", "log":"Log file",
-		}
-		# find last extension piece
-		ext = nm.rsplit(".", 1)[-1] if "." in nm else ""
-		if ext in EXT: return EXT[ext]
-		# fallback to mimetypes for unknowns
-		kind, _ = mimetypes.guess_type(nm)
-		if kind:
-			main = kind.split("/", 1)[0]
-			label = {
-				"image":"Image file", "audio":"Audio file", "video":"Video file",
-				"text":"Text file", "application":"Application file",
-			}.get(main, "File")
-			return label
-		return "File"
+		return _guess_type(name, is_dir)
 
 	def _entries_to_map(self, entries: list[dict]) -> dict[str, tuple[bool, int, int, str, int, str]]:
 		"""
 		name -> (is_dir, raw_size, mtime_ms, type_label, item_count_for_dir, owner)
 		"""
-		m: dict[str, tuple[bool, int, int, str, int, str]] = {}
-		for r in entries or []:
-			name = str(r.get("name") or _basename_for_label(str(r.get("path") or "")) or "")
-			is_dir = self._coerce_is_dir(r)
-			sz = self._coerce_size_int(r)
-			mt = self._coerce_mtime_ms(r)
-			tl = "File folder" if is_dir else (self._guess_type(name, False) or "File")
-			# optional item counts
-			items = 0
-			for k in ("items", "child_count", "children", "count"):
-				try:
-					v = r.get(k)
-					if isinstance(v, (int, float)) and int(v) > 0:
-						items = int(v); break
-				except Exception:
-					pass
-			owner = self._coerce_owner(r)
-			m[name] = (is_dir, sz, mt, tl, items, owner)
+		# fs.list replies are normally pre-mapped on the websocket decode thread
+		m = getattr(entries, "mapped", None)
+		m = dict(m) if m is not None else listing_map(entries)
+		if self._owner_cache:
+			for name, v in m.items():
+				if not v[5] and name in self._owner_cache:
+					m[name] = v[:5] + (self._owner_cache[name],)
 		return m
 
-	def _set_row(self, row: int, name: str, is_dir: bool, size: int, mtime_ms: int, type_label: str, owner: str, dir_items: int = 0):
+	def _make_row(self, name: str, is_dir: bool, size: int, mtime_ms: int, type_label: str, owner: str, dir_items: int = 0) -> FileRow:
 		icon = self.icon_dir if is_dir else self.icon_file
-		self.table.setItem(row, 0, NameItem(self._fmt_label(name, is_dir), is_dir, icon))
-		self.table.setItem(row, 1, QTableWidgetItem(self._fmt_dt(mtime_ms)))
-		self.table.setItem(row, 2, QTableWidgetItem(type_label))
-		self.table.setItem(row, 3, QTableWidgetItem(owner or ""))  # <-- Owner
-
-		# Size column (files → bytes; folders → items/bytes/blank)
-		if not is_dir:
-			disp, sort_v = self._fmt_bytes(size), size
-		else:
-			if dir_items > 0:
-				disp, sort_v = (f"{dir_items} item" if dir_items == 1 else f"{dir_items} items"), dir_items
-			elif size > 0:
-				disp, sort_v = self._fmt_bytes(size), size
-			else:
-				disp, sort_v = "", 0
-		self.table.setItem(row, 4, SizeItem(disp, sort_v))        # <-- moved to col 4
+		return FileRow(self._fmt_label(name, is_dir), is_dir, size=size, mtime_ms=mtime_ms,
+					   type_label=type_label, owner=owner, items=dir_items, icon=icon)
+
+	def _row(self, view_row: int) -> FileRow | None:
+		"""FileRow behind a (proxy) row of the table."""
+		src = self.proxy.mapToSource(self.proxy.index(view_row, 0))
+		return self.model.row_at(src.row()) if src.isValid() else None
+
+	def _selected_file_rows(self) -> list[FileRow]:
+		rows = [self._row(i.row()) for i in self.table.selectionModel().selectedRows()]
+		return [r for r in rows if r is not None]
 
 	def _apply_search_filter(self, text: str):
-		text = (text or "").lower()
-		for r in range(self.table.rowCount()):
-			nm = (self.table.item(r, 0).text() if self.table.item(r,0) else "").lower()
-			self.table.setRowHidden(r, bool(text) and text not in nm)
+		self.proxy.set_needle(text)
 
 	def _unique_name(self, base: str, *, ext: str = "", is_dir: bool = False) -> str:
 		existing = set((self._last_listing or {}).keys())
@@ -1623,19 +1829,16 @@ class FileBrowser(QWidget):
 			pass
 
 	def _delete_selection(self):
-		rows = [i.row() for i in self.table.selectionModel().selectedRows()]
+		rows = self._selected_file_rows()
 		if not rows:
 			return
 
 		# Build list of targets
 		sep = _sep_for(self.path, self.os_type)
 		targets = []
-		for r in rows:
-			item = self.table.item(r, 0)
-			if not item:
-				continue
-			name = item.text().rstrip("/")
-			is_dir = isinstance(item, NameItem) and item.is_dir
+		for item in rows:
+			name = item.name.rstrip("/")
+			is_dir = item.is_dir
 			remote = self.path + ("" if self.path.endswith(sep) else sep) + name
 			targets.append((name, remote, is_dir))
 
@@ -1709,18 +1912,18 @@ class FileBrowser(QWidget):
 		self.fws.start_upload_folder(self.sid, local, remote_dir, os_type=self.os_type)
 
 
-	def _open_in_new_tab_from_item(self, item: QTableWidgetItem):
+	def _open_in_new_tab_from_item(self, item: FileRow):
 		"""Open the clicked item in a new tab. Works for both real folders and
-		pseudo rows (drives/quick) that carry a target path in Qt.UserRole."""
+		pseudo rows (drives/quick) that carry a target path."""
 		if not item:
 			return
 		# Resolve target path
-		target = item.data(Qt.UserRole)
+		target = item.target
 		if target:
 			target = str(target)
 		else:
 			# Normal folder row
-			name = item.text().rstrip("/")
+			name = item.name.rstrip("/")
 			target = self._join_path(self.path, name)
 
 		# Create tab and navigate there
@@ -1776,6 +1979,10 @@ class FileBrowser(QWidget):
 		log.debug("refresh reason=%s path=%s pending=%s showing_drives=%s showing_quick=%s transport=%s (sid=%s)",
 				  getattr(self, "_refresh_reason", None), self.path, self._pending_path, self._showing_drives, self._showing_quick, self.transport, self.sid)
 		# When showing faux tables, do not call list_dir; refresh the faux data instead.
+		if self._showing_drives or self._showing_quick:
+			# leaving the folder view; stop any listing still streaming in
+			self._page_live = False
+			self.fws.cancel_list()
 		if self._showing_drives:
 			self._busy = True
 			self.status.setText("Loading drives…")
@@ -1816,12 +2023,119 @@ class FileBrowser(QWidget):
 		self._req_seq += 1
 		self._inflight_req = (self._req_seq, target, getattr(self, "_refresh_reason", None), time.time())
 		log.debug("list_dir begin req=%s target=%s reason=%s (sid=%s)", self._req_seq, target, getattr(self, "_refresh_reason", None), self.sid)
-		self.fws.list_dir(self.sid, target); self._busy_guard.start(self._busy_timeout_ms())
+		fresh, self._want_fresh = self._want_fresh, False
+		self._page_live = False
+		self.fws.list_dir(self.sid, target, lazy_owner=self._lazy_owners(), fresh=fresh, page_size=LIST_PAGE_SIZE)
+		self._busy_guard.start(self._busy_timeout_ms())
+
+	def _manual_refresh(self):
+		# an explicit refresh skips the teamserver's shared listing cache
+		self._want_fresh = True
+		self._kick_live(immediate=True)
+
+	def _lazy_owners(self) -> bool:
+		return self.os_type == "windows"
+
+	def _request_visible_owners(self):
+		"""Ask for owners of the rows currently on screen that still lack one."""
+		if not self._lazy_owners() or self._showing_drives or self._showing_quick:
+			return
+		n = self.proxy.rowCount()
+		if not n:
+			return
+		top = max(0, self.table.rowAt(0))
+		bottom = self.table.rowAt(self.table.viewport().height() - 1)
+		bottom = n - 1 if bottom < 0 else bottom
+		names = []
+		for vr in range(top, bottom + 1):
+			r = self._row(vr)
+			if r is not None and not r.owner and r.name not in self._owner_asked:
+				names.append(r.name)
+		if names:
+			self._owner_asked.update(names)
+			self.fws.request_owners(self.sid, self.path, names)
+
+	def _on_owners(self, path: str, owners: dict):
+		if self._norm_path(path) != self._norm_path(self.path):
+			return  # reply for a folder we already left
+		owners = {str(k): str(v or "") for k, v in owners.items()}
+		self._owner_cache.update(owners)
+		self.model.set_owners(owners)
+		# keep the diff baseline in step so the next refresh doesn't flag these rows
+		for name, o in owners.items():
+			v = self._last_listing.get(name)
+			if v is not None:
+				self._last_listing[name] = v[:5] + (o,)
+
+	@staticmethod
+	def _map_row_args(v: tuple) -> tuple:
+		"""_entries_to_map value -> _make_row positional args (after name)."""
+		is_dir, size, mt, tl, items, owner = v
+		return is_dir, size, mt, tl, owner, items
 
 	def _fmt_label(self, name: str, is_dir: bool) -> str:
 		# Don’t suffix folders with a slash on any OS
 		return name
 
+	def _visible_entries(self, path: str, entries: list) -> list:
+		# If we’re listing the Users root, show directories only and exclude hidden
+		_entries = entries or []
+		if self._is_users_root(path):
+			try:
+				_entries = [
+					e for e in _entries
+					if bool(e.get("is_dir")) and not self._entry_is_hidden(e)
+				]
+			except Exception:
+				_entries = [e for e in _entries if bool(e.get("is_dir"))]
+		return _entries
+
+	def _on_list_page(self, path: str, entries: list, cursor: int, done: bool, ok: bool):
+		"""
+		Paged fs.list. Navigating into a folder shows the first page right away
+		and appends the rest as they arrive; a refresh of the folder already on
+		screen is buffered and diffed once at the end (a partial listing would
+		look like deletions).
+		"""
+		if cursor == 0:
+			self._page_buf = MappedEntries([], {})
+			self._page_live = False
+		if self._page_live:
+			self._append_list_page(entries)
+			if done:
+				self._page_live = False
+				self._busy = False
+				self._busy_guard.stop()
+				self.status.setText(f"Live • {len(self._last_listing)} item(s)")
+			else:
+				self._busy_guard.start(self._busy_timeout_ms())
+			return
+
+		self._page_buf.extend(entries)
+		self._page_buf.mapped.update(getattr(entries, "mapped", None) or listing_map(entries))
+		if done or not ok:
+			buf, self._page_buf = self._page_buf, MappedEntries([], {})
+			self._on_list(path, buf, ok)
+			return
+
+		if self._norm_path(path) != self.path:
+			# first page of a navigation: commit the folder with what we have
+			buf, self._page_buf = self._page_buf, MappedEntries([], {})
+			self._on_list(path, buf, True)
+			if self._norm_path(path) == self.path and self._inflight_req is None:
+				self._page_live = True
+				self._busy = True
+				self._busy_guard.start(self._busy_timeout_ms())
+				self.status.setText(f"Listing… {len(self._last_listing)} item(s)")
+
+	def _append_list_page(self, entries: list):
+		add = {n: v for n, v in self._entries_to_map(self._visible_entries(self.path, entries)).items()
+			   if n not in self._last_listing}
+		if add:
+			self.model.apply_diff(set(), {}, [self._make_row(n, *self._map_row_args(v)) for n, v in add.items()])
+			self._last_listing.update(add)
+		self.status.setText(f"Listing… {len(self._last_listing)} item(s)")
+
 	def _on_list(self, path: str, entries: list, ok: bool = True):
 		self._busy = False
 		self._busy_guard.stop()
@@ -1851,6 +2165,9 @@ class FileBrowser(QWidget):
 
 		new_path = attempted
 		path_changed = (new_path != self.path)
+		if path_changed:
+			self._owner_cache.clear()
+			self._owner_asked.clear()
 
 		# commit path
 		self.path = new_path
@@ -1859,39 +2176,17 @@ class FileBrowser(QWidget):
 			self.path_edit.setText(self.path)
 		self._rebuild_breadcrumbs()
 
-		# If we’re listing the Users root, show directories only and exclude hidden
-		_entries = entries or []
-		if self._is_users_root(attempted):
-			try:
-				_entries = [
-					e for e in _entries
-					if bool(e.get("is_dir")) and not self._entry_is_hidden(e)
-				]
-			except Exception:
-				_entries = [e for e in _entries if bool(e.get("is_dir"))]
-		new_map = self._entries_to_map(_entries)
+		new_map = self._entries_to_map(self._visible_entries(attempted, entries))
 
 		# --- NEW: hard rebuild when navigating into a different folder ---
 		if path_changed:
-			header = self.table.horizontalHeader()
-			sort_col = header.sortIndicatorSection()
-			sort_order = header.sortIndicatorOrder()
-
-			was_sort = self.table.isSortingEnabled()
-			self.table.setSortingEnabled(False)
-			self.table.setUpdatesEnabled(False)
-			try:
-				self.table.clearSelection()
-				# hard rebuild branch
-				self._ensure_main_columns()
-				self.table.setRowCount(0)
-				for name, (is_dir, size, mt, tl, items, owner) in new_map.items():
-					r = self.table.rowCount(); self.table.insertRow(r)
-					self._set_row(r, name, is_dir, size, mt, tl, owner, items)
-			finally:
-				self.table.setUpdatesEnabled(True)
-				self.table.setSortingEnabled(was_sort)
-				if was_sort: self.table.sortItems(sort_col, sort_order)
+			# hard rebuild branch: one model reset, rows sorted before the view sees them
+			self.table.clearSelection()
+			self._ensure_main_columns()
+			self.model.set_rows([
+				self._make_row(name, is_dir, size, mt, tl, owner, items)
+				for name, (is_dir, size, mt, tl, items, owner) in new_map.items()
+			])
 
 			self._last_listing = new_map
 			self.status.setText(f"Live • {len(new_map)} item(s)")
@@ -1921,61 +2216,24 @@ class FileBrowser(QWidget):
 
 		self._hist_freeze = False
 
-		# Preserve UX state
-		vbar = self.table.verticalScrollBar(); scroll_pos = vbar.value()
-		header = self.table.horizontalHeader()
-		sort_col = header.sortIndicatorSection(); sort_order = header.sortIndicatorOrder()
-		selected_names = [self.table.item(i.row(), 0).text().rstrip("/") for i in self.table.selectionModel().selectedRows()]
-
-		# Current rows index
-		cur_rows: dict[str, int] = {}
-		for r in range(self.table.rowCount()):
-			nm = self.table.item(r, 0).text().rstrip("/")
-			cur_rows[nm] = r
-
 		# Diff
 		old = self._last_listing
 		old_names = set(old.keys()); new_names = set(new_map.keys())
-		removed = sorted(list(old_names - new_names))
-		added   = sorted(list(new_names - old_names))
+		removed = old_names - new_names
+		added   = sorted(new_names - old_names)
 		intersect = old_names & new_names
-		changed = sorted([n for n in intersect if old[n] != new_map[n]])
+		changed = [n for n in intersect if old[n] != new_map[n]]
 
-		# Patch table
-		was_sort = self.table.isSortingEnabled()
-		self.table.setSortingEnabled(False)
-		self.table.setUpdatesEnabled(False)
-		try:
-			# ensure correct columns in case we previously showed a pseudo view
-			self._ensure_main_columns()
-			for row in sorted([cur_rows[n] for n in removed if n in cur_rows], reverse=True):
-				self.table.removeRow(row)
-
-			# patch branch
-			for name in changed:
-				row = cur_rows.get(name)
-				if row is None: continue
-				is_dir, size, mt, tl, items, owner = new_map[name]
-				self._set_row(row, name, is_dir, size, mt, tl, owner, items)
-
-			for name in added:
-				is_dir, size, mt, tl, items, owner = new_map[name]
-				row = self.table.rowCount(); self.table.insertRow(row)
-				self._set_row(row, name, is_dir, size, mt, tl, owner, items)
-
-			self.table.sortItems(sort_col, sort_order)
-			self.table.clearSelection()
-			if selected_names:
-				name_to_row = { self.table.item(r, 0).text().rstrip("/"): r for r in range(self.table.rowCount()) }
-				for nm in selected_names:
-					r = name_to_row.get(nm)
-					if r is not None: self.table.selectRow(r)
-
-			vbar.setValue(scroll_pos)
-		finally:
-			self.table.setUpdatesEnabled(True)
-			self.table.setSortingEnabled(was_sort)
-			if was_sort: self.table.sortItems(sort_col, sort_order)
+		# Patch model in place; selection and scroll follow persistent indexes.
+		# Coming back from a pseudo view (different columns) means a full fill.
+		if self._ensure_main_columns():
+			self.model.set_rows([self._make_row(n, *self._map_row_args(v)) for n, v in new_map.items()])
+		else:
+			self.model.apply_diff(
+				removed,
+				{n: self._make_row(n, *self._map_row_args(new_map[n])) for n in changed},
+				[self._make_row(n, *self._map_row_args(new_map[n])) for n in added],
+			)
 
 		self._last_listing = new_map
 		self.status.setText(f"Live • {len(new_map)} item(s)")
@@ -2116,14 +2374,11 @@ class FileBrowser(QWidget):
 		log.debug("cell_dbl row=%s col=%s pseudo_drives=%s pseudo_quick=%s (sid=%s)", row, col, self._showing_drives, self._showing_quick, self.sid)
 		# Special cases: faux tables ("This PC" drives / Quick access)
 		if self._showing_drives or self._showing_quick:
-			item0 = self.table.item(row, 0)
+			item0 = self._row(row)
 			if item0 is not None:
-				try:
-					log.debug("cell_dbl pseudo item text=%r role=%r (sid=%s)", item0.text(), item0.data(Qt.UserRole), self.sid)
-				except Exception:
-					log.debug("cell_dbl pseudo item with no text/role (sid=%s)", self.sid)
+				log.debug("cell_dbl pseudo item text=%r target=%r (sid=%s)", item0.name, item0.target, self.sid)
 
-				target = item0.data(Qt.UserRole)
+				target = item0.target
 				if target:
 					# We're leaving the pseudo view; drop flags and any overlay immediately
 					# Consistent exit path (handles C: -> C:\ normalization and queuing)
@@ -2138,15 +2393,12 @@ class FileBrowser(QWidget):
 				self._navigate_or_queue(qp)
 			return"""
 
-		name_item = self.table.item(row, 0)
+		name_item = self._row(row)
 		if not name_item:
 			return
 
 		# Robust fallback: if the visible text ends with "(X:)" treat it as a drive root.
-		try:
-			txt = name_item.text()
-		except Exception:
-			txt = ""
+		txt = name_item.name or ""
 		m = re.search(r"\(([A-Za-z]:)\)\s*$", txt or "")
 		if m:
 			# Navigate directly to the drive root even if flags desynced.
@@ -2161,17 +2413,20 @@ class FileBrowser(QWidget):
 			self._navigate_or_queue((txt or "").strip())
 			return
 
-		name = name_item.text()
+		name = name_item.name
 		base = name[:-1] if name.endswith("/") else name
-		if isinstance(name_item, NameItem) and name_item.is_dir:
+		if name_item.is_dir:
 			target = self._join_path(self.path, base)
 			self._navigate_or_queue(target)
 		else:
 			# ---- NEW: open text-like files in Sentinel editor; others download as before ----
-			type_label = self.table.item(row, 2).text() if self.table.item(row, 2) else ""
+			type_label = name_item.type_label
 			if self._is_text_like(base, type_label):
 				remote = self._join_path(self.path, base)
-				self._open_remote_text_in_editor(remote, base)
+				if name_item.size > PAGED_THRESHOLD:
+					self._open_remote_paged(remote, base)
+				else:
+					self._open_remote_text_in_editor(remote, base)
 			else:
 				log.debug("cell_dbl non-text file -> download (sid=%s)", self.sid)
 				self.download()
@@ -2229,46 +2484,28 @@ class FileBrowser(QWidget):
 		log.debug("render_drives_table count=%s (sid=%s)", len(drives or []), self.sid)
 		self.overlay.setVisible(False)
 		#self._drive_rows.clear()
-		# preserve current sort, then disable sorting while we mutate rows
+		self.table.clearSelection()
+		self.model.set_columns(["Name", "File system", "Used", "Free"])
+		rows = []
+		for d in drives:
+			letter = d.get("letter") or ""
+			label = (d.get("label") or "").strip()
+			size = int(d.get("size") or 0); used = int(d.get("used") or 0); free = int(d.get("free") or 0)
+			name = f"{label} ({letter})" if label and len(letter) <= 6 else (letter or label or "Drive")
+			# Normalize a Windows drive like "C:" -> "C:\"
+			target = letter
+			if self.os_type == "windows" and len(target) == 2 and target[1] == ":":
+				target += "\\"
+			fs = "" if self.os_type == "windows" else (d.get("label") or "")
+			# Store the target root/mount directly on the row so sorting is safe
+			log.debug("drives_table name=%s -> target=%s (sid=%s)", name, target, self.sid)
+			rows.append(FileRow(name, True, target=target, icon=self.icon_drive,
+								cells=[name, fs, self._fmt_bytes(used), self._fmt_bytes(free)],
+								keys=[name.lower(), fs.lower(), used, free], right_cols=(2, 3)))
+		self.model.set_rows(rows)
 		hdr = self.table.horizontalHeader()
-		sort_col = hdr.sortIndicatorSection()
-		sort_order = hdr.sortIndicatorOrder()
-		self.table.setSortingEnabled(False)
-		self.table.setUpdatesEnabled(False)
-		try:
-			self.table.clearSelection()
-			self.table.setRowCount(0)
-			self.table.setColumnCount(4)
-			self.table.setHorizontalHeaderLabels(["Name", "File system", "Used", "Free"])
-			"""# Temporarily freeze sorting to avoid row index churn while inserting
-			was_sorting = self.table.isSortingEnabled()
-			self.table.setSortingEnabled(False)"""
-			for d in drives:
-				letter = d.get("letter") or ""
-				label = (d.get("label") or "").strip()
-				size = int(d.get("size") or 0); used = int(d.get("used") or 0); free = int(d.get("free") or 0)
-				name = f"{label} ({letter})" if label and len(letter) <= 6 else (letter or label or "Drive")
-				# Normalize a Windows drive like "C:" -> "C:\"
-				target = letter
-				if self.os_type == "windows" and len(target) == 2 and target[1] == ":":
-					target += "\\"
-
-				r = self.table.rowCount(); self.table.insertRow(r)
-				item0 = NameItem(name, True, self.icon_drive)
-				# Store the target root/mount directly on the item so sorting is safe
-				item0.setData(Qt.UserRole, target)
-				log.debug("drives_table row=%s name=%s -> target=%s (sid=%s)", r, name, target, self.sid)
-				self.table.setItem(r, 0, item0)
-				self.table.setItem(r, 1, QTableWidgetItem("" if self.os_type=="windows" else (d.get("label") or "")))
-				self.table.setItem(r, 2, SizeItem(self._fmt_bytes(used), used))
-				self.table.setItem(r, 3, SizeItem(self._fmt_bytes(free), free))
-			hdr.setSectionResizeMode(0, QHeaderView.Stretch)
-			for i in (1,2,3): hdr.setSectionResizeMode(i, QHeaderView.ResizeToContents)
-		finally:
-			self.table.setUpdatesEnabled(True)
-			self.table.setSortingEnabled(True)
-			# restore previous sort choice
-			self.table.sortItems(sort_col, sort_order)
+		hdr.setSectionResizeMode(0, QHeaderView.Stretch)
+		for i in (1,2,3): hdr.setSectionResizeMode(i, QHeaderView.ResizeToContents)
 
 	def _render_quick_table(self, quickpaths: dict):
 		log.debug("render_quick_table count=%s (sid=%s)", len(quickpaths or {}), self.sid)
@@ -2278,71 +2515,43 @@ class FileBrowser(QWidget):
 		"""
 		self.overlay.setVisible(False)
 		#self._quick_rows.clear()
-		# preserve current sort, then disable sorting while we mutate rows
+		self.table.clearSelection()
+		# Explorer-like: no full path column here; just show friendly names
+		self.model.set_columns(["Name"])
+		labels = [
+			("desktop",   "Desktop"),
+			("documents", "Documents"),
+			("downloads", "Downloads"),
+			("pictures",  "Pictures"),
+			("videos",    "Videos"),
+		]
+		rows = []
+		for key, label in labels:
+			# Store the target path on the row; double-click will use this.
+			target = quickpaths.get(key) or None
+			rows.append(FileRow(label, True, target=target, icon=self.icon_dir, cells=[label], right_cols=()))
+		self.model.set_rows(rows)
 		hdr = self.table.horizontalHeader()
-		sort_col = hdr.sortIndicatorSection()
-		sort_order = hdr.sortIndicatorOrder()
-		self.table.setSortingEnabled(False)
-		self.table.setUpdatesEnabled(False)
-		try:
-			self.table.clearSelection()
-			self.table.setRowCount(0)
-			# Explorer-like: no full path column here; just show friendly names
-			self.table.setColumnCount(1)
-			self.table.setHorizontalHeaderLabels(["Name"])
-			labels = [
-				("desktop",   "Desktop"),
-				("documents", "Documents"),
-				("downloads", "Downloads"),
-				("pictures",  "Pictures"),
-				("videos",    "Videos"),
-			]
-			for key, label in labels:
-				target = quickpaths.get(key) or ""
-				r = self.table.rowCount(); self.table.insertRow(r)
-				item0 = NameItem(label, True, self.icon_dir)
-				if target:
-					# Store the target path on the item; double-click will use this.
-					item0.setData(Qt.UserRole, target)
-				self.table.setItem(r, 0, item0)
-			hdr = self.table.horizontalHeader()
-			hdr.setSectionResizeMode(0, QHeaderView.Stretch)
-		finally:
-			self.table.setUpdatesEnabled(True)
-			self.table.setSortingEnabled(True)
-			# restore previous sort choice
-			self.table.sortItems(sort_col, sort_order)
+		hdr.setSectionResizeMode(0, QHeaderView.Stretch)
 
 	def _render_quickaccess_table(self):
 		"""Render a faux view of Quick access targets (local client paths)."""
 		self.overlay.setVisible(False)
 		labels = [("videos","Videos"),("pictures","Pictures"),("downloads","Downloads"),
 				  ("documents","Documents"),("desktop","Desktop")]
-		self.table.setUpdatesEnabled(False)
-		try:
-			self.table.clearSelection()
-			self.table.setRowCount(0)
-			self.table.setHorizontalHeaderLabels(["Name", "Path", "Type", "Size"])
-			was_sorting = self.table.isSortingEnabled()
-			self.table.setSortingEnabled(False)
-			for key, label in labels:
-				p = self._quickpaths.get(key)
-				if not p:
-					continue
-				r = self.table.rowCount(); self.table.insertRow(r)
-				item0 = NameItem(label, True, self.icon_dir)
-				item0.setData(Qt.UserRole, p)  # store target path
-				self.table.setItem(r, 0, item0)
-				self.table.setItem(r, 1, QTableWidgetItem(p))
-				self.table.setItem(r, 2, QTableWidgetItem(""))
-				self.table.setItem(r, 3, QTableWidgetItem(""))
-			self.table.setSortingEnabled(was_sorting)
-			hdr = self.table.horizontalHeader()
-			hdr.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-			hdr.setSectionResizeMode(1, QHeaderView.Stretch)
-			for i in (2,3): hdr.setSectionResizeMode(i, QHeaderView.ResizeToContents)
-		finally:
-			self.table.setUpdatesEnabled(True)
+		self.table.clearSelection()
+		self.model.set_columns(["Name", "Path", "Type", "Size"])
+		rows = []
+		for key, label in labels:
+			p = self._quickpaths.get(key)
+			if not p:
+				continue
+			rows.append(FileRow(label, True, target=p, icon=self.icon_dir, cells=[label, p, "", ""], right_cols=()))
+		self.model.set_rows(rows)
+		hdr = self.table.horizontalHeader()
+		hdr.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+		hdr.setSectionResizeMode(1, QHeaderView.Stretch)
+		for i in (2,3): hdr.setSectionResizeMode(i, QHeaderView.ResizeToContents)
 
 	# ----- Helpers -----
 	def _norm_path(self, p: str) -> str:
@@ -2468,11 +2677,11 @@ class FileBrowser(QWidget):
 
 	# ---------- Download / Upload ----------
 	def download(self):
-		rows = self.table.selectionModel().selectedRows()
+		rows = self._selected_file_rows()
 		if not rows: return
-		name_item = self.table.item(rows[0].row(), 0)
-		is_dir = isinstance(name_item, NameItem) and name_item.is_dir
-		name = name_item.text().rstrip("/")
+		name_item = rows[0]
+		is_dir = name_item.is_dir
+		name = name_item.name.rstrip("/")
 		sep = _sep_for(self.path, self.os_type)
 		remote = self.path + ("" if self.path.endswith(sep) else sep) + name
 		log.info("download start name=%s is_dir=%s remote=%s (sid=%s)", name, is_dir, remote, self.sid)
@@ -2483,11 +2692,23 @@ class FileBrowser(QWidget):
 			if not dest_dir: return
 			ext = ".zip" if self.os_type == "windows" else ".tar.gz"
 			tmp_local = os.path.join(tempfile.mkdtemp(prefix="gc2_dl_client_"), name + ext)
+			# archive bytes go to a worker that writes the archive and extracts as they arrive
+			self._save_fp = None
+			self._dl_stream_files = 0
 			try:
-				self._save_fp = open(tmp_local, "wb")
-			except Exception as e:
-				QMessageBox.critical(self, "Download", str(e)); return
-			log.debug("download folder tmp_archive=%s extract_to=%s (sid=%s)", tmp_local, dest_dir, self.sid)
+				self._dl_stream = StreamingExtractor(tmp_local, os.path.join(dest_dir, name), strip_root=name, parent=self)
+				self._dl_stream.file_ready.connect(self._on_stream_file)
+				self._dl_stream.done.connect(self._on_stream_done)
+			except Exception:
+				# fall back to saving the whole archive and extracting it at the end
+				log.exception("streaming extract unavailable (sid=%s)", self.sid)
+				self._dl_stream = None
+				try:
+					self._save_fp = open(tmp_local, "wb")
+				except Exception as e:
+					QMessageBox.critical(self, "Download", str(e)); return
+			log.debug("download folder tmp_archive=%s extract_to=%s streaming=%s (sid=%s)",
+					  tmp_local, dest_dir, self._dl_stream is not None, self.sid)
 
 			# mark state for post-extract
 			self._dl_is_folder = True
@@ -2535,6 +2756,9 @@ class FileBrowser(QWidget):
 			except Exception:
 				pass
 			return
+		if self._dl_stream is not None:
+			self._dl_stream.feed(data)
+			return
 		# existing behavior
 		try:
 			if hasattr(self, "_save_fp") and self._save_fp: self._save_fp.write(data)
@@ -2585,6 +2809,16 @@ class FileBrowser(QWidget):
 		except Exception:
 			log.exception("download close failed (sid=%s)", self.sid)
 
+		stream = self._dl_stream
+		if stream is not None:
+			if status == "done":
+				# the worker finishes the archive/extraction, then _on_stream_done wraps up
+				stream.finish()
+				self.status.setText("Finishing extraction…")
+				return
+			self._dl_stream = None
+			stream.abort()
+
 		if status != "done":
 			QMessageBox.critical(self, "Download", f"{status}: {error or 'failed'}")
 			log.error("download failed tid=%s status=%s error=%s (sid=%s)", tid, status, error, self.sid)
@@ -2739,7 +2973,6 @@ class FileBrowser(QWidget):
 
 				# remove archive after successful extraction
 				try:
-					os.system(f"mv {arch} /home/kali/thatthing.zip")
 					os.remove(arch)
 				except Exception:
 					log.exception("post-extract remove failed (sid=%s)", self.sid)
@@ -2770,6 +3003,61 @@ class FileBrowser(QWidget):
 			self.status.setText("Download complete")
 			log.info("download complete (file) (sid=%s)", self.sid)
 			
+	def _on_stream_file(self, path: str):
+		stream = self._dl_stream
+		self._dl_stream_files += 1
+		if self._dl_stream_files == 1 and stream is not None:
+			log.info("download first file after %.2fs: %s (sid=%s)", stream.first_file_s or 0.0, path, self.sid)
+			self.status.setText(f"First file after {stream.first_file_s or 0.0:.2f} s: {os.path.basename(path)}")
+			self._dl_stream_status_t = time.time()
+		elif time.time() - self._dl_stream_status_t >= 0.25:
+			self._dl_stream_status_t = time.time()
+			self.status.setText(f"Downloading… {self._dl_stream_files:,} file(s) extracted")
+
+	def _on_stream_done(self, ok: bool, err: str, info: dict):
+		"""Streaming extract worker finished (after fs.download.end, or aborted by it)."""
+		if self.sender() is not self._dl_stream:
+			# aborted by a failed download; that path already reported it
+			arch = (info or {}).get("archive") or ""
+			try:
+				if arch and os.path.exists(arch):
+					os.remove(arch)
+			except Exception:
+				log.exception("download cleanup failed (sid=%s)", self.sid)
+			return
+		self._dl_stream = None
+		arch = info.get("archive") or ""
+		dest = os.path.join(getattr(self, "_dl_extract_to", ""), getattr(self, "_dl_folder_name", "folder"))
+		got = int(info.get("bytes") or 0)
+		expect = self._dl_expect_total
+		first = info.get("first_file_s")
+		log.info("download stream extract ok=%s err=%s kind=%s files=%s bytes=%d expect=%s first_file_s=%s dest=%s (sid=%s)",
+				 ok, err, info.get("kind"), info.get("files"), got, expect, first, dest, self.sid)
+		if ok and expect and got != expect:
+			ok, err = False, f"Truncated on client: got={got} expected={expect}"
+		if ok:
+			try:
+				os.remove(arch)
+			except Exception:
+				log.exception("post-extract remove failed (sid=%s)", self.sid)
+			when = f" (first file after {first:.2f} s)" if first is not None else ""
+			QMessageBox.information(self, "Download", f"Folder downloaded to:\n{dest}{when}")
+			log.info("download complete (folder) dest=%s (sid=%s)", dest, self.sid)
+			self.status.setText("Download complete")
+			return
+		# preserve the evidence
+		try:
+			if arch and os.path.exists(arch):
+				os.replace(arch, arch + ".bad")
+				arch += ".bad"
+		except Exception:
+			pass
+		QMessageBox.warning(self, "Download",
+							f"Downloaded archive saved but extract failed:\n{err}\n\n"
+							f"{info.get('files') or 0} file(s) already extracted to {dest}\nArchive: {arch}")
+		log.error("download extract failed; saved at=%s err=%s (sid=%s)", arch, err, self.sid)
+		self.status.setText("Download complete (archive left)")
+
 	def _sha256_path(self, p: str) -> str:
 		h = hashlib.sha256()
 		with open(p, "rb") as f:
@@ -2793,69 +3081,15 @@ class FileBrowser(QWidget):
 		return (size - scan + pos) if pos != -1 else None
 
 	# ---------- Safe local extraction (GUI side) ----------
+	# Rules live in archive_safe_extract (shared with the streaming extractor).
 	def _ensure_inside(self, root: str, path: str) -> None:
-		ab_root = os.path.abspath(root)
-		ab_path = os.path.abspath(path)
-		if not (ab_path == ab_root or ab_path.startswith(ab_root + os.sep)):
-			raise RuntimeError(f"Unsafe path in archive: {path}")
+		ensure_inside(root, path)
 
 	def _safe_extract_zip(self, zf: zipfile.ZipFile, dest_dir: str, *, strip_root: str | None = None) -> None:
-		"""
-		Normalize backslashes to forward slashes, prevent traversal, create dirs,
-		and (optionally) strip a redundant top-level folder that matches strip_root.
-		"""
-		os.makedirs(dest_dir, exist_ok=True)
-		sr = (strip_root or "").strip().lower()
-		for info in zf.infolist():
-			raw = info.filename or ""
-			norm = raw.replace("\\", "/")
-			parts = [p for p in norm.split("/") if p]
-			# Strip common top-level folder if it equals the chosen folder name
-			if parts and sr and parts[0].lower() == sr:
-				parts = parts[1:]
-			if not parts:
-				# entry was root or just a dir marker for the root
-				continue
-			target = os.path.join(dest_dir, *parts)
-			self._ensure_inside(dest_dir, target)
-			if raw.endswith("/") or raw.endswith("\\"):
-				os.makedirs(target, exist_ok=True)
-			else:
-				os.makedirs(os.path.dirname(target), exist_ok=True)
-				with zf.open(info, "r") as src, open(target, "wb") as dst:
-					while True:
-						chunk = src.read(1024 * 1024)
-						if not chunk:
-							break
-						dst.write(chunk)
+		safe_extract_zip(zf, dest_dir, strip_root=strip_root)
 
 	def _safe_extract_tar(self, tf: tarfile.TarFile, dest_dir: str, *, strip_root: str | None = None) -> None:
-		os.makedirs(dest_dir, exist_ok=True)
-		sr = (strip_root or "").strip().lower()
-		for member in tf.getmembers():
-			# Skip links for safety
-			if member.issym() or member.islnk():
-				continue
-			parts = [p for p in (member.name or "").split("/") if p]
-			if parts and sr and parts[0].lower() == sr:
-				parts = parts[1:]
-			if not parts:
-				continue
-			target = os.path.join(dest_dir, *parts)
-			self._ensure_inside(dest_dir, target)
-			if member.isdir():
-				os.makedirs(target, exist_ok=True)
-				continue
-			os.makedirs(os.path.dirname(target), exist_ok=True)
-			src = tf.extractfile(member)
-			if src is None:
-				continue
-			with src, open(target, "wb") as dst:
-				while True:
-					chunk = src.read(1024 * 1024)
-					if not chunk:
-						break
-					dst.write(chunk)
+		safe_extract_tar(tf, dest_dir, strip_root=strip_root)
 
 	def upload_folder(self):
 		local = QFileDialog.getExistingDirectory(self, "Upload Folder")
@@ -1,8 +1,147 @@
 # gui/files_ws_client.py
-from PyQt5.QtCore import QObject, pyqtSignal, QUrl
+from PyQt5.QtCore import QObject, QThread, QCoreApplication, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtWebSockets import QWebSocket
 from PyQt5.QtNetwork import QAbstractSocket
-import json, os, zipfile, tarfile, tempfile, shutil
+from collections import deque
+import binascii, json, os, uuid, zipfile, tarfile, tempfile, shutil
+
+from ws_transport import WSTransport, ws_request
+
+UPLOAD_CHUNK = 256 * 1024
+DEFAULT_UPLOAD_WINDOW = 8 * 1024 * 1024   # servers that don't grant one in fs.upload.accept
+UPLOAD_RECONNECT_MAX_MS = 10_000
+
+
+_ul_thread: QThread | None = None
+
+
+def _decode_range(msg: dict):
+	"""fs.range shaper (decode thread): base64 "data" -> bytes."""
+	data = msg.get("data") or ""
+	msg["data"] = binascii.a2b_base64(data) if isinstance(data, str) else bytes(data)
+
+
+def _upload_thread() -> QThread:
+	"""One worker thread shared by every client's upload readers (started lazily)."""
+	global _ul_thread
+	if _ul_thread is None:
+		_ul_thread = QThread()
+		_ul_thread.setObjectName("files-upload")
+		_ul_thread.start()
+		app = QCoreApplication.instance()
+		if app is not None:
+			app.aboutToQuit.connect(_stop_upload_thread)
+	return _ul_thread
+
+
+def _stop_upload_thread():
+	global _ul_thread
+	if _ul_thread is not None:
+		_ul_thread.quit()
+		_ul_thread.wait(2000)
+		_ul_thread = None
+
+
+def _archive_folder(local_dir: str, os_type: str) -> str:
+	"""Pack `local_dir` into a temp zip (Windows targets) or tar.gz; returns its path."""
+	use_zip = (os_type or "").lower() == "windows"
+	suffix = ".zip" if use_zip else ".tar.gz"
+
+	fd, tmp_path = tempfile.mkstemp(prefix="gc2_ul_arch_", suffix=suffix)
+	os.close(fd)
+	base = os.path.basename(os.path.normpath(local_dir)) or "folder"
+
+	try:
+		if use_zip:
+			with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+				for root, _, files in os.walk(local_dir):
+					for name in files:
+						full = os.path.join(root, name)
+						arc = os.path.join(base, os.path.relpath(full, local_dir)).replace("\\", "/")
+						zf.write(full, arcname=arc)
+		else:
+			with tarfile.open(tmp_path, "w:gz") as tf:
+				tf.add(local_dir, arcname=base, recursive=True)
+	except Exception:
+		try: os.remove(tmp_path)
+		except Exception: pass
+		raise
+	return tmp_path
+
+
+class _Upload:
+	"""One queued/running upload, tracked on the UI thread (byte offsets into the source)."""
+	def __init__(self, local_path: str, begin: dict, *, folder: bool = False, os_type: str = ""):
+		self.local_path = local_path
+		self.begin = begin              # fs.upload.begin minus size/upload_id
+		self.folder = folder
+		self.os_type = os_type
+		self.upload_id = uuid.uuid4().hex
+		self.reader: _UploadReader | None = None
+		self.size: int | None = None    # known once the reader is ready
+		self.accepted = False
+		self.window = DEFAULT_UPLOAD_WINDOW
+		self.acked = 0       # bytes the server confirmed
+		self.requested = 0   # bytes asked of the reader
+		self.sent = 0        # bytes written to the socket
+
+
+class _UploadReader(QObject):
+	"""Archives (folders) and reads the upload source on the upload thread."""
+	ready = pyqtSignal(object)           # size
+	failed = pyqtSignal(str)
+	chunk = pyqtSignal(object, object)   # offset, bytes
+
+	def __init__(self, local_path: str, *, folder: bool = False, os_type: str = ""):
+		super().__init__()
+		self._src = local_path
+		self._folder = folder
+		self._os_type = os_type
+		self._path: str | None = None
+		self._tmp_archive: str | None = None
+		self._fh = None
+
+	@pyqtSlot()
+	def prepare(self):
+		try:
+			if self._folder:
+				self._path = self._tmp_archive = _archive_folder(self._src, self._os_type)
+			else:
+				self._path = self._src
+			size = os.path.getsize(self._path)
+		except Exception as e:
+			self.failed.emit(f"Failed to archive folder: {e}" if self._folder else f"Cannot read {self._src}: {e}")
+			return
+		self.ready.emit(size)
+
+	@pyqtSlot(object, object)
+	def read(self, offset, nbytes):
+		try:
+			if self._fh is None:
+				self._fh = open(self._path, "rb")
+			self._fh.seek(offset)
+			end = offset + nbytes
+			while offset < end:
+				data = self._fh.read(min(UPLOAD_CHUNK, end - offset))
+				if not data:
+					raise OSError("file shrank during upload")
+				self.chunk.emit(offset, data)
+				offset += len(data)
+		except Exception as e:
+			self.failed.emit(f"Upload read failed: {e}")
+
+	@pyqtSlot()
+	def close(self):
+		if self._fh is not None:
+			try: self._fh.close()
+			except Exception: pass
+			self._fh = None
+		if self._tmp_archive:
+			try: os.remove(self._tmp_archive)
+			except Exception: pass
+			self._tmp_archive = None
+		self.deleteLater()
+
 
 class FilesWSClient(QObject):
 	connected = pyqtSignal()
@@ -18,15 +157,33 @@ class FilesWSClient(QObject):
 	quickpaths = pyqtSignal(object)         # dict        -> Quick Access
 	created = pyqtSignal(str, str, bool, str)  # kind, path, ok, error
 	deleted = pyqtSignal(str, bool, str)  # path, ok, error
-
-	def __init__(self, base_url: str, token: str, parent=None):
+	owners_ready = pyqtSignal(str, object)  # dir path, {name: owner}
+	list_page = pyqtSignal(str, object, int, bool, bool)  # path, entries, cursor, done, ok
+	range_read = pyqtSignal(object)         # fs.range reply, "data" already bytes
+	# to the current upload's _UploadReader on the upload thread (queued)
+	_ul_prepare = pyqtSignal()
+	_ul_read = pyqtSignal(object, object)   # offset, nbytes
+	_ul_close = pyqtSignal()
+
+	def __init__(self, base_url: str, token: str, parent=None, *, shapers: dict | None = None):
+		"""
+		shapers: {message type: fn(msg)} run on the websocket decode thread before
+		dispatch, e.g. to pre-normalize fs.list entries for the view.
+		"""
 		super().__init__(parent)
 		self.base_url = base_url.rstrip("/")
 		self.token = token
 		self.ws = QWebSocket()
 		self._pending_text: list[str] = []
 		self._ul_explicit_finish = False
-		self._tmp_archive_for_upload: str | None = None
+		self._ul: _Upload | None = None         # upload in progress
+		self._ul_queue: deque = deque()         # uploads waiting for it
+		self._ul_backoff_ms = 0
+		self._ul_retry = QTimer(self)
+		self._ul_retry.setSingleShot(True)
+		self._ul_retry.timeout.connect(self._reconnect_upload)
+		self._list_seq = 0
+		self._list_req: str | None = None  # paged listing we still want pages for
 
 		# robust error hookup across PyQt5 versions
 		if hasattr(self.ws, "errorOccurred"):
@@ -37,19 +194,26 @@ class FilesWSClient(QObject):
 		# flush when connected
 		if hasattr(self.ws, "connected"):
 			self.ws.connected.connect(self._on_connected)
+		self.ws.disconnected.connect(self._on_disconnected)
 
-		self.ws.textMessageReceived.connect(self._on_text)
-		self.ws.binaryMessageReceived.connect(lambda b: self.dl_chunk.emit(bytes(b)))
+		# decoded off the UI thread; binary chunks stay ordered with the text frames around them
+		shapers = dict(shapers or {})
+		shapers.setdefault("fs.range", _decode_range)
+		self._rx = WSTransport(self.ws, self._on_text, on_binary=self.dl_chunk.emit,
+							   shapers=shapers, parent=self)
 
 	def _on_connected(self):
 		self.connected.emit()
 		# flush queued messages
 		while self._pending_text:
 			self.ws.sendTextMessage(self._pending_text.pop(0))
+		job = self._ul
+		if job is not None and job.size is not None and not job.accepted and self._ul_backoff_ms:
+			self._send_upload_begin()  # reconnected mid-upload: resume
 
 	def open(self):
 		ws_url = self.base_url.replace("http", "ws", 1) + f"/ws/files?token={self.token}"
-		self.ws.open(QUrl(ws_url))
+		self.ws.open(ws_request(ws_url))
 
 	def delete(self, sid: str, remote_path: str, *, folder: bool = False):
 		"""
@@ -60,8 +224,30 @@ class FilesWSClient(QObject):
 		self._send(msg)
 
 	# -------- API --------
-	def list_dir(self, sid: str, path: str):
-		self._send({"action":"fs.list","sid":sid,"path":path,"req_id":"list"})
+	def list_dir(self, sid: str, path: str, *, lazy_owner: bool = False, fresh: bool = False, page_size: int = 0):
+		"""
+		lazy_owner: skip per-entry owner lookups (Windows Get-Acl); ask for them with request_owners().
+		fresh: bypass the teamserver's shared listing cache.
+		page_size: stream the listing as list_page signals of this many entries (0 = one listed signal).
+		"""
+		msg = {"action":"fs.list","sid":sid,"path":path,"req_id":"list"}
+		if lazy_owner: msg["lazy_owner"] = True
+		if fresh: msg["fresh"] = True
+		if page_size:
+			# a new paged listing replaces the previous one on the server, pages of the old one are dropped here
+			self._list_seq += 1
+			self._list_req = msg["req_id"] = f"list-{self._list_seq}"
+			msg["page_size"] = int(page_size)
+		self._send(msg)
+
+	def cancel_list(self):
+		"""Stop the paged listing in flight (operator navigated away)."""
+		if self._list_req:
+			self._send({"action":"fs.list.cancel","req_id":self._list_req})
+			self._list_req = None
+
+	def request_owners(self, sid: str, path: str, names: list[str]):
+		self._send({"action":"fs.owners","sid":sid,"path":path,"names":list(names),"req_id":"owners"})
 
 	def new_folder(self, sid: str, parent_or_full: str, name: str | None = None, *, req_id: int | None = None):
 		msg = {"action":"fs.new_folder","sid":sid}
@@ -84,71 +270,144 @@ class FilesWSClient(QObject):
 	def start_download(self, sid: str, remote_path: str, *, folder: bool = False):
 		self._send({"action":"fs.download","sid":sid,"path":remote_path,"req_id":"dl","folder": bool(folder)})
 
+	def read_range(self, sid: str, remote_path: str, offset: int, length: int, *, req_id: str, stat: bool = False):
+		"""
+		Read bytes [offset, offset+length) of a remote file in place; the reply comes back
+		as range_read with the same req_id. stat=True also reports the file size ("total").
+		"""
+		msg = {"action":"fs.read_range","sid":sid,"path":remote_path,"offset":int(offset),
+			   "length":int(length),"req_id":req_id}
+		if stat: msg["stat"] = True
+		self._send(msg)
+
 	def start_upload(self, sid: str, local_path: str, remote_path: str):
-		size = os.path.getsize(local_path)
-		self._ul_explicit_finish = False
-		self._send({"action":"fs.upload.begin","sid":sid,"remote_path":remote_path,"size":size,"req_id":"up"})
-		# after accept, stream
-		def _stream():
-			with open(local_path, "rb") as f:
-				chunk = f.read(256*1024)
-				while chunk:
-					self.ws.sendBinaryMessage(chunk)
-					chunk = f.read(256*1024)
-			# only send finish if server said it's required
-			if self._ul_explicit_finish:
-				self._send({"action":"fs.upload.finish"})
-		self._pending_upload_stream = _stream  # run when accept arrives
+		"""Queue a file upload; uploads run one at a time on this socket."""
+		self._enqueue_upload(_Upload(local_path, {"action":"fs.upload.begin","sid":sid,"remote_path":remote_path,"req_id":"up"}))
 
 	# --- folder upload with server-side extraction ---
 	def start_upload_folder(self, sid: str, local_dir: str, remote_dir: str, *, os_type: str = ""):
 		"""
 		Pack `local_dir` into a temp archive (zip on Windows targets, tar.gz on posix),
 		then upload it with `folder: True` so the server extracts into `remote_dir`.
+		Archiving happens on the upload thread.
 		"""
 		if not os.path.isdir(local_dir):
 			self.error.emit(f"Folder not found: {local_dir}")
 			return
+		# Note: send folder=True + remote_dir so the backend extracts into that directory
+		begin = {"action":"fs.upload.begin","sid":sid,"remote_dir":remote_dir,"folder":True,"req_id":"up"}
+		self._enqueue_upload(_Upload(local_dir, begin, folder=True, os_type=os_type))
+
+	# -------- upload internals --------
+	# The reader lives on the upload thread and only reads what the server's
+	# credit window allows: at most `window` bytes past the last acked offset
+	# are ever read/queued, whatever the file size or link speed.
+	def _enqueue_upload(self, job: "_Upload"):
+		self._ul_queue.append(job)
+		self._next_upload()
+
+	def _next_upload(self):
+		if self._ul is not None or not self._ul_queue:
+			return
+		job = self._ul = self._ul_queue.popleft()
+		reader = job.reader = _UploadReader(job.local_path, folder=job.folder, os_type=job.os_type)
+		reader.moveToThread(_upload_thread())
+		reader.ready.connect(self._on_upload_ready)
+		reader.failed.connect(self._on_upload_failed)
+		reader.chunk.connect(self._on_upload_chunk)
+		self._ul_prepare.connect(reader.prepare)
+		self._ul_read.connect(reader.read)
+		self._ul_close.connect(reader.close)
+		self._ul_prepare.emit()
+
+	def _end_upload(self):
+		job, self._ul = self._ul, None
+		self._ul_retry.stop()
+		self._ul_backoff_ms = 0
+		if job is not None and job.reader is not None:
+			self._ul_close.emit()  # closes the file and drops any temp archive on the upload thread
+			for sig in (self._ul_prepare, self._ul_read, self._ul_close):
+				try:
+					sig.disconnect()
+				except TypeError:
+					pass
+			job.reader = None
+		self._next_upload()
+
+	def _from_reader(self) -> "_Upload | None":
+		job = self._ul
+		return job if job is not None and self.sender() is job.reader else None
+
+	def _on_upload_ready(self, size):
+		job = self._from_reader()
+		if job is None:
+			return
+		job.size = int(size)
+		if self._ul_backoff_ms and self.ws.state() != QAbstractSocket.ConnectedState:
+			return  # reconnecting; _on_connected sends the begin
+		self._send_upload_begin()
+
+	def _send_upload_begin(self):
+		job = self._ul
+		job.accepted = False
+		self._ul_explicit_finish = False
+		self._send(dict(job.begin, size=job.size, upload_id=job.upload_id))
 
-		use_zip = (os_type or "").lower() == "windows"
-		suffix = ".zip" if use_zip else ".tar.gz"
-
-		fd, tmp_path = tempfile.mkstemp(prefix="gc2_ul_arch_", suffix=suffix)
-		os.close(fd)
-		base = os.path.basename(os.path.normpath(local_dir)) or "folder"
-
-		try:
-			if use_zip:
-				with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
-					for root, _, files in os.walk(local_dir):
-						for name in files:
-							full = os.path.join(root, name)
-							arc = os.path.join(base, os.path.relpath(full, local_dir)).replace("\\", "/")
-							zf.write(full, arcname=arc)
-			else:
-				with tarfile.open(tmp_path, "w:gz") as tf:
-					tf.add(local_dir, arcname=base, recursive=True)
-		except Exception as e:
-			try: os.remove(tmp_path)
-			except Exception: pass
-			self.error.emit(f"Failed to archive folder: {e}")
+	def _on_upload_failed(self, err: str):
+		if self._from_reader() is None:
 			return
+		self.error.emit(err)
+		self.up_result.emit("error", err)
+		self._end_upload()
 
-		self._tmp_archive_for_upload = tmp_path
-		size = os.path.getsize(tmp_path)
-		self._ul_explicit_finish = False
-		# Note: send folder=True + remote_dir so the backend extracts into that directory
-		self._send({"action":"fs.upload.begin","sid":sid,"remote_dir":remote_dir,"folder":True,"size":size,"req_id":"up"})
-
-		def _stream():
-			with open(tmp_path, "rb") as f:
-				chunk = f.read(256*1024)
-				while chunk:
-					self.ws.sendBinaryMessage(chunk)
-					chunk = f.read(256*1024)
-			if self._ul_explicit_finish:
-				self._send({"action":"fs.upload.finish"})
-		self._pending_upload_stream = _stream
+	def _pump_upload(self):
+		job = self._ul
+		if job is None or not job.accepted:
+			return
+		limit = min(job.size, job.acked + job.window)
+		if job.requested < limit:
+			self._ul_read.emit(job.requested, limit - job.requested)
+			job.requested = limit
+
+	def _on_upload_chunk(self, offset, data):
+		job = self._from_reader()
+		if job is None or not job.accepted or self.ws.state() != QAbstractSocket.ConnectedState:
+			return
+		end = offset + len(data)
+		# after a resume, reads issued before the reconnect may still be queued: keep only what's next
+		if not (offset <= job.sent < end):
+			return
+		self.ws.sendBinaryMessage(data[job.sent - offset:] if job.sent > offset else data)
+		job.sent = end
+		if job.sent >= job.size and self._ul_explicit_finish:
+			self._send({"action":"fs.upload.finish"})
+
+	def _on_upload_acked(self, acked: int):
+		job = self._ul
+		if job is not None and acked > job.acked:
+			job.acked = acked
+			self._pump_upload()
+
+	def _on_disconnected(self):
+		job = self._ul
+		if job is None:
+			return
+		# the server parks the partial bytes under upload_id; reconnect and resume from its offset
+		job.accepted = False
+		if not self._ul_retry.isActive():
+			self._schedule_upload_retry()
+
+	def _schedule_upload_retry(self):
+		self._ul_backoff_ms = min(UPLOAD_RECONNECT_MAX_MS, max(1000, self._ul_backoff_ms * 2))
+		self._ul_retry.start(self._ul_backoff_ms)
+
+	def _reconnect_upload(self):
+		job = self._ul
+		if job is None or job.accepted:
+			return
+		if self.ws.state() == QAbstractSocket.UnconnectedState:
+			self.open()
+		self._schedule_upload_retry()  # try again if this attempt goes nowhere
 
 	# -------- explorer helpers --------
 	def get_drives(self, sid: str):
@@ -166,11 +425,7 @@ class FilesWSClient(QObject):
 		else:
 			self.ws.sendTextMessage(s)
 
-	def _on_text(self, s: str):
-		try:
-			m = json.loads(s)
-		except Exception:
-			return
+	def _on_text(self, m: dict):
 		t = (m.get("type") or "").lower()
 
 		if t == "fs.list":
@@ -190,6 +445,24 @@ class FilesWSClient(QObject):
 			self.listed.emit(path, entries, bool(m.get("ok", True)))
 			return
 
+		elif t == "fs.list.page":
+			if m.get("req_id") != self._list_req:
+				return  # superseded or cancelled
+			done = bool(m.get("done", True))
+			if done:
+				self._list_req = None
+			entries = m.get("entries") or []
+			if not isinstance(entries, list):
+				entries = []
+			self.list_page.emit(str(m.get("path") or ""), entries, int(m.get("cursor") or 0), done, bool(m.get("ok", True)))
+			return
+
+		elif t == "fs.owners":
+			owners = m.get("owners") or {}
+			if isinstance(owners, dict):
+				self.owners_ready.emit(str(m.get("path") or ""), owners)
+			return
+
 		elif t == "deleted":
 			self.deleted.emit(str(m.get("path", "")), bool(m.get("ok", False)), str(m.get("error", "")))
 			return
@@ -202,6 +475,10 @@ class FilesWSClient(QObject):
 				str(m.get("error") or "")
 			)
 
+		elif t == "fs.range":
+			self.range_read.emit(m)
+			return
+
 		elif t == "fs.download.meta":
 			self.dl_meta.emit(m.get("tid",""), int(m.get("total_bytes") or 0))
 
@@ -213,26 +490,31 @@ class FilesWSClient(QObject):
 
 		elif t == "fs.upload.accept":
 			self._ul_explicit_finish = bool(m.get("explicit_finish", False))
-			cb = getattr(self, "_pending_upload_stream", None)
-			if cb:
-				self._pending_upload_stream = None
-				cb()
-				
+			job = self._ul
+			if job is None or job.size is None:
+				return
+			off = int(m.get("offset") or 0)
+			job.sent = job.requested = job.acked = off
+			job.window = int(m.get("window") or DEFAULT_UPLOAD_WINDOW)
+			job.accepted = True
+			self._ul_retry.stop()
+			self._ul_backoff_ms = 0
+			if off:
+				self.up_progress.emit(off, job.size)
+			self._pump_upload()
+
+		elif t == "fs.upload.credit":
+			if self._ul is not None and m.get("upload_id") == self._ul.upload_id:
+				self._on_upload_acked(int(m.get("acked") or 0))
+
 		elif t == "fs.upload.progress":
-			self.up_progress.emit(int(m.get("written") or 0), int(m.get("total") or 0))
+			written = int(m.get("written") or 0)
+			self.up_progress.emit(written, int(m.get("total") or 0))
+			self._on_upload_acked(written)  # servers without fs.upload.credit still report progress
 
 		elif t == "fs.upload.result":
 			self.up_result.emit(m.get("status",""), m.get("error") or "")
-
-			# cleanup any temp archive from folder uploads
-			try:
-				if self._tmp_archive_for_upload and os.path.exists(self._tmp_archive_for_upload):
-					try:
-						os.remove(self._tmp_archive_for_upload)
-					except Exception:
-						pass
-			finally:
-				self._tmp_archive_for_upload = None
+			self._end_upload()
 
 		elif t == "pong":
 			pass
@@ -247,3 +529,5 @@ class FilesWSClient(QObject):
 			
 		elif t == "error":
 			self.error.emit(m.get("error") or "error")
+			if m.get("req_id") == "up" and self._ul is not None and not self._ul.accepted:
+				self._end_upload()  # begin rejected; move on to the next queued upload
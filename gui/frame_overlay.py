@@ -0,0 +1,125 @@
+# gui/frame_overlay.py
+"""
+Frame-time overlay: how long the UI thread goes without servicing its event
+loop, plus what the websocket transport is doing.
+
+A precise 16 ms timer measures the gap between its own ticks; anything past
+16 ms is time the UI thread was busy (parsing, model resets, painting).
+Toggle with Ctrl+Shift+F, or start it visible with SENTINEL_FRAME_OVERLAY=1.
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen
+from PyQt5.QtWidgets import QWidget
+
+from ws_transport import TransportStats
+
+TICK_MS = 16
+HISTORY = 240           # ~4 s of ticks
+BUDGET_MS = 1000 / 60   # one 60 fps frame
+REPAINT_MS = 250
+
+
+def _pct(vals, p):
+	vals = sorted(vals)
+	return vals[min(len(vals) - 1, int(len(vals) * p))] if vals else 0.0
+
+
+class FrameTimeOverlay(QWidget):
+	def __init__(self, parent: QWidget):
+		super().__init__(parent)
+		self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+		self.setAttribute(Qt.WA_NoSystemBackground, True)
+		self.setFocusPolicy(Qt.NoFocus)
+		self.resize(260, 118)
+		self._font = QFont("monospace", 8)
+		self._gaps: deque = deque(maxlen=HISTORY)
+		self._last = None
+		self._last_delivered = TransportStats.delivered
+		self._last_decoded = TransportStats.decoded
+		self._rate_t = time.perf_counter()
+		self._rates = (0.0, 0.0)
+
+		self._tick = QTimer(self)
+		self._tick.setTimerType(Qt.PreciseTimer)
+		self._tick.setInterval(TICK_MS)
+		self._tick.timeout.connect(self._on_tick)
+		self._repaint = QTimer(self)
+		self._repaint.setInterval(REPAINT_MS)
+		self._repaint.timeout.connect(self._refresh)
+		self.hide()
+		if os.environ.get("SENTINEL_FRAME_OVERLAY") == "1":
+			self.toggle()
+
+	def toggle(self):
+		if self.isVisible():
+			self._tick.stop(); self._repaint.stop()
+			self.hide()
+			return
+		self._gaps.clear()
+		self._last = None
+		TransportStats.reset_peaks()
+		self._tick.start(); self._repaint.start()
+		self._place()
+		self.show(); self.raise_()
+
+	def _place(self):
+		p = self.parentWidget()
+		if p is not None:
+			self.move(p.width() - self.width() - 12, p.height() - self.height() - 12)
+
+	def _on_tick(self):
+		now = time.perf_counter()
+		if self._last is not None:
+			self._gaps.append((now - self._last) * 1000.0)
+		self._last = now
+
+	def _refresh(self):
+		now = time.perf_counter()
+		dt = max(1e-6, now - self._rate_t)
+		self._rates = ((TransportStats.decoded - self._last_decoded) / dt,
+					   (TransportStats.delivered - self._last_delivered) / dt)
+		self._last_decoded, self._last_delivered, self._rate_t = TransportStats.decoded, TransportStats.delivered, now
+		self._place()
+		self.raise_()
+		self.update()
+
+	def paintEvent(self, _):
+		p = QPainter(self)
+		p.fillRect(self.rect(), QColor(0, 0, 0, 170))
+		gaps = list(self._gaps)
+		w = self.width()
+		graph_h = 44.0
+		# bars: one per tick, red when the UI thread missed the frame
+		if gaps:
+			bw = w / float(HISTORY)
+			scale = graph_h / (BUDGET_MS * 4)
+			x = w - len(gaps) * bw
+			for g in gaps:
+				bh = min(graph_h, g * scale)
+				p.fillRect(QRectF(x, graph_h - bh, max(1.0, bw), bh),
+						   QColor("#ff5c5c") if g > BUDGET_MS * 1.5 else QColor("#5cd67a"))
+				x += bw
+		p.setPen(QPen(QColor(255, 255, 255, 90), 1, Qt.DashLine))
+		y_budget = graph_h - BUDGET_MS * (graph_h / (BUDGET_MS * 4))
+		p.drawLine(0, int(y_budget), w, int(y_budget))
+
+		stalls = sum(1 for g in gaps if g > BUDGET_MS * 1.5)
+		p.setPen(QColor("#e6e6e6"))
+		p.setFont(self._font)
+		lines = [
+			f"frame p50 {_pct(gaps, 0.5):5.1f}  p95 {_pct(gaps, 0.95):5.1f}  max {max(gaps) if gaps else 0:6.1f} ms",
+			f"missed frames {stalls}/{len(gaps)}",
+			f"ws decoded {self._rates[0]:6.0f}/s  delivered {self._rates[1]:6.0f}/s",
+			f"ws flush {TransportStats.last_flush_ms:5.1f} ms  max {TransportStats.max_flush_ms:5.1f}  backlog {TransportStats.backlog}",
+		]
+		y = graph_h + 14
+		for ln in lines:
+			p.drawText(6, int(y), ln)
+			y += 15
+		p.end()
@@ -0,0 +1,311 @@
+# gui/history_tab.py
+"""
+Command history search pane.
+
+Queries the teamserver's history store over the shared sessions websocket
+(action "history"): full-text search over commands and outputs, optionally
+narrowed to one session / operator. Results arrive newest first in pages;
+scrolling to the bottom fetches the next page. Selecting a row loads that
+command's full output underneath.
+"""
+import datetime
+from typing import List, Optional
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, QRect
+from PyQt5.QtGui import QFont, QPainter, QPen, QColor, QPalette
+from PyQt5.QtWidgets import (
+	QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QComboBox, QPushButton, QLabel, QTableView,
+	QHeaderView, QAbstractItemView, QSplitter, QPlainTextEdit, QStyledItemDelegate, QStyle, QStyleOptionViewItem
+)
+
+from theme_center import use_sheet, theme_color
+
+PAGE = 100
+SEARCH_DEBOUNCE_MS = 250
+MARK_OPEN, MARK_CLOSE = "\x02", "\x03"   # snippet match markers (core.command_history)
+
+COLUMNS = [
+	("Time", "sent_at"), ("Session", "sid"), ("Operator", "op_id"), ("Command", "cmd"),
+	("Match", "snippet"), ("Latency", "latency_ms"), ("Bytes in/out", "bytes_in"), ("Status", "status"),
+]
+MATCH_COL = 4
+
+
+def _fmt_time(ts) -> str:
+	try:
+		return datetime.datetime.fromtimestamp(float(ts)).strftime("%Y-%m-%d %H:%M:%S")
+	except Exception:
+		return ""
+
+
+def _fmt_bytes(n) -> str:
+	try:
+		n = int(n or 0)
+	except Exception:
+		return ""
+	for unit in ("B", "KB", "MB"):
+		if n < 1024:
+			return f"{n} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+		n /= 1024.0
+	return f"{n:.1f} GB"
+
+
+def _one_line(text: str) -> str:
+	return " ".join((text or "").split())
+
+
+class HistoryModel(QAbstractTableModel):
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.rows: List[dict] = []
+		self.hosts = {}   # sid -> hostname, from the sessions cache
+
+	def reset(self, rows: List[dict]):
+		self.beginResetModel()
+		self.rows = list(rows)
+		self.endResetModel()
+
+	def append(self, rows: List[dict]):
+		if not rows:
+			return
+		n = len(self.rows)
+		self.beginInsertRows(QModelIndex(), n, n + len(rows) - 1)
+		self.rows.extend(rows)
+		self.endInsertRows()
+
+	def rowCount(self, parent=QModelIndex()):
+		return 0 if parent.isValid() else len(self.rows)
+
+	def columnCount(self, parent=QModelIndex()):
+		return len(COLUMNS)
+
+	def headerData(self, section, orientation, role=Qt.DisplayRole):
+		if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+			return COLUMNS[section][0]
+		return None
+
+	def data(self, idx, role=Qt.DisplayRole):
+		if not idx.isValid():
+			return None
+		r = self.rows[idx.row()]
+		key = COLUMNS[idx.column()][1]
+		if role == Qt.DisplayRole:
+			if key == "sent_at":
+				return _fmt_time(r.get("sent_at"))
+			if key == "sid":
+				sid = str(r.get("sid") or "")
+				host = self.hosts.get(sid)
+				return f"{host} ({sid[:8]})" if host else sid
+			if key == "latency_ms":
+				ms = r.get("latency_ms")
+				return "" if ms is None else (f"{ms:.0f} ms" if ms < 10000 else f"{ms / 1000.0:.1f} s")
+			if key == "bytes_in":
+				return f"{_fmt_bytes(r.get('bytes_in'))} / {_fmt_bytes(r.get('bytes_out'))}"
+			if key in ("cmd", "snippet"):
+				return _one_line(r.get(key))
+			return str(r.get(key) or "")
+		if role == Qt.ToolTipRole and key == "cmd":
+			return r.get("cmd") or ""
+		if role == Qt.UserRole:
+			return r
+		if role == Qt.TextAlignmentRole and key in ("latency_ms", "bytes_in"):
+			return int(Qt.AlignRight | Qt.AlignVCenter)
+		return None
+
+
+class SnippetDelegate(QStyledItemDelegate):
+	"""Paints an FTS snippet with its matched terms highlighted."""
+
+	def paint(self, p: QPainter, opt, idx):
+		text = idx.data(Qt.DisplayRole) or ""
+		if MARK_OPEN not in text:
+			return super().paint(p, opt, idx)
+		opt = QStyleOptionViewItem(opt)
+		self.initStyleOption(opt, idx)
+		opt.text = ""
+		opt.widget.style().drawControl(QStyle.CE_ItemViewItem, opt, p, opt.widget)
+
+		p.save()
+		p.setClipRect(opt.rect)
+		r = opt.rect.adjusted(6, 0, -6, 0)
+		fm = p.fontMetrics()
+		x = r.left()
+		ink = opt.palette.color(QPalette.Text)
+		hit_bg = QColor(theme_color("accent", "#3d7eff"))
+		hit_bg.setAlpha(110)
+		hit = False
+		for part in text.replace(MARK_CLOSE, MARK_OPEN).split(MARK_OPEN):
+			if part:
+				w = fm.horizontalAdvance(part)
+				if hit:
+					p.fillRect(QRect(x, r.top() + 3, w, r.height() - 6), hit_bg)
+				p.setPen(QPen(ink))
+				p.drawText(QRect(x, r.top(), w, r.height()), Qt.AlignVCenter | Qt.AlignLeft, part)
+				x += w
+				if x > r.right():
+					break
+			hit = not hit
+		p.restore()
+
+
+class HistoryTab(QWidget):
+	def __init__(self, api, sessions_ws, parent=None):
+		super().__init__(parent)
+		self.api = api
+		self.ws = sessions_ws
+		self._next: Optional[int] = None
+		self._rid: Optional[str] = None      # in-flight search/page request
+		self._entry_rid: Optional[str] = None
+		self._append = False
+
+		use_sheet(self, "files")
+
+		self.search = QLineEdit()
+		self.search.setPlaceholderText('Search commands and output…   e.g. lsass  "Domain Admins"  krbtgt*')
+		self.search.setClearButtonEnabled(True)
+		self.session_filter = QComboBox()
+		self.session_filter.setMinimumWidth(200)
+		self.op_filter = QLineEdit()
+		self.op_filter.setPlaceholderText("Operator")
+		self.op_filter.setMaximumWidth(160)
+		self.btn_refresh = QPushButton("Refresh")
+		self.status = QLabel("")
+		self.status.setObjectName("StatusLabel")
+
+		top = QHBoxLayout()
+		top.setContentsMargins(8, 8, 8, 4)
+		top.setSpacing(8)
+		top.addWidget(self.search, 1)
+		top.addWidget(self.session_filter)
+		top.addWidget(self.op_filter)
+		top.addWidget(self.btn_refresh)
+
+		self.model = HistoryModel(self)
+		self.table = QTableView()
+		self.table.setModel(self.model)
+		self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+		self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+		self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+		self.table.setWordWrap(False)
+		self.table.verticalHeader().setVisible(False)
+		self.table.verticalHeader().setDefaultSectionSize(26)
+		self.table.setItemDelegateForColumn(MATCH_COL, SnippetDelegate(self.table))
+		hh = self.table.horizontalHeader()
+		hh.setSectionResizeMode(QHeaderView.Interactive)
+		hh.setSectionResizeMode(MATCH_COL, QHeaderView.Stretch)
+		for col, w in ((0, 150), (1, 190), (2, 110), (3, 260), (5, 80), (6, 130), (7, 70)):
+			self.table.setColumnWidth(col, w)
+
+		self.output = QPlainTextEdit()
+		self.output.setReadOnly(True)
+		self.output.setFont(QFont("Consolas", 10))
+		self.output.setPlaceholderText("Select a command to see its full output")
+
+		split = QSplitter(Qt.Vertical)
+		split.addWidget(self.table)
+		split.addWidget(self.output)
+		split.setStretchFactor(0, 3)
+		split.setStretchFactor(1, 2)
+
+		root = QVBoxLayout(self)
+		root.setContentsMargins(0, 0, 0, 0)
+		root.addLayout(top)
+		root.addWidget(split, 1)
+		root.addWidget(self.status)
+
+		self._debounce = QTimer(self)
+		self._debounce.setSingleShot(True)
+		self._debounce.setInterval(SEARCH_DEBOUNCE_MS)
+		self._debounce.timeout.connect(self.run_search)
+
+		self.search.textChanged.connect(lambda *_: self._debounce.start())
+		self.search.returnPressed.connect(self.run_search)
+		self.op_filter.returnPressed.connect(self.run_search)
+		self.session_filter.activated.connect(lambda *_: self.run_search())
+		self.btn_refresh.clicked.connect(self.run_search)
+		self.table.verticalScrollBar().valueChanged.connect(self._maybe_more)
+		self.table.selectionModel().currentRowChanged.connect(self._on_row)
+		self.ws.snapshot.connect(self._refresh_sessions)
+
+		self._refresh_sessions(self.ws.all_cached())
+		self.run_search()
+
+	# ---------- filters ----------
+	def _refresh_sessions(self, sessions: list):
+		hosts = {}
+		for s in sessions or []:
+			sid = str(s.get("id") or "")
+			if sid:
+				hosts[sid] = s.get("hostname") or ""
+		self.model.hosts = hosts
+		current = self.session_filter.currentData()
+		self.session_filter.blockSignals(True)
+		self.session_filter.clear()
+		self.session_filter.addItem("All sessions", None)
+		for sid, host in sorted(hosts.items(), key=lambda kv: (kv[1].lower(), kv[0])):
+			self.session_filter.addItem(f"{host or '?'}  ({sid[:8]})", sid)
+		if current and self.session_filter.findData(current) < 0:
+			self.session_filter.addItem(current, current)  # session gone; its history is not
+		self.session_filter.setCurrentIndex(max(0, self.session_filter.findData(current)))
+		self.session_filter.blockSignals(False)
+
+	# ---------- paging ----------
+	def run_search(self):
+		self._debounce.stop()
+		self._next = None
+		self._request(before=None, append=False)
+
+	def _maybe_more(self, value: int):
+		sb = self.table.verticalScrollBar()
+		if self._next is not None and self._rid is None and value >= sb.maximum() - 4:
+			self._request(before=self._next, append=True)
+
+	def _request(self, *, before: Optional[int], append: bool):
+		self._append = append
+		self.status.setText("Searching…" if not append else "Loading more…")
+		self._rid = self.ws.history(
+			self.search.text().strip(),
+			sid=self.session_filter.currentData(),
+			op_id=self.op_filter.text().strip() or None,
+			before=before,
+			limit=PAGE,
+			cb=self._on_page,
+		)
+
+	def _on_page(self, msg: dict):
+		if msg.get("req_id") != self._rid:
+			return  # superseded by a newer search
+		self._rid = None
+		if str(msg.get("type", "")).lower() != "history":
+			self.status.setText(f"History search failed: {msg.get('error') or 'unknown error'}")
+			return
+		items = msg.get("items") or []
+		if self._append:
+			self.model.append(items)
+		else:
+			self.model.reset(items)
+			self.output.clear()
+		self._next = msg.get("next")
+		more = " — scroll for more" if self._next is not None else ""
+		mode = "" if msg.get("fts", True) else "  (substring search: teamserver sqlite has no FTS5)"
+		self.status.setText(f"{self.model.rowCount()} results{more}{mode}")
+
+	# ---------- full output ----------
+	def _on_row(self, cur: QModelIndex, _prev: QModelIndex):
+		row = self.model.data(self.model.index(cur.row(), 0), Qt.UserRole) if cur.isValid() else None
+		if not row:
+			return
+		self.output.setPlainText(f"$ {row.get('cmd') or ''}\n\n(loading output…)")
+		self._entry_rid = self.ws.history_entry(int(row["id"]), cb=self._on_entry)
+
+	def _on_entry(self, msg: dict):
+		if msg.get("req_id") != self._entry_rid:
+			return
+		e = msg.get("entry") or {}
+		if str(msg.get("type", "")).lower() != "history.entry":
+			self.output.setPlainText(f"[!] {msg.get('error') or 'failed to load output'}")
+			return
+		head = (f"$ {e.get('cmd') or ''}\n"
+				f"# {e.get('sid')}  op={e.get('op_id')}  {_fmt_time(e.get('sent_at'))}  "
+				f"{e.get('status')}  {e.get('latency_ms') or 0:.0f} ms\n\n")
+		self.output.setPlainText(head + (e.get("output") or ""))
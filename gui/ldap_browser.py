@@ -26,175 +26,17 @@ except Exception:
 	def theme_color(_k, d): return d
 	qta = None
 
+from theme_center import use_sheet
+
 
 # ---------- Visual helpers ----------------------------------------------------
 
 def _apply_styles(widget: QWidget):
 	"""
-	Global stylesheet tuned for dark UI; no 'box-shadow' (Qt doesn't support it).
-	Clean, subtle, and consistent between tree & table, like the file browser.
+	Dark glassy look shared by the panes and the tab host; the rules are the
+	"ldap" sheet in theme_center, compiled once into the app stylesheet.
 	"""
-	widget.setStyleSheet("""
-	QWidget { color: #dce3ea; }
-	QFrame#TopBar {
-		background: transparent;
-	}
-
-	/* Quick Access header chip */
-	QLabel#QuickHdr {
-		font-weight: 800;
-		color: #eaf2ff;
-		padding: 2px 4px;
-	}
-
-	/* thin vertical separator used in the connection bar */
-	QFrame#VSep {
-		background: #243044;
-		min-width: 1px; max-width: 1px;
-		margin: 0 6px;
-	}
-	/* chip-like toggle for the Options row */
-	QToolButton#OptionsToggle {
-		background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-					stop:0 #253242, stop:1 #1b2533);
-		border: 1px solid #2b3c5c;
-		border-radius: 11px;
-		padding: 4px 10px;
-		color: #dbe7fb;
-	}
-	QToolButton#OptionsToggle:hover { background: #243349; }
-	QToolButton#OptionsToggle:checked { background: #1e2a3e; }
-
-	QLineEdit, QComboBox, QTableView, QTreeView {
-		background: rgba(12,16,22,0.65);
-		border: 1px solid #243044;
-		border-radius: 9px;
-		selection-background-color: #1e293b;
-		selection-color: #eaf2ff;
-	}
-	QLineEdit:focus, QComboBox:focus, QTableView:focus, QTreeView:focus {
-		border: 1px solid #365985;
-	}
-	QHeaderView::section {
-		background: #0e1520;
-		color: #cdd6e3;
-		padding: 6px 8px;
-		border: 0;
-		border-bottom: 1px solid #1e2a3d;
-	}
-	QTableWidget {
-		gridline-color: #1f2b3e;
-		border: 1px solid #243044;
-		border-radius: 9px;
-	}
-	QTreeView {
-		background: transparent;
-		border: 1px solid #243044;
-		border-radius: 9px;
-		show-decoration-selected: 1;
-	}
-	QPushButton, QToolButton {
-		background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-					stop:0 #253242, stop:1 #1b2533);
-		border: 1px solid #2b3c5c;
-		border-radius: 11px;
-		padding: 6px 12px;
-	}
-	QPushButton:hover, QToolButton:hover {
-		background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-					stop:0 #2a3a4e, stop:1 #213044);
-	}
-	QPushButton:pressed, QToolButton:pressed { background: #172130; }
-
-	/* Slim scrollbars */
-	QScrollBar:vertical, QScrollBar:horizontal { background: transparent; border: none; margin: 0px; }
-	QScrollBar::handle { background: #2b3b52; border-radius: 6px; min-height: 24px; min-width: 24px; }
-	QScrollBar::handle:hover { background: #35506f; }
-	QScrollBar::add-line, QScrollBar::sub-line { height:0; width:0; }
-
-	/* Polished context menu to match the glassy dark UI */
-	QMenu {
-		background: #0f1622;
-		color: #dde6f3;
-		border: 1px solid #33455f;
-		border-radius: 10px;
-		padding: 6px 4px;
-	}
-	QMenu::separator {
-		height: 1px;
-		background: #233145;
-		margin: 6px 10px;
-	}
-	QMenu::item {
-		padding: 6px 14px;
-		border-radius: 6px;
-	}
-	QMenu::item:selected { background: #1a2433; }
-
-	/* File-browser style tabs */
-	QTabBar::tab {
-		background: #1a2330;
-		color: #d9e3f0;
-		border: 1px solid #2b3c5c;
-		padding: 6px 32px 6px 14px; /* room for a bigger close button */
-		border-top-left-radius: 9px;
-		border-top-right-radius: 9px;
-		margin-right: 6px;
-	}
-	QTabBar::tab:selected {
-		background: #202b3a;
-		border-bottom-color: #202b3a;
-	}
-	QTabBar::tab:!selected {
-		background: #151d28;
-	}
-
-	/* Make the built-in overflow scroller arrows look like premium chips */
-	QTabBar::scroller {
-		width: 42px;                       /* breathing room */
-	}
-
-	/* Gorgeous, crisp close button (real widget, not the style primitive) */
-	QToolButton#TabCloseBtn {
-		min-width: 24px;  max-width: 24px;
-		min-height: 24px; max-height: 24px;
-		padding: 0;
-		margin-left: 10px;
-		margin-right: 6px;              
-		border: 1px solid transparent;
-		border-radius: 12px;
-		background: transparent;
-	}
-	QToolButton#TabCloseBtn:hover {
-		background: rgba(239, 68, 68, 0.15); /* soft halo */
-		border: 1px solid rgba(239, 68, 68, 0.65);
-	}
-	QToolButton#TabCloseBtn:pressed {
-		background: rgba(220, 38, 38, 0.22);
-		border: 1px solid rgba(220, 38, 38, 0.85);
-		padding-top: 1px; padding-left: 1px; /* tiny tactile nudge */
-	}
-
-	QToolButton#TabCloseBtn:focus {
-		outline: none;
-		box-shadow: 0 0 0 2px rgba(95,142,214,0.35); /* subtle focus ring */
-		border: 1px solid #5f8ed6;
-	}
-
-	QTabBar QToolButton::right-arrow {
-		image: url(:/qt-project.org/styles/commonstyle/images/right-32.png);
-		width: 12px; height: 12px;
-	}
-	QTabBar QToolButton::left-arrow {
-		image: url(:/qt-project.org/styles/commonstyle/images/left-32.png);
-		width: 12px; height: 12px;
-	}
-
-	/* Slight spacing between tabs */
-	QTabBar { qproperty-movable: true; }
-	QTabBar::tab { margin-right: 8px; }
-
-	""")
+	use_sheet(widget, "ldap")
 
 class _QuickItem(QStandardItem):
 	"""Convenience item storing DN & type."""
@@ -242,13 +84,22 @@ class _GlassCard(QFrame):
 		p.drawPath(path); p.end()
 
 # --- Tree model (lazy) -------------------------------------------------------
+# Children beyond this many are inserted over successive event-loop turns so
+# expanding a huge OU never blocks painting for long.
+INSERT_BATCH = 500
+
+def _dn_key(dn: str) -> str:
+	return (dn or "").strip().lower()  # DNs compare case-insensitively
+
 class _Node:
-	__slots__ = ("dn","rdn","has_children","loaded","children","attrs")
-	def __init__(self, dn:str, rdn:str, has_children:bool):
+	__slots__ = ("dn","rdn","has_children","loaded","children","attrs","parent","row")
+	def __init__(self, dn:str, rdn:str, has_children:bool, parent:Optional["_Node"]=None, row:int=0):
 		self.dn = dn; self.rdn = rdn; self.has_children = bool(has_children)
 		self.loaded = False
 		self.children: List["_Node"] = []
 		self.attrs: Dict[str, List[str]] = {}
+		self.parent = parent  # None for roots
+		self.row = row        # position in parent.children (or roots)
 
 class LdapTreeModel(QAbstractItemModel):
 	nodeActivated = pyqtSignal(object)  # _Node
@@ -256,6 +107,11 @@ class LdapTreeModel(QAbstractItemModel):
 	def __init__(self, parent=None):
 		super().__init__(parent)
 		self.roots: List[_Node] = []
+		self._by_dn: Dict[str, _Node] = {}
+		# (parent node, remaining rows) still being inserted in batches
+		self._pending: List[Tuple[_Node, List[Dict[str, any]]]] = []
+		self._batch_timer = QTimer(self); self._batch_timer.setSingleShot(True)
+		self._batch_timer.timeout.connect(self._insert_next_batch)
 
 	def columnCount(self, parent): return 1
 	def rowCount(self, parent):
@@ -281,13 +137,9 @@ class LdapTreeModel(QAbstractItemModel):
 
 	def parent(self, idx):
 		if not idx.isValid(): return QModelIndex()
-		node = self._node(idx); par = self._parent_of(node)
+		par = self._node(idx).parent
 		if par is None: return QModelIndex()
-		grand = self._parent_of(par)
-		siblings = self.roots if grand is None else grand.children
-		try: row = siblings.index(par)
-		except Exception: return QModelIndex()
-		return self.createIndex(row, 0, par)
+		return self.createIndex(par.row, 0, par)
 
 	def data(self, idx, role):
 		if not idx.isValid(): return QVariant()
@@ -299,25 +151,19 @@ class LdapTreeModel(QAbstractItemModel):
 	def _node(self, idx) -> Optional[_Node]:
 		return idx.internalPointer() if idx.isValid() else None
 
-	def _parent_of(self, node: Optional[_Node]) -> Optional[_Node]:
-		if node is None: return None
-		def dfs(p: Optional[_Node]) -> Optional[_Node]:
-			if p is None: return None
-			for ch in p.children:
-				if ch is node: return p
-				res = dfs(ch)
-				if res: return res
-			return None
-		for r in self.roots:
-			if r is node: return None
-			res = dfs(r)
-			if res: return res
-		return None
+	def index_for_node(self, node: Optional[_Node]) -> QModelIndex:
+		return QModelIndex() if node is None else self.createIndex(node.row, 0, node)
+
+	def index_for_dn(self, dn: str) -> QModelIndex:
+		"""Index of the loaded node with this DN (invalid if it isn't in the tree)."""
+		return self.index_for_node(self._by_dn.get(_dn_key(dn)))
 
 	# mutate API
 	def set_roots(self, dns: List[str]):
 		self.beginResetModel()
-		self.roots = [_Node(d, d.split(",",1)[0] if d else d, True) for d in dns]
+		self._pending.clear(); self._batch_timer.stop()
+		self.roots = [_Node(d, d.split(",",1)[0] if d else d, True, None, i) for i, d in enumerate(dns)]
+		self._by_dn = {_dn_key(n.dn): n for n in self.roots}
 		self.endResetModel()
 
 	def insert_children(self, parent_idx: QModelIndex, rows: List[Dict[str, any]]):
@@ -332,14 +178,33 @@ class LdapTreeModel(QAbstractItemModel):
 			return
 
 		parent_node.loaded = True
-		begin = len(parent_node.children)
-		self.beginInsertRows(parent_idx, begin, begin + len(rows) - 1)
-		for r in rows:
-			ch = _Node(r.get("dn", ""), r.get("rdn", ""), bool(r.get("has_children")))
+		self._pending.append((parent_node, list(rows)))
+		if len(self._pending) == 1:
+			self._insert_next_batch()  # first batch shows up right away
+
+	def _insert_next_batch(self):
+		if not self._pending:
+			return
+		parent_node, rows = self._pending[0]
+		batch, rest = rows[:INSERT_BATCH], rows[INSERT_BATCH:]
+		if rest:
+			self._pending[0] = (parent_node, rest)
+		else:
+			self._pending.pop(0)
+
+		kids = parent_node.children
+		begin = len(kids)
+		self.beginInsertRows(self.index_for_node(parent_node), begin, begin + len(batch) - 1)
+		for i, r in enumerate(batch, begin):
+			ch = _Node(r.get("dn", ""), r.get("rdn", ""), bool(r.get("has_children")), parent_node, i)
 			ch.attrs = r.get("attrs") or {}
-			parent_node.children.append(ch)
+			kids.append(ch)
+			self._by_dn[_dn_key(ch.dn)] = ch
 		self.endInsertRows()
 
+		if self._pending:
+			self._batch_timer.start(0)
+
 
 # --- Single LDAP Pane (one tab) ----------------------------------------------
 class _LdapPane(QWidget):
@@ -772,19 +637,7 @@ class _LdapPane(QWidget):
 			if not msg.get("ok"): return
 			dn   = msg.get("dn") or ""; rows = msg.get("children") or []
 
-			def _find_index_for_dn(target_dn: str) -> QModelIndex:
-				q = [QModelIndex()]
-				while q:
-					parent = q.pop(0)
-					for i in range(self.model.rowCount(parent)):
-						ix = self.model.index(i, 0, parent)
-						node: _Node = ix.internalPointer()
-						if node and node.dn == target_dn:
-							return ix
-						q.append(ix)
-				return QModelIndex()
-
-			parent_ix = _find_index_for_dn(dn)
+			parent_ix = self.model.index_for_dn(dn)
 			if not parent_ix.isValid(): return
 			self.model.insert_children(parent_ix, rows)
 			# Don't auto-expand/select; keeps the UI calm.
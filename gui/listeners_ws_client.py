@@ -7,6 +7,8 @@ from typing import Optional
 from PyQt5.QtCore import QObject, pyqtSignal, QUrl, QTimer
 from PyQt5.QtWebSockets import QWebSocket
 
+from ws_transport import WSTransport, ws_request
+
 
 class ListenersWSClient(QObject):
 	# connection lifecycle
@@ -34,7 +36,8 @@ class ListenersWSClient(QObject):
 		# ---- wire signals
 		self.ws.connected.connect(self.connected)
 		self.ws.disconnected.connect(self.disconnected)
-		self.ws.textMessageReceived.connect(self._on_text)
+		self._rx = WSTransport(self.ws, self._on_text,
+							   on_bad=lambda _: self.error.emit("Invalid message from server"), parent=self)
 
 		# PyQt5 uses .error, PyQt6 uses .errorOccurred — support both
 		try:
@@ -61,7 +64,7 @@ class ListenersWSClient(QObject):
 			ws_base = self.base_url
 
 		url = QUrl(f"{ws_base}/ws/listeners?token={self.token}")
-		self.ws.open(url)
+		self.ws.open(ws_request(url))
 		self._pong_timer.start()
 
 	def close(self):
@@ -103,13 +106,7 @@ class ListenersWSClient(QObject):
 		self._send({"action": "ping", "req_id": self._next_req_id()})
 
 	# ---------- inbound dispatch ----------
-	def _on_text(self, txt: str):
-		try:
-			m = json.loads(txt)
-		except Exception:
-			self.error.emit("Invalid message from server")
-			return
-
+	def _on_text(self, m: dict):
 		t = m.get("type")
 		if t == "listeners.snapshot":
 			self.snapshot.emit(m.get("rows") or [])
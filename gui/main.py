@@ -9,8 +9,8 @@ from PyQt5.QtGui import QPalette, QColor, QIcon
 from PyQt5.QtCore import Qt
 
 from login_dialog import LoginDialog
-from main_window import MainWindow
 from theme_center import ThemeManager
+# main_window (and the dashboard behind it) is imported after login
 
 def _asset_path(*parts):
 	"""Resolve a path relative to this file (works when packaged, too)."""
@@ -70,6 +70,7 @@ if __name__ == "__main__":
 	# ---- normal flow ----
 	dlg = LoginDialog()
 	if dlg.exec_() == LoginDialog.Accepted:
+		from main_window import MainWindow
 		mw = MainWindow(dlg.api_client)
 		mw.show()
 		sys.exit(app.exec_())
@@ -1,10 +1,11 @@
 # gui/main_window.py
-from PyQt5.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout
+from PyQt5.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout, QShortcut
 from PyQt5.QtCore import Qt, QPoint, QRectF
-from PyQt5.QtGui import QPainterPath, QRegion
+from PyQt5.QtGui import QPainterPath, QRegion, QKeySequence
 
 from dashboard import Dashboard
 from title_bar import TitleBar
+from frame_overlay import FrameTimeOverlay
 
 class _EdgeGrip(QWidget):
 	def __init__(self, parent, edge: str, margin: int):
@@ -135,6 +136,10 @@ class MainWindow(QMainWindow):
 		self._position_grips()
 		self._apply_round_mask()  # initial
 
+		# UI-thread stall / websocket throughput overlay (Ctrl+Shift+F)
+		self.frame_overlay = FrameTimeOverlay(self)
+		QShortcut(QKeySequence("Ctrl+Shift+F"), self, activated=self.frame_overlay.toggle)
+
 	def _position_grips(self):
 		m  = self._RESIZE_MARGIN
 		w  = self.width()
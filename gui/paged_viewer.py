@@ -0,0 +1,575 @@
+# gui/paged_viewer.py
+"""
+Read-only paged viewer for remote files too big to download into an editor tab.
+
+Bytes are fetched with fs.read_range, PAGE_BYTES at a time and only when the
+view (or a search) reaches them. Fetched pages land in a sparse temp file that
+is memory-mapped, so going back over a region costs nothing and RAM holds only
+what the OS keeps hot. The QPlainTextEdit only ever holds the lines that fit
+the viewport. Newlines are counted per page as pages arrive: line numbers are
+exact over the prefix loaded from the start of the file and estimated past it.
+"""
+from __future__ import annotations
+
+import binascii
+import itertools
+import mmap
+import os
+import tempfile
+from collections import deque
+from typing import Optional
+
+from PyQt5.QtCore import Qt, QEvent, QTimer
+from PyQt5.QtGui import QFont, QTextCursor
+from PyQt5.QtWidgets import (
+	QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QScrollBar, QLabel,
+	QLineEdit, QToolButton, QShortcut
+)
+
+PAGE_BYTES = 1024 * 1024
+PAGED_THRESHOLD = 8 * 1024 * 1024   # bigger files open here instead of in an editable tab
+MAX_LINE_BYTES = 64 * 1024          # longer lines are cut for display
+SCROLL_STEPS = 1_000_000            # scrollbar resolution over the whole file
+MAX_QUEUED = 6                      # page requests waiting behind the one in flight
+SEARCH_PAGES_PER_STEP = 8           # pages scanned before yielding to the event loop
+
+_view_ids = itertools.count(1)
+
+
+class _NeedPage(Exception):
+	"""Raised by the line walkers when they run into a page that isn't cached yet."""
+	def __init__(self, page: int):
+		super().__init__(page)
+		self.page = page
+
+
+class SparseFileCache:
+	"""Fetched pages of one remote file, kept in a memory-mapped sparse temp file."""
+
+	def __init__(self, total: int, page_bytes: int = PAGE_BYTES):
+		self.total = max(0, int(total))
+		self.page_bytes = page_bytes
+		self.pages = max(1, -(-self.total // page_bytes))
+		self._have = bytearray(self.pages)
+		fd, self.path = tempfile.mkstemp(prefix="gc2_view_", suffix=".part")
+		self._f = os.fdopen(fd, "r+b")
+		self._f.truncate(self.total)  # no blocks allocated until written, where the FS allows
+		self._mm = mmap.mmap(self._f.fileno(), self.total) if self.total else None
+
+	def has(self, page: int) -> bool:
+		return 0 <= page < self.pages and bool(self._have[page])
+
+	def cached_pages(self) -> int:
+		return sum(self._have)
+
+	def put(self, page: int, data: bytes) -> None:
+		off = page * self.page_bytes
+		n = max(0, min(len(data), self.total - off))
+		if n and self._mm is not None:
+			self._mm[off:off + n] = data[:n]
+		self._have[page] = 1
+
+	def read(self, off: int, n: int) -> bytes:
+		if self._mm is None or n <= 0:
+			return b""
+		return self._mm[max(0, off):min(self.total, off + n)]
+
+	def find(self, needle: bytes, start: int, end: int) -> int:
+		return self._mm.find(needle, start, end) if self._mm is not None else -1
+
+	def rfind(self, needle: bytes, start: int, end: int) -> int:
+		return self._mm.rfind(needle, start, end) if self._mm is not None else -1
+
+	def run_end(self, off: int) -> int:
+		"""End of the run of cached pages containing ``off``."""
+		p = off // self.page_bytes
+		while self.has(p):
+			p += 1
+		return min(self.total, p * self.page_bytes)
+
+	def run_start(self, off: int) -> int:
+		"""Start of the run of cached pages containing ``off``."""
+		p = off // self.page_bytes
+		while p > 0 and self.has(p - 1):
+			p -= 1
+		return p * self.page_bytes
+
+	def close(self) -> None:
+		try:
+			if self._mm is not None:
+				self._mm.close()
+			self._f.close()
+		finally:
+			self._mm = None
+			try:
+				os.remove(self.path)
+			except OSError:
+				pass
+
+
+class LineIndex:
+	"""Newlines per fetched page, folded into running totals over the contiguous prefix."""
+
+	def __init__(self, pages: int):
+		self.counts = [-1] * pages
+		self._cum = [0]  # _cum[i] = lines before page i, for i <= prefix
+
+	@property
+	def prefix(self) -> int:
+		return len(self._cum) - 1
+
+	def add(self, page: int, newlines: int) -> None:
+		if self.counts[page] >= 0:
+			return
+		self.counts[page] = newlines
+		while self.prefix < len(self.counts) and self.counts[self.prefix] >= 0:
+			self._cum.append(self._cum[-1] + self.counts[self.prefix])
+
+	def _avg(self) -> float:
+		known = [c for c in self.counts if c >= 0]
+		return (sum(known) / len(known)) if known else 0.0
+
+	def line_at(self, page: int, newlines_before: int) -> tuple[int, bool]:
+		"""1-based line number of an offset in ``page`` (exact, or an estimate)."""
+		if page <= self.prefix:
+			return self._cum[page] + newlines_before + 1, True
+		return int(self._cum[-1] + (page - self.prefix) * self._avg()) + newlines_before + 1, False
+
+	def total(self) -> tuple[int, bool]:
+		if self.prefix == len(self.counts):
+			return self._cum[-1] + 1, True
+		return int(self._cum[-1] + (len(self.counts) - self.prefix) * self._avg()) + 1, False
+
+
+def _sniff_encoding(head: bytes) -> tuple[str, int]:
+	"""(codec, BOM length) from the first bytes of the file; no BOM means UTF-8."""
+	if head.startswith(b"\xef\xbb\xbf"):
+		return "utf-8", 3
+	if head.startswith(b"\xff\xfe"):
+		return "utf-16-le", 2
+	if head.startswith(b"\xfe\xff"):
+		return "utf-16-be", 2
+	return "utf-8", 0
+
+
+class PagedFileView(QWidget):
+	"""One tab = one remote file, viewed through fs.read_range pages."""
+
+	def __init__(self, fws, sid: str, remote_path: str, parent=None):
+		super().__init__(parent)
+		self.fws = fws
+		self.sid = sid
+		self.remote_path = remote_path
+		self._rid = f"view{next(_view_ids)}-"
+		self._cache: Optional[SparseFileCache] = None
+		self._lines: Optional[LineIndex] = None
+		self._enc = "utf-8"
+		self._nl = b"\n"
+		self._bom = 0
+		self._top = 0                    # byte offset of the first visible line
+		self._inflight: Optional[int] = None
+		self._queue: deque = deque()
+		self._pending_jump: Optional[int] = None
+		self._pending_lines = 0
+		self._search: Optional[dict] = None
+		self._hit: Optional[tuple] = None  # (offset, length) of the current match
+		self._error = ""
+
+		lay = QVBoxLayout(self)
+		lay.setContentsMargins(0, 0, 0, 0)
+		lay.setSpacing(0)
+
+		bar = QHBoxLayout()
+		bar.setContentsMargins(8, 4, 8, 4)
+		bar.setSpacing(6)
+		ro = QLabel("Read-only · paged", self)
+		ro.setStyleSheet("color:#8a93a3;")
+		self.find_edit = QLineEdit(self)
+		self.find_edit.setPlaceholderText("Find (Enter = next)")
+		self.find_edit.setClearButtonEnabled(True)
+		self.find_edit.returnPressed.connect(self.find_next)
+		self.case_btn = QToolButton(self)
+		self.case_btn.setText("Aa")
+		self.case_btn.setToolTip("Match case")
+		self.case_btn.setCheckable(True)
+		bar.addWidget(ro)
+		bar.addStretch(1)
+		bar.addWidget(self.find_edit, 0)
+		bar.addWidget(self.case_btn, 0)
+		lay.addLayout(bar)
+
+		body = QHBoxLayout()
+		body.setContentsMargins(0, 0, 0, 0)
+		body.setSpacing(0)
+		self.view = QPlainTextEdit(self)
+		self.view.setReadOnly(True)
+		self.view.setFrameShape(QPlainTextEdit.NoFrame)
+		self.view.setLineWrapMode(QPlainTextEdit.NoWrap)
+		self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+		self._set_mono(self.view)
+		self.view.installEventFilter(self)
+		self.view.viewport().installEventFilter(self)
+		self.vbar = QScrollBar(Qt.Vertical, self)
+		self.vbar.setRange(0, 0)
+		self.vbar.valueChanged.connect(self._on_scrollbar)
+		body.addWidget(self.view, 1)
+		body.addWidget(self.vbar, 0)
+		lay.addLayout(body, 1)
+
+		self.status = QLabel("Loading…", self)
+		self.status.setStyleSheet("color:#8a93a3; padding:4px 10px;")
+		lay.addWidget(self.status, 0)
+
+		QShortcut("Ctrl+F", self, activated=lambda: (self.find_edit.setFocus(), self.find_edit.selectAll()))
+		QShortcut("F3", self, activated=self.find_next)
+		QShortcut("Escape", self.find_edit, activated=self._cancel_search)
+
+		self._render_timer = QTimer(self)
+		self._render_timer.setSingleShot(True)
+		self._render_timer.setInterval(0)
+		self._render_timer.timeout.connect(self._render)
+
+		self.fws.range_read.connect(self._on_range)
+		self._request(0, stat=True)
+
+	# ---------- lifecycle ----------
+	def release(self):
+		"""Drop the local page cache (tab closed)."""
+		try:
+			self.fws.range_read.disconnect(self._on_range)
+		except Exception:
+			pass
+		self._queue.clear()
+		self._search = None
+		if self._cache is not None:
+			self._cache.close()
+			self._cache = None
+
+	def _set_mono(self, w: QWidget):
+		f = QFont()
+		for fam in ("Fira Code", "JetBrains Mono", "Cascadia Code", "DejaVu Sans Mono", "Monospace"):
+			f.setFamily(fam)
+			w.setFont(f)
+			if w.fontInfo().family() == fam:
+				break
+		f.setPointSizeF(max(10.0, w.fontInfo().pointSizeF()))
+		w.setFont(f)
+
+	# ---------- fetching ----------
+	def _request(self, page: int, *, stat: bool = False):
+		self._inflight = page
+		self.fws.read_range(self.sid, self.remote_path, page * PAGE_BYTES, PAGE_BYTES,
+							req_id=f"{self._rid}{page}", stat=stat)
+
+	def _want(self, page: int, *, urgent: bool = False):
+		c = self._cache
+		if c is None or not (0 <= page < c.pages) or c.has(page) or page == self._inflight:
+			return
+		if page in self._queue:
+			if not urgent:
+				return
+			self._queue.remove(page)
+		if urgent:
+			self._queue.appendleft(page)
+		else:
+			self._queue.append(page)
+		while len(self._queue) > MAX_QUEUED:
+			self._queue.pop()  # stalest prefetch; the view asks again if it still matters
+		self._pump()
+
+	def _pump(self):
+		if self._inflight is None and self._queue:
+			self._request(self._queue.popleft())
+
+	def _on_range(self, m: dict):
+		rid = str(m.get("req_id") or "")
+		if not rid.startswith(self._rid):
+			return
+		try:
+			page = int(rid[len(self._rid):])
+		except ValueError:
+			return
+		if page == self._inflight:
+			self._inflight = None
+		if not m.get("ok"):
+			self._error = str(m.get("error") or "read failed")
+			if self._cache is None:
+				self.view.setPlainText("")
+				self.status.setText(f"Open failed: {self._error}")
+				return
+			self.status.setText(f"Read failed at page {page}: {self._error}")
+			self._search = None
+			self._pump()
+			return
+		self._error = ""
+		data = m.get("data") or b""
+		if isinstance(data, str):  # shaper didn't run
+			data = binascii.a2b_base64(data)
+
+		if self._cache is None:
+			total = int(m.get("total") if m.get("total") is not None else -1)
+			if total < 0:
+				total = len(data)
+			self._cache = SparseFileCache(total)
+			self._lines = LineIndex(self._cache.pages)
+			self._enc, self._bom = _sniff_encoding(bytes(data[:4]))
+			self._nl = "\n".encode(self._enc)
+			self._top = self._bom
+			self.vbar.setRange(0, min(SCROLL_STEPS, max(0, total)))
+			self.vbar.setPageStep(max(1, self.vbar.maximum() // 50))
+
+		self._cache.put(page, data)
+		self._lines.add(page, bytes(data).count(self._nl))
+		self._pump()
+
+		if self._pending_jump is not None:
+			self._jump_to(self._pending_jump)
+		if self._pending_lines:
+			n, self._pending_lines = self._pending_lines, 0
+			self._scroll_lines(n)
+		if self._search is not None:
+			QTimer.singleShot(0, self._search_step)
+		self._render_timer.start()
+
+	# ---------- line walking ----------
+	def _line_end(self, pos: int) -> tuple[int, int]:
+		"""(end of the line starting at ``pos``, start of the next one)."""
+		c = self._cache
+		if not c.has(pos // PAGE_BYTES):
+			raise _NeedPage(pos // PAGE_BYTES)
+		limit = min(c.total, pos + MAX_LINE_BYTES)
+		hi = min(limit, c.run_end(pos))
+		i = c.find(self._nl, pos, hi)
+		if i >= 0:
+			return i, i + len(self._nl)
+		if hi == limit:
+			return limit, limit
+		raise _NeedPage(hi // PAGE_BYTES)
+
+	def _prev_start(self, pos: int) -> int:
+		"""Start of the line before the one starting at ``pos``."""
+		end = pos - len(self._nl)  # the newline that ends the previous line
+		if end <= self._bom:
+			return self._bom
+		c = self._cache
+		if not c.has((end - 1) // PAGE_BYTES):
+			raise _NeedPage((end - 1) // PAGE_BYTES)
+		lo = max(self._bom, end - MAX_LINE_BYTES)
+		lo_cached = max(lo, c.run_start(end - 1))
+		i = c.rfind(self._nl, lo_cached, end)
+		if i >= 0:
+			return i + len(self._nl)
+		if lo_cached == lo:
+			return lo
+		raise _NeedPage(lo_cached // PAGE_BYTES - 1)
+
+	def _line_start_at(self, off: int) -> int:
+		"""Start of the line containing ``off`` (as far back as the cache reaches)."""
+		c = self._cache
+		lo = max(self._bom, off - MAX_LINE_BYTES, c.run_start(off))
+		i = c.rfind(self._nl, lo, off)
+		return i + len(self._nl) if i >= 0 else lo
+
+	def _rows(self) -> int:
+		return max(1, self.view.viewport().height() // max(1, self.view.fontMetrics().lineSpacing()))
+
+	# ---------- navigation ----------
+	def _set_top(self, off: int):
+		self._top = max(self._bom, min(off, self._cache.total if self._cache else 0))
+		if self._cache is not None and self._cache.total:
+			self.vbar.blockSignals(True)
+			self.vbar.setValue(int(self._top * self.vbar.maximum() / self._cache.total))
+			self.vbar.blockSignals(False)
+		self._render_timer.start()
+
+	def _scroll_lines(self, n: int):
+		if self._cache is None or not n:
+			return
+		pos = self._top
+		try:
+			while n > 0:
+				end, nxt = self._line_end(pos)
+				if nxt >= self._cache.total:
+					break
+				pos, n = nxt, n - 1
+			while n < 0:
+				if pos <= self._bom:
+					break
+				pos, n = self._prev_start(pos), n + 1
+		except _NeedPage as need:
+			self._pending_lines = n
+			self._want(need.page, urgent=True)
+		self._set_top(pos)
+
+	def _jump_to(self, off: int):
+		"""Show the first line that starts at or after byte ``off``."""
+		self._pending_jump = None
+		if off <= self._bom:
+			self._set_top(self._bom)
+			return
+		try:
+			if not self._cache.has(off // PAGE_BYTES):
+				raise _NeedPage(off // PAGE_BYTES)
+			start = self._line_start_at(off)
+			if start != off:
+				_end, nxt = self._line_end(off)
+				if nxt < self._cache.total:
+					start = nxt
+		except _NeedPage as need:
+			self._pending_jump = off
+			self._want(need.page, urgent=True)
+			return
+		self._set_top(start)
+
+	def _jump_to_end(self):
+		if self._cache is None:
+			return
+		self._pending_jump = None
+		self._top = self._cache.total
+		self._scroll_lines(-self._rows())
+
+	def _on_scrollbar(self, value: int):
+		if self._cache is None or not self.vbar.maximum():
+			return
+		self._pending_lines = 0
+		self._jump_to(int(value * self._cache.total / self.vbar.maximum()))
+
+	def eventFilter(self, obj, ev):
+		if self._cache is not None:
+			t = ev.type()
+			if t == QEvent.Wheel and obj is self.view.viewport():
+				steps = ev.angleDelta().y() // 40  # 3 lines per notch
+				if steps:
+					self._scroll_lines(-steps)
+				return True
+			if t == QEvent.KeyPress and obj is self.view:
+				k, ctrl = ev.key(), bool(ev.modifiers() & Qt.ControlModifier)
+				if k == Qt.Key_Down: self._scroll_lines(1); return True
+				if k == Qt.Key_Up: self._scroll_lines(-1); return True
+				if k == Qt.Key_PageDown: self._scroll_lines(self._rows() - 1); return True
+				if k == Qt.Key_PageUp: self._scroll_lines(-(self._rows() - 1)); return True
+				if k == Qt.Key_Home and ctrl: self._jump_to(0); return True
+				if k == Qt.Key_End and ctrl: self._jump_to_end(); return True
+			if t == QEvent.Resize and obj is self.view.viewport():
+				self._render_timer.start()
+		return super().eventFilter(obj, ev)
+
+	# ---------- rendering ----------
+	def _decode(self, raw: bytes) -> str:
+		return raw.decode(self._enc, errors="replace").rstrip("\r")
+
+	def _render(self):
+		c = self._cache
+		if c is None:
+			return
+		rows = self._rows()
+		lines: list[str] = []
+		spans: list[tuple] = []  # (start, end) bytes of each shown line
+		pos = self._top
+		try:
+			while len(lines) < rows and pos < c.total:
+				end, nxt = self._line_end(pos)
+				lines.append(self._decode(c.read(pos, end - pos)))
+				spans.append((pos, end))
+				pos = nxt
+		except _NeedPage as need:
+			self._want(need.page, urgent=True)
+			lines.append("…")
+		self.view.setPlainText("\n".join(lines))
+		self._highlight_hit(lines, spans)
+
+		# keep a page either side of the window warm
+		if pos < c.total:
+			self._want(pos // PAGE_BYTES + 1)
+		if self._top > self._bom:
+			self._want(self._top // PAGE_BYTES - 1)
+		self._update_status()
+
+	def _highlight_hit(self, lines: list, spans: list):
+		if not self._hit:
+			return
+		off, n = self._hit
+		chars = 0
+		for text, (start, end) in zip(lines, spans):
+			if start <= off and off + n <= end:
+				c = self._cache
+				a = chars + len(self._decode(c.read(start, off - start)))
+				cur = self.view.textCursor()
+				cur.setPosition(a)
+				cur.setPosition(a + len(self._decode(c.read(off, n))), QTextCursor.KeepAnchor)
+				self.view.setTextCursor(cur)
+				return
+			chars += len(text) + 1
+
+	def _update_status(self):
+		c, li = self._cache, self._lines
+		page = self._top // PAGE_BYTES
+		before = c.read(page * PAGE_BYTES, self._top - page * PAGE_BYTES).count(self._nl)
+		line, exact = li.line_at(page, before)
+		total, total_exact = li.total()
+		msg = (f"Line {'' if exact else '~'}{line:,} of {'' if total_exact else '~'}{total:,}"
+			   f"  ·  {self._top:,} / {c.total:,} bytes"
+			   f"  ·  {c.cached_pages()}/{c.pages} pages cached  ·  {self._enc}")
+		if self._search is not None:
+			msg += "  ·  searching…"
+		if self._error:
+			msg += f"  ·  {self._error}"
+		self.status.setText(msg)
+
+	# ---------- search ----------
+	def find_next(self):
+		text = self.find_edit.text()
+		if not text or self._cache is None:
+			return
+		needle = text.encode(self._enc)
+		match_case = self.case_btn.isChecked()
+		start = (self._hit[0] + 1) if self._hit else self._top
+		self._search = {"needle": needle if match_case else needle.lower(), "case": match_case,
+						"pos": start, "origin": start, "wrapped": False}
+		self._search_step()
+
+	def _cancel_search(self):
+		self._search = None
+		self._update_status()
+
+	def _search_step(self):
+		s, c = self._search, self._cache
+		if s is None or c is None:
+			return
+		needle = s["needle"]
+		for _ in range(SEARCH_PAGES_PER_STEP):
+			pos = s["pos"]
+			limit = c.total if not s["wrapped"] else min(c.total, s["origin"] + len(needle) - 1)
+			if pos >= limit:
+				if s["wrapped"] or s["origin"] <= self._bom:
+					self._search = None
+					self._hit = None
+					self.status.setText(f"Not found: {self.find_edit.text()}")
+					return
+				s["wrapped"], s["pos"] = True, self._bom
+				continue
+			if not c.has(pos // PAGE_BYTES):
+				self._want(pos // PAGE_BYTES, urgent=True)
+				self._update_status()
+				return  # resumes from _on_range
+			hi = min(limit, c.run_end(pos), (pos // PAGE_BYTES + 1) * PAGE_BYTES + len(needle) - 1)
+			if s["case"]:
+				i = c.find(needle, pos, hi)
+			else:
+				i = c.read(pos, hi - pos).lower().find(needle)
+				i = pos + i if i >= 0 else -1
+			if i >= 0:
+				self._search = None
+				self._hit = (i, len(needle))
+				self._set_top(self._line_start_at(i))
+				return
+			if hi >= limit:
+				s["pos"] = limit
+			else:
+				# the next page is missing or the needle may straddle it: carry the overlap
+				s["pos"] = max(pos + 1, hi - len(needle) + 1)
+				if not c.has(hi // PAGE_BYTES) and hi < c.total:
+					self._want(hi // PAGE_BYTES, urgent=True)
+					self._update_status()
+					return
+		QTimer.singleShot(0, self._search_step)
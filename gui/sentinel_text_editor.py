@@ -16,6 +16,8 @@ from PyQt5.QtWidgets import (
 from title_bar import TitleBar
 # Remote WS client (same one FileBrowser uses)
 from files_ws_client import FilesWSClient
+# Read-only paged view for files too big for an editable tab
+from paged_viewer import PagedFileView, PAGED_THRESHOLD
 
 RADIUS = 12
 SHADOW_BLUR = 36
@@ -511,6 +513,7 @@ class RemoteOpenDialog(QDialog):
 			self._navigate_to(full, add_to_history=True)
 		else:
 			self.selected_path = full
+			self.selected_size = self._size_at(row)
 			self.accept()
 
 	def _choose_selected(self):
@@ -526,8 +529,16 @@ class RemoteOpenDialog(QDialog):
 			self._navigate_to(full, add_to_history=True)
 			return
 		self.selected_path = it.data(Qt.UserRole) or ""
+		self.selected_size = self._size_at(r)
 		self.accept()
 
+	def _size_at(self, row: int) -> int:
+		it = self.table.item(row, 2)
+		try:
+			return int((it.text() if it else "").replace(",", "") or 0)
+		except ValueError:
+			return 0
+
 class RemoteSaveDialog(RemoteOpenDialog):
 	"""Same remote browser, but with a filename field and 'Save' semantics."""
 	def __init__(self, fws: FilesWSClient, sid: str, os_type: str, start_path: str, suggested_name: str = "untitled.txt"):
@@ -815,8 +826,8 @@ class SentinelEditorWindow(QWidget):
 		self._center_on_screen()
 		self.installEventFilter(self)
 
-		# Track pages by remote path
-		self._by_remote: Dict[str, _EditorPage] = {}
+		# Track pages by remote path (_EditorPage or PagedFileView)
+		self._by_remote: Dict[str, QWidget] = {}
 
 	def _make_titlebar(self) -> TitleBar:
 		try:
@@ -1039,7 +1050,25 @@ class SentinelEditorWindow(QWidget):
 			idx = self.tabs.indexOf(page)
 			if idx >= 0:
 				self.tabs.setCurrentIndex(idx)
-			page.set_text_if_clean(initial_text)
+			if isinstance(page, _EditorPage):
+				page.set_text_if_clean(initial_text)
+		self._retitle_window()
+
+	def open_paged(self, *, title: str, remote_path: str):
+		"""Open a large remote file read-only; bytes are fetched by page as it is scrolled/searched."""
+		self.show(); self.raise_(); self.activateWindow()
+		page = self._by_remote.get(remote_path)
+		if page is None:
+			if not (self.fws and self._sid):
+				QMessageBox.information(self, "Open", "No agent connection.")
+				return
+			page = PagedFileView(self.fws, self._sid, remote_path)
+			idx = self.tabs.addTab(page, f"{title} (read-only)")
+			self._by_remote[remote_path] = page
+		else:
+			idx = self.tabs.indexOf(page)
+		if idx >= 0:
+			self.tabs.setCurrentIndex(idx)
 		self._retitle_window()
 
 	# ---------- Agent context ----------
@@ -1078,7 +1107,10 @@ class SentinelEditorWindow(QWidget):
 		dlg = RemoteOpenDialog(self.fws, self._sid, self._os_type, start)
 		dlg.setModal(True)
 		if dlg.exec_() == QDialog.Accepted and dlg.selected_path:
-			self._download_and_open(dlg.selected_path)
+			if getattr(dlg, "selected_size", 0) > PAGED_THRESHOLD:
+				self.open_paged(title=_basename_for_label(dlg.selected_path), remote_path=dlg.selected_path)
+			else:
+				self._download_and_open(dlg.selected_path)
 
 	def _download_and_open(self, remote_path: str):
 		# capture name and kick download
@@ -1241,6 +1273,9 @@ class SentinelEditorWindow(QWidget):
 		if isinstance(w, _EditorPage):
 			# (Optional) prompt if dirty
 			self._by_remote.pop(w.remote_path, None)
+		elif isinstance(w, PagedFileView):
+			self._by_remote.pop(w.remote_path, None)
+			w.release()
 		self.tabs.removeTab(index)
 		self._retitle_window()
 
@@ -1262,5 +1297,8 @@ class SentinelEditorWindow(QWidget):
 		return super().eventFilter(obj, ev)
 
 	def closeEvent(self, e):
+		for w in list(self._by_remote.values()):
+			if isinstance(w, PagedFileView):
+				w.release()
 		type(self)._instance = None
 		return super().closeEvent(e)
@@ -21,6 +21,8 @@ try:
 except Exception:
 	def theme_color(_k, d): return d
 
+from theme_center import use_sheet
+
 # ─────────────────────────── Tiny icon helpers ───────────────────────────
 def _make_play_icon(sz=16, col="#eaf2ff"):
 	pm = QPixmap(sz, sz); pm.fill(Qt.transparent)
@@ -522,6 +524,9 @@ class SentinelshellConsole(QWidget):
 		self._at_line_start = True  # <— NEW: are we at the start of a terminal line?
 		self._ansi_state = _ansi_default_state()
 
+		# header/output/command-bar rules: the "console" sheet in theme_center
+		use_sheet(self, "console")
+
 		# outer card
 		card = _GlassCard(radius=14, parent=self)
 		lay = QVBoxLayout(card); lay.setContentsMargins(14,14,14,14); lay.setSpacing(10)
@@ -529,15 +534,12 @@ class SentinelshellConsole(QWidget):
 		# header
 		self.title = QLabel(f"SS — {hostname}")
 		self.title.setObjectName("GSTitle")
-		self.title.setStyleSheet("QLabel#GSTitle{font-size:16.5pt;font-weight:600;color:#eaf2ff;letter-spacing:0.3px;}")
 		self.badge = QLabel(f"SID: {sid}")
 		self.badge.setObjectName("Badge")
-		self.badge.setStyleSheet("QLabel#Badge{color:#cfe3ff;background:rgba(63,134,255,0.11);border:1px solid #2b3c5c;border-radius:9px;padding:2px 8px;font-size:9.5pt;}")
 
 		self.status = QPushButton(); self.status.setEnabled(False); self.status.setFlat(True)
 		self.status.setObjectName("StatusBtn")
 		self.status.setIcon(_make_dot_icon(10, "#f59e0b")); self.status.setText(" Connecting…")
-		self.status.setStyleSheet("QPushButton#StatusBtn{color:#cbd5e1;border:none;padding:0 4px;font-size:9.5pt;}")
 
 		# toolbar buttons
 		self.btn_wrap  = QPushButton("Wrap");        self._style_pill(self.btn_wrap,  checkable=True, checked=False)
@@ -560,33 +562,24 @@ class SentinelshellConsole(QWidget):
 		try: mono.setStyleStrategy(QFont.NoFontMerging)
 		except Exception: pass
 		self.out.setFont(mono); self.out.setWordWrapMode(QTextOption.NoWrap)
-		self.out.setStyleSheet("QTextEdit{background:transparent;color:#dce3ea;selection-background-color:#314e86;selection-color:#eaf2ff;border:none;}")
+		self.out.setObjectName("ConsoleOutput")
 		lay.addWidget(self.out, 1)
 
 		self._at_line_start = True  # are we currently at column 0?
 
 		# compact “smart hints” strip (chips shown while typing)
 		self.hints = QLabel(""); self.hints.setObjectName("HintChips")
-		self.hints.setStyleSheet(
-			"QLabel#HintChips{border:none;color:#a9b6c8;}"
-		)
 		lay.addWidget(self.hints)
 
 		# command bar
 		bar = QHBoxLayout(); bar.setSpacing(8)
 		self.prompt = QLabel("❯"); self.prompt.setObjectName("PromptGlyph"); self.prompt.setAlignment(Qt.AlignCenter)
 		self.prompt.setFixedWidth(26)
-		self.prompt.setStyleSheet("QLabel#PromptGlyph{font:12pt 'JetBrains Mono','Fira Code','Consolas','Menlo';color:#cfe3ff;background:rgba(63,134,255,0.18);border:1px solid #2b3c5c;border-radius:9px;}")
 		hist_path = str(Path.home() / f".sentinelcommander_ss_{sid}_history")
 		self.inp = HistoryLineEdit(history_path=hist_path)
 		self._style_input(self.inp)
 		self.btn_send = QPushButton(" Send"); self.btn_send.setIcon(_make_play_icon(16, "#eaf2ff"))
 		self.btn_send.setObjectName("SendBtn"); self.btn_send.setCursor(Qt.PointingHandCursor); self.btn_send.setMinimumHeight(38)
-		self.btn_send.setStyleSheet(
-			"QPushButton#SendBtn{background:#2b6af1;border:1px solid #3c78f5;color:white;border-radius:10px;padding:8px 14px;font-weight:600;}"
-			"QPushButton#SendBtn:hover{background:#3b7bff;border-color:#4b86ff;}"
-			"QPushButton#SendBtn:pressed{background:#2a62db;}"
-		)
 		bar.addWidget(self.prompt, 0); bar.addWidget(self.inp, 1); bar.addWidget(self.btn_send, 0)
 		lay.addLayout(bar)
 
@@ -636,19 +629,10 @@ class SentinelshellConsole(QWidget):
 		btn.setObjectName("Pill"); btn.setCheckable(checkable)
 		if checkable: btn.setChecked(checked)
 		btn.setCursor(Qt.PointingHandCursor); btn.setMinimumHeight(30)
-		btn.setStyleSheet(
-			"QPushButton#Pill{color:#cfd8e3;background:rgba(14,20,28,0.6);border:1px solid #2a3446;border-radius:10px;padding:6px 10px;}"
-			"QPushButton#Pill:hover{border-color:#3b82f6;}"
-			"QPushButton#Pill:checked{background:rgba(40,76,140,0.35);border-color:#3b82f6;color:#eaf2ff;}"
-		)
 	def _style_input(self, le: QLineEdit):
 		f = QFont("JetBrains Mono"); f.setStyleHint(QFont.Monospace); f.setPointSize(10); le.setFont(f)
 		le.setMinimumHeight(38)
-		le.setStyleSheet(
-			"QLineEdit{color:#eaf2ff;background:rgba(10,14,20,0.65);border:1px solid #2b3c5c;border-radius:10px;padding:8px 10px;"
-			"selection-background-color:#3b82f6;selection-color:white;}"
-			"QLineEdit:focus{border-color:#4b86ff;background:rgba(14,20,28,0.75);}"
-		)
+		le.setObjectName("ConsoleInput")
 
 	# ─────────────── Connection state
 	def _set_connected(self, ok: bool):
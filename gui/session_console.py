@@ -23,6 +23,13 @@ except Exception:
 		def instance(): return ThemeManager()
 		def themeChanged(self, *a, **k): pass
 
+from theme_center import use_sheet
+
+# ---------- output render tuning ----------
+CONSOLE_SCROLLBACK_LINES = 20000     # blocks kept in the widget; the rest lives in the spill log
+RENDER_FRAME_MS = 16                 # incoming output is coalesced into one edit per frame
+RENDER_SLICE_CHARS = 256 * 1024      # max chars written per edit; bigger backlogs are sliced
+
 # ---------- tiny icon helpers (vector-ish, no external assets) ----------
 def _make_play_icon(sz=16, col="#eaf2ff"):
 	pm = QPixmap(sz, sz); pm.fill(Qt.transparent)
@@ -400,6 +407,19 @@ class SessionConsole(QWidget):
 		self._rep_last_base = ""
 		self._snf_seen = False   # “session not found” guard
 
+		# render pipeline: _append_text only queues, _render_pending writes once per frame
+		self._pending: list = []          # [render_text, repeat_count] not yet in the widget
+		self._rep_rendered_dirty = False  # last *rendered* line needs its (xN) rewritten
+		self._render_timer = QTimer(self)
+		self._render_timer.setSingleShot(True)
+		self._render_timer.timeout.connect(self._render_pending)
+		self._spill_path = Path.home() / f".sentinelcommander_sc_{sid}_scrollback.log"
+		self._spill = None                # opened on first write, truncated per console
+		self._spill_noted = False
+
+		# header/output/command-bar rules: the "console" sheet in theme_center
+		use_sheet(self, "console")
+
 		# ================= HEADER =================
 		card = _GlassCard(radius=14, parent=self)
 		self._card = card
@@ -409,14 +429,9 @@ class SessionConsole(QWidget):
 
 		self.title = QLabel(hostname)
 		self.title.setObjectName("ConsoleTitle")
-		self.title.setStyleSheet("QLabel#ConsoleTitle{font-size:16.5pt;font-weight:600;color:#eaf2ff;letter-spacing:0.3px;}")
 
 		self.sid_badge = QLabel(f"SID: {sid}")
 		self.sid_badge.setObjectName("Badge")
-		self.sid_badge.setStyleSheet(
-			"QLabel#Badge{color:#cfe3ff;background:rgba(63,134,255,0.11);"
-			"border:1px solid #2b3c5c;border-radius:9px;padding:2px 8px;font-size:9.5pt;}"
-		)
 
 		self.status = QPushButton()   # dot icon + text
 		self.status.setObjectName("StatusBtn")
@@ -424,7 +439,6 @@ class SessionConsole(QWidget):
 		self.status.setFlat(True)
 		self.status.setIcon(_make_dot_icon(10, "#f59e0b")) # pending
 		self.status.setText(" Connecting…")
-		self.status.setStyleSheet("QPushButton#StatusBtn{color:#cbd5e1; border:none; padding:0 4px; font-size:9.5pt;}")
 
 		self.btn_files = QPushButton("Files"); self._style_pill(self.btn_files)
 		self.btn_wrap  = QPushButton("Wrap");  self._style_pill(self.btn_wrap, checkable=True)
@@ -445,6 +459,8 @@ class SessionConsole(QWidget):
 
 		# ================= OUTPUT =================
 		self.out = QPlainTextEdit(); self.out.setReadOnly(True)
+		self.out.setUndoRedoEnabled(False)
+		self.out.setMaximumBlockCount(CONSOLE_SCROLLBACK_LINES)
 		self._style_output()
 		card_lay.addWidget(self.out, 1)
 
@@ -455,10 +471,6 @@ class SessionConsole(QWidget):
 		self.prompt.setObjectName("PromptGlyph")
 		self.prompt.setAlignment(Qt.AlignCenter)
 		self.prompt.setFixedWidth(26)
-		self.prompt.setStyleSheet(
-			"QLabel#PromptGlyph{font: 12pt 'JetBrains Mono','Fira Code','Consolas','Menlo';"
-			"color:#cfe3ff;background:rgba(63,134,255,0.18);border:1px solid #2b3c5c;border-radius:9px;}"
-		)
 
 		# history-enabled input
 		hist_path = str(Path.home() / f".sentinelcommander_sc_{sid}_history")
@@ -470,12 +482,6 @@ class SessionConsole(QWidget):
 		self.btn_send.setCursor(Qt.PointingHandCursor)
 		self.btn_send.setObjectName("SendBtn")
 		self.btn_send.setMinimumHeight(38)
-		self.btn_send.setStyleSheet(
-			"QPushButton#SendBtn{background:#2b6af1;border:1px solid #3c78f5;color:white;"
-			"border-radius:10px;padding:8px 14px;font-weight:600;}"
-			"QPushButton#SendBtn:hover{background:#3b7bff;border-color:#4b86ff;}"
-			"QPushButton#SendBtn:pressed{background:#2a62db;}"
-		)
 
 		h_cmd.addWidget(self.prompt, 0)
 		h_cmd.addWidget(self.inp, 1)
@@ -538,32 +544,19 @@ class SessionConsole(QWidget):
 		if checkable: btn.setChecked(checked)
 		btn.setCursor(Qt.PointingHandCursor)
 		btn.setMinimumHeight(30)
-		btn.setStyleSheet(
-			"QPushButton#Pill{color:#cfd8e3;background:rgba(14,20,28,0.6);"
-			"border:1px solid #2a3446;border-radius:10px;padding:6px 10px;}"
-			"QPushButton#Pill:hover{border-color:#3b82f6;}"
-			"QPushButton#Pill:checked{background:rgba(40,76,140,0.35);border-color:#3b82f6;color:#eaf2ff;}"
-		)
 
 	def _style_output(self):
 		self.out.setFrameStyle(QFrame.NoFrame)
 		self.out.setLineWrapMode(QPlainTextEdit.NoWrap)
 		f = QFont("JetBrains Mono"); f.setStyleHint(QFont.Monospace); f.setPointSize(10)
 		self.out.setFont(f)
-		self.out.setStyleSheet(
-			"QPlainTextEdit{background:transparent;color:#e6edf3;selection-background-color:#314e86;"
-			"selection-color:#eaf2ff;border:none;}"
-		)
+		self.out.setObjectName("ConsoleOutput")
 
 	def _style_input(self, le: QLineEdit):
 		f = QFont("JetBrains Mono"); f.setStyleHint(QFont.Monospace); f.setPointSize(10)
 		le.setFont(f)
 		le.setMinimumHeight(38)
-		le.setStyleSheet(
-			"QLineEdit{color:#eaf2ff;background:rgba(10,14,20,0.65);border:1px solid #2b3c5c;"
-			"border-radius:10px;padding:8px 10px;selection-background-color:#3b82f6;selection-color:white;}"
-			"QLineEdit:focus{border-color:#4b86ff;background:rgba(14,20,28,0.75);}"
-		)
+		le.setObjectName("ConsoleInput")
 
 	# ---------- behavior ----------
 	def _toggle_wrap(self, on: bool):
@@ -604,66 +597,117 @@ class SessionConsole(QWidget):
 		QTimer.singleShot(170, lambda: self.out.setExtraSelections([]))
 
 	def _append_text(self, text: str, *, key: str = None):
-		import time as _t
-
+		"""Queue output for the next frame; see _render_pending."""
 		# honor CLEAR control
 		if text == "\x00CLEAR\x00":
 			self._clear_screen()
 			return
 
 		base_key = (key if key is not None else text.strip())
-		now = _t.time()
-
-		# Build visible text (with optional timestamp)
-		if self._show_time:
-			ts = time.strftime("[%H:%M:%S] ")
-		else:
-			ts = ""
-		visible = []
-		for ln in text.splitlines() or [""]:
-			visible.append((ts + ln) if (self._show_time and ln.strip()) else ln)
-		render = "\n".join(visible)
+		now = time.time()
 
-		# Repeat collapse: if same key within window, update the last line instead of appending
+		# Repeat collapse: same key within window only bumps the (xN) counter
 		if self._rep_key_last == base_key and (now - self._rep_last_ts) <= self._rep_window:
 			self._rep_count += 1
 			self._rep_last_ts = now
-			self._update_last_line_repetition()
-			self._flash_last_line()
+			if self._pending:
+				self._pending[-1][1] = self._rep_count
+			else:
+				self._rep_rendered_dirty = True
+			self._schedule_render()
 			return
 
-		# New line
-		self._with_scroll_guard(lambda: self.out.appendPlainText(render))
-		self._flash_last_line()
+		# Build visible text (with optional timestamp)
+		ts = time.strftime("[%H:%M:%S] ") if self._show_time else ""
+		lines = text.splitlines() or [""]
+		if ts:
+			lines = [(ts + ln) if ln.strip() else ln for ln in lines]
+		render = "\n".join(lines)
+		self._pending.append([render, 1])
 
 		# capture last line pieces for future updates
 		self._rep_key_last = base_key
 		self._rep_last_ts = now
 		self._rep_count = 1
 		# store only the final line’s base text (without “(xN)”)
-		last_line = render.splitlines()[-1] if render.splitlines() else render
-		if self._show_time and last_line.startswith(ts):
+		last_line = lines[-1]
+		if ts and last_line.startswith(ts):
 			self._rep_last_render_prefix = ts
 			self._rep_last_base = last_line[len(ts):]
 		else:
 			self._rep_last_render_prefix = ""
 			self._rep_last_base = last_line
+		self._schedule_render()
+
+	def _schedule_render(self, delay: int = RENDER_FRAME_MS):
+		if not self._render_timer.isActive():
+			self._render_timer.start(delay)
+
+	def _take_slice(self) -> str:
+		"""Pop up to RENDER_SLICE_CHARS of queued output (split on a line break)."""
+		parts, budget = [], RENDER_SLICE_CHARS
+		while self._pending and budget > 0:
+			text, count = self._pending[0]
+			if len(text) > budget:
+				cut = text.rfind("\n", 0, budget)
+				if cut > 0:
+					parts.append(text[:cut])
+					self._pending[0][0] = text[cut + 1:]
+				elif not parts:
+					# one monster line; hard split, the rest continues as its own line
+					parts.append(text[:budget])
+					self._pending[0][0] = text[budget:]
+				break
+			self._pending.pop(0)
+			if count > 1:
+				text = f"{text}  (x{count})"
+			parts.append(text)
+			budget -= len(text) + 1
+		return "\n".join(parts)
+
+	def _render_pending(self):
+		"""Apply everything queued since the last frame as a single document edit."""
+		chunk = self._take_slice()
+		rewrite = self._rep_rendered_dirty
+		self._rep_rendered_dirty = False
+		if not chunk and not rewrite:
+			return
 
-		if self._autoscroll:
-			cur = self.out.textCursor()
-			cur.movePosition(QTextCursor.End)
-			self.out.setTextCursor(cur)
-			self.out.ensureCursorVisible()
-			
-	def _update_last_line_repetition(self):
 		def _write():
-			cur = self.out.textCursor()
+			cur = QTextCursor(self.out.document())   # not the view's cursor: no selection jumps
+			cur.beginEditBlock()
 			cur.movePosition(QTextCursor.End)
-			cur.select(QTextCursor.LineUnderCursor)
-			new_text = f"{self._rep_last_render_prefix}{self._rep_last_base}  (x{self._rep_count})"
-			cur.insertText(new_text)
+			if rewrite:
+				cur.select(QTextCursor.LineUnderCursor)
+				cur.insertText(f"{self._rep_last_render_prefix}{self._rep_last_base}  (x{self._rep_count})")
+			if chunk:
+				if not self.out.document().isEmpty():
+					cur.insertText("\n")
+				cur.insertText(chunk)
+			cur.endEditBlock()
 		self._with_scroll_guard(_write)
 
+		if chunk:
+			self._spill_write(chunk)
+		if self._pending:
+			self._schedule_render(0)   # yield to input events between slices
+		else:
+			self._flash_last_line()
+
+	def _spill_write(self, chunk: str):
+		"""Full history goes to disk; the widget only keeps the last N lines."""
+		try:
+			if self._spill is None:
+				self._spill = open(self._spill_path, "w", encoding="utf-8", errors="replace")
+			self._spill.write(chunk + "\n")
+			self._spill.flush()
+		except Exception:
+			return
+		if not self._spill_noted and self.out.document().blockCount() >= CONSOLE_SCROLLBACK_LINES:
+			self._spill_noted = True
+			self.out.setToolTip(f"Older output trimmed; full log: {self._spill_path}")
+			self.status.setToolTip(str(self._spill_path))
+
 	def _send(self):
 		cmd = self.inp.text().strip()
 		if not cmd:
@@ -680,8 +724,22 @@ class SessionConsole(QWidget):
 		self.inp.clear()
 
 	def _clear_screen(self):
+		# anything still queued belongs to before the clear
+		self._pending.clear()
+		self._rep_rendered_dirty = False
+		self._rep_key_last = None
 		self.out.clear()
 
+	def closeEvent(self, e):
+		try:
+			if self._pending:
+				self._spill_write("\n".join(t for t, _c in self._pending))
+			if self._spill is not None:
+				self._spill.close()
+		except Exception:
+			pass
+		super().closeEvent(e)
+
 	def _copy_all(self):
 		self.out.selectAll(); self.out.copy()
 		# brief visual tick in the status
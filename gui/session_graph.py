@@ -1,17 +1,18 @@
 from __future__ import annotations
 
 import json
+import bisect
 import inspect
 import math
 import os
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from PyQt5.QtCore import (
 	QPoint, QPointF, QRectF, Qt, pyqtSignal, QSize, QTimer, QLineF, QEvent, QRect
 )
 from PyQt5.QtGui import (
-	QBrush, QColor, QFont, QPainter, QPainterPath, QPen, QPixmap, QKeySequence
+	QBrush, QColor, QFont, QPainter, QPainterPath, QPen, QPixmap, QKeySequence, QTransform
 )
 from PyQt5.QtWidgets import (
 	QGraphicsItem, QGraphicsObject, QGraphicsScene, QGraphicsSimpleTextItem,
@@ -91,6 +92,9 @@ _FIREWALL_PATHS = [
 _FIREWALL_PM: Optional[QPixmap] = None
 
 _ICON_CACHE: Dict[str, QPixmap] = {}
+# (kind, w, h) -> icon pre-scaled to w x h device pixels, shared by all agents
+_ICON_TIERS: Dict[Tuple[str, int, int], QPixmap] = {}
+ICON_TIERS_MAX = 64
 AGENT_ICON_SCALE = 1.6
 
 def _get_firewall_icon() -> QPixmap:
@@ -147,10 +151,32 @@ def _get_os_icon(kind: str) -> QPixmap:
 	_ICON_CACHE[kind] = QPixmap()
 	return _ICON_CACHE[kind]
 
+def _get_os_icon_scaled(kind: str, w: int, h: int) -> QPixmap:
+	"""OS icon smooth-scaled to w x h once per zoom level instead of once per agent."""
+	key = (kind, w, h)
+	pm = _ICON_TIERS.get(key)
+	if pm is None:
+		src = _get_os_icon(kind)
+		if src.isNull():
+			return src
+		if len(_ICON_TIERS) >= ICON_TIERS_MAX:
+			_ICON_TIERS.clear()
+		pm = _ICON_TIERS[key] = src.scaled(w, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+	return pm
+
 # ---- interaction tuning ----
 DBLCLICK_BASE_TARGET_ZOOM = 2.0   # minimum zoom to reach on double click
 DBLCLICK_ANIM_STEPS = 10          # frames
 DBLCLICK_ANIM_INTERVAL_MS = 16    # ~160ms total
+FILTER_COALESCE_MS = 16           # filter passes batch to at most one per frame
+
+# ---- level of detail ----
+# Thresholds are the view scale (1.0 = 100%). Below LOD_LABEL_ZOOM text is
+# unreadable anyway, so labels are skipped; below LOD_ICON_ZOOM agents are
+# drawn as flat tiles instead of scaled icons.
+LOD_LABEL_ZOOM = 0.55
+LOD_ICON_ZOOM = 0.18
+INTERACTION_SETTLE_MS = 120       # full-quality redraw this long after the last pan/zoom step
 
 # ---- spawn placement tuning -----------------------------------------------
 # New agents (no saved position) are placed on rings around the C2 and must be
@@ -160,6 +186,178 @@ SPAWN_RING_STEP    = 180.0   # px, distance between rings
 # Minimum separation depends on icon size; we’ll compute from item’s rect,
 # but keep a floor here as well.
 SPAWN_MIN_SEP_FLOOR = 160.0  # px
+# Spatial index cell size; ~one agent footprint so a min-sep query touches 3x3 cells.
+GRID_CELL = SPAWN_MIN_SEP_FLOOR
+
+
+class _AgentGrid:
+	"""
+	Uniform-grid spatial index over agent centers, kept in sync with
+	SessionGraph.agent_items. Neighbourhood queries only visit the cells that
+	overlap the query circle, so spawn placement and hit-testing no longer scan
+	every agent. Also tracks the union of agent scene rects (recomputed lazily
+	only after a move/removal shrinks it).
+	"""
+
+	def __init__(self, cell: float = GRID_CELL):
+		self.cell = float(cell)
+		self._cells: Dict[Tuple[int, int], set] = {}
+		self._pos: Dict[str, Tuple[float, float]] = {}
+		self._rects: Dict[str, QRectF] = {}
+		self._bounds: Optional[QRectF] = None
+		self._bounds_dirty = False
+		self._reach = 0.0   # largest center->corner distance seen; bounds hit() radius
+		# spawn-slot frontier (see free_slot)
+		self._slot_geom: Optional[Tuple[float, float, float, float]] = None
+		self._ring_starts: List[int] = [0]   # first slot index of each generated ring
+		self._cursor = 0
+		self._slot_of: Dict[str, int] = {}
+
+	def __len__(self):
+		return len(self._pos)
+
+	def _key(self, x: float, y: float) -> Tuple[int, int]:
+		return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+	def insert(self, sid: str, pos: QPointF, rect: QRectF):
+		if sid in self._pos:
+			self.move(sid, pos, rect)
+			return
+		x, y = pos.x(), pos.y()
+		self._pos[sid] = (x, y)
+		self._cells.setdefault(self._key(x, y), set()).add(sid)
+		self._rects[sid] = rect
+		self._grow_reach(x, y, rect)
+		if not self._bounds_dirty:
+			self._bounds = rect if self._bounds is None else self._bounds.united(rect)
+
+	def move(self, sid: str, pos: QPointF, rect: QRectF):
+		old = self._pos.get(sid)
+		if old is None:
+			self.insert(sid, pos, rect)
+			return
+		x, y = pos.x(), pos.y()
+		ok, nk = self._key(*old), self._key(x, y)
+		if ok != nk:
+			bucket = self._cells.get(ok)
+			if bucket is not None:
+				bucket.discard(sid)
+				if not bucket:
+					del self._cells[ok]
+			self._cells.setdefault(nk, set()).add(sid)
+		self._pos[sid] = (x, y)
+		self._rects[sid] = rect
+		self._grow_reach(x, y, rect)
+		self._bounds_dirty = True
+		self._release_slot(sid)
+
+	def _grow_reach(self, x: float, y: float, rect: QRectF):
+		dx = max(abs(rect.left() - x), abs(rect.right() - x))
+		dy = max(abs(rect.top() - y), abs(rect.bottom() - y))
+		self._reach = max(self._reach, math.hypot(dx, dy))
+
+	def remove(self, sid: str):
+		old = self._pos.pop(sid, None)
+		self._rects.pop(sid, None)
+		self._release_slot(sid)
+		if old is None:
+			return
+		k = self._key(*old)
+		bucket = self._cells.get(k)
+		if bucket is not None:
+			bucket.discard(sid)
+			if not bucket:
+				del self._cells[k]
+		self._bounds_dirty = True
+
+	def bounds(self) -> Optional[QRectF]:
+		if self._bounds_dirty:
+			self._bounds = None
+			for r in self._rects.values():
+				self._bounds = r if self._bounds is None else self._bounds.united(r)
+			self._bounds_dirty = False
+		return self._bounds
+
+	def near(self, pos: QPointF, radius: float, exclude: Optional[str] = None):
+		"""Yield (sid, distance) for every agent center within ``radius`` of pos."""
+		x, y = pos.x(), pos.y()
+		r2 = radius * radius
+		kx0, ky0 = self._key(x - radius, y - radius)
+		kx1, ky1 = self._key(x + radius, y + radius)
+		for kx in range(kx0, kx1 + 1):
+			for ky in range(ky0, ky1 + 1):
+				for sid in self._cells.get((kx, ky), ()):
+					if sid == exclude:
+						continue
+					px, py = self._pos[sid]
+					d2 = (px - x) ** 2 + (py - y) ** 2
+					if d2 <= r2:
+						yield sid, math.sqrt(d2)
+
+	def nearest(self, pos: QPointF, radius: float, exclude: Optional[str] = None) -> Tuple[Optional[str], float]:
+		best_sid, best_d = None, float("inf")
+		for sid, d in self.near(pos, radius, exclude):
+			if d < best_d:
+				best_sid, best_d = sid, d
+		return best_sid, best_d
+
+	def position(self, sid: str) -> Optional[Tuple[float, float]]:
+		return self._pos.get(sid)
+
+	# ----- spawn slots -----
+	# Spawn positions form one fixed sequence: ring after ring around the C2,
+	# evenly spaced slots per ring. A cursor marks the first slot that may be
+	# free; slots before it are known taken, so an insert only probes from the
+	# cursor until one slot passes the min-sep check (amortised O(1) grid
+	# lookups, plus an O(log rings) bisect to locate a slot). Removing or
+	# moving a spawned agent pulls the cursor back to its slot.
+
+	def _release_slot(self, sid: str):
+		idx = self._slot_of.pop(sid, None)
+		if idx is not None and idx < self._cursor:
+			self._cursor = idx
+
+	def _slot_pos(self, idx: int) -> Tuple[float, float]:
+		cx, cy, min_sep, r0 = self._slot_geom
+		starts = self._ring_starts
+		while starts[-1] <= idx:   # generate rings up to idx
+			ring = len(starts) - 1
+			r = r0 + ring * SPAWN_RING_STEP
+			starts.append(starts[-1] + max(8, int(2.0 * math.pi * r / (min_sep * 1.05))))
+		ring = bisect.bisect_right(starts, idx) - 1
+		slots = starts[ring + 1] - starts[ring]
+		r = r0 + ring * SPAWN_RING_STEP
+		ang = (ring * 0.37) % (2.0 * math.pi) + ((idx - starts[ring]) / float(slots)) * (2.0 * math.pi)
+		return cx + math.cos(ang) * r, cy + math.sin(ang) * r
+
+	def free_slot(self, sid: str, center: QPointF, min_sep: float, r0: float) -> QPointF:
+		"""First slot at least ``min_sep`` from every agent; reserves it for ``sid``."""
+		geom = (center.x(), center.y(), min_sep, r0)
+		if geom != self._slot_geom:
+			# C2 moved or the footprint changed: slots are elsewhere now
+			self._slot_geom = geom
+			self._ring_starts = [0]
+			self._cursor = 0
+			self._slot_of.clear()
+		# reserved slots hold an indexed agent, so the min-sep probe rejects them too
+		idx = self._cursor
+		while True:
+			x, y = self._slot_pos(idx)
+			cand = QPointF(x, y)
+			if self.nearest(cand, min_sep, exclude=sid)[1] >= min_sep:
+				break
+			idx += 1
+		self._cursor = idx + 1   # everything up to idx is occupied now
+		self._slot_of[sid] = idx
+		return cand
+
+	def hit(self, pos: QPointF, accept=None) -> Optional[str]:
+		"""Agent whose scene rect contains ``pos`` (topmost-agnostic)."""
+		for sid, _d in self.near(pos, max(self.cell * 1.5, self._reach)):
+			r = self._rects.get(sid)
+			if r is not None and r.contains(pos) and (accept is None or accept(sid)):
+				return sid
+		return None
 
 # ---------- Helpers ----------------
 def _strip_host_prefix(username: str, hostname: str) -> str:
@@ -208,15 +406,39 @@ def _paint_firewall(p: QPainter, rect: QRectF):
 	p.drawPath(flame)
 	p.restore()
 
-def _paint_os_icon(p: QPainter, rect: QRectF, pix: QPixmap):
-	"""Draw a pixmap nicely into rect (centered, aspect-fit, smooth)."""
+def _paint_os_icon(p: QPainter, rect: QRectF, kind: str) -> bool:
+	"""Draw the OS icon into rect (smooth); False if there is no icon for kind."""
+	t = p.worldTransform()
+	if t.type() <= QTransform.TxScale:
+		# plain zoom: blit the shared pre-scaled pixmap 1:1 in device pixels
+		d = t.mapRect(rect)
+		w, h = max(1, round(d.width())), max(1, round(d.height()))
+		pix = _get_os_icon_scaled(kind, w, h)
+		if pix.isNull():
+			return False
+		p.setWorldTransform(QTransform())
+		p.drawPixmap(round(d.x()), round(d.y()), pix)
+		p.setWorldTransform(t)
+		return True
+	pix = _get_os_icon(kind)
 	if pix.isNull():
-		return
+		return False
 	p.save()
 	p.setRenderHint(QPainter.SmoothPixmapTransform, True)
 	# Fill the node rect (keeps it simple; swap to aspect-fit if you prefer)
 	p.drawPixmap(QRectF(rect), pix, QRectF(pix.rect()))
 	p.restore()
+	return True
+
+
+def _paint_agent_tile(p: QPainter, rect: QRectF, osname: str):
+	"""Far-zoom stand-in for the OS icon: one flat rect, no AA, no pixmap scaling."""
+	col = QColor(245, 180, 80) if osname.startswith("lin") or "linux" in osname else QColor(41, 128, 255)
+	p.fillRect(rect.adjusted(6, 6, -6, -6), col)
+
+
+def _lod(p: QPainter) -> float:
+	return QStyleOptionGraphicsItem.levelOfDetailFromTransform(p.worldTransform())
 
 
 def _paint_windows_computer(p: QPainter, rect: QRectF):
@@ -292,6 +514,14 @@ def _paint_linux_computer(p: QPainter, rect: QRectF):
 
 
 # ---------- scene items ----------
+class _LodText(QGraphicsSimpleTextItem):
+	"""Label that SessionGraph switches off below LOD_LABEL_ZOOM (see GraphView.detailChanged)."""
+	def set_shown(self, shown: bool):
+		# no contents: not painted and no cache pixmap, but visibility (edge
+		# fit, filters) is left alone
+		self.setFlag(QGraphicsItem.ItemHasNoContents, not shown)
+
+
 class AgentItem(QGraphicsObject):
 	"""Draggable agent node (windows/linux). Emits context menu actions."""
 	open_console = pyqtSignal(str, str)  # sid, hostname
@@ -305,6 +535,7 @@ class AgentItem(QGraphicsObject):
 		super().__init__()
 		self.node = node
 		self._edges: List[EdgeItem] = []
+		self._grid: Optional[_AgentGrid] = None   # set by SessionGraph once indexed
 
 		w = NODE_W * AGENT_ICON_SCALE
 		h = NODE_H * AGENT_ICON_SCALE
@@ -315,33 +546,51 @@ class AgentItem(QGraphicsObject):
 		self.setCursor(Qt.OpenHandCursor)
 		#self._rect = QRectF(-NODE_W/2, -NODE_H/2, NODE_W, NODE_H)
 		self._rect = QRectF(-w/2, -h/2, w, h)
+		# tile is re-rendered only on zoom/OS change; pans and scene updates blit it
+		self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
 		clean_user = _strip_host_prefix(node.username, node.hostname)
-		self._label = QGraphicsSimpleTextItem(f"{clean_user}@{node.hostname}", self)
+		self._label = _LodText(f"{clean_user}@{node.hostname}", self)
 		self._label.setBrush(LABEL_GRAY)
 		self._label.setFont(LABEL_FONT)
 		#self._label.setPos(-self._label.boundingRect().width()/2, NODE_H/2 + 6)
 		self._label.setPos(-self._label.boundingRect().width()/2, h/2 + 6)
 		self._label.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+		self._update_bounds()
 
-	def boundingRect(self) -> QRectF:
+	def set_detail(self, labels: bool, zooming: bool):
+		mode = QGraphicsItem.NoCache if zooming else QGraphicsItem.DeviceCoordinateCache
+		if self.cacheMode() != mode:
+			self.setCacheMode(mode)
+			self._label.setCacheMode(mode)
+		self._label.set_shown(labels)
+
+	def _update_bounds(self):
+		self.prepareGeometryChange()
 		br = self._rect.adjusted(-4, -4, 4, 20)
 		# include label
 		lb = self._label.mapRectToParent(self._label.boundingRect())
-		return br.united(lb)
+		self._bounds = br.united(lb)
+
+	def set_label(self, text: str):
+		self._label.setText(text)
+		self._label.setPos(-self._label.boundingRect().width()/2, self._rect.height()/2 + 6)
+		self._update_bounds()
+
+	def boundingRect(self) -> QRectF:
+		return self._bounds
 
 	def paint(self, p: QPainter, opt: QStyleOptionGraphicsItem, widget=None):
 		osname = (self.node.os or "").lower()
+		if _lod(p) < LOD_ICON_ZOOM:
+			_paint_agent_tile(p, self._rect, osname)
+			return
 		# Prefer icons; lazily load them once a QApplication exists.
 		if osname.startswith("win"):
-			pm = _get_os_icon("windows")
-			if not pm.isNull():
-				_paint_os_icon(p, self._rect, pm)
+			if _paint_os_icon(p, self._rect, "windows"):
 				return
 		elif osname.lower().startswith("lin") or "linux" in osname:
-			pm = _get_os_icon("linux")
-			if not pm.isNull():
-				_paint_os_icon(p, self._rect, pm)
+			if _paint_os_icon(p, self._rect, "linux"):
 				return
 		# Fallback vectors (kept for robustness)
 		if osname.startswith("win"):
@@ -418,6 +667,9 @@ class AgentItem(QGraphicsObject):
 			#self.position_changed.emit()
 			for e in self._edges:
 				e.refresh()
+			grid = self._grid
+			if grid is not None:
+				grid.move(self.node.sid, self.pos(), self.sceneBoundingRect())
 		return super().itemChange(change, value)
 
 
@@ -459,12 +711,12 @@ class EdgeItem(QGraphicsItem):
 		self.dst = dst          # Agent
 		self.protocol = (protocol or "").lower()
 
-		 # draw the line behind nodes
+		 # draw the line behind nodes; no item cache: a long diagonal edge would
+		 # need a pixmap the size of its whole bounding box, re-rendered per zoom step
 		self.setZValue(-5)
-		self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
 		# --- label is a TOP-LEVEL item so it can float above everything ---
-		self.label = QGraphicsSimpleTextItem(self.protocol)   # no parent
+		self.label = _LodText(self.protocol)   # no parent
 		self.label.setFont(PROTOCOL_FONT)
 		self.label.setBrush(QBrush(NEON))
 		self.label.setZValue(50)  # above C2 and agents
@@ -473,6 +725,14 @@ class EdgeItem(QGraphicsItem):
 
 		self._seg1_end = None
 		self._seg2_start = None 
+		# geometry cached by refresh(); paint/boundingRect never recompute it
+		self._a: Optional[QPointF] = None     # C2 center
+		self._b: Optional[QPointF] = None     # agent center
+		self._tip: Optional[QPointF] = None   # arrow tip, short of the C2 icon
+		self._bounds = QRectF()
+		# hairline form for _EdgeBatch: whole line / line with the label gap
+		self._hair: Tuple[QLineF, ...] = ()
+		self._hair_split: Tuple[QLineF, ...] = ()
 
 		# don't consume mouse input
 		self.setAcceptedMouseButtons(Qt.NoButton)
@@ -526,11 +786,17 @@ class EdgeItem(QGraphicsItem):
 		# from center toward the agent is direction -u
 		return QPointF(c2_center.x() - ux * t_tip, c2_center.y() - uy * t_tip)
 
-	def refresh(self):
-		self.prepareGeometryChange()
+	def refresh(self, force: bool = False):
+		"""Recompute geometry; a no-op unless an endpoint moved (or force)."""
 		a = self.mapFromItem(self.src, 0, 0)   # C2 center
 		b = self.mapFromItem(self.dst, 0, 0)   # Agent center
+		if not force and a == self._a and b == self._b:
+			return
+		self.prepareGeometryChange()
 		tip = self._c2_tip_point(a, b)
+		self._a, self._b, self._tip = a, b, tip
+		self._hair = self._hair_split = (QLineF(b, tip),)
+		self._bounds = QRectF(a, b).normalized().adjusted(-12, -12, 12, 12)
 		mid = (b + tip) * 0.5
 
 		if self.scene() and self.label.scene() is None:
@@ -547,6 +813,7 @@ class EdgeItem(QGraphicsItem):
 			self.label.setVisible(False)
 			self._seg1_end = self._seg2_start = None
 			self.update(); return
+		self._bounds = self._bounds.united(self.label.mapRectToParent(self.label.boundingRect()))
 
 		# unit direction b -> tip
 		ux = (tip.x() - b.x()) / L
@@ -596,30 +863,32 @@ class EdgeItem(QGraphicsItem):
 				p2 = QPointF(p2.x() + ux*LABEL_EDGE_PAD, p2.y() + uy*LABEL_EDGE_PAD)
 			self._seg1_end = p1
 			self._seg2_start = p2
+			self._hair_split = (QLineF(b, p1), QLineF(p2, tip))
 		else:
 			self._seg1_end = self._seg2_start = None
 
 		self.update()
 
 	def boundingRect(self) -> QRectF:
-		a = self.mapFromItem(self.src, 0, 0)
-		b = self.mapFromItem(self.dst, 0, 0)
-		rect = QRectF(a, b).normalized().adjusted(-12, -12, 12, 12)
-		if self.label.isVisible():
-			lb = self.label.mapRectToParent(self.label.boundingRect())
-			return rect.united(lb)
-		return rect
+		return self._bounds
+
+	def set_detail(self, labels: bool, full: bool):
+		"""Full quality paints the styled arrow here; otherwise _EdgeBatch draws the hairline."""
+		self.setFlag(QGraphicsItem.ItemHasNoContents, not full)
+		self.label.set_shown(labels)
 
 	def paint(self, p: QPainter, opt: QStyleOptionGraphicsItem, widget=None):
-		a = self.mapFromItem(self.src, 0, 0)
-		b = self.mapFromItem(self.dst, 0, 0)
-		tip = self._c2_tip_point(a, b)
+		b, tip = self._b, self._tip
+		if b is None or tip is None:
+			return
 
 		v = tip - b
 		L = math.hypot(v.x(), v.y())
 		if L < 1e-6:
 			return
 
+		split = self.label.isVisible() and self._seg1_end is not None and self._seg2_start is not None
+
 		pen = QPen(NEON, 2.6)
 		if self.protocol in ("tls", "https"):
 			pen.setStyle(Qt.DashLine)
@@ -628,7 +897,7 @@ class EdgeItem(QGraphicsItem):
 		else:
 			pen.setStyle(Qt.SolidLine)
 
-		if not self.label.isVisible() or self._seg1_end is None or self._seg2_start is None:
+		if not split:
 			if ARROW_GLOW:
 				glow = QPen(NEON_DIM, 5.0); glow.setStyle(pen.style())
 				p.setPen(glow); p.drawLine(QLineF(b, tip))
@@ -663,21 +932,77 @@ class EdgeItem(QGraphicsItem):
 		p.setBrush(QBrush(NEON))
 		p.drawPolygon(tip, left, right)
 
+	def set_protocol(self, protocol: str):
+		"""Update the transport in place (label text + pen style) instead of recreating the edge."""
+		protocol = (protocol or "").lower()
+		if protocol == self.protocol:
+			return
+		self.protocol = protocol
+		self.label.setText(protocol)
+		self.refresh(force=True)
+
 	def cleanup(self):
 		if self.label and self.label.scene():
 			self.label.scene().removeItem(self.label)
+		# unregister from both endpoints
+		for it in (self.src, self.dst):
+			try:
+				it._edges.remove(self)  # type: ignore[attr-defined]
+			except (AttributeError, ValueError):
+				pass
+
+
+class _EdgeBatch(QGraphicsItem):
+	"""
+	Every visible edge as an aliased hairline (no head/glow), in one paint call.
+
+	Used instead of the EdgeItems while zoomed out or mid pan/zoom: at a few
+	hundred agents the per-item paint() calls cost more than the lines.
+	"""
+	def __init__(self, edges: Dict[str, EdgeItem]):
+		super().__init__()
+		self._edges = edges      # SessionGraph.edges, shared
+		self._split = True       # labels shown: keep their gap in the line
+		self.setZValue(-5)
+		self.setAcceptedMouseButtons(Qt.NoButton)
+		self.setAcceptHoverEvents(False)
+		self.setVisible(False)
+
+	def set_detail(self, labels: bool, full: bool):
+		self._split = labels
+		self.setVisible(not full)
+
+	def boundingRect(self) -> QRectF:
+		# edges can end anywhere in the (fixed) scene rect; fit-to-view uses
+		# SessionGraph._content_rect() so this doesn't count as content
+		sc = self.scene()
+		return sc.sceneRect() if sc is not None else QRectF()
+
+	def paint(self, p: QPainter, opt: QStyleOptionGraphicsItem, widget=None):
+		lines = []
+		split = self._split
+		for e in self._edges.values():
+			if e.isVisible():
+				lines.extend(e._hair_split if split else e._hair)
+		if lines:
+			p.setRenderHint(QPainter.Antialiasing, False)
+			p.setPen(QPen(NEON, 0))
+			p.drawLines(lines)
 
 
 # ---------- view widget ----------
 class GraphView(QGraphicsView):
 	"""Black canvas, wheel zoom, buttons, key panning."""
 	zoomChanged = pyqtSignal(float)
+	detailChanged = pyqtSignal(bool, bool, bool)   # labels shown, full-quality edges, zooming
 
 	def __init__(self, scene: QGraphicsScene, parent=None):
 		super().__init__(scene, parent)
 		self.setRenderHint(QPainter.Antialiasing, True)
 		#self.setViewportUpdateMode(QGraphicsView.BoundingRectViewportUpdate)
 		self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+		# every item pads its own boundingRect, skip Qt's extra AA margin bookkeeping
+		self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, True)
 		self.setBackgroundBrush(QBrush(BLACK))
 		self.setDragMode(QGraphicsView.NoDrag)
 		self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
@@ -687,6 +1012,15 @@ class GraphView(QGraphicsView):
 		self._dbl_timer: Optional[QTimer] = None
 		self._is_panning = False
 		self._pan_last = None  # type: Optional[QPoint]
+		# optional index-backed hit test: scene pos -> node item (or None for background)
+		self.node_at: Optional[Callable[[QPointF], Optional[QGraphicsItem]]] = None
+		# while True, edges paint in their cheap form (see _EdgeBatch)
+		self._interacting = False
+		self._zooming = False   # a zoom step happened during the current interaction
+		self._detail = (True, True, False)
+		self._settle_timer = QTimer(self)
+		self._settle_timer.setSingleShot(True)
+		self._settle_timer.timeout.connect(self._end_interaction)
 		self._build_zoom_buttons()
 		# Keep overlay buttons anchored on viewport changes
 		self.viewport().installEventFilter(self)
@@ -751,6 +1085,42 @@ class GraphView(QGraphicsView):
 			# next widget (if any) would be placed to the *left* of this one
 			vw = x
 
+	# --- pan/zoom interaction (drives the simplified-edge LOD) ---
+	def _begin_interaction(self):
+		self._settle_timer.stop()
+		self._interacting = True
+		self._zooming = False   # pans blit item caches; _apply_zoom turns them off again
+		self._update_detail()
+
+	def _touch_interaction(self):
+		"""Mark a one-off pan/zoom step; full quality returns once steps stop."""
+		self._interacting = True
+		self._settle_timer.start(INTERACTION_SETTLE_MS)
+		self._update_detail()
+
+	def _end_interaction(self):
+		if self._interacting:
+			self._interacting = False
+			self._zooming = False
+			self._update_detail()
+			self.viewport().update()
+
+	def _update_detail(self):
+		"""Emit detailChanged when the zoom crosses LOD_LABEL_ZOOM or an interaction starts/ends.
+
+		Items are switched once per change rather than each deciding in
+		paint(): a label that only returns early from paint() still gets its
+		device cache re-rendered on every zoom step. For the same reason
+		labels are off and agents drop their device caches while a zoom is in
+		progress (every step would re-render all of them); both come back for
+		pans and once the view settles.
+		"""
+		labels = self._zoom >= LOD_LABEL_ZOOM and not self._zooming
+		detail = (labels, labels and not self._interacting, self._zooming)
+		if detail != self._detail:
+			self._detail = detail
+			self.detailChanged.emit(*detail)
+
 	def wheelEvent(self, event):
 		# angleDelta is in 1/8th degree units; 120 ~= one notch
 		delta = event.angleDelta().y()
@@ -761,6 +1131,7 @@ class GraphView(QGraphicsView):
 		factor = 1.0 + (abs(delta) / 240.0)  # gentle
 		if delta < 0:
 			factor = 1.0 / factor
+		self._touch_interaction()
 		self._apply_zoom(factor)
 		# keep overlay crisp in place after zoom
 		self._reposition_buttons()
@@ -782,6 +1153,8 @@ class GraphView(QGraphicsView):
 			return
 		self.scale(factor, factor)
 		self._zoom = new_zoom
+		self._zooming = self._interacting
+		self._update_detail()
 		self.zoomChanged.emit(self._zoom)
 
 	# Arrow keys & WASD panning
@@ -803,6 +1176,8 @@ class GraphView(QGraphicsView):
 		speed = 1.0  # tweak pan sensitivity (lower = slower)
 		h = self.horizontalScrollBar()
 		v = self.verticalScrollBar()
+		self._zooming = False
+		self._touch_interaction()
 		h.setValue(h.value() - int(dx * speed))
 		v.setValue(v.value() - int(dy * speed))
 
@@ -831,6 +1206,7 @@ class GraphView(QGraphicsView):
 
 		# Anchor to view center during animation for stable flight
 		self.setTransformationAnchor(QGraphicsView.AnchorViewCenter)
+		self._begin_interaction()
 
 		i = {"k": 0}
 		self._dbl_timer = QTimer(self)
@@ -841,6 +1217,7 @@ class GraphView(QGraphicsView):
 				# Final snap to exact target
 				self.centerOn(scene_pos)
 				self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+				self._end_interaction()
 				return
 
 			# Zoom incrementally
@@ -874,11 +1251,16 @@ class GraphView(QGraphicsView):
 
 	# Mouse drag panning (sideways & any direction)
 	# Middle button always pans; left button pans only on empty background.
+	def _is_background_at(self, pos: QPoint) -> bool:
+		if self.node_at is not None:
+			return self.node_at(self.mapToScene(pos)) is None
+		return self._treat_as_background(self.itemAt(pos))
+
 	def mousePressEvent(self, e):
-		item = self.itemAt(e.pos())
-		if (e.button() == Qt.MiddleButton) or (e.button() == Qt.LeftButton and self._treat_as_background(item)):
+		if (e.button() == Qt.MiddleButton) or (e.button() == Qt.LeftButton and self._is_background_at(e.pos())):
 			self._panning = True
 			self._pan_last = e.pos()
+			self._begin_interaction()
 			self.setCursor(Qt.ClosedHandCursor)
 			e.accept()
 			return
@@ -905,6 +1287,7 @@ class GraphView(QGraphicsView):
 	def mouseReleaseEvent(self, e):
 		if self._panning and e.button() in (Qt.MiddleButton, Qt.LeftButton):
 			self._panning = False
+			self._end_interaction()
 			self.setCursor(Qt.ArrowCursor)
 			e.accept()
 			return
@@ -919,6 +1302,7 @@ class GraphView(QGraphicsView):
 		self.fitInView(r, Qt.KeepAspectRatio)
 		# keep internal zoom in sync with the new transform
 		self._zoom = self.transform().m11()
+		self._update_detail()
 		self._reposition_buttons()
 
 	def zoom_overlay_rect_global(self) -> QRect:
@@ -990,9 +1374,22 @@ class SessionGraph(QWidget):
 		self.c2.setPos(0, 0)
 
 		self.agent_items: Dict[str, AgentItem] = {}
-		self.edge_items: List[EdgeItem] = []
+		self.edges: Dict[str, EdgeItem] = {}   # sid -> the agent's single, stable edge
+		self.grid = _AgentGrid()               # spatial index over agent_items
+		self.view.node_at = self._node_at
 		self._centered_once = False
 
+		# level of detail: labels and edge styling switch per zoom tier/interaction
+		self._edge_batch = _EdgeBatch(self.edges)
+		self.scene.addItem(self._edge_batch)
+		self.view.detailChanged.connect(self._apply_detail)
+
+		# filter pass is coalesced to at most once per frame
+		self._filter_timer = QTimer(self)
+		self._filter_timer.setSingleShot(True)
+		self._filter_timer.setInterval(FILTER_COALESCE_MS)
+		self._filter_timer.timeout.connect(self._apply_filters_to_items)
+
 		# lazy persistence saver
 		self._save_timer = QTimer(self)
 		self._save_timer.setSingleShot(True)
@@ -1022,11 +1419,22 @@ class SessionGraph(QWidget):
 	def sessions_ws(self):
 		return self._sessions_ws
 
+	@property
+	def edge_items(self) -> List[EdgeItem]:
+		return list(self.edges.values())
+
+	def _apply_detail(self, labels: bool, full: bool, zooming: bool):
+		self._edge_batch.set_detail(labels, full)
+		for it in self.agent_items.values():
+			it.set_detail(labels, zooming)
+		for e in self.edges.values():
+			e.set_detail(labels, full)
+
 	def _retint_graph(self):
 		# schedule repaints so pens/brushes pick up new theme colors
 		self.scene.update()
-		for e in getattr(self, "edge_items", []):
-			try: e.refresh()
+		for e in self.edges.values():
+			try: e.refresh(force=True)
 			except Exception: pass
 
 	# ----- Filter Functions -----
@@ -1046,39 +1454,49 @@ class SessionGraph(QWidget):
 			self._show_windows = bool(show_windows)
 		if show_linux is not None:
 			self._show_linux = bool(show_linux)
-		self._apply_filters_to_items()
+		self._schedule_filters()
 
 	def set_transports_filter(self, protocols: set[str]):
 		self._allowed_protocols = {str(p).lower() for p in (protocols or set())}
-		self._apply_filters_to_items()
+		self._schedule_filters()
+
+	def _schedule_filters(self):
+		"""Queue one filter pass for the next frame; repeated calls coalesce."""
+		if not self._filter_timer.isActive():
+			self._filter_timer.start()
+
+	def _agent_passes_filters(self, it: AgentItem) -> bool:
+		osname = (it.node.os or "").lower()
+		is_win = osname.startswith("win")
+		is_lin = osname.startswith("lin") or "linux" in osname
+
+		# Unknown OS stays visible unless explicitly excluded by protocol
+		os_ok = ((is_win and self._show_windows) or
+				 (is_lin and self._show_linux) or
+				 (not is_win and not is_lin))
+
+		proto_ok = (it.node.protocol.lower() in self._allowed_protocols) if self._allowed_protocols else False
+		return bool(os_ok and proto_ok)
 
 	def _apply_filters_to_items(self):
-		# Apply to agent nodes
-		for it in self.agent_items.values():
-			osname = (it.node.os or "").lower()
-			is_win = osname.startswith("win")
-			is_lin = osname.startswith("lin") or "linux" in osname
-
-			# Unknown OS stays visible unless explicitly excluded by protocol
-			os_ok = ((is_win and self._show_windows) or
-					 (is_lin and self._show_linux) or
-					 (not is_win and not is_lin))
-
-			proto_ok = (it.node.protocol.lower() in self._allowed_protocols) if self._allowed_protocols else False
-			vis = bool(os_ok and proto_ok)
-			it.setVisible(vis)
-
-		# Apply to edges + their floating labels
-		for e in self.edge_items:
-			vis = e.dst.isVisible()
-			e.setVisible(vis)
+		self._filter_timer.stop()
+		for sid, it in self.agent_items.items():
+			vis = self._agent_passes_filters(it)
+			was = it.isVisible()
+			if vis != was:
+				it.setVisible(vis)
+
+			# edge + its floating label follow the agent
+			e = self.edges.get(sid)
+			if e is None:
+				continue
 			if vis:
-				e.refresh()
-			else:
-				try:
-					e.label.setVisible(False)
-				except Exception:
-					pass
+				if not e.isVisible():
+					e.setVisible(True)
+					e.refresh(force=True)   # label may have been hidden while filtered out
+			elif e.isVisible() or e.label.isVisible():
+				e.setVisible(False)
+				e.label.setVisible(False)
 
 	# ----- data & layout -----
 	def _try_start_ws(self):
@@ -1139,39 +1557,47 @@ class SessionGraph(QWidget):
 			if callable(ask):
 				ask()
 
-	def _rebuild_edges(self):
-		# clear edges (and their labels)
-		for e in self.edge_items:
-			try:
-				e.cleanup()
-			except Exception:
-				pass
-			self.scene.removeItem(e)
-		self.edge_items.clear()
-
-		# reset edge registries
-		try:
-			self.c2._edges.clear()
-		except Exception:
-			self.c2._edges = []
-
-		for item in self.agent_items.values():
-			try:
-				item._edges.clear()
-			except Exception:
-				item._edges = []
-
+	def _ensure_edge(self, item: AgentItem) -> EdgeItem:
+		"""Create the agent's edge on first sight; afterwards only its protocol is updated."""
+		sid = item.node.sid
+		edge = self.edges.get(sid)
+		if edge is None:
 			edge = EdgeItem(self.c2, item, item.node.protocol)
+			edge.set_detail(*self.view._detail[:2])
 			self.scene.addItem(edge)
-			self.edge_items.append(edge)
-			item._edges.append(edge)
-			try:
-				self.c2._edges.append(edge)
-			except Exception:
-				pass
-
+			self.edges[sid] = edge
 			edge.refresh()  # <-- place label & gap from the very first frame
-			self._apply_filters_to_items()
+		else:
+			edge.set_protocol(item.node.protocol)
+		return edge
+
+	def _node_at(self, scene_pos: QPointF) -> Optional[QGraphicsItem]:
+		"""Node (agent or C2) under scene_pos via the spatial index; None = background."""
+		if self.c2.sceneBoundingRect().contains(scene_pos):
+			return self.c2
+		def visible(sid: str) -> bool:
+			it = self.agent_items.get(sid)
+			return it is not None and it.isVisible()
+		sid = self.grid.hit(scene_pos, accept=visible)
+		return self.agent_items.get(sid) if sid is not None else None
+
+	def _content_rect(self) -> QRectF:
+		"""Agents + C2; scene.itemsBoundingRect() would include the scene-wide _EdgeBatch."""
+		r = self.c2.sceneBoundingRect()
+		b = self.grid.bounds()
+		return r.united(b) if b is not None else r
+
+	def _remove_agent(self, sid: str) -> bool:
+		it = self.agent_items.pop(sid, None)
+		self.grid.remove(sid)
+		edge = self.edges.pop(sid, None)
+		if edge is not None:
+			edge.cleanup()
+			self.scene.removeItem(edge)
+		if it is None:
+			return False
+		self.scene.removeItem(it)
+		return True
 
 	# ----- websocket handlers -----------------------------------------------
 	def _on_ws_snapshot(self, payload):
@@ -1185,25 +1611,27 @@ class SessionGraph(QWidget):
 		sessions = sessions or []
 
 		# Compute add/update/remove vs. current state
-		new_nodes = {self._dict_to_node(s).sid: self._dict_to_node(s) for s in sessions}
-		present_ids = set(self.agent_items.keys())
-		wanted_ids = set(new_nodes.keys())
+		new_nodes: Dict[str, SessionNode] = {}
+		for s in sessions:
+			node = self._dict_to_node(s)
+			new_nodes[node.sid] = node
 
+		changed = False
 		# remove gone
-		for sid in list(present_ids - wanted_ids):
-			it = self.agent_items.pop(sid)
-			self.scene.removeItem(it)
+		for sid in set(self.agent_items) - set(new_nodes):
+			changed |= self._remove_agent(sid)
 
-		# add/update
-		for sid, node in new_nodes.items():
-			self._upsert_node(node)
+		# add/update (only touched agents get their edge created/updated);
+		# sid order keeps first-time placement deterministic regardless of server order
+		for sid in sorted(new_nodes):
+			changed |= self._upsert_node(new_nodes[sid])
 
-		self._rebuild_edges()
-		self._apply_filters_to_items()
+		if changed:
+			self._schedule_filters()
 
 		if not self._centered_once:
 			if self.agent_items:
-				self.view.fit_all(self.scene.itemsBoundingRect(), margin=80)
+				self.view.fit_all(self._content_rect(), margin=80)
 			else:
 				self.view.centerOn(self.c2)
 			self._centered_once = True
@@ -1211,132 +1639,40 @@ class SessionGraph(QWidget):
 		"""if not self._centered_once:
 			self.view.centerOn(self.c2); self._centered_once = True"""
 
-		self._save_timer.start()
+		if changed:
+			self._save_timer.start()
 
 	def _on_ws_upsert(self, s: dict):
 		node = self._dict_to_node(s or {})
-		self._upsert_node(node)
-		self._rebuild_edges()
-		self._apply_filters_to_items()
-		self._save_timer.start()
+		if self._upsert_node(node):
+			self._schedule_filters()
+			self._save_timer.start()
 
 	def _on_ws_remove(self, sid: str):
 		if not sid:
 			return
-		it = self.agent_items.pop(sid, None)
-		if it:
-			self.scene.removeItem(it)
-			self._rebuild_edges()
-			self._apply_filters_to_items()
+		if self._remove_agent(sid):
 			self._save_timer.start()
 
-	def _upsert_node(self, node: SessionNode):
-		def _scene_rect_of(item: QGraphicsItem) -> QRectF:
-			# Use full boundingRect so labels are included
-			try:
-				return item.mapRectToScene(item.boundingRect())
-			except Exception:
-				r = getattr(item, "_rect", QRectF(-30, -30, 60, 60))
-				return r.translated(item.scenePos())
-
+	def _upsert_node(self, node: SessionNode) -> bool:
+		"""Add or update one agent (and its edge). Returns False when nothing changed."""
 		def _find_spawn_pos(new_item: AgentItem) -> QPointF:
 			"""
-			Choose a free position around C2 so the new node doesn't overlap others.
-			We scan concentric rings; for each candidate we compute how much it would
-			expand the overall union of node rectangles. Pick the one that keeps the
-			layout compact while preserving a minimum separation.
+			Choose a free position around C2 so the new node doesn't overlap others:
+			the first ring slot (inner rings first) at least min_sep from every
+			agent, taken from the grid's slot frontier (see _AgentGrid.free_slot).
 			"""
 			# Separation based on node footprint
 			w = new_item._rect.width()
 			h = new_item._rect.height()
 			min_sep = max(SPAWN_MIN_SEP_FLOOR, max(w, h) * 1.15)  # padding
 
-			# C2 center in scene coords (its local origin is already the center)
-			c2c = self.c2.scenePos()
-
 			# Start radius just outside the C2 icon + a bit
-			c2_half = max(getattr(self.c2, "_rect", QRectF(-30, -30, 60, 60)).width(),
-						  getattr(self.c2, "_rect", QRectF(-30, -30, 60, 60)).height()) * 0.5
+			c2_rect = getattr(self.c2, "_rect", QRectF(-30, -30, 60, 60))
+			c2_half = max(c2_rect.width(), c2_rect.height()) * 0.5
 			r0 = max(SPAWN_RING_START, c2_half + min_sep * 0.9)
 
-			# Existing agents (positions & scene rects)
-			existing_items = [it for it in self.agent_items.values() if it is not new_item]
-			existing_pos = [it.pos() for it in existing_items]
-
-			# Base union of current items (C2 + existing agents)
-			union = _scene_rect_of(self.c2)
-			for it in existing_items:
-				union = union.united(_scene_rect_of(it))
-			base_w, base_h = union.width(), union.height()
-
-			best = None  # (score, QPointF)
-
-			# Try rings; choose best score
-			max_rings = 30
-			for ring in range(max_rings):
-				r = r0 + ring * SPAWN_RING_STEP
-				circ = 2.0 * math.pi * r
-				slots = max(8, int(circ / (min_sep * 1.05)))
-				angle_offset = (ring * 0.37) % (2.0 * math.pi)  # golden-ish twist
-
-				for s in range(slots):
-					ang = angle_offset + (s / float(slots)) * (2.0 * math.pi)
-					cand = QPointF(c2c.x() + math.cos(ang) * r,
-								   c2c.y() + math.sin(ang) * r)
-
-					# Enforce minimum separation
-					nearest = float("inf")
-					ok = True
-					for p in existing_pos:
-						d = QLineF(cand, p).length()
-						nearest = min(nearest, d)
-						if d < min_sep:
-							ok = False
-							break
-					if not ok:
-						continue
-
-					# Compute union growth if we placed here
-					# (translate the new item's bounding rect to 'cand')
-					br_local = new_item.boundingRect()
-					br_scene = br_local.translated(cand)
-					new_union = union.united(br_scene)
-					dw = new_union.width()  - base_w
-					dh = new_union.height() - base_h
-
-					# Score: prefer *compact* footprint (small dw/dh), then spacing.
-					# Tune weights to taste.
-					spread_penalty = (dw * 1.2) + (dh * 1.0)
-					spacing_reward = min(nearest - min_sep, 1000.0) * 0.05
-
-					# Tiny nudge to place slightly *below* the nearest neighbor
-					# (helps to avoid label overlaps when there’s just one neighbor).
-					nudge = 0.0
-					if existing_pos:
-						# nearest neighbor y delta (positive means “below”)
-						y_deltas = sorted((cand.y() - p.y() for p in existing_pos),
-										  key=lambda v: abs(v))
-						if y_deltas:
-							nudge = (0.02 if y_deltas[0] > 0 else -0.02)
-
-					score = -spread_penalty + spacing_reward + nudge
-
-					if (best is None) or (score > best[0]):
-						best = (score, cand)
-
-				# Early exit: if we already found a candidate on an inner ring
-				# with zero union growth (perfect compact fit), take it.
-				if best is not None and best[0] > -1e-6:
-					break
-
-			if best is not None:
-				return best[1]
-
-			# Fallback: old grid (should rarely happen)
-			idx = len(self.agent_items)
-			spacing = min_sep * 1.25
-			return QPointF(c2c.x() + (idx % 10) * spacing - 5 * spacing,
-							c2c.y() + (idx // 10) * (spacing * 0.7))
+			return self.grid.free_slot(new_item.node.sid, self.c2.scenePos(), min_sep, r0)
 
 		item = self.agent_items.get(node.sid)
 		if item is None:
@@ -1347,6 +1683,7 @@ class SessionGraph(QWidget):
 			item.open_file_browser.connect(self._emit_open_file_browser)
 			item.open_ldap_browser.connect(self._emit_open_ldap_browser)
 			item.position_changed.connect(lambda: self._save_timer.start())
+			item.set_detail(self.view._detail[0], self.view._detail[2])
 			self.scene.addItem(item)
 			self.agent_items[node.sid] = item
 			# position (persisted or basic layout)
@@ -1356,12 +1693,20 @@ class SessionGraph(QWidget):
 			else:
 				# NEW: smart first-time placement around C2, avoiding other agents
 				item.setPos(_find_spawn_pos(item))
+			self.grid.insert(node.sid, item.pos(), item.sceneBoundingRect())
+			item._grid = self.grid
+		elif item.node == node:
+			return False
 		else:
+			old = item.node
 			item.node = node
-			clean_user = _strip_host_prefix(node.username, node.hostname)
-			item._label.setText(f"{clean_user}@{node.hostname}")
-			item._label.setPos(-item._label.boundingRect().width()/2, item._rect.height()/2 + 6)
-			#item._label.setPos(-item._label.boundingRect().width()/2, NODE_H/2 + 6)
+			if (old.username, old.hostname) != (node.username, node.hostname):
+				clean_user = _strip_host_prefix(node.username, node.hostname)
+				item.set_label(f"{clean_user}@{node.hostname}")
+			if old.os != node.os:
+				item.update()
+		self._ensure_edge(item)
+		return True
 
 	# ----- Browser Emits -----
 	def _emit_open_file_browser(self, sid: str, host: str):
@@ -5,7 +5,8 @@ from PyQt5.QtWidgets import (
     QLabel, QMessageBox, QStyledItemDelegate, QStyleOptionViewItem, QStyle
 )
 from PyQt5.QtCore import (
-    Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal, QSortFilterProxyModel, QRect, QEvent
+    Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal, QSortFilterProxyModel, QRect, QEvent,
+    QTimer
 )
 from PyQt5.QtGui import (
     QPalette, QColor, QFont, QPainter, QBrush, QPen, QIcon
@@ -73,13 +74,55 @@ COLUMNS = [
     ("Last Seen", "last_checkin"),   # rendered via _rel_last_seen
 ]
 
+_LAST_SEEN_COL = next(i for i, (_, k) in enumerate(COLUMNS) if k == "last_checkin")
+LAST_SEEN_TICK_MS = 1000
+
+# Cell styling is the same object for every row; build once, hand out the same instance.
+_SEEN_COLORS = {
+    "stale": "#9aa3ad",
+    "cool":  "#bdc6d1",
+    "warm":  "#e9d27e",
+    "live":  "#99e2b4",
+}
+_SEEN_COLOR_DEFAULT = "#cfd6dd"
+_QCOLOR_CACHE = {}
+_ID_FONT = None
+
+def _seen_color(cls):
+    c = _QCOLOR_CACHE.get(cls)
+    if c is None:
+        c = _QCOLOR_CACHE[cls] = QColor(_SEEN_COLORS.get(cls, _SEEN_COLOR_DEFAULT))
+    return c
+
+def _id_font():
+    global _ID_FONT
+    if _ID_FONT is None:
+        f = QFont()
+        f.setFamily("Consolas")
+        f.setPointSizeF(f.pointSizeF() * 0.95)
+        _ID_FONT = f
+    return _ID_FONT
+
+
 class SessionsModel(QAbstractTableModel):
-    def __init__(self):
-        super().__init__()
-        self._rows = []  # list[dict]
+    """
+    Rows are keyed by session id and keep their source position for as long as
+    the session lives: snapshots are diffed into insert/remove/dataChanged so
+    views, selection and the proxy's sort survive updates without a reset.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []   # list[dict], source order = arrival order
+        self._index = {}  # sid -> source row
+        self._seen = {}   # sid -> (label, cls); cleared by the 1 s tick
         self._sort_col = 1
         self._sort_order = Qt.AscendingOrder
 
+        self._tick = QTimer(self)
+        self._tick.setInterval(LAST_SEEN_TICK_MS)
+        self._tick.timeout.connect(self._refresh_last_seen)
+        self._tick.start()
+
     def rowCount(self, _=QModelIndex()):
         return len(self._rows)
 
@@ -91,6 +134,13 @@ class SessionsModel(QAbstractTableModel):
             return COLUMNS[section][0]
         return QVariant()
 
+    def _last_seen(self, row):
+        sid = row.get("id")
+        hit = self._seen.get(sid)
+        if hit is None:
+            hit = self._seen[sid] = _rel_last_seen(row.get("last_checkin"))
+        return hit
+
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
             return QVariant()
@@ -100,8 +150,7 @@ class SessionsModel(QAbstractTableModel):
 
         if role == Qt.DisplayRole:
             if key == "last_checkin":
-                label, _cls = _rel_last_seen(row.get(key))
-                return label
+                return self._last_seen(row)[0]
             return str(row.get(key, ""))
 
         if role == Qt.TextAlignmentRole:
@@ -111,19 +160,11 @@ class SessionsModel(QAbstractTableModel):
 
         if role == Qt.FontRole:
             if key in ("id",):
-                f = QFont()
-                f.setFamily("Consolas")
-                f.setPointSizeF(f.pointSizeF() * 0.95)
-                return f
+                return _id_font()
 
         if role == Qt.ForegroundRole:
             if key == "last_checkin":
-                label, cls = _rel_last_seen(row.get(key))
-                if cls == "stale":   return QColor("#9aa3ad")
-                if cls == "cool":    return QColor("#bdc6d1")
-                if cls == "warm":    return QColor("#e9d27e")
-                if cls == "live":    return QColor("#99e2b4")
-                return QColor("#cfd6dd")
+                return _seen_color(self._last_seen(row)[1])
         return QVariant()
 
     # Sorting (so header clicks work)
@@ -132,28 +173,130 @@ class SessionsModel(QAbstractTableModel):
 
         def _keyfunc(r):
             if key == "last_checkin":
-                label, cls = _rel_last_seen(r.get(key))
+                label, cls = self._last_seen(r)
                 # order live > warm > cool > stale by class + label
                 rank = {"live":0, "warm":1, "cool":2, "stale":3, "unknown":4}.get(cls, 5)
                 return (rank, label)
             return str(r.get(key, "")).lower()
 
         self.layoutAboutToBeChanged.emit()
+        old = {r.get("id"): i for i, r in enumerate(self._rows)}
         self._rows.sort(key=_keyfunc, reverse=(order == Qt.DescendingOrder))
+        self._reindex()
+        # remap persistent indexes (selection, proxy mapping) to the new rows
+        frm, to = [], []
+        for sid, new_row in self._index.items():
+            old_row = old.get(sid)
+            if old_row is None or old_row == new_row:
+                continue
+            for c in range(len(COLUMNS)):
+                frm.append(self.index(old_row, c))
+                to.append(self.index(new_row, c))
+        self.changePersistentIndexList(frm, to)
         self._sort_col, self._sort_order = column, order
         self.layoutChanged.emit()
 
+    def _reindex(self, start=0):
+        for i in range(start, len(self._rows)):
+            self._index[self._rows[i].get("id")] = i
+
     # Public
     def set_sessions(self, sessions: list):
-        """Replace data while preserving sort."""
-        selected_id = None
-        # caller can provide selected id, but we’ll allow external reselect
-        self.layoutAboutToBeChanged.emit()
-        self._rows = list(sessions or [])
-        # keep sort
-        self.layoutChanged.emit()
-        if self._sort_col is not None:
-            self.sort(self._sort_col, self._sort_order)
+        """
+        Apply a full snapshot as a diff: gone sessions are removed, new ones
+        appended, and changed ones only get dataChanged on the cells that differ.
+        Sorting is left to the proxy so source rows never move.
+        """
+        incoming = {}
+        for s in sessions or []:
+            incoming[str(s.get("id", ""))] = s
+
+        # removals, bottom-up in contiguous runs
+        gone = sorted((i for sid, i in self._index.items() if sid not in incoming), reverse=True)
+        if gone:
+            run_end = run_start = gone[0]
+            for i in gone[1:] + [None]:
+                if i is not None and i == run_start - 1:
+                    run_start = i
+                    continue
+                self._remove_rows(run_start, run_end)
+                if i is not None:
+                    run_end = run_start = i
+            self._reindex(gone[-1])
+
+        # updates in place
+        for sid, s in incoming.items():
+            i = self._index.get(sid)
+            if i is not None:
+                self._update_row(i, s)
+
+        # inserts, appended as one block
+        fresh = [s for sid, s in incoming.items() if sid not in self._index]
+        if fresh:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(fresh) - 1)
+            self._rows.extend(dict(s) for s in fresh)
+            self._reindex(first)
+            self.endInsertRows()
+
+    def upsert_session(self, session: dict):
+        """Apply a single-session delta (e.g. a 'get' reply)."""
+        sid = str(session.get("id", ""))
+        i = self._index.get(sid)
+        if i is not None:
+            self._update_row(i, session)
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first)
+        self._rows.append(dict(session))
+        self._index[sid] = first
+        self.endInsertRows()
+
+    def remove_session(self, sid: str):
+        i = self._index.get(sid)
+        if i is None:
+            return
+        self._remove_rows(i, i)
+        self._reindex(i)
+
+    def _remove_rows(self, first, last):
+        self.beginRemoveRows(QModelIndex(), first, last)
+        for r in self._rows[first:last + 1]:
+            self._index.pop(r.get("id"), None)
+            self._seen.pop(r.get("id"), None)
+        del self._rows[first:last + 1]
+        self.endRemoveRows()
+
+    def _update_row(self, i, session):
+        old = self._rows[i]
+        if old == session:
+            return
+        cols = [c for c, (_, key) in enumerate(COLUMNS) if old.get(key) != session.get(key)]
+        self._rows[i] = dict(session)
+        if "last_checkin" in (COLUMNS[c][1] for c in cols):
+            self._seen.pop(old.get("id"), None)
+        if cols:
+            self.dataChanged.emit(self.index(i, min(cols)), self.index(i, max(cols)))
+
+    def _refresh_last_seen(self):
+        """1 s tick: recompute last-seen labels, signal only rows whose label moved."""
+        if not self._rows:
+            return
+        old, self._seen = self._seen, {}
+        lo = hi = None
+        for i, r in enumerate(self._rows):
+            sid = r.get("id")
+            if sid not in old:
+                continue  # never rendered; computed on first paint
+            if self._last_seen(r) != old[sid]:
+                lo = i if lo is None else lo
+                hi = i
+        if lo is not None:
+            self.dataChanged.emit(self.index(lo, _LAST_SEEN_COL), self.index(hi, _LAST_SEEN_COL))
+
+    def row_of(self, sid: str):
+        """Source row for a session id, or -1."""
+        return self._index.get(sid, -1)
 
     def session_at(self, proxy_row: int, proxy_model: QSortFilterProxyModel):
         if proxy_row < 0:
@@ -318,7 +461,7 @@ class SessionsTab(QWidget):
         top.addWidget(self.columns_btn)
 
         # --- table view ---
-        self.model = SessionsModel()
+        self.model = SessionsModel(self)
         self.proxy = SessionsFilter()
         self.proxy.setSourceModel(self.model)
 
@@ -391,6 +534,8 @@ class SessionsTab(QWidget):
         self.ws.disconnected.connect(lambda: None)
         self.ws.error.connect(lambda e: None)
         self.ws.snapshot.connect(self._apply_snapshot)
+        self.ws.session.connect(self.model.upsert_session)
+        self.ws.killed.connect(lambda sid, _t: self.model.remove_session(sid))
         self.ws.open()
 
         # build columns menu
@@ -565,18 +710,10 @@ class SessionsTab(QWidget):
 
     # ----------- live updates -----------
     def _apply_snapshot(self, sessions: list):
-        # Keep selection & scroll
-        prev_sid = self._current_sid()
+        # Diffed into row inserts/removes/dataChanged; selection and scroll
+        # follow their persistent indexes, so nothing to restore here.
         self.model.set_sessions(sessions)
 
-        # reselect by id
-        if prev_sid:
-            id_col = 0
-            for r in range(self.proxy.rowCount()):
-                if self.proxy.index(r, id_col).data() == prev_sid:
-                    self.table.selectRow(r)
-                    break
-
     # Make clicks on empty space deselect the current row
     def eventFilter(self, obj, ev):
         if obj is self.table.viewport():
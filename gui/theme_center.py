@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import re
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 
-from PyQt5.QtCore import QObject, pyqtSignal, Qt
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, Qt
 from PyQt5.QtGui import QPalette, QColor, QFont
 from PyQt5.QtWidgets import (
     QApplication,
@@ -385,6 +387,371 @@ def build_global_qss(t: Theme) -> str:
     """
 
 
+# ---------------------------------------------------------------------------
+# Scoped component sheets
+# ---------------------------------------------------------------------------
+# Panes used to carry their own setStyleSheet() strings: one parse and one
+# extra polish per instance, all redone on every theme/accent change. They now
+# tag their root widget with use_sheet(widget, scope) and their rules live
+# here, scoped to that property and shipped inside the one app stylesheet
+# (compiled once per theme, see compiled_qss()).
+
+SCOPE_PROP = "themeScope"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+
+
+def _scope_selector(sel: str, attr: str) -> list[str]:
+    out = [f"*{attr} {sel}"]  # descendants of the tagged root
+    if not re.search(r"[\s>+~]", sel):
+        # the root itself (e.g. "QWidget {...}" used to style the pane): attr goes before any pseudo part
+        m = re.search(r":(?![^\[]*\])", sel)
+        out.append(sel + attr if m is None else sel[:m.start()] + attr + sel[m.start():])
+    return out
+
+
+def scoped_qss(scope: str, qss: str) -> str:
+    """Rewrite a widget-local stylesheet so it only applies under [themeScope=scope]."""
+    attr = f'[{SCOPE_PROP}="{scope}"]'
+    rules = []
+    for sels, body in _RULE_RE.findall(_COMMENT_RE.sub("", qss)):
+        scoped = [s2 for sel in sels.split(",") if sel.strip() for s2 in _scope_selector(sel.strip(), attr)]
+        if scoped:
+            rules.append(f"{', '.join(scoped)} {{{body.strip()}}}")
+    return "\n".join(rules)
+
+
+_SHEETS: Dict[str, Callable[[Theme], str]] = {}
+
+# Compiled app stylesheets, per theme + accent (+ any other color/font tweak)
+_QSS_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_QSS_CACHE_MAX = 16
+
+
+def register_sheet(scope: str, build: Callable[[Theme], str]) -> None:
+    _SHEETS[scope] = build
+    _QSS_CACHE.clear()
+
+
+def use_sheet(widget: QWidget, scope: str) -> None:
+    """Style `widget` and its children with the `scope` component sheet."""
+    widget.setProperty(SCOPE_PROP, scope)
+    if widget.isVisible():  # tagged after polish: refresh just this subtree
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+
+
+_FILES_QSS = """
+    QWidget { background:#0e1420; color:#e8e8e8; font-size:13px; }
+    QLabel { background:transparent; }
+    QLabel#StatusLabel { color:#8a93a3; }
+    /* Compact tabs */
+    QTabBar { margin-bottom: -2px; }
+    QTabBar::tab { background:#131a26; border:1px solid #273245; padding:4px 8px; margin-right:6px;
+                   border-top-left-radius:8px; border-top-right-radius:8px; min-height: 22px; }
+    QTabBar::tab:selected { background:#192235; }
+    /* Crumbs host shouldn’t reserve vertical space */
+    #CrumbsHost { background:transparent; padding:0; margin:0; min-height: 0; }
+    QToolButton[crumb="true"] { background:#131a26; border:1px solid #273245; border-radius:8px; padding:4px 8px; }
+    QToolButton[crumb="true"]:hover { background:#172134; }
+    QLineEdit { background:#0b111a; color:#e8e8e8; border:1px solid #273245; border-radius:8px; padding:6px 10px; }
+    QToolButton, QPushButton {
+        background:#131a26; color:#e8e8e8; border:1px solid #273245; border-radius:8px; padding:6px 12px;
+    }
+
+    /* ===== Windows 11-style TopNavBar ===== */
+    #TopNavBar {
+        background:#111722;
+        border:1px solid #1d2635;
+        border-radius:10px;
+    }
+    #TopNavBar QToolButton[toolbar="true"] {
+        min-width:36px; min-height:36px; border-radius:10px; padding:0;
+    }
+    #TopNavBar QToolButton[toolbar="true"]:hover { background:#172134; }
+    #TopNavBar QToolButton[toolbar="true"]:pressed { background:#101826; }
+    #TopNavBar QLineEdit {
+        background:#0b111a; color:#e8e8e8; border:1px solid #273245; border-radius:8px; padding:6px 10px;
+        min-width:240px;
+    }
+    /* Breadcrumbs more “to a tee”: flat text-like with chevrons */
+    #CrumbsHost { background:transparent; padding:0; margin:0; min-height:0; }
+    QToolButton[crumb="true"] {
+        background:transparent; border:0; border-radius:6px; padding:2px 6px; color:#e8e8e8;
+    }
+    QToolButton[crumb="true"]:hover { background:#1a2234; }
+    QLabel#CrumbSep { color:#8a93a3; padding:0 4px; }
+    /* ===== end TopNavBar ===== */
+
+    /* (Sidebar mini-toolbar CSS left as-is if present elsewhere) */
+
+    QToolButton:hover, QPushButton:hover { background:#172134; }
+    QToolButton:pressed, QPushButton:pressed { background:#101826; }
+
+    #Sidebar {
+        background:#111722;
+        border:1px solid #1d2635;
+        border-radius:10px;
+        selection-background-color:#1b2740;   /* fallback for some styles */
+        selection-color:#e8e8e8;
+        show-decoration-selected: 0;          /* prevent blue chip on the left */
+        outline: 0;                            /* no dotted focus outline */
+    }
+    QTreeWidget#Sidebar::item { height:26px; padding:2px 10px; }
+    QTreeWidget#Sidebar::item:hover { background:#172134; }
+    QTreeWidget#Sidebar::item:selected,
+    QTreeWidget#Sidebar::item:selected:active,
+    QTreeWidget#Sidebar::item:selected:!active {
+        background:#1b2740; color:#e8e8e8; border:0;
+    }
+    QTreeWidget#Sidebar::branch:selected,
+    QTreeWidget#Sidebar::branch:selected:active,
+    QTreeWidget#Sidebar::branch:selected:!active { background: transparent; }
+
+    QTableView {
+        background:#0b111a; border:1px solid #1d2635; border-radius:10px; gridline-color:#1b2434;
+    }
+    QHeaderView::section {
+        background:#111722; color:#e8e8e8; padding:6px 8px; border:0px; border-right:1px solid #1b2434;
+    }
+    QTableView::item:selected { background:#193156; }
+    QProgressBar { background:#0b111a; border:1px solid #273245; border-radius:6px; }
+
+    /* Hide any splitter grabber “dots” so it doesn’t look draggable here */
+    QSplitter::handle { image: none; }
+    QToolBar::handle { image: none; }
+    QLabel#CrumbSep { color:#8a93a3; padding:0 6px; }
+"""
+
+_LDAP_QSS = """
+    QWidget { color: #dce3ea; }
+    QFrame#TopBar {
+        background: transparent;
+    }
+
+    /* Quick Access header chip */
+    QLabel#QuickHdr {
+        font-weight: 800;
+        color: #eaf2ff;
+        padding: 2px 4px;
+    }
+
+    /* thin vertical separator used in the connection bar */
+    QFrame#VSep {
+        background: #243044;
+        min-width: 1px; max-width: 1px;
+        margin: 0 6px;
+    }
+    /* chip-like toggle for the Options row */
+    QToolButton#OptionsToggle {
+        background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #253242, stop:1 #1b2533);
+        border: 1px solid #2b3c5c;
+        border-radius: 11px;
+        padding: 4px 10px;
+        color: #dbe7fb;
+    }
+    QToolButton#OptionsToggle:hover { background: #243349; }
+    QToolButton#OptionsToggle:checked { background: #1e2a3e; }
+
+    QLineEdit, QComboBox, QTableView, QTreeView {
+        background: rgba(12,16,22,0.65);
+        border: 1px solid #243044;
+        border-radius: 9px;
+        selection-background-color: #1e293b;
+        selection-color: #eaf2ff;
+    }
+    QLineEdit:focus, QComboBox:focus, QTableView:focus, QTreeView:focus {
+        border: 1px solid #365985;
+    }
+    QHeaderView::section {
+        background: #0e1520;
+        color: #cdd6e3;
+        padding: 6px 8px;
+        border: 0;
+        border-bottom: 1px solid #1e2a3d;
+    }
+    QTableWidget {
+        gridline-color: #1f2b3e;
+        border: 1px solid #243044;
+        border-radius: 9px;
+    }
+    QTreeView {
+        background: transparent;
+        border: 1px solid #243044;
+        border-radius: 9px;
+        show-decoration-selected: 1;
+    }
+    QPushButton, QToolButton {
+        background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #253242, stop:1 #1b2533);
+        border: 1px solid #2b3c5c;
+        border-radius: 11px;
+        padding: 6px 12px;
+    }
+    QPushButton:hover, QToolButton:hover {
+        background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #2a3a4e, stop:1 #213044);
+    }
+    QPushButton:pressed, QToolButton:pressed { background: #172130; }
+
+    /* Slim scrollbars */
+    QScrollBar:vertical, QScrollBar:horizontal { background: transparent; border: none; margin: 0px; }
+    QScrollBar::handle { background: #2b3b52; border-radius: 6px; min-height: 24px; min-width: 24px; }
+    QScrollBar::handle:hover { background: #35506f; }
+    QScrollBar::add-line, QScrollBar::sub-line { height:0; width:0; }
+
+    /* Polished context menu to match the glassy dark UI */
+    QMenu {
+        background: #0f1622;
+        color: #dde6f3;
+        border: 1px solid #33455f;
+        border-radius: 10px;
+        padding: 6px 4px;
+    }
+    QMenu::separator {
+        height: 1px;
+        background: #233145;
+        margin: 6px 10px;
+    }
+    QMenu::item {
+        padding: 6px 14px;
+        border-radius: 6px;
+    }
+    QMenu::item:selected { background: #1a2433; }
+
+    /* File-browser style tabs */
+    QTabBar::tab {
+        background: #1a2330;
+        color: #d9e3f0;
+        border: 1px solid #2b3c5c;
+        padding: 6px 32px 6px 14px; /* room for a bigger close button */
+        border-top-left-radius: 9px;
+        border-top-right-radius: 9px;
+        margin-right: 6px;
+    }
+    QTabBar::tab:selected {
+        background: #202b3a;
+        border-bottom-color: #202b3a;
+    }
+    QTabBar::tab:!selected {
+        background: #151d28;
+    }
+
+    /* Make the built-in overflow scroller arrows look like premium chips */
+    QTabBar::scroller {
+        width: 42px;                       /* breathing room */
+    }
+
+    /* Gorgeous, crisp close button (real widget, not the style primitive) */
+    QToolButton#TabCloseBtn {
+        min-width: 24px;  max-width: 24px;
+        min-height: 24px; max-height: 24px;
+        padding: 0;
+        margin-left: 10px;
+        margin-right: 6px;              
+        border: 1px solid transparent;
+        border-radius: 12px;
+        background: transparent;
+    }
+    QToolButton#TabCloseBtn:hover {
+        background: rgba(239, 68, 68, 0.15); /* soft halo */
+        border: 1px solid rgba(239, 68, 68, 0.65);
+    }
+    QToolButton#TabCloseBtn:pressed {
+        background: rgba(220, 38, 38, 0.22);
+        border: 1px solid rgba(220, 38, 38, 0.85);
+        padding-top: 1px; padding-left: 1px; /* tiny tactile nudge */
+    }
+
+    QToolButton#TabCloseBtn:focus {
+        outline: none;
+        box-shadow: 0 0 0 2px rgba(95,142,214,0.35); /* subtle focus ring */
+        border: 1px solid #5f8ed6;
+    }
+
+    QTabBar QToolButton::right-arrow {
+        image: url(:/qt-project.org/styles/commonstyle/images/right-32.png);
+        width: 12px; height: 12px;
+    }
+    QTabBar QToolButton::left-arrow {
+        image: url(:/qt-project.org/styles/commonstyle/images/left-32.png);
+        width: 12px; height: 12px;
+    }
+
+    /* Slight spacing between tabs */
+    QTabBar { qproperty-movable: true; }
+    QTabBar::tab { margin-right: 8px; }
+"""
+
+_CONSOLE_QSS = """
+    QLabel#ConsoleTitle, QLabel#GSTitle { font-size:16.5pt; font-weight:600; color:#eaf2ff; letter-spacing:0.3px; }
+    QLabel#Badge {
+        color:#cfe3ff; background:rgba(63,134,255,0.11);
+        border:1px solid #2b3c5c; border-radius:9px; padding:2px 8px; font-size:9.5pt;
+    }
+    QPushButton#StatusBtn { color:#cbd5e1; border:none; padding:0 4px; font-size:9.5pt; }
+    QPushButton#Pill {
+        color:#cfd8e3; background:rgba(14,20,28,0.6);
+        border:1px solid #2a3446; border-radius:10px; padding:6px 10px;
+    }
+    QPushButton#Pill:hover { border-color:#3b82f6; }
+    QPushButton#Pill:checked { background:rgba(40,76,140,0.35); border-color:#3b82f6; color:#eaf2ff; }
+    QPlainTextEdit#ConsoleOutput {
+        background:transparent; color:#e6edf3; selection-background-color:#314e86;
+        selection-color:#eaf2ff; border:none;
+    }
+    QTextEdit#ConsoleOutput {
+        background:transparent; color:#dce3ea; selection-background-color:#314e86;
+        selection-color:#eaf2ff; border:none;
+    }
+    QLabel#HintChips { border:none; color:#a9b6c8; }
+    QLabel#PromptGlyph {
+        font: 12pt 'JetBrains Mono','Fira Code','Consolas','Menlo';
+        color:#cfe3ff; background:rgba(63,134,255,0.18); border:1px solid #2b3c5c; border-radius:9px;
+    }
+    QLineEdit#ConsoleInput {
+        color:#eaf2ff; background:rgba(10,14,20,0.65); border:1px solid #2b3c5c;
+        border-radius:10px; padding:8px 10px; selection-background-color:#3b82f6; selection-color:white;
+    }
+    QLineEdit#ConsoleInput:focus { border-color:#4b86ff; background:rgba(14,20,28,0.75); }
+    QPushButton#SendBtn {
+        background:#2b6af1; border:1px solid #3c78f5; color:white;
+        border-radius:10px; padding:8px 14px; font-weight:600;
+    }
+    QPushButton#SendBtn:hover { background:#3b7bff; border-color:#4b86ff; }
+    QPushButton#SendBtn:pressed { background:#2a62db; }
+"""
+
+register_sheet("files", lambda t: _FILES_QSS)
+register_sheet("ldap", lambda t: _LDAP_QSS)
+register_sheet("console", lambda t: _CONSOLE_QSS)
+
+
+
+def theme_key(t: Theme) -> tuple:
+    roles = (t.window, t.base, t.alt_base, t.text, t.disabled_text, t.button,
+             t.button_text, t.highlight, t.highlighted_text, t.link)
+    return (t.name, t.base_font_pt, tuple(c.name() for c in roles),
+            tuple(sorted((k, qc(v).name()) for k, v in t.colors.items())))
+
+
+def compiled_qss(t: Theme) -> str:
+    """Global QSS + every scoped component sheet, built once per theme/accent."""
+    key = theme_key(t)
+    qss = _QSS_CACHE.get(key)
+    if qss is None:
+        parts = [build_global_qss(t)]
+        parts += [scoped_qss(scope, build(t)) for scope, build in _SHEETS.items()]
+        qss = _QSS_CACHE[key] = "\n".join(parts)
+        while len(_QSS_CACHE) > _QSS_CACHE_MAX:
+            _QSS_CACHE.popitem(last=False)
+    else:
+        _QSS_CACHE.move_to_end(key)
+    return qss
+
+
 class ThemeManager(QObject):
     themeChanged = pyqtSignal(object)  # emits Theme
     _instance: Optional["ThemeManager"] = None
@@ -394,6 +761,12 @@ class ThemeManager(QObject):
         self._themes = dict(_BUILTINS)
         self._current: Theme = HACKER_GREEN
         self._font_scale = 1.0
+        self._applied_qss: Optional[str] = None
+        # set_theme_by_name / set_accent / set_font_scale coalesce into one restyle
+        self._pending_app: Optional[QApplication] = None
+        self._apply_timer = QTimer(self)
+        self._apply_timer.setSingleShot(True)
+        self._apply_timer.timeout.connect(self._apply_pending)
 
     @classmethod
     def instance(cls) -> "ThemeManager":
@@ -416,12 +789,30 @@ class ThemeManager(QObject):
         self.apply(app, base)
 
     def apply(self, app: QApplication, theme: Theme):
+        self._apply_timer.stop()
         base_pt = max(7, int(round(theme.base_font_pt * self._font_scale)))
         # Monospace makes the "hacker" vibe consistent across widgets.
-        app.setFont(QFont("DejaVu Sans Mono", base_pt))
-
-        app.setPalette(make_palette(theme))
-        app.setStyleSheet(build_global_qss(theme))
+        font = QFont("DejaVu Sans Mono", base_pt)
+        pal = make_palette(theme)
+        qss = compiled_qss(theme)
+
+        # One restyle per change: skip whatever is unchanged, and hold repaints
+        # of the visible windows until the stylesheet (which repolishes every
+        # widget anyway) is in, so they paint once with the final look.
+        frozen = [w for w in app.topLevelWidgets() if w.isVisible() and w.updatesEnabled()]
+        for w in frozen:
+            w.setUpdatesEnabled(False)
+        try:
+            if app.font() != font:
+                app.setFont(font)
+            if app.palette() != pal:
+                app.setPalette(pal)
+            if qss != self._applied_qss:
+                app.setStyleSheet(qss)
+                self._applied_qss = qss
+        finally:
+            for w in frozen:
+                w.setUpdatesEnabled(True)
         self._current = theme
         self.themeChanged.emit(theme)
 
@@ -433,15 +824,26 @@ class ThemeManager(QObject):
         st.setValue("theme/accent", theme.colors.get("accent", qc("#00ff66")).name())
         st.setValue("theme/font_scale", self._font_scale)
 
+    def _request(self, app: QApplication, theme: Theme):
+        """Make `theme` current now; restyle once on the next event-loop turn."""
+        self._current = theme
+        self._pending_app = app
+        self._apply_timer.start(0)
+
+    def _apply_pending(self):
+        app, self._pending_app = self._pending_app, None
+        if app is not None:
+            self.apply(app, self._current)
+
     def set_theme_by_name(self, app: QApplication, name: str):
-        self.apply(app, self._themes.get(name, HACKER_GREEN))
+        self._request(app, self._themes.get(name, HACKER_GREEN))
 
     def set_accent(self, app: QApplication, color: QColor):
-        self.apply(app, self._current.with_accent(color))
+        self._request(app, self._current.with_accent(color))
 
     def set_font_scale(self, app: QApplication, scale: float):
         self._font_scale = max(0.8, min(1.4, float(scale)))
-        self.apply(app, self._current)
+        self._request(app, self._current)
 
     def current(self) -> Theme:
         return self._current
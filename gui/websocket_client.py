@@ -9,6 +9,8 @@ from PyQt5.QtCore import QObject, QTimer, pyqtSignal, QUrl
 from PyQt5.QtNetwork import QAbstractSocket
 from PyQt5.QtWebSockets import QWebSocket
 
+from ws_transport import WSTransport, ws_request
+
 
 def _make_ws_url(base_http_url: str, path: str, token: str) -> QUrl:
     """
@@ -26,6 +28,19 @@ def _make_ws_url(base_http_url: str, path: str, token: str) -> QUrl:
     return QUrl(f"{ws_base}{path}?token={token}")
 
 
+def _index_snapshot(msg: dict) -> None:
+    """Decode-thread shaper: sid -> session map for the client cache."""
+    by_sid: Dict[str, dict] = {}
+    for s in msg.get("sessions") or []:
+        try:
+            sid = str(s.get("id") or s.get("sid") or "")
+            if sid:
+                by_sid[sid] = s
+        except Exception:
+            pass
+    msg["_by_sid"] = by_sid
+
+
 class SessionsWSClient(QObject):
     """
     High-level WebSocket wrapper for /ws/sessions.
@@ -69,7 +84,9 @@ class SessionsWSClient(QObject):
             self.ws.errorOccurred.connect(self._on_error)  # Qt >= 5.15
         else:
             self.ws.error.connect(self._on_error)
-        self.ws.textMessageReceived.connect(self._on_message)
+        # frames are parsed off the UI thread and delivered once per frame
+        self._rx = WSTransport(self.ws, self._on_message, on_bad=self._on_bad_frame,
+                               shapers={"snapshot": _index_snapshot}, parent=self)
 
     # ---- public -------------------------------------------------------------
 
@@ -103,6 +120,27 @@ class SessionsWSClient(QObject):
              cb: Optional[Callable[[dict], None]] = None) -> str:
         return self._send({"action": "exec", "sid": sid, "cmd": cmd, "op_id": op_id}, cb)
 
+    def history(self, q: str = "", *, sid: Optional[str] = None, op_id: Optional[str] = None,
+                before: Optional[int] = None, limit: int = 100,
+                cb: Optional[Callable[[dict], None]] = None) -> str:
+        """One page of command history (newest first); reply type "history", next page via before=reply["next"]."""
+        payload: Dict[str, Any] = {"action": "history", "q": q, "limit": limit}
+        if sid: payload["sid"] = sid
+        if op_id: payload["op_id"] = op_id
+        if before is not None: payload["before"] = before
+        return self._send(payload, cb)
+
+    def history_entry(self, hid: int, cb: Optional[Callable[[dict], None]] = None) -> str:
+        return self._send({"action": "history", "id": hid}, cb)
+
+    # teamserver diagnostics (admin only)
+    def profile(self, seconds: float = 10.0, interval_ms: float = 10.0, idle: bool = False,
+                cb: Optional[Callable[[dict], None]] = None) -> str:
+        return self._send({"action": "profile", "seconds": seconds, "interval_ms": interval_ms, "idle": idle}, cb)
+
+    def threads(self, window: float = 1.0, cb: Optional[Callable[[dict], None]] = None) -> str:
+        return self._send({"action": "threads", "window": window}, cb)
+
     # convenience for other widgets
     def get_cached(self, sid: str) -> Optional[dict]:
         return self._cache.get(sid)
@@ -118,7 +156,7 @@ class SessionsWSClient(QObject):
 
     def _open(self):
         url = _make_ws_url(self.api.base_url, "/ws/sessions", self.api.token)
-        self.ws.open(url)
+        self.ws.open(ws_request(url))
 
     def _schedule_reconnect(self):
         # exponential-ish backoff up to ~10s
@@ -167,13 +205,10 @@ class SessionsWSClient(QObject):
             name = self.ws.errorString()
         self.error.emit(name)
 
-    def _on_message(self, txt: str):
-        try:
-            msg = json.loads(txt)
-        except Exception:
-            self.rawMessage.emit({"type": "parse_error", "raw": txt})
-            return
+    def _on_bad_frame(self, txt: str):
+        self.rawMessage.emit({"type": "parse_error", "raw": txt})
 
+    def _on_message(self, msg: dict):
         self.rawMessage.emit(msg)
 
         t = (msg.get("type") or "").lower()
@@ -182,16 +217,12 @@ class SessionsWSClient(QObject):
         # dispatch per-type signals
         if t == "snapshot":
             sessions = msg.get("sessions") or []
-            # refresh local cache
-            new_cache: Dict[str, dict] = {}
-            for s in sessions:
-                try:
-                    sid = str(s.get("id") or s.get("sid") or "")
-                    if sid:
-                        new_cache[sid] = s
-                except Exception:
-                    pass
-            self._cache = new_cache
+            # refresh local cache (indexed on the decode thread)
+            by_sid = msg.pop("_by_sid", None)
+            if by_sid is None:
+                _index_snapshot(msg)
+                by_sid = msg.pop("_by_sid")
+            self._cache = by_sid
             self.snapshot.emit(sessions)
         elif t == "session":
             s = msg.get("session") or {}
@@ -245,7 +276,8 @@ class OperatorsWSClient(QObject):
             self.ws.errorOccurred.connect(self._on_error)
         else:
             self.ws.error.connect(self._on_error)
-        self.ws.textMessageReceived.connect(self._on_message)
+        self._rx = WSTransport(self.ws, self._on_message,
+                               on_bad=lambda txt: self.rawMessage.emit({"type":"parse_error","raw":txt}), parent=self)
 
         self._reconnect_timer = QTimer(self); self._reconnect_timer.setSingleShot(True)
         self._reconnect_timer.timeout.connect(self._open)
@@ -278,7 +310,7 @@ class OperatorsWSClient(QObject):
     # internals
     def _open(self):
         url = _make_ws_url(self.api.base_url, "/ws/operators", self.api.token)
-        self.ws.open(url)
+        self.ws.open(ws_request(url))
     def _schedule_reconnect(self):
         self._reconnect_ms = min(int(self._reconnect_ms*1.7), 10000)
         self._reconnect_timer.start(self._reconnect_ms)
@@ -304,9 +336,7 @@ class OperatorsWSClient(QObject):
         try: name = QAbstractSocket.SocketError(err).name if isinstance(err,int) else str(err)
         except Exception: name = self.ws.errorString()
         self.error.emit(name)
-    def _on_message(self, txt):
-        try: msg = json.loads(txt)
-        except Exception: self.rawMessage.emit({"type":"parse_error","raw":txt}); return
+    def _on_message(self, msg):
         self.rawMessage.emit(msg)
 
         t = (msg.get("type") or "").lower(); rid = msg.get("req_id")
@@ -0,0 +1,52 @@
+# gui/ws_codec.py
+"""
+Receive-side counterpart of the teamserver's ws_codec (no Qt in here, so it
+runs on the decode thread and in benchmarks).
+
+When ``msgpack`` is installed the GUI offers the ``sentinel.msgpack.v1``
+subprotocol. A teamserver that takes it announces ``{"type":"ws.codec"}``
+as its first (JSON) frame, then sends binary frames tagged 0x01 (msgpack
+message, uniform row lists packed as columns) or 0x02 (raw data, e.g. download
+chunks). Anything else is plain JSON text, as before.
+"""
+from __future__ import annotations
+
+try:  # optional: without it the GUI only offers JSON
+	import msgpack
+except Exception:
+	msgpack = None
+
+SUBPROTOCOL_MSGPACK = "sentinel.msgpack.v1"
+CODEC_MSGPACK = "msgpack"
+
+TAG_MSG = 0x01
+TAG_DATA = 0x02
+
+
+def available() -> bool:
+	return msgpack is not None
+
+
+def inflate(msg: dict) -> dict:
+	"""Turn columnar {"__cols__", "__rows__"} values back into lists of dicts, in place."""
+	for k, v in msg.items():
+		if isinstance(v, dict) and "__cols__" in v and "__rows__" in v:
+			cols = v["__cols__"]
+			msg[k] = [dict(zip(cols, row)) for row in v["__rows__"]]
+	return msg
+
+
+def decode_binary(data: bytes):
+	"""A tagged binary frame -> ("text", dict) | ("bin", bytes) | ("bad", bytes)."""
+	if not data:
+		return ("bad", data)
+	tag = data[0]
+	if tag == TAG_DATA:
+		return ("bin", data[1:])
+	if tag == TAG_MSG and msgpack is not None:
+		try:
+			msg = msgpack.unpackb(memoryview(data)[1:], raw=False, strict_map_key=False)
+		except Exception:
+			return ("bad", data)
+		return ("text", inflate(msg)) if isinstance(msg, dict) else ("bad", data)
+	return ("bad", data)
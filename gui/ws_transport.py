@@ -0,0 +1,213 @@
+# gui/ws_transport.py
+"""
+Off-thread receive path shared by the GUI websocket clients.
+
+QWebSocket delivers frames on the UI thread; parsing a large snapshot or
+listing there stalls painting. WSTransport hooks an existing QWebSocket,
+hands every frame to a decoder living on one shared worker thread
+(json.loads + optional per-type "shapers" that pre-build whatever the UI
+needs), and delivers the results back on the UI thread in arrival order,
+batched once per frame:
+
+	self.ws = QWebSocket()
+	self._rx = WSTransport(self.ws, self._on_message, shapers={"snapshot": _index_snapshot}, parent=self)
+
+Binary frames ride the same queue so they stay ordered with the text
+frames around them (downloads: begin -> chunks -> end).
+
+Open sockets with ws_request(url) to offer the compact msgpack encoding
+(see ws_codec); the decoder follows whatever the server announces, so the
+handlers always see plain dicts.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, QThread, QTimer, QCoreApplication, QUrl, pyqtSignal, pyqtSlot
+from PyQt5.QtNetwork import QNetworkRequest
+
+import ws_codec
+
+FRAME_MS = 16          # deliver decoded messages at most once per frame…
+FLUSH_BUDGET_MS = 8.0  # …and hand the rest to the next frame after this much UI-thread time
+
+Shaper = Callable[[dict], Any]
+
+_thread: Optional[QThread] = None
+
+
+def _decode_thread() -> QThread:
+	"""The one worker thread all transports decode on (started lazily)."""
+	global _thread
+	if _thread is None:
+		_thread = QThread()
+		_thread.setObjectName("ws-decode")
+		_thread.start()
+		app = QCoreApplication.instance()
+		if app is not None:
+			app.aboutToQuit.connect(_stop_decode_thread)
+	return _thread
+
+
+def _stop_decode_thread():
+	global _thread
+	if _thread is not None:
+		_thread.quit()
+		_thread.wait(2000)
+		_thread = None
+
+
+def ws_request(url) -> QNetworkRequest:
+	"""Handshake request for QWebSocket.open(); offers msgpack when it is installed."""
+	req = QNetworkRequest(url if isinstance(url, QUrl) else QUrl(url))
+	if ws_codec.available():
+		req.setRawHeader(b"Sec-WebSocket-Protocol", ws_codec.SUBPROTOCOL_MSGPACK.encode())
+	return req
+
+
+class TransportStats:
+	"""Process-wide counters the frame-time overlay reads."""
+	decoded = 0          # frames decoded
+	decode_s = 0.0       # worker time spent decoding/shaping
+	delivered = 0        # messages handed to the UI thread
+	last_flush_ms = 0.0  # UI time of the last delivery batch
+	max_flush_ms = 0.0
+	backlog = 0          # decoded, waiting for the next frame
+
+	@classmethod
+	def reset_peaks(cls):
+		cls.max_flush_ms = 0.0
+
+
+class _Decoder(QObject):
+	"""Lives on the decode thread; one per transport so shapers stay per-client."""
+	decoded = pyqtSignal(object)  # (kind, payload): ("text", dict) | ("bad", str) | ("bin", bytes)
+
+	def __init__(self, shapers: Dict[str, Shaper]):
+		super().__init__()
+		self._shapers = shapers
+		self._tagged = False  # server announced msgpack: binary frames carry a tag byte
+
+	def _shape(self, msg):
+		if isinstance(msg, dict):
+			shape = self._shapers.get(str(msg.get("type") or "").lower())
+			if shape is not None:
+				try:
+					shape(msg)
+				except Exception:
+					pass  # deliver unshaped; the client still copes with raw payloads
+		return msg
+
+	@pyqtSlot(object)
+	def decode(self, frame):
+		kind, data = frame
+		if kind == "reset":  # (re)connected: JSON until told otherwise
+			self._tagged = False
+			return
+		t0 = time.perf_counter()
+		if kind == "bin":
+			if not self._tagged:
+				self.decoded.emit(frame)
+				return
+			kind, data = ws_codec.decode_binary(data)
+			if kind != "text":
+				if kind == "bin":
+					self.decoded.emit((kind, data))
+				return
+			msg = data
+		else:
+			try:
+				msg = json.loads(data)
+			except Exception:
+				self.decoded.emit(("bad", data))
+				return
+			if isinstance(msg, dict) and msg.get("type") == "ws.codec":
+				self._tagged = msg.get("codec") == ws_codec.CODEC_MSGPACK
+				return
+		self._shape(msg)
+		TransportStats.decoded += 1
+		TransportStats.decode_s += time.perf_counter() - t0
+		self.decoded.emit(("text", msg))
+
+
+class WSTransport(QObject):
+	"""
+	Receive side of a QWebSocket, decoded off the UI thread.
+
+	on_message(dict)  - every JSON object frame, in order
+	on_binary(bytes)  - binary frames, in order with the text ones (optional)
+	on_bad(str)       - frames that are not JSON (optional)
+	shapers           - {type: fn(msg)} run on the worker; mutate msg in place
+	"""
+	_submit = pyqtSignal(object)
+
+	def __init__(self, ws, on_message: Callable[[dict], None], *,
+				 on_binary: Optional[Callable[[bytes], None]] = None,
+				 on_bad: Optional[Callable[[str], None]] = None,
+				 shapers: Optional[Dict[str, Shaper]] = None,
+				 parent: Optional[QObject] = None):
+		super().__init__(parent)
+		self._on_message = on_message
+		self._on_binary = on_binary
+		self._on_bad = on_bad
+		self._ready: list = []
+		self._head = 0
+
+		self._decoder = _Decoder(dict(shapers or {}))
+		self._decoder.moveToThread(_decode_thread())
+		self._submit.connect(self._decoder.decode)
+		self._decoder.decoded.connect(self._on_decoded)
+		self.destroyed.connect(self._decoder.deleteLater)
+
+		self._flush_timer = QTimer(self)
+		self._flush_timer.setSingleShot(True)
+		self._flush_timer.timeout.connect(self._flush)
+
+		ws.connected.connect(lambda: self._submit.emit(("reset", None)))
+		ws.textMessageReceived.connect(lambda s: self._submit.emit(("text", s)))
+		# always hooked: with msgpack negotiated, messages arrive as binary frames too
+		ws.binaryMessageReceived.connect(lambda b: self._submit.emit(("bin", bytes(b))))
+
+	def _on_decoded(self, item):
+		self._ready.append(item)
+		TransportStats.backlog += 1
+		if not self._flush_timer.isActive():
+			self._flush_timer.start(FRAME_MS)
+
+	def _flush(self):
+		t0 = time.perf_counter()
+		budget = FLUSH_BUDGET_MS / 1000.0
+		ready = self._ready
+		i = self._head
+		try:
+			while i < len(ready):
+				kind, payload = ready[i]
+				i += 1
+				try:
+					if kind == "text":
+						if isinstance(payload, dict):
+							self._on_message(payload)
+					elif kind == "bin":
+						if self._on_binary is not None:
+							self._on_binary(payload)
+					elif self._on_bad is not None:
+						self._on_bad(payload)
+				except Exception:
+					pass  # one bad handler must not wedge the queue
+				if time.perf_counter() - t0 > budget:
+					break
+		finally:
+			done = i - self._head
+			TransportStats.delivered += done
+			TransportStats.backlog -= done
+			if i >= len(ready):
+				self._ready = []
+				self._head = 0
+			else:
+				self._head = i
+				self._flush_timer.start(0)  # rest on the next turn of the event loop
+			ms = (time.perf_counter() - t0) * 1000.0
+			TransportStats.last_flush_ms = ms
+			TransportStats.max_flush_ms = max(TransportStats.max_flush_ms, ms)
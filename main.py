@@ -1,13 +1,59 @@
 #!/usr/bin/env python3
 import uvicorn
+import argparse
 import os
+import subprocess
 import sys
+import time
 
 # Ensure project root is in path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+
+def _start_state_service(sock: str) -> subprocess.Popen:
+    """Spawn the process that owns sessions/listeners and wait until it answers."""
+    from core import ipc
+
+    proc = subprocess.Popen([sys.executable, "-m", "core.teamserver.state_service", "--socket", sock], cwd=ROOT)
+    deadline = time.monotonic() + 30.0
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"[!] State service exited during startup (code {proc.returncode})")
+        try:
+            ipc.RpcClient(sock, connect_timeout=0.5).call("ping")
+            return proc
+        except ConnectionError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("[!] State service did not come up within 30s")
+
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="SentinelCommander teamserver")
+    ap.add_argument("--workers", type=int, default=int(os.getenv("SENTINEL_WORKERS", "1")),
+                    help="API worker processes; >1 moves sessions/listeners into a separate state service")
+    args = ap.parse_args()
+
     port = int(os.getenv("SENTINEL_PORT", "6060"))
     host = os.getenv("SENTINEL_HOST", "0.0.0.0")
     print(f"[*] Starting SentinelCommander Backend on {host}:{port}")
-    uvicorn.run("TeamServer.main:app", host=host, port=port, reload=False)
+
+    if args.workers <= 1:
+        uvicorn.run("TeamServer.main:app", host=host, port=port, reload=False)
+        raise SystemExit(0)
+
+    from core.teamserver import state_service
+
+    sock = os.getenv(state_service.ENV_SOCKET) or state_service.SOCKET_PATH
+    state = _start_state_service(sock)
+    os.environ[state_service.ENV_SOCKET] = sock  # inherited by every uvicorn worker
+    print(f"[*] State service pid {state.pid} on {sock}; {args.workers} API workers")
+    try:
+        uvicorn.run("TeamServer.main:app", host=host, port=port, reload=False, workers=args.workers)
+    finally:
+        state.terminate()
+        try:
+            state.wait(10)
+        except subprocess.TimeoutExpired:
+            state.kill()